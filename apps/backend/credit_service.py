@@ -2,17 +2,48 @@
 McLeuker AI - Credit Service v2
 Real-time usage-based credit deduction system (Manus AI style).
 Credits are deducted incrementally during task execution based on actual API usage.
+
+Billing sessions run against an in-process ledger (CreditLedger section):
+- start_billing_session reads the balance once and reserves an escrow
+- bill_operation debits the escrow locally (no database round trip) and
+  journals the debit to local disk before applying it
+- debits are settled with one atomic `settle_credit_debits` RPC at session end,
+  every CREDIT_CHECKPOINT_OPS operations / CREDIT_CHECKPOINT_SECONDS, or when
+  the escrow runs out; the legacy table writes are the fallback
+- sessions that stop billing (client gone without end_billing_session) have
+  their escrow released and debits settled after CREDIT_CHECKPOINT_SECONDS
+  idle, and are closed after CREDIT_SESSION_IDLE_TTL_SECONDS
+- debits journaled by a process that exited unsettled (crash) are adopted
+  and settled by the next process to start
+
+Configuration:
+- CREDIT_ESCROW_CREDITS: credits reserved per session refill (default 100)
+- CREDIT_OVERDRAFT_LIMIT: credits a session may debit past the balance (default 0)
+- CREDIT_CHECKPOINT_OPS: settle after this many unsettled debits (default 25)
+- CREDIT_CHECKPOINT_SECONDS: settle unsettled debits older than this (default 60)
+- CREDIT_SESSION_IDLE_TTL_SECONDS: close sessions idle longer than this (default 3600)
+- CREDIT_JOURNAL_DIR: unsettled-debit journals, one locked file per process (default /tmp/mcleuker_credit_journal)
+- CREDIT_JOURNAL_FSYNC: fsync each journal write (default true)
 """
 
 from decimal import Decimal
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
+import os
+import time
 import uuid
 import json
 
-from supabase import Client
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: journals are not shared between processes
+    FCNTL_AVAILABLE = False
+
+if TYPE_CHECKING:  # Only used for annotations; the client is injected
+    from supabase import Client
 
 
 class TaskStatus(Enum):
@@ -97,6 +128,16 @@ MODE_MIN_BALANCE = {
     "swarm": 10,
 }
 
+# Local ledger (see module docstring)
+CREDIT_ESCROW_CREDITS = int(os.getenv("CREDIT_ESCROW_CREDITS", "100"))
+CREDIT_OVERDRAFT_LIMIT = int(os.getenv("CREDIT_OVERDRAFT_LIMIT", "0"))
+CREDIT_CHECKPOINT_OPS = int(os.getenv("CREDIT_CHECKPOINT_OPS", "25"))
+CREDIT_CHECKPOINT_SECONDS = float(os.getenv("CREDIT_CHECKPOINT_SECONDS", "60"))
+CREDIT_SESSION_IDLE_TTL_SECONDS = float(os.getenv("CREDIT_SESSION_IDLE_TTL_SECONDS", "3600"))
+CREDIT_JOURNAL_DIR = os.getenv("CREDIT_JOURNAL_DIR", "/tmp/mcleuker_credit_journal")
+CREDIT_JOURNAL_FSYNC = os.getenv("CREDIT_JOURNAL_FSYNC", "true").lower() == "true"
+CREDIT_JOURNAL_COMPACT_RECORDS = 10000  # Rewrite the journal past this many records
+
 
 @dataclass
 class BillingResult:
@@ -127,6 +168,202 @@ class RunningTaskTracker:
     total_deducted: int = 0
     operations: list = field(default_factory=list)
     started_at: datetime = field(default_factory=datetime.utcnow)
+    # Ledger state
+    escrow: int = 0                     # Reserved credits not yet debited
+    unsettled: int = 0                  # Debited locally, not yet settled
+    unsettled_ops: list = field(default_factory=list)
+    settled_at: float = field(default_factory=time.monotonic)
+    last_activity: float = field(default_factory=time.monotonic)
+    overdraft: int = 0                  # Debited past the balance (CREDIT_OVERDRAFT_LIMIT)
+
+
+@dataclass
+class UserLedger:
+    """Per-user view of the local ledger"""
+    balance: int = 0                    # Last balance read from / returned by the database
+    pending: int = 0                    # Debited locally across sessions, not yet settled
+    held: int = 0                       # Escrow reserved by open sessions
+
+    @property
+    def available(self) -> int:
+        return self.balance - self.pending - self.held
+
+    @property
+    def projected_balance(self) -> int:
+        return max(0, self.balance - self.pending)
+
+
+class CreditJournal:
+    """
+    Append-only JSONL journal of local debits, one file per process
+    (journal-<pid>.jsonl in CREDIT_JOURNAL_DIR) held under an exclusive lock.
+    Every debit is written before it is applied; every settlement writes a
+    marker. replay() adopts only journals whose owner is gone (lock free)
+    and returns the debits that never reached the database.
+    """
+
+    def __init__(self, directory: str = CREDIT_JOURNAL_DIR, fsync: bool = CREDIT_JOURNAL_FSYNC):
+        self.directory = directory
+        self.path = os.path.join(directory, f"journal-{os.getpid()}.jsonl") if directory else None
+        self.fsync = fsync
+        self._fh = None
+        self._seq = 0
+        self._adopted: Dict[str, Any] = {}  # path -> locked handle of a dead process's journal
+        self._replayed = False
+        self.records_written = 0
+        self.records_since_compact = 0
+
+    @staticmethod
+    def _try_lock(fh) -> bool:
+        if not FCNTL_AVAILABLE:
+            return True
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _open(self, path: str):
+        fh = open(path, "a", encoding="utf-8")
+        if not self._try_lock(fh):
+            fh.close()
+            raise OSError(f"journal {path} is locked by another process")
+        return fh
+
+    def _write(self, record: Dict[str, Any]):
+        if not self.path:
+            return
+        try:
+            if self._fh is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._fh = self._open(self.path)
+            self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            self.records_written += 1
+            self.records_since_compact += 1
+        except OSError as e:
+            print(f"Credit journal write error: {e}")
+
+    def debit(self, session_id: str, user_id: str, amount: int, operation: str) -> int:
+        """Journal a debit. Returns its sequence number."""
+        self._seq += 1
+        self._write({"e": "debit", "q": self._seq, "s": session_id, "u": user_id, "n": amount, "op": operation})
+        return self._seq
+
+    def settled(self, session_id: str, seq: int):
+        """Mark every debit of a session up to seq as settled."""
+        self._write({"e": "settle", "q": seq, "s": session_id})
+
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Unsettled debits per session from journals of exited processes:
+        {session_id: {"user_id", "operations", "journal"}}. Adopted journals
+        stay locked until release().
+        """
+        sessions: Dict[str, Dict[str, Any]] = {}
+        if self._replayed or not self.directory or not os.path.isdir(self.directory):
+            return sessions
+        self._replayed = True
+        if self._fh is None and os.path.exists(self.path):
+            # Left by an earlier process with our pid; move it aside so it is adopted below
+            try:
+                os.replace(self.path, os.path.join(self.directory, f"journal-{os.getpid()}-{time.time_ns()}.jsonl"))
+            except OSError as e:
+                print(f"Credit journal replay error: {e}")
+        if not FCNTL_AVAILABLE:
+            return sessions  # Cannot tell live journals from orphans
+
+        markers = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if not (name.startswith("journal-") and name.endswith(".jsonl")) or path == self.path:
+                continue
+            try:
+                fh = open(path, "r+", encoding="utf-8")
+            except OSError:
+                continue
+            if not self._try_lock(fh):
+                fh.close()  # Owner is alive
+                continue
+            self._adopted[path] = fh
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash mid-write
+                session_id = record.get("s")
+                if record.get("e") == "debit":
+                    entry = sessions.setdefault(session_id, {"user_id": record["u"], "operations": [], "journal": path})
+                    entry["operations"].append({"op": record["op"], "cost": record["n"], "q": record["q"]})
+                elif record.get("e") == "settle":
+                    markers.append(record)
+
+        # Markers may sit in a different file than the debits (an adopter crashed mid-settlement)
+        for record in markers:
+            session_id = record.get("s")
+            if session_id in sessions:
+                remaining = [o for o in sessions[session_id]["operations"] if o["q"] > record["q"]]
+                if remaining:
+                    sessions[session_id]["operations"] = remaining
+                else:
+                    del sessions[session_id]
+        for path in set(self._adopted) - {e["journal"] for e in sessions.values()}:
+            self.release(path)
+        return sessions
+
+    def release(self, path: str):
+        """Delete an adopted journal once all of its debits are settled."""
+        fh = self._adopted.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Credit journal release error: {e}")
+        if fh is not None:
+            fh.close()
+
+    def compact(self, trackers):
+        """Rewrite this process's journal with only the unsettled debits of `trackers`."""
+        if not self.path or self._fh is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            # Lock the new file before it takes the journal's name, so no other process can adopt it
+            fh = self._open(tmp_path)
+            for tracker in trackers:
+                for o in tracker.unsettled_ops:
+                    fh.write(json.dumps({"e": "debit", "q": o["q"], "s": tracker.task_id, "u": tracker.user_id,
+                                         "n": o["cost"], "op": o["op"]}, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+            os.replace(tmp_path, self.path)
+            self._fh.close()
+            self._fh = fh
+            self.records_since_compact = 0
+        except OSError as e:
+            print(f"Credit journal compaction error: {e}")
+
+    def reset(self):
+        """Truncate this process's journal (call only when nothing is unsettled)."""
+        if self._fh is None:
+            return
+        try:
+            self._fh.truncate(0)  # Keeps the lock
+            self.records_since_compact = 0
+        except OSError as e:
+            print(f"Credit journal reset error: {e}")
+
+
+_process_journal: Optional[CreditJournal] = None
+
+
+def get_process_journal() -> CreditJournal:
+    """The journal of this process, shared by every CreditService instance in it"""
+    global _process_journal
+    if _process_journal is None:
+        _process_journal = CreditJournal()
+    return _process_journal
 
 
 class CreditService:
@@ -136,12 +373,25 @@ class CreditService:
     similar to Manus AI's credit system.
     """
 
-    def __init__(self, supabase: Client):
+    def __init__(self, supabase: "Client", journal: Optional[CreditJournal] = None):
         self.supabase = supabase
         self.min_credits_to_start = 3
         self.low_balance_threshold = 10
         # In-memory task trackers for real-time billing
         self._active_tasks: Dict[str, RunningTaskTracker] = {}
+        # Local ledger: per-user balances, closed sessions awaiting settlement
+        self._ledgers: Dict[str, UserLedger] = {}
+        self._unsettled: Dict[str, RunningTaskTracker] = {}
+        self._settle_rpc_available = True
+        self._ledger_stats = {
+            "sessions": 0, "operations": 0, "balance_reads": 0, "escrow_refills": 0,
+            "overdrafts": 0, "settlements": 0, "settle_rpc": 0, "settle_fallback": 0,
+            "settle_failures": 0, "recovered_sessions": 0, "reaped_sessions": 0,
+        }
+        self._recovered_journals: Dict[str, set] = {}  # adopted journal path -> unsettled session ids
+        self.journal = journal or get_process_journal()
+        for session_id, entry in self.journal.replay().items():
+            self._recover_session(session_id, entry)
 
     # ========================================================================
     # USER CREDIT MANAGEMENT
@@ -236,29 +486,29 @@ class CreditService:
     async def start_billing_session(self, user_id: str, mode: str) -> Optional[str]:
         """
         Start a billing session for a task. Returns a session_id.
-        Deducts the base cost immediately.
+        Reads the balance once, reserves an escrow and debits the base cost
+        locally. Returns None if the balance is below the mode minimum.
         """
+        if self._active_tasks:
+            await self.reap_idle_sessions()
+        if self._unsettled:
+            await self.settle_pending()
+
         min_required = MODE_MIN_BALANCE.get(mode, 5)
-        balance = await self.get_balance(user_id)
-        if balance < min_required:
+        ledger = self._ledgers.setdefault(user_id, UserLedger())
+        ledger.balance = await self.get_balance(user_id)
+        self._ledger_stats["balance_reads"] += 1
+        if ledger.available < min_required:
             return None
 
         session_id = str(uuid.uuid4())[:12]
         base_cost = MODE_BASE_COSTS.get(mode, 3)
 
-        # Deduct base cost immediately
-        result = await self.deduct_credits(user_id, base_cost, f"base_{mode}")
-        if not result.success:
-            return None
-
-        # Track the session
-        self._active_tasks[session_id] = RunningTaskTracker(
-            task_id=session_id,
-            user_id=user_id,
-            mode=mode,
-            total_deducted=base_cost,
-            operations=[{"op": f"base_{mode}", "cost": base_cost, "ts": datetime.utcnow().isoformat()}],
-        )
+        tracker = RunningTaskTracker(task_id=session_id, user_id=user_id, mode=mode)
+        self._active_tasks[session_id] = tracker
+        self._ledger_stats["sessions"] += 1
+        self._reserve(tracker, ledger, max(CREDIT_ESCROW_CREDITS, min_required))
+        self._debit(tracker, ledger, base_cost, f"base_{mode}")
 
         return session_id
 
@@ -271,8 +521,9 @@ class CreditService:
     ) -> BillingResult:
         """
         Bill for a specific operation during task execution.
-        Deducts credits in real-time as each operation completes.
-        Returns the billing result with updated balance.
+        Debits the session escrow locally; only refilling an exhausted escrow
+        or a settlement checkpoint touches the database.
+        Returns the billing result with the projected balance.
         """
         tracker = self._active_tasks.get(session_id)
         if not tracker:
@@ -280,55 +531,74 @@ class CreditService:
             return BillingResult(
                 success=True, credits_used=0, remaining_balance=0, margin_usd=Decimal("0")
             )
+        tracker.last_activity = time.monotonic()
 
         # Calculate cost for this operation
         base_cost = OPERATION_COSTS.get(operation, 1)
         cost = max(1, int(base_cost * units))
-
-        # Check if user still has credits
-        balance = await self.get_balance(tracker.user_id)
-        if balance < cost:
-            # Insufficient credits — deduct what's available, then signal pause
-            if balance > 0:
-                result = await self.deduct_credits(tracker.user_id, balance, f"{operation}")
-                tracker.total_deducted += balance
-                tracker.operations.append({
-                    "op": operation, "cost": balance, "context": context,
-                    "ts": datetime.utcnow().isoformat(), "partial": True
-                })
+        ledger = self._ledgers.setdefault(tracker.user_id, UserLedger())
+
+        if tracker.escrow < cost:
+            # Escrow exhausted: settle what was spent (returns a fresh balance) and refill
+            if tracker.unsettled:
+                await self._settle(tracker)
+            else:
+                ledger.balance = await self.get_balance(tracker.user_id)
+                self._ledger_stats["balance_reads"] += 1
+            self._ledger_stats["escrow_refills"] += 1
+            self._reserve(tracker, ledger, max(CREDIT_ESCROW_CREDITS, cost) - tracker.escrow)
+
+        if tracker.escrow < cost:
+            # Overdraft guard: how far past the balance this session may still go
+            if tracker.escrow + CREDIT_OVERDRAFT_LIMIT - tracker.overdraft >= cost:
+                tracker.overdraft += cost - tracker.escrow
+                self._ledger_stats["overdrafts"] += 1
+            elif tracker.escrow > 0:
+                # Insufficient credits — deduct what's available, then signal pause
+                charged = tracker.escrow
+                self._debit(tracker, ledger, charged, operation, context, partial=True)
+                await self._maybe_checkpoint(tracker)
                 return BillingResult(
                     success=True,
-                    credits_used=balance,
-                    remaining_balance=0,
+                    credits_used=charged,
+                    remaining_balance=ledger.projected_balance,
                     margin_usd=Decimal("0"),
                     should_pause=True,
                     error="Low credits - task may be limited"
                 )
-            return BillingResult(
-                success=False, credits_used=0, remaining_balance=0,
-                margin_usd=Decimal("0"), should_pause=True,
-                error="Insufficient credits"
-            )
-
-        # Deduct the operation cost
-        result = await self.deduct_credits(tracker.user_id, cost, f"{operation}")
-        if result.success:
-            tracker.total_deducted += cost
-            tracker.operations.append({
-                "op": operation, "cost": cost, "context": context,
-                "ts": datetime.utcnow().isoformat()
-            })
+            else:
+                return BillingResult(
+                    success=False, credits_used=0, remaining_balance=ledger.projected_balance,
+                    margin_usd=Decimal("0"), should_pause=True,
+                    error="Insufficient credits"
+                )
 
-        return result
+        self._debit(tracker, ledger, cost, operation, context)
+        await self._maybe_checkpoint(tracker)
+        return BillingResult(
+            success=True,
+            credits_used=cost,
+            remaining_balance=ledger.projected_balance,
+            margin_usd=Decimal("0"),
+        )
 
     async def end_billing_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
-        End a billing session and return the summary.
+        End a billing session, release its escrow, settle its debits
+        and return the summary.
         """
         tracker = self._active_tasks.pop(session_id, None)
         if not tracker:
             return None
 
+        ledger = self._ledgers.setdefault(tracker.user_id, UserLedger())
+        ledger.held -= tracker.escrow
+        tracker.escrow = 0
+        settled = await self._settle(tracker)
+        if not settled:
+            self._unsettled[session_id] = tracker  # Retried by the next session start
+        self._trim_journal()
+
         summary = {
             "session_id": session_id,
             "user_id": tracker.user_id,
@@ -337,10 +607,218 @@ class CreditService:
             "operations_count": len(tracker.operations),
             "operations": tracker.operations,
             "duration_seconds": (datetime.utcnow() - tracker.started_at).total_seconds(),
+            "remaining_balance": ledger.projected_balance,
+            "settled": settled,
         }
 
         return summary
 
+    async def reap_idle_sessions(self) -> int:
+        """
+        Release and settle sessions that stopped billing without being ended.
+        Idle past CREDIT_CHECKPOINT_SECONDS: the escrow goes back to the user
+        and the debits are settled (a later operation refills the escrow).
+        Idle past CREDIT_SESSION_IDLE_TTL_SECONDS: the session is ended.
+        Returns how many sessions were ended.
+        """
+        now = time.monotonic()
+        ended = 0
+        for session_id, tracker in list(self._active_tasks.items()):
+            idle = now - tracker.last_activity
+            if idle >= CREDIT_SESSION_IDLE_TTL_SECONDS:
+                await self.end_billing_session(session_id)
+                self._ledger_stats["reaped_sessions"] += 1
+                ended += 1
+            elif idle >= CREDIT_CHECKPOINT_SECONDS:
+                ledger = self._ledgers.setdefault(tracker.user_id, UserLedger())
+                ledger.held -= tracker.escrow
+                tracker.escrow = 0
+                await self._settle(tracker)
+        return ended
+
+    def get_session_balance(self, session_id: str) -> Optional[int]:
+        """Projected balance for a session's user, without a database read"""
+        tracker = self._active_tasks.get(session_id)
+        if not tracker:
+            return None
+        ledger = self._ledgers.get(tracker.user_id)
+        return ledger.projected_balance if ledger else None
+
+    # ========================================================================
+    # CREDIT LEDGER (escrow, journal, batched settlement)
+    # ========================================================================
+
+    def _reserve(self, tracker: RunningTaskTracker, ledger: UserLedger, amount: int) -> int:
+        """Move up to `amount` available credits into the session escrow"""
+        amount = max(0, min(amount, ledger.available))
+        tracker.escrow += amount
+        ledger.held += amount
+        return amount
+
+    def _debit(
+        self, tracker: RunningTaskTracker, ledger: UserLedger, amount: int,
+        operation: str, context: str = "", partial: bool = False
+    ):
+        """O(1) local debit: journal first, then apply"""
+        seq = self.journal.debit(tracker.task_id, tracker.user_id, amount, operation)
+        from_escrow = min(amount, tracker.escrow)
+        tracker.escrow -= from_escrow
+        ledger.held -= from_escrow
+        ledger.pending += amount
+        tracker.unsettled += amount
+        tracker.unsettled_ops.append({"op": operation, "cost": amount, "q": seq})
+        tracker.total_deducted += amount
+        op = {"op": operation, "cost": amount, "context": context, "ts": datetime.utcnow().isoformat()}
+        if partial:
+            op["partial"] = True
+        tracker.operations.append(op)
+        self._ledger_stats["operations"] += 1
+
+    async def _maybe_checkpoint(self, tracker: RunningTaskTracker):
+        if len(tracker.unsettled_ops) >= CREDIT_CHECKPOINT_OPS or \
+                time.monotonic() - tracker.settled_at >= CREDIT_CHECKPOINT_SECONDS:
+            await self._settle(tracker)
+
+    async def _settle(self, tracker: RunningTaskTracker) -> bool:
+        """Settle a session's unsettled debits. Returns False if it must be retried."""
+        if tracker.unsettled <= 0:
+            return True
+        seq = tracker.unsettled_ops[-1]["q"]
+        operations = [{"op": o["op"], "cost": o["cost"]} for o in tracker.unsettled_ops]
+        new_balance = await self._settle_debits(
+            tracker.user_id, tracker.task_id, tracker.unsettled, operations, f"{tracker.task_id}:{seq}"
+        )
+        if new_balance is None:
+            self._ledger_stats["settle_failures"] += 1
+            return False
+
+        self.journal.settled(tracker.task_id, seq)
+        ledger = self._ledgers.setdefault(tracker.user_id, UserLedger())
+        ledger.pending -= tracker.unsettled
+        ledger.balance = new_balance
+        tracker.unsettled = 0
+        tracker.unsettled_ops = []
+        tracker.settled_at = time.monotonic()
+        self._ledger_stats["settlements"] += 1
+        return True
+
+    async def _settle_debits(
+        self, user_id: str, session_id: str, amount: int,
+        operations: List[Dict[str, Any]], settlement_id: str
+    ) -> Optional[int]:
+        """
+        Apply `amount` to the database in one call. Returns the new balance,
+        or None on failure. settlement_id makes a journal replay idempotent.
+        """
+        if self._settle_rpc_available:
+            try:
+                result = self.supabase.rpc("settle_credit_debits", {
+                    "p_user_id": user_id,
+                    "p_amount": amount,
+                    "p_settlement_id": settlement_id,
+                    "p_session_id": session_id,
+                    "p_operations": operations,
+                }).execute()
+                data = result.data[0] if isinstance(result.data, list) and result.data else result.data
+                if data and data.get("success"):
+                    self._ledger_stats["settle_rpc"] += 1
+                    return int(data.get("new_balance", 0))
+            except Exception as e:
+                message = str(e)
+                if "PGRST202" not in message and "settle_credit_debits" not in message:
+                    # May have been applied; retry later under the same settlement_id
+                    print(f"Credit settlement RPC error: {e}")
+                    return None
+                # Migration 009 not applied; use the table writes from now on
+                self._settle_rpc_available = False
+
+        try:
+            current_balance = await self.get_balance(user_id)
+            new_balance = max(0, current_balance - amount)
+            self.supabase.table("user_credits")\
+                .update({
+                    "balance": new_balance,
+                    "updated_at": datetime.utcnow().isoformat()
+                })\
+                .eq("user_id", user_id)\
+                .execute()
+
+            try:
+                self.supabase.table("users")\
+                    .update({"credit_balance": new_balance})\
+                    .eq("id", user_id)\
+                    .execute()
+            except Exception:
+                pass
+
+            try:
+                self.supabase.table("credit_transactions")\
+                    .insert({
+                        "user_id": user_id,
+                        "amount": -amount,
+                        "balance_after": new_balance,
+                        "type": "deduction",
+                        "description": f"Credit deduction: {', '.join(o['op'] for o in operations)}",
+                        "session_id": session_id,
+                    })\
+                    .execute()
+            except Exception:
+                pass
+
+            self._ledger_stats["settle_fallback"] += 1
+            return new_balance
+        except Exception as e:
+            print(f"Credit settlement error: {e}")
+            return None
+
+    def _recover_session(self, session_id: str, entry: Dict[str, Any]):
+        """Queue journaled debits from a previous process for settlement"""
+        tracker = RunningTaskTracker(task_id=session_id, user_id=entry["user_id"], mode="recovered")
+        tracker.unsettled_ops = entry["operations"]
+        tracker.unsettled = sum(o["cost"] for o in tracker.unsettled_ops)
+        tracker.total_deducted = tracker.unsettled
+        self._ledgers.setdefault(tracker.user_id, UserLedger()).pending += tracker.unsettled
+        self._unsettled[session_id] = tracker
+        self._recovered_journals.setdefault(entry["journal"], set()).add(session_id)
+        self._ledger_stats["recovered_sessions"] += 1
+
+    async def settle_pending(self) -> int:
+        """Retry settlement of closed and recovered sessions. Returns how many remain."""
+        for session_id, tracker in list(self._unsettled.items()):
+            if await self._settle(tracker):
+                del self._unsettled[session_id]
+                for path, session_ids in list(self._recovered_journals.items()):
+                    session_ids.discard(session_id)
+                    if not session_ids:
+                        del self._recovered_journals[path]
+                        self.journal.release(path)
+        self._trim_journal()
+        return len(self._unsettled)
+
+    def _trim_journal(self):
+        # Recovered sessions live in the adopted journal, not in ours
+        own_unsettled = [t for t in self._unsettled.values() if t.mode != "recovered"]
+        if not self._active_tasks and not own_unsettled:
+            self.journal.reset()
+        elif self.journal.records_since_compact >= CREDIT_JOURNAL_COMPACT_RECORDS:
+            self.journal.compact([*self._active_tasks.values(), *own_unsettled])
+
+    def get_ledger_stats(self) -> Dict[str, Any]:
+        """Ledger counters for /health"""
+        stats = self._ledger_stats
+        return {
+            **stats,
+            "db_calls_per_operation": round(
+                (stats["balance_reads"] + stats["settlements"]) / stats["operations"], 3
+            ) if stats["operations"] else None,
+            "open_sessions": len(self._active_tasks),
+            "unsettled_sessions": len(self._unsettled),
+            "pending_credits": sum(l.pending for l in self._ledgers.values()),
+            "held_credits": sum(l.held for l in self._ledgers.values()),
+            "settle_rpc_available": self._settle_rpc_available,
+            "journal_records": self.journal.records_written,
+        }
+
     # ========================================================================
     # CORE CREDIT OPERATIONS
     # ========================================================================
@@ -25,9 +25,11 @@ Models:
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse, Response
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Dict, Any, Union, AsyncGenerator
+from typing import List, Optional, Literal, Dict, Any, Union, AsyncGenerator, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import openai
 import os
 import json
@@ -37,6 +39,12 @@ import uuid
 import re
 import time
 import hashlib
+import functools
+import copy
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
 import traceback
@@ -46,10 +54,16 @@ from enum import Enum
 import csv
 from io import BytesIO
 import base64
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote
 import mimetypes
 import tempfile
 import io
+import aiofiles
+
+# HTML parsing off the event loop (in-tree, no optional dependencies)
+from src.utils.html_extract import (
+    extract_readable_content, extract_text_and_links, parse_off_loop, shutdown_parse_pool,
+)
 
 # JWT Auth
 from jose import JWTError, jwt
@@ -161,6 +175,9 @@ security_bearer = HTTPBearer(auto_error=False)
 UPLOAD_DIR = Path("/tmp/mcleuker_uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 MAX_UPLOAD_SIZE_MB = 50
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Uploads are spooled to disk 1MB at a time
+UPLOAD_PIPELINE_WORKERS = int(os.getenv("UPLOAD_PIPELINE_WORKERS", "4"))
+MAX_VISION_BASE64_MB = 10
 ALLOWED_IMAGE_TYPES = {"image/png", "image/jpeg", "image/webp", "image/gif", "image/svg+xml", "image/bmp", "image/tiff"}
 ALLOWED_VIDEO_TYPES = {"video/mp4", "video/webm", "video/quicktime", "video/x-msvideo", "video/x-matroska"}
 ALLOWED_DOC_TYPES = {
@@ -234,6 +251,18 @@ grok_client = openai.OpenAI(
     base_url="https://api.x.ai/v1"
 ) if GROK_API_KEY else None
 
+# Async LLM clients - used for token streaming so a long completion never
+# blocks the event loop (the sync clients above are kept for existing callers)
+kimi_async_client = openai.AsyncOpenAI(
+    api_key=KIMI_API_KEY,
+    base_url="https://api.moonshot.ai/v1"
+) if KIMI_API_KEY else None
+
+grok_async_client = openai.AsyncOpenAI(
+    api_key=GROK_API_KEY,
+    base_url="https://api.x.ai/v1"
+) if GROK_API_KEY else None
+
 # ============================================================================
 # AGENTIC AI MODULE INITIALIZATION
 # ============================================================================
@@ -248,8 +277,9 @@ try:
     from agentic.grok_client import GrokClient
     from agentic.kimi25_client import Kimi25Client
     from agentic.websocket_handler import ExecutionWebSocketManager, get_websocket_manager
+    from core.frame_stream import recording_summary, replay_recording
     from agentic.github_integration import GitHubClient
-    from agentic.browser_engine import BrowserEngine, get_browser_engine, shutdown_browser_engine, PLAYWRIGHT_AVAILABLE
+    from agentic.browser_engine import BrowserEngine, BrowserPool, get_browser_engine, shutdown_browser_engine, PLAYWRIGHT_AVAILABLE
     AGENTIC_AVAILABLE = True
     logger.info("Agentic AI modules loaded successfully")
 except ImportError as e:
@@ -271,6 +301,23 @@ try:
 except ImportError as e:
     logger.warning(f"Agent V3 framework not available: {e}")
 
+# Browser extraction stats — the same utils.browser_extraction module (and
+# render cache) the agentic browser engine imports
+BROWSER_EXTRACTION_AVAILABLE = False
+try:
+    from utils.browser_extraction import get_extraction_stats
+    BROWSER_EXTRACTION_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"Browser extraction stats not available: {e}")
+
+# Safety guard (per-user request rate limits)
+SAFETY_GUARD_AVAILABLE = False
+try:
+    from core.safety import get_safety_guard
+    SAFETY_GUARD_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"Safety guard not available: {e}")
+
 # Initialize agentic components
 e2b_manager = None
 browserless_client = None
@@ -280,6 +327,7 @@ ws_manager = None
 kimi25_client_instance = None
 grok_client_instance = None
 browser_engine_instance = None
+browser_pool = None
 
 if AGENTIC_AVAILABLE:
     try:
@@ -317,11 +365,14 @@ if AGENTIC_AVAILABLE:
         # Browser Engine (Playwright-based with live screenshots)
         try:
             if PLAYWRIGHT_AVAILABLE:
+                # One warm Chromium; each execution leases its own context
+                browser_pool = BrowserPool()
                 browser_engine_instance = BrowserEngine(
                     kimi_client=kimi_client,
                     grok_client=grok_client,
+                    pool=browser_pool,
                 )
-                logger.info("Playwright browser engine initialized (will start on first use)")
+                logger.info(f"Playwright browser engine initialized (pool of {browser_pool.max_contexts} contexts, will start on first use)")
             else:
                 logger.warning("Playwright not available — browser engine disabled")
         except Exception as be_err:
@@ -338,6 +389,7 @@ if AGENTIC_AVAILABLE:
             browser_engine=browser_engine_instance,
             max_steps=15,
             enable_auto_correct=True,
+            frame_publisher=ws_manager.frame_publisher if ws_manager else None,
         )
         logger.info("Execution orchestrator initialized")
     except Exception as e:
@@ -694,10 +746,17 @@ try:
 
         # Browser engine V3
         try:
+            # Sessions lease isolated contexts from the shared Chromium pool
             v4_browser_engine = BrowserEngineV3(
                 headless=True,
                 llm_client=v4_llm_client,
+                pool=browser_pool,
             )
+            if ws_manager:
+                # Raw frames go to the LiveScreen channel of the session's execution
+                async def _v4_publish_frame(session_id, frame, meta):
+                    return await ws_manager.frame_publisher(session_id)(frame, meta=meta)
+                v4_browser_engine.set_frame_callback(_v4_publish_frame)
             logger.info("V4 BrowserEngineV3 initialized")
         except Exception as be_err:
             logger.warning(f"V4 BrowserEngineV3 not available: {be_err}")
@@ -792,9 +851,11 @@ except Exception as e:
 task_persistence = None
 try:
     from src.core.task_persistence import TaskPersistenceManager, ExecutionStatus
+    from src.core.event_log import create_event_log
     task_persistence = TaskPersistenceManager(
         supabase=supabase if supabase else None,
         ws_manager=ws_manager if 'ws_manager' in dir() else None,
+        event_log=create_event_log(),
     )
     logger.info("V6 TaskPersistenceManager initialized")
 except Exception as e:
@@ -807,6 +868,13 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # Generated files storage bucket name
 GENERATED_FILES_BUCKET = "generated-files"
 
+# Local cache for files pulled back from Supabase Storage (LRU, size-bounded)
+DOWNLOAD_CACHE_DIR = OUTPUT_DIR / "download_cache"
+DOWNLOAD_CACHE_MAX_BYTES = int(os.getenv("DOWNLOAD_CACHE_MAX_MB", "1024")) * 1024 * 1024
+# Files filled or served this recently are never evicted (they may be about to stream)
+DOWNLOAD_CACHE_MIN_AGE_SECONDS = 60
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
 # Current date for real-time data enforcement
 def get_current_date_str():
     return datetime.now().strftime('%Y-%m-%d')
@@ -815,6 +883,188 @@ def get_current_year():
     return datetime.now().year
 
 
+# ============================================================================
+# PERSISTENCE QUEUE - Write-behind batching for Supabase writes
+# ============================================================================
+
+PERSIST_QUEUE_MAX_PENDING = int(os.getenv("PERSIST_QUEUE_MAX_PENDING", "5000"))
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.5"))
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "200"))
+PERSIST_MAX_RETRIES = 3
+
+
+class PersistenceQueue:
+    """Write-behind queue for Supabase writes on the request path.
+    
+    Callers enqueue inserts, upserts and updates and return immediately; a
+    background worker flushes them every PERSIST_FLUSH_INTERVAL seconds, with
+    the blocking supabase-py calls run in a thread.
+    
+    - Inserts are batched per table into multi-row inserts.
+    - Upserts and updates are coalesced per row key, so a burst of progress
+      updates for one task becomes a single UPDATE with the latest values.
+    - Each flush writes inserts, then upserts, then updates, so an update
+      never overtakes the insert of the row it targets.
+    - Pending operations are bounded; enqueuers wait for space when full.
+    - Failed batches are retried with backoff; `stop()` drains on shutdown.
+    """
+    
+    _inserts: Dict[str, List[Dict]] = {}
+    _upserts: Dict[tuple, Dict] = {}  # (table, key_col, key_val) -> row
+    _updates: Dict[tuple, Dict] = {}  # (table, match_col, match_val) -> merged fields
+    _worker: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _space: Optional[asyncio.Condition] = None
+    _stopping: bool = False
+    _stats = {"enqueued": 0, "coalesced": 0, "written": 0, "batches": 0, "retries": 0, "failed": 0}
+    
+    @classmethod
+    def _pending(cls) -> int:
+        return sum(len(rows) for rows in cls._inserts.values()) + len(cls._upserts) + len(cls._updates)
+    
+    @classmethod
+    def start(cls):
+        """Start the flush worker (idempotent; also called lazily on first enqueue)."""
+        if cls._worker is not None and not cls._worker.done():
+            return
+        cls._wakeup = asyncio.Event()
+        cls._space = asyncio.Condition()
+        cls._stopping = False
+        cls._worker = asyncio.create_task(cls._run())
+    
+    @classmethod
+    async def _admit(cls, new_op: bool):
+        if not supabase:
+            return False
+        cls.start()
+        if new_op and cls._pending() >= PERSIST_QUEUE_MAX_PENDING:
+            cls._wakeup.set()
+            async with cls._space:
+                await cls._space.wait_for(lambda: cls._pending() < PERSIST_QUEUE_MAX_PENDING)
+        cls._stats["enqueued"] += 1
+        return True
+    
+    @classmethod
+    async def insert(cls, table: str, row: Dict):
+        """Queue a row insert (batched with other inserts into the same table)."""
+        if not await cls._admit(new_op=True):
+            return
+        cls._inserts.setdefault(table, []).append(row)
+        if cls._pending() >= PERSIST_BATCH_SIZE:
+            cls._wakeup.set()
+    
+    @classmethod
+    async def upsert(cls, table: str, row: Dict, key_col: str):
+        """Queue an upsert; a later upsert of the same key replaces this one."""
+        key = (table, key_col, row[key_col])
+        if not await cls._admit(new_op=key not in cls._upserts):
+            return
+        if key in cls._upserts:
+            cls._stats["coalesced"] += 1
+        cls._upserts[key] = row
+    
+    @classmethod
+    async def update(cls, table: str, match_col: str, match_val: Any, data: Dict):
+        """Queue an update of one row; pending updates to the same row are merged."""
+        key = (table, match_col, match_val)
+        if not await cls._admit(new_op=key not in cls._updates):
+            return
+        if key in cls._updates:
+            cls._stats["coalesced"] += 1
+            cls._updates[key].update(data)
+        else:
+            cls._updates[key] = dict(data)
+    
+    @classmethod
+    async def _write(cls, description: str, fn, op_count: int) -> bool:
+        for attempt in range(PERSIST_MAX_RETRIES):
+            try:
+                await asyncio.to_thread(fn)
+                cls._stats["written"] += op_count
+                cls._stats["batches"] += 1
+                return True
+            except Exception as e:
+                if attempt == PERSIST_MAX_RETRIES - 1:
+                    logger.error(f"Persistence queue write failed ({description}): {e}")
+                else:
+                    cls._stats["retries"] += 1
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+        return False
+    
+    @classmethod
+    async def flush(cls):
+        """Write everything currently pending."""
+        inserts, cls._inserts = cls._inserts, {}
+        upserts, cls._upserts = cls._upserts, {}
+        updates, cls._updates = cls._updates, {}
+        if cls._space is not None:
+            async with cls._space:
+                cls._space.notify_all()
+        
+        for table, rows in inserts.items():
+            for i in range(0, len(rows), PERSIST_BATCH_SIZE):
+                batch = rows[i:i + PERSIST_BATCH_SIZE]
+                ok = await cls._write(f"insert {table} x{len(batch)}",
+                                      lambda t=table, b=batch: supabase.table(t).insert(b).execute(), len(batch))
+                if not ok and len(batch) > 1:
+                    # One bad row shouldn't lose the whole batch
+                    for row in batch:
+                        if not await cls._write(f"insert {table}", lambda t=table, r=row: supabase.table(t).insert(r).execute(), 1):
+                            cls._stats["failed"] += 1
+                elif not ok:
+                    cls._stats["failed"] += 1
+        
+        upserts_by_table: Dict[str, List[Dict]] = {}
+        for (table, _, _), row in upserts.items():
+            upserts_by_table.setdefault(table, []).append(row)
+        for table, rows in upserts_by_table.items():
+            for i in range(0, len(rows), PERSIST_BATCH_SIZE):
+                batch = rows[i:i + PERSIST_BATCH_SIZE]
+                if not await cls._write(f"upsert {table} x{len(batch)}",
+                                        lambda t=table, b=batch: supabase.table(t).upsert(b).execute(), len(batch)):
+                    cls._stats["failed"] += len(batch)
+        
+        for (table, match_col, match_val), data in updates.items():
+            if not await cls._write(f"update {table}",
+                                    lambda t=table, c=match_col, v=match_val, d=data: supabase.table(t).update(d).eq(c, v).execute(), 1):
+                cls._stats["failed"] += 1
+    
+    @classmethod
+    async def _run(cls):
+        while True:
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), timeout=PERSIST_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            cls._wakeup.clear()
+            if cls._pending():
+                try:
+                    await cls.flush()
+                except Exception as e:
+                    logger.error(f"Persistence queue flush error: {e}")
+            if cls._stopping and not cls._pending():
+                return
+    
+    @classmethod
+    async def stop(cls, timeout: float = 15.0):
+        """Drain pending writes and stop the worker."""
+        if cls._worker is None:
+            return
+        cls._stopping = True
+        cls._wakeup.set()
+        try:
+            await asyncio.wait_for(cls._worker, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Persistence queue drain timed out with {cls._pending()} writes pending")
+            cls._worker.cancel()
+        cls._worker = None
+    
+    @classmethod
+    def get_stats(cls) -> Dict:
+        return {**cls._stats, "pending": cls._pending(), "max_pending": PERSIST_QUEUE_MAX_PENDING,
+                "running": cls._worker is not None and not cls._worker.done()}
+
+
 # ============================================================================
 # PERSISTENT FILE STORE - Supabase Storage for permanent file access
 # ============================================================================
@@ -896,8 +1146,7 @@ class PersistentFileStore:
         # Upload to Supabase Storage
         if supabase:
             try:
-                with open(filepath, "rb") as f:
-                    file_bytes = f.read()
+                file_bytes = await asyncio.to_thread(local_path.read_bytes)
                 
                 # Determine content type
                 content_types = {
@@ -911,7 +1160,8 @@ class PersistentFileStore:
                 }
                 content_type = content_types.get(file_type, "application/octet-stream")
                 
-                supabase.storage.from_(GENERATED_FILES_BUCKET).upload(
+                await asyncio.to_thread(
+                    supabase.storage.from_(GENERATED_FILES_BUCKET).upload,
                     path=storage_path,
                     file=file_bytes,
                     file_options={"content-type": content_type, "upsert": "true"}
@@ -942,7 +1192,7 @@ class PersistentFileStore:
         
         if supabase:
             try:
-                supabase.table("generated_files").upsert({
+                await PersistenceQueue.upsert("generated_files", {
                     "file_id": file_id,
                     "filename": filename,
                     "local_path": str(filepath),
@@ -953,7 +1203,7 @@ class PersistentFileStore:
                     "conversation_id": conversation_id,
                     "size_bytes": size_bytes,
                     "created_at": datetime.now().isoformat()
-                }).execute()
+                }, key_col="file_id")
             except Exception as e:
                 logger.error(f"DB insert error for generated file: {e}")
         
@@ -995,36 +1245,99 @@ class PersistentFileStore:
         return None
     
     @classmethod
-    async def get_file_content(cls, file_id: str) -> Optional[bytes]:
-        """Download file content from Supabase Storage."""
+    def _cache_path(cls, file_id: str, filename: str) -> Path:
+        return DOWNLOAD_CACHE_DIR / f"{file_id}_{filename}"
+    
+    @classmethod
+    def _evict_cache(cls, keep: Optional[Path] = None):
+        """Delete least-recently-used cached downloads until under DOWNLOAD_CACHE_MAX_BYTES.
+        
+        `keep` (the file just filled) and files used in the last
+        DOWNLOAD_CACHE_MIN_AGE_SECONDS are skipped, so a file larger than the
+        cap is still served once; responses hold their file open, so a later
+        eviction cannot cut a download short.
+        """
+        try:
+            entries = [(p, p.stat()) for p in DOWNLOAD_CACHE_DIR.iterdir() if p.is_file() and not p.name.endswith(".part")]
+        except FileNotFoundError:
+            return
+        total = sum(st.st_size for _, st in entries)
+        recent = time.time() - DOWNLOAD_CACHE_MIN_AGE_SECONDS
+        for path, st in sorted(entries, key=lambda e: e[1].st_mtime):
+            if total <= DOWNLOAD_CACHE_MAX_BYTES:
+                break
+            if path == keep or st.st_mtime > recent:
+                continue
+            try:
+                path.unlink()
+                total -= st.st_size
+                for info in cls._file_cache.values():
+                    if info.get("filepath") == str(path):
+                        info["filepath"] = ""
+            except OSError:
+                pass
+    
+    @classmethod
+    async def _stream_to_cache(cls, storage_path: str, dest: Path) -> bool:
+        """Stream an object from Supabase Storage to disk without buffering it in memory."""
+        url = f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/{GENERATED_FILES_BUCKET}/{storage_path}"
+        tmp = dest.with_name(dest.name + f".{uuid.uuid4().hex[:8]}.part")
+        client = HTTPClientPool.get_client(urlparse(SUPABASE_URL).netloc)
+        try:
+            async with client.stream(
+                "GET", url, timeout=60.0,
+                headers={"Authorization": f"Bearer {SUPABASE_KEY}", "apikey": SUPABASE_KEY},
+            ) as response:
+                response.raise_for_status()
+                async with aiofiles.open(tmp, "wb") as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+            os.replace(tmp, dest)
+            return True
+        except Exception as e:
+            logger.error(f"Supabase Storage download error: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return False
+    
+    @classmethod
+    async def ensure_local_file(cls, file_id: str) -> Optional[Path]:
+        """Return a local path for the file, filling the bounded download cache if needed."""
         file_info = cls.get_file(file_id)
         if not file_info:
             return None
         
         # Try local first (faster)
-        local_path = Path(file_info.get("filepath", ""))
-        if local_path.exists():
-            return local_path.read_bytes()
+        local_path = Path(file_info.get("filepath", "") or "")
+        if file_info.get("filepath") and local_path.is_file():
+            if local_path.parent == DOWNLOAD_CACHE_DIR:
+                try:
+                    os.utime(local_path)  # LRU touch
+                except FileNotFoundError:
+                    pass
+            return local_path
         
-        # Download from Supabase Storage
         storage_path = file_info.get("storage_path", "")
-        if storage_path and supabase:
-            try:
-                data = supabase.storage.from_(GENERATED_FILES_BUCKET).download(storage_path)
-                if data:
-                    # Cache locally for faster subsequent access
-                    try:
-                        OUTPUT_DIR.mkdir(exist_ok=True)
-                        local_cache = OUTPUT_DIR / f"{file_id}_{file_info['filename']}"
-                        local_cache.write_bytes(data)
-                        cls._file_cache[file_id]["filepath"] = str(local_cache)
-                    except Exception:
-                        pass
-                    return data
-            except Exception as e:
-                logger.error(f"Supabase Storage download error: {e}")
+        if not (storage_path and supabase and SUPABASE_URL):
+            return None
         
-        return None
+        DOWNLOAD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        dest = cls._cache_path(file_id, file_info["filename"])
+        if not dest.is_file() and not await cls._stream_to_cache(storage_path, dest):
+            return None
+        cls._file_cache[file_id]["filepath"] = str(dest)
+        await asyncio.to_thread(cls._evict_cache, dest)
+        return dest
+    
+    @classmethod
+    async def get_file_content(cls, file_id: str) -> Optional[bytes]:
+        """Read the whole file (prefer ensure_local_file + streaming for downloads)."""
+        local_path = await cls.ensure_local_file(file_id)
+        if not local_path:
+            return None
+        return await asyncio.to_thread(local_path.read_bytes)
     
     @classmethod
     async def list_files(cls, user_id: str = None, conversation_id: str = None,
@@ -1136,6 +1449,9 @@ class SearchRequest(BaseModel):
     query: str
     sources: List[str] = ["web", "news"]
     num_results: int = 10
+    deadline: Optional[float] = None  # Latency budget in seconds
+    min_providers: Optional[int] = None  # Quorum: successful providers needed for early return
+    min_sources: Optional[int] = None  # Quorum: real sources needed for early return
 
 class AgentRequest(BaseModel):
     task: str
@@ -1148,6 +1464,8 @@ class SwarmRequest(BaseModel):
     num_agents: int = 5
     context: Dict = {}
     user_id: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    quorum: Optional[int] = None
 
 # ============================================================================
 # AUTH DATA MODELS
@@ -1334,6 +1652,130 @@ def clean_sources_for_output(sources: List[Dict]) -> List[Dict]:
     return cleaned
 
 
+# ============================================================================
+# HTTP CLIENT POOL - App-lifetime connection reuse for outbound APIs
+# ============================================================================
+
+HTTP_POOL_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_POOL_MAX_KEEPALIVE_PER_HOST = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE_PER_HOST", "10"))
+HTTP_POOL_SHARED_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_SHARED_MAX_CONNECTIONS", "100"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+
+try:
+    import h2  # noqa: F401 - enables httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientPool:
+    """Long-lived httpx clients shared by SearchLayer providers and URLContentFetcher.
+    
+    One AsyncClient per API host gives each provider its own connection limit,
+    so a slow backend can't starve the others. Arbitrary URLs (user links) go
+    through a single shared client. Connections are kept alive between chat
+    turns, so TCP+TLS handshakes are paid once per host instead of per call.
+    
+    Request and handshake counts are collected through httpcore trace events
+    and exposed on /health as a connection-reuse ratio.
+    """
+    
+    _host_clients: Dict[str, httpx.AsyncClient] = {}
+    _shared_client: Optional[httpx.AsyncClient] = None
+    _stats = {"requests": 0, "tcp_connects": 0, "tls_handshakes": 0}
+    
+    # Hosts pre-warmed at startup when the provider is configured
+    PROVIDER_HOSTS = {
+        "api.perplexity.ai": lambda: bool(PERPLEXITY_API_KEY),
+        "api.exa.ai": lambda: bool(EXA_API_KEY),
+        "serpapi.com": lambda: bool(SERPAPI_KEY),
+        "api.bing.microsoft.com": lambda: bool(BING_API_KEY),
+        "www.googleapis.com": lambda: bool(GOOGLE_CUSTOM_SEARCH_KEY or YOUTUBE_API_KEY),
+        "api.firecrawl.dev": lambda: bool(FIRECRAWL_API_KEY),
+        "api.pinterest.com": lambda: bool(PINTEREST_API_KEY),
+        "production-sfo.browserless.io": lambda: bool(BROWSERLESS_API_KEY),
+    }
+    
+    @classmethod
+    async def _trace(cls, name: str, info: Dict):
+        """httpcore trace hook - counts fresh connections and TLS handshakes."""
+        if name == "connection.connect_tcp.complete":
+            cls._stats["tcp_connects"] += 1
+        elif name == "connection.start_tls.complete":
+            cls._stats["tls_handshakes"] += 1
+    
+    @classmethod
+    async def _on_request(cls, request: httpx.Request):
+        cls._stats["requests"] += 1
+        request.extensions["trace"] = cls._trace
+    
+    @classmethod
+    def _build_client(cls, max_connections: int, max_keepalive: int) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+            ),
+            event_hooks={"request": [cls._on_request]},
+        )
+    
+    @classmethod
+    def get_client(cls, host: str = None) -> httpx.AsyncClient:
+        """Return the pooled client for an API host, or the shared client if host is None."""
+        if host is None:
+            if cls._shared_client is None or cls._shared_client.is_closed:
+                cls._shared_client = cls._build_client(
+                    HTTP_POOL_SHARED_MAX_CONNECTIONS, HTTP_POOL_SHARED_MAX_CONNECTIONS // 2
+                )
+            return cls._shared_client
+        
+        client = cls._host_clients.get(host)
+        if client is None or client.is_closed:
+            client = cls._build_client(HTTP_POOL_MAX_CONNECTIONS_PER_HOST, HTTP_POOL_MAX_KEEPALIVE_PER_HOST)
+            cls._host_clients[host] = client
+        return client
+    
+    @classmethod
+    async def startup(cls):
+        """Create clients for all configured provider hosts."""
+        for host, is_configured in cls.PROVIDER_HOSTS.items():
+            if is_configured():
+                cls.get_client(host)
+        cls.get_client()
+        logger.info(f"HTTP client pool ready: {len(cls._host_clients)} provider hosts, http2={HTTP2_AVAILABLE}")
+    
+    @classmethod
+    async def shutdown(cls):
+        """Close every pooled client and release its connections."""
+        clients = list(cls._host_clients.values())
+        if cls._shared_client is not None:
+            clients.append(cls._shared_client)
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"HTTP client pool close error: {e}")
+        cls._host_clients.clear()
+        cls._shared_client = None
+    
+    @classmethod
+    def get_stats(cls) -> Dict:
+        requests = cls._stats["requests"]
+        connects = cls._stats["tcp_connects"]
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "hosts": len(cls._host_clients),
+            "requests": requests,
+            "tcp_connects": connects,
+            "tls_handshakes": cls._stats["tls_handshakes"],
+            "handshakes_saved": max(requests - connects, 0),
+            "connection_reuse_ratio": round(1 - connects / requests, 3) if requests else 0.0,
+        }
+
+
 # ============================================================================
 # URL CONTENT FETCHER - Real link analysis engine
 # ============================================================================
@@ -1359,6 +1801,11 @@ class URLContentFetcher:
     
     MAX_CONTENT_LENGTH = 8000
     FETCH_TIMEOUT = 15
+    # Stop downloading HTML past this many bytes - readable text beyond it
+    # would be cut by MAX_CONTENT_LENGTH anyway
+    MAX_HTML_BYTES = 1_500_000
+    # Plain text / JSON: 4 bytes per char covers any UTF-8 content
+    MAX_TEXT_BYTES = MAX_CONTENT_LENGTH * 4
     
     @classmethod
     def extract_urls(cls, text: str) -> List[str]:
@@ -1375,13 +1822,32 @@ class URLContentFetcher:
                 continue
         return filtered[:5]
     
+    @classmethod
+    async def _read_capped(cls, response: httpx.Response, max_bytes: int) -> bytes:
+        """Read a streamed body, stopping (and closing the stream) once max_bytes arrive."""
+        chunks = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= max_bytes:
+                break
+        return b"".join(chunks)[:max_bytes]
+    
     @classmethod
     async def fetch_url_content(cls, url: str) -> Dict[str, str]:
-        """Fetch and extract readable content from a URL."""
+        """Fetch and extract readable content from a URL.
+        
+        The body is streamed with a byte cap per content type and binary files
+        are never downloaded; HTML extraction runs in the parse pool.
+        """
         result = {"url": url, "title": "", "content": "", "content_type": "", "error": None}
         
         try:
-            async with httpx.AsyncClient(
+            client = HTTPClientPool.get_client()
+            async with client.stream(
+                "GET",
+                url,
                 timeout=cls.FETCH_TIMEOUT,
                 follow_redirects=True,
                 headers={
@@ -1389,33 +1855,37 @@ class URLContentFetcher:
                     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
                     "Accept-Language": "en-US,en;q=0.9",
                 }
-            ) as client:
-                response = await client.get(url)
+            ) as response:
                 response.raise_for_status()
                 
                 content_type = response.headers.get("content-type", "").lower()
                 result["content_type"] = content_type
+                encoding = response.encoding or "utf-8"
+                size = response.headers.get("content-length", "unknown")
                 
                 if "text/html" in content_type or "application/xhtml" in content_type:
-                    html = response.text
-                    result.update(cls._parse_html(html, url))
+                    body = await cls._read_capped(response, cls.MAX_HTML_BYTES)
+                    html = body.decode(encoding, errors="replace")
+                    result.update(await parse_off_loop(extract_readable_content, html, cls.MAX_CONTENT_LENGTH))
                 elif "application/json" in content_type:
+                    text = (await cls._read_capped(response, cls.MAX_HTML_BYTES)).decode(encoding, errors="replace")
                     try:
-                        data = response.json()
+                        data = json.loads(text)
                         result["content"] = json.dumps(data, indent=2)[:cls.MAX_CONTENT_LENGTH]
                         result["title"] = f"JSON data from {urlparse(url).netloc}"
                     except Exception:
-                        result["content"] = response.text[:cls.MAX_CONTENT_LENGTH]
+                        result["content"] = text[:cls.MAX_CONTENT_LENGTH]
                 elif "text/" in content_type:
-                    result["content"] = response.text[:cls.MAX_CONTENT_LENGTH]
+                    text = (await cls._read_capped(response, cls.MAX_TEXT_BYTES)).decode(encoding, errors="replace")
+                    result["content"] = text[:cls.MAX_CONTENT_LENGTH]
                     result["title"] = f"Text content from {urlparse(url).netloc}"
                 elif "application/pdf" in content_type:
-                    result["content"] = f"[PDF document from {url} - {len(response.content)} bytes]"
+                    result["content"] = f"[PDF document from {url} - {size} bytes]"
                     result["title"] = f"PDF from {urlparse(url).netloc}"
                 else:
-                    result["content"] = f"[Binary content: {content_type}, {len(response.content)} bytes]"
+                    result["content"] = f"[Binary content: {content_type}, {size} bytes]"
                     result["title"] = f"File from {urlparse(url).netloc}"
-                    
+                
         except httpx.TimeoutException:
             result["error"] = f"Timeout fetching {url}"
         except httpx.HTTPStatusError as e:
@@ -1427,53 +1897,8 @@ class URLContentFetcher:
     
     @classmethod
     def _parse_html(cls, html: str, url: str) -> Dict[str, str]:
-        """Parse HTML and extract readable content."""
-        from bs4 import BeautifulSoup
-        
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        title = ""
-        if soup.title and soup.title.string:
-            title = soup.title.string.strip()
-        
-        for tag in soup.find_all(['script', 'style', 'nav', 'footer', 'header',
-                                   'aside', 'iframe', 'noscript', 'svg', 'form']):
-            tag.decompose()
-        
-        main_content = None
-        for selector in ['article', 'main', '[role="main"]', '.post-content',
-                         '.article-body', '.entry-content', '#content', '.content']:
-            main_content = soup.select_one(selector)
-            if main_content:
-                break
-        
-        if not main_content:
-            main_content = soup.body if soup.body else soup
-        
-        content_parts = []
-        for element in main_content.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'li', 'td', 'th',
-                                               'blockquote', 'pre', 'code', 'figcaption']):
-            text = element.get_text(strip=True)
-            if not text or len(text) < 3:
-                continue
-            tag_name = element.name
-            if tag_name in ('h1', 'h2', 'h3', 'h4'):
-                content_parts.append(f"\n{'#' * int(tag_name[1])} {text}\n")
-            elif tag_name == 'li':
-                content_parts.append(f"- {text}")
-            elif tag_name == 'blockquote':
-                content_parts.append(f"> {text}")
-            elif tag_name in ('pre', 'code'):
-                content_parts.append(f"```\n{text}\n```")
-            else:
-                content_parts.append(text)
-        
-        content = "\n".join(content_parts)
-        if len(content) < 100:
-            content = main_content.get_text(separator="\n", strip=True)
-        
-        content = content[:cls.MAX_CONTENT_LENGTH]
-        return {"title": title, "content": content}
+        """Parse HTML and extract readable content (synchronous - prefer parse_off_loop)."""
+        return extract_readable_content(html, cls.MAX_CONTENT_LENGTH)
     
     @classmethod
     async def fetch_all_urls(cls, text: str) -> List[Dict[str, str]]:
@@ -1522,93 +1947,481 @@ class URLContentFetcher:
 # SEARCH LAYER - All APIs in Parallel
 # ============================================================================
 
+# Latency budget for instant-mode chat searches: return once 3 providers have
+# answered with 10+ sources, or after the deadline, whichever comes first
+INSTANT_SEARCH_DEADLINE = float(os.getenv("INSTANT_SEARCH_DEADLINE", "8"))
+INSTANT_SEARCH_MIN_PROVIDERS = int(os.getenv("INSTANT_SEARCH_MIN_PROVIDERS", "3"))
+INSTANT_SEARCH_MIN_SOURCES = int(os.getenv("INSTANT_SEARCH_MIN_SOURCES", "10"))
+
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+SEARCH_CACHE_SQLITE_PATH = os.getenv("SEARCH_CACHE_SQLITE_PATH", "")  # Optional shared tier, e.g. /tmp/mcleuker_search_cache.db
+
+
+class SearchCache:
+    """Per-provider search result cache with request coalescing.
+    
+    Entries are keyed by provider + normalized query + result count, so a chat
+    turn, a background search and a file-research retry asking the same thing
+    share provider calls. Real-time providers expire sooner than index-style
+    ones. Concurrent identical lookups join a single in-flight provider call.
+    
+    Tiers: a size-bounded in-memory LRU, plus an optional SQLite file
+    (SEARCH_CACHE_SQLITE_PATH) shared by workers on the same host.
+    """
+    
+    # Seconds a successful provider result stays fresh
+    TTL_BY_PROVIDER = {
+        "grok": 300,            # Real-time X/social
+        "perplexity": 900,      # Live web answer
+        "bing": 1800,           # News-weighted (freshness=Month)
+        "firecrawl": 1800,
+        "browserless": 1800,
+        "youtube": 3600,
+        "pinterest": 3600,
+        "exa": 21600,
+        "google": 21600,
+        "google_custom": 21600,
+    }
+    DEFAULT_TTL = 1800
+    
+    _entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, result)
+    _inflight: Dict[str, Dict] = {}
+    _stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0}
+    _db: Optional[sqlite3.Connection] = None
+    _db_lock = threading.Lock()
+    _db_writes = 0
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace so near-identical queries share a key."""
+        text = unicodedata.normalize("NFKC", query or "").lower()
+        text = re.sub(r"[^\w\s]", " ", text)
+        return " ".join(text.split())
+    
+    @classmethod
+    def _key(cls, provider: str, query: str, num_results: int) -> str:
+        raw = f"{provider}|{num_results}|{cls.normalize_query(query)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    @classmethod
+    def ttl_for(cls, provider: str) -> int:
+        return cls.TTL_BY_PROVIDER.get(provider, cls.DEFAULT_TTL)
+    
+    @classmethod
+    def _memory_get(cls, key: str) -> Optional[Dict]:
+        entry = cls._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.time():
+            del cls._entries[key]
+            return None
+        cls._entries.move_to_end(key)
+        return result
+    
+    @classmethod
+    def _memory_put(cls, key: str, expires_at: float, result: Dict):
+        cls._entries[key] = (expires_at, result)
+        cls._entries.move_to_end(key)
+        while len(cls._entries) > SEARCH_CACHE_MAX_ENTRIES:
+            cls._entries.popitem(last=False)
+            cls._stats["evictions"] += 1
+    
+    @classmethod
+    def _get_db(cls) -> Optional[sqlite3.Connection]:
+        if not SEARCH_CACHE_SQLITE_PATH:
+            return None
+        if cls._db is None:
+            db = sqlite3.connect(SEARCH_CACHE_SQLITE_PATH, check_same_thread=False, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, provider TEXT, expires_at REAL, payload TEXT)"
+            )
+            db.commit()
+            cls._db = db
+        return cls._db
+    
+    @classmethod
+    def _disk_get(cls, key: str) -> Optional[tuple]:
+        with cls._db_lock:
+            db = cls._get_db()
+            row = db.execute(
+                "SELECT expires_at, payload FROM search_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if not row:
+            return None
+        return row[0], json.loads(row[1])
+    
+    @classmethod
+    def _disk_put(cls, key: str, provider: str, expires_at: float, result: Dict):
+        payload = json.dumps(result, default=str)
+        with cls._db_lock:
+            db = cls._get_db()
+            db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, provider, expires_at, payload) VALUES (?, ?, ?, ?)",
+                (key, provider, expires_at, payload)
+            )
+            cls._db_writes += 1
+            if cls._db_writes % 200 == 0:
+                db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+            db.commit()
+    
+    @classmethod
+    async def _load_or_fetch(cls, key: str, provider: str, factory) -> Dict:
+        """Runs once per in-flight key: disk tier first, then the real provider call."""
+        if SEARCH_CACHE_SQLITE_PATH:
+            try:
+                cached = await asyncio.to_thread(cls._disk_get, key)
+                if cached is not None:
+                    cls._stats["disk_hits"] += 1
+                    cls._memory_put(key, cached[0], cached[1])
+                    return cached[1]
+            except Exception as e:
+                logger.warning(f"Search cache disk read failed: {e}")
+        
+        cls._stats["misses"] += 1
+        result = await factory()
+        if isinstance(result, dict) and not result.get("error"):
+            expires_at = time.time() + cls.ttl_for(provider)
+            cls._memory_put(key, expires_at, result)
+            cls._stats["stores"] += 1
+            if SEARCH_CACHE_SQLITE_PATH:
+                try:
+                    await asyncio.to_thread(cls._disk_put, key, provider, expires_at, result)
+                except Exception as e:
+                    logger.warning(f"Search cache disk write failed: {e}")
+        return result
+    
+    @classmethod
+    async def fetch(cls, provider: str, query: str, num_results: int, factory) -> Dict:
+        """Return a cached provider result, join an identical in-flight call, or start one.
+        
+        `factory` is a zero-arg callable returning the provider coroutine. The
+        shared call is only cancelled once every waiter has gone away, so a
+        caller that cuts off a straggler doesn't abort it for other waiters.
+        """
+        key = cls._key(provider, query, num_results)
+        cached = cls._memory_get(key)
+        if cached is not None:
+            cls._stats["memory_hits"] += 1
+            return copy.deepcopy(cached)
+        
+        entry = cls._inflight.get(key)
+        if entry is None:
+            task = asyncio.create_task(cls._load_or_fetch(key, provider, factory))
+            entry = {"task": task, "waiters": 0}
+            cls._inflight[key] = entry
+            
+            def _clear(_task, key=key, entry=entry):
+                if cls._inflight.get(key) is entry:
+                    del cls._inflight[key]
+            task.add_done_callback(_clear)
+        else:
+            cls._stats["coalesced"] += 1
+        
+        entry["waiters"] += 1
+        try:
+            result = await asyncio.shield(entry["task"])
+        finally:
+            entry["waiters"] -= 1
+            if entry["waiters"] == 0 and not entry["task"].done():
+                entry["task"].cancel()
+        return copy.deepcopy(result)
+    
+    @classmethod
+    def get_stats(cls) -> Dict:
+        hits = cls._stats["memory_hits"] + cls._stats["disk_hits"]
+        lookups = hits + cls._stats["misses"] + cls._stats["coalesced"]
+        return {
+            **cls._stats,
+            "entries": len(cls._entries),
+            "max_entries": SEARCH_CACHE_MAX_ENTRIES,
+            "inflight": len(cls._inflight),
+            "disk_tier": bool(SEARCH_CACHE_SQLITE_PATH),
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class ProviderGovernor:
+    """Admission control in front of one search provider.
+    
+    - AIMD concurrency: the in-flight limit grows by one per window of
+      successes and halves on a failure or slow response.
+    - Token bucket: caps request rate to stay under the provider's quota.
+    - Circuit breaker: after consecutive failures the provider is skipped for
+      a cool-down (doubling on repeated trips), then a single half-open probe
+      decides whether it closes again.
+    
+    SearchLayer checks `is_available()` before fanning out so tripped
+    providers cost nothing, and wraps each call in `run()`.
+    """
+    
+    # (requests per second, burst) per provider
+    RATE_LIMITS = {
+        "perplexity": (5.0, 10),
+        "exa": (5.0, 10),
+        "google": (5.0, 10),
+        "bing": (3.0, 6),
+        "google_custom": (1.5, 5),
+        "grok": (5.0, 10),
+        "youtube": (5.0, 10),
+        "firecrawl": (2.0, 5),
+        "pinterest": (2.0, 5),
+        "browserless": (1.0, 3),
+    }
+    DEFAULT_RATE_LIMIT = (5.0, 10)
+    
+    INITIAL_LIMIT = 4
+    MIN_LIMIT = 1
+    MAX_LIMIT = 32
+    SLOW_CALL_SECONDS = 15.0
+    FAILURE_THRESHOLD = 3
+    BASE_COOLDOWN = 30.0
+    MAX_COOLDOWN = 300.0
+    
+    _governors: Dict[str, "ProviderGovernor"] = {}
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.rate, self.burst = self.RATE_LIMITS.get(name, self.DEFAULT_RATE_LIMIT)
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.limit = float(self.INITIAL_LIMIT)
+        self.in_flight = 0
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.cooldown = self.BASE_COOLDOWN
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "skipped": 0, "trips": 0}
+        self.avg_latency_ms = 0.0
+        self._cond: Optional[asyncio.Condition] = None
+    
+    @classmethod
+    def get(cls, name: str) -> "ProviderGovernor":
+        governor = cls._governors.get(name)
+        if governor is None:
+            governor = cls(name)
+            cls._governors[name] = governor
+        return governor
+    
+    def is_available(self) -> bool:
+        """False while the breaker is open (or a half-open probe is already out)."""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            return not self.probe_in_flight
+        return True
+    
+    async def _acquire_token(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def _acquire_slot(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+    
+    async def _release_slot(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+    
+    def _on_success(self, latency: float):
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        if latency > self.SLOW_CALL_SECONDS:
+            self.limit = max(self.MIN_LIMIT, self.limit / 2)
+        else:
+            self.limit = min(self.MAX_LIMIT, self.limit + 1 / self.limit)
+        if self.state == "half_open":
+            logger.info(f"Search provider {self.name} recovered - circuit closed")
+        self.state = "closed"
+        self.cooldown = self.BASE_COOLDOWN
+    
+    def _on_failure(self):
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        self.limit = max(self.MIN_LIMIT, self.limit / 2)
+        if self.state == "half_open":
+            self.cooldown = min(self.cooldown * 2, self.MAX_COOLDOWN)
+            self._trip()
+        elif self.state == "closed" and self.consecutive_failures >= self.FAILURE_THRESHOLD:
+            self._trip()
+    
+    def _trip(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.stats["trips"] += 1
+        logger.warning(f"Search provider {self.name} circuit opened for {self.cooldown:.0f}s "
+                       f"after {self.consecutive_failures} consecutive failures")
+    
+    async def run(self, factory) -> Dict:
+        """Run a provider call under the rate limit, concurrency limit and breaker."""
+        if not self.is_available():
+            self.stats["skipped"] += 1
+            return {"error": f"{self.name} circuit open", "source": self.name, "data_points": [], "sources": []}
+        
+        probe = self.state == "half_open"
+        if probe:
+            self.probe_in_flight = True
+        try:
+            await self._acquire_token()
+            await self._acquire_slot()
+            self.stats["calls"] += 1
+            started = time.monotonic()
+            try:
+                result = await factory()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._on_failure()
+                raise
+            finally:
+                await self._release_slot()
+            
+            latency = time.monotonic() - started
+            self.avg_latency_ms = 0.8 * self.avg_latency_ms + 0.2 * latency * 1000 if self.avg_latency_ms else latency * 1000
+            if isinstance(result, dict) and result.get("error"):
+                self._on_failure()
+            else:
+                self._on_success(latency)
+            return result
+        finally:
+            if probe:
+                self.probe_in_flight = False
+    
+    def get_stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "open_remaining_s": round(max(self.cooldown - (time.monotonic() - self.opened_at), 0), 1) if self.state == "open" else 0,
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "tokens": round(self.tokens, 2),
+            "rate_per_sec": self.rate,
+            "consecutive_failures": self.consecutive_failures,
+            "cooldown_s": self.cooldown,
+            "avg_latency_ms": int(self.avg_latency_ms),
+            **self.stats,
+        }
+    
+    @classmethod
+    def get_all_stats(cls) -> Dict:
+        return {name: governor.get_stats() for name, governor in cls._governors.items()}
+
+
 class SearchLayer:
     """Unified search across all data sources - 8+ APIs in parallel."""
     
+    # Stragglers left running after an early return (kept referenced until done)
+    _background_tasks: set = set()
+    
     @staticmethod
-    async def search(query: str, sources: List[str] = None, num_results: int = 10) -> Dict:
-        """Search across ALL configured sources in parallel."""
+    async def search(query: str, sources: List[str] = None, num_results: int = 10,
+                     deadline: Optional[float] = None, min_providers: Optional[int] = None,
+                     min_sources: Optional[int] = None, cancel_stragglers: bool = True,
+                     use_cache: bool = True) -> Dict:
+        """Search across ALL configured sources in parallel.
+        
+        Latency-budget mode: pass `deadline` (seconds) and/or a quorum
+        (`min_providers` successful providers with at least `min_sources` real
+        sources). The merged result returns as soon as the quorum is met or the
+        deadline passes; providers still running are listed in `cut_off` and are
+        cancelled, or left to finish in the background (filling SearchCache) if
+        cancel_stragglers=False. With none of these set, every provider is awaited.
+        
+        Provider results go through SearchCache unless use_cache=False.
+        """
         if sources is None:
             sources = ["web", "news"]
         
-        tasks = []
-        source_map = {}
-        idx = 0
+        provider_calls = []
         
         # Perplexity - always include for comprehensive answers
         if PERPLEXITY_API_KEY:
-            tasks.append(SearchLayer._perplexity_search(query))
-            source_map[idx] = "perplexity"
-            idx += 1
+            provider_calls.append(("perplexity", lambda: SearchLayer._perplexity_search(query)))
         
         # Exa - neural search
         if EXA_API_KEY:
-            tasks.append(SearchLayer._exa_search(query, num_results))
-            source_map[idx] = "exa"
-            idx += 1
+            provider_calls.append(("exa", lambda: SearchLayer._exa_search(query, num_results)))
         
         # Google via SerpAPI
         if SERPAPI_KEY:
-            tasks.append(SearchLayer._google_search(query, num_results))
-            source_map[idx] = "google"
-            idx += 1
+            provider_calls.append(("google", lambda: SearchLayer._google_search(query, num_results)))
         
         # Bing Search
         if BING_API_KEY:
-            tasks.append(SearchLayer._bing_search(query, num_results))
-            source_map[idx] = "bing"
-            idx += 1
+            provider_calls.append(("bing", lambda: SearchLayer._bing_search(query, num_results)))
         
         # Google Custom Search
         if GOOGLE_CUSTOM_SEARCH_KEY and GOOGLE_CUSTOM_SEARCH_CX:
-            tasks.append(SearchLayer._google_custom_search(query, num_results))
-            source_map[idx] = "google_custom"
-            idx += 1
+            provider_calls.append(("google_custom", lambda: SearchLayer._google_custom_search(query, num_results)))
         
         # Grok - real-time X/social data
         if GROK_API_KEY:
-            tasks.append(SearchLayer._grok_search(query))
-            source_map[idx] = "grok"
-            idx += 1
+            provider_calls.append(("grok", lambda: SearchLayer._grok_search(query)))
         
         # YouTube Data v3
         if YOUTUBE_API_KEY:
-            tasks.append(SearchLayer._youtube_search(query))
-            source_map[idx] = "youtube"
-            idx += 1
+            provider_calls.append(("youtube", lambda: SearchLayer._youtube_search(query)))
         
         # Firecrawl - web scraping for deeper content
         if FIRECRAWL_API_KEY:
-            tasks.append(SearchLayer._firecrawl_search(query))
-            source_map[idx] = "firecrawl"
-            idx += 1
+            provider_calls.append(("firecrawl", lambda: SearchLayer._firecrawl_search(query)))
         
         # Pinterest - visual and trend data
         if PINTEREST_API_KEY:
-            tasks.append(SearchLayer._pinterest_search(query))
-            source_map[idx] = "pinterest"
-            idx += 1
+            provider_calls.append(("pinterest", lambda: SearchLayer._pinterest_search(query)))
         
         # Browserless - deep web scraping with headless browser
         if BROWSERLESS_API_KEY:
-            tasks.append(SearchLayer._browserless_deep_search(query))
-            source_map[idx] = "browserless"
-            idx += 1
+            provider_calls.append(("browserless", lambda: SearchLayer._browserless_deep_search(query)))
         
-        if not tasks:
+        if not provider_calls:
             return {"query": query, "results": {}, "structured_data": {"data_points": [], "sources": []}}
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Every real provider call is admitted through its governor. Providers with
+        # an open circuit answer instantly with an error (cached results still count).
+        skipped = [name for name, _ in provider_calls if not ProviderGovernor.get(name).is_available()]
+        provider_calls = [
+            (name, functools.partial(ProviderGovernor.get(name).run, factory))
+            for name, factory in provider_calls
+        ]
+        
+        if use_cache:
+            provider_calls = [
+                (name, SearchCache.fetch(name, query, num_results, factory))
+                for name, factory in provider_calls
+            ]
+        else:
+            provider_calls = [(name, factory()) for name, factory in provider_calls]
+        
+        started = time.time()
+        results, cut_off, quorum_met = await SearchLayer._gather_with_budget(
+            provider_calls, deadline, min_providers, min_sources, cancel_stragglers
+        )
         
         combined = {
             "query": query,
             "sources": sources,
             "results": {},
+            "skipped_providers": skipped,
             "structured_data": {"data_points": [], "sources": []}
         }
         
-        for i, result in enumerate(results):
-            source_name = source_map.get(i, f"source_{i}")
+        for source_name, result in results.items():
             if isinstance(result, Exception):
                 combined["results"][source_name] = {"error": str(result)}
             else:
@@ -1639,34 +2452,121 @@ class SearchLayer:
             combined["structured_data"]["sources"]
         )
         
+        if deadline is not None or min_providers is not None or min_sources is not None:
+            combined["budget"] = {
+                "deadline": deadline,
+                "min_providers": min_providers,
+                "min_sources": min_sources,
+                "quorum_met": quorum_met,
+                "elapsed_ms": int((time.time() - started) * 1000),
+            }
+            combined["cut_off"] = cut_off
+            if cut_off:
+                logger.info(f"Search budget cut off {cut_off} after {combined['budget']['elapsed_ms']}ms (quorum_met={quorum_met})")
+        
         return combined
     
+    @staticmethod
+    def _count_real_sources(result: Dict) -> int:
+        """Count URLs a provider result contributes to the merged source list."""
+        count = sum(1 for s in result.get("sources", []) if str(s.get("url", "")).startswith("http"))
+        count += sum(1 for c in result.get("citations", []) if c and str(c).startswith("http"))
+        return count
+    
+    @staticmethod
+    async def _gather_with_budget(provider_calls: List[tuple], deadline: Optional[float],
+                                  min_providers: Optional[int], min_sources: Optional[int],
+                                  cancel_stragglers: bool) -> tuple:
+        """Run provider coroutines concurrently, stopping early on quorum or deadline.
+        
+        Returns (results by provider name, names of providers cut off, quorum_met).
+        """
+        loop = asyncio.get_running_loop()
+        tasks = {asyncio.create_task(coro): name for name, coro in provider_calls}
+        pending = set(tasks)
+        results = {}
+        ok_providers = 0
+        source_count = 0
+        quorum_met = False
+        use_quorum = min_providers is not None or min_sources is not None
+        end_at = loop.time() + deadline if deadline is not None else None
+        
+        finished = False
+        try:
+            while pending:
+                timeout = None
+                if end_at is not None:
+                    timeout = end_at - loop.time()
+                    if timeout <= 0:
+                        break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # Deadline reached
+            
+                for task in done:
+                    name = tasks[task]
+                    if task.cancelled():
+                        results[name] = {"error": "cancelled", "source": name, "data_points": [], "sources": []}
+                        continue
+                    exc = task.exception()
+                    if exc is not None:
+                        results[name] = exc
+                        continue
+                    result = task.result()
+                    results[name] = result
+                    if isinstance(result, dict) and not result.get("error"):
+                        ok_providers += 1
+                        source_count += SearchLayer._count_real_sources(result)
+            
+                if use_quorum and ok_providers >= (min_providers or 1) and source_count >= (min_sources or 0):
+                    quorum_met = True
+                    break
+            finished = True
+        finally:
+            if not finished:
+                # Cancelled from outside (client disconnect) or failed: stop every provider call
+                for task in pending:
+                    task.cancel()
+        
+        # Keep provider order stable for the merge, independent of finish order
+        results = {name: results[name] for name, _ in provider_calls if name in results}
+        cut_off = [tasks[t] for t in pending]
+        for task in pending:
+            if cancel_stragglers:
+                task.cancel()
+            else:
+                SearchLayer._background_tasks.add(task)
+                task.add_done_callback(SearchLayer._background_tasks.discard)
+        
+        return results, cut_off, quorum_met
+    
     @staticmethod
     async def _perplexity_search(query: str) -> Dict:
         """Search with Perplexity AI."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    "https://api.perplexity.ai/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "sonar-pro",
-                        "messages": [{"role": "user", "content": f"Provide the latest {get_current_year()} data and information about: {query}"}],
-                        "temperature": 0.2
-                    }
-                )
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                return {
-                    "source": "perplexity",
-                    "answer": content,
-                    "citations": data.get("citations", []),
-                    "data_points": [{"title": "Research Summary", "description": content[:500], "source": "perplexity"}],
-                    "sources": []  # Real sources come from citations
+            client = HTTPClientPool.get_client("api.perplexity.ai")
+            response = await client.post(
+                "https://api.perplexity.ai/chat/completions",
+                timeout=30.0,
+                headers={
+                    "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "sonar-pro",
+                    "messages": [{"role": "user", "content": f"Provide the latest {get_current_year()} data and information about: {query}"}],
+                    "temperature": 0.2
                 }
+            )
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            return {
+                "source": "perplexity",
+                "answer": content,
+                "citations": data.get("citations", []),
+                "data_points": [{"title": "Research Summary", "description": content[:500], "source": "perplexity"}],
+                "sources": []  # Real sources come from citations
+            }
         except Exception as e:
             logger.error(f"Perplexity search error: {e}")
             return {"error": str(e), "source": "perplexity", "data_points": [], "sources": []}
@@ -1675,33 +2575,34 @@ class SearchLayer:
     async def _exa_search(query: str, num_results: int) -> Dict:
         """Search with Exa.ai neural search."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    "https://api.exa.ai/search",
-                    headers={"Authorization": f"Bearer {EXA_API_KEY}"},
-                    json={
-                        "query": query,
-                        "numResults": num_results,
-                        "useAutoprompt": True,
-                        "contents": {"text": {"maxCharacters": 500}}
-                    }
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for r in data.get("results", []):
-                    url = r.get("url", "")
-                    title = r.get("title", "")
-                    real_name = extract_source_name(url, title)
-                    dp = {
-                        "title": title,
-                        "description": r.get("text", "")[:300],
-                        "url": url,
-                        "source": real_name
-                    }
-                    data_points.append(dp)
-                    sources.append({"title": title, "url": url, "source": real_name})
-                return {"source": "exa", "results": data.get("results", []), "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("api.exa.ai")
+            response = await client.post(
+                "https://api.exa.ai/search",
+                timeout=30.0,
+                headers={"Authorization": f"Bearer {EXA_API_KEY}"},
+                json={
+                    "query": query,
+                    "numResults": num_results,
+                    "useAutoprompt": True,
+                    "contents": {"text": {"maxCharacters": 500}}
+                }
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for r in data.get("results", []):
+                url = r.get("url", "")
+                title = r.get("title", "")
+                real_name = extract_source_name(url, title)
+                dp = {
+                    "title": title,
+                    "description": r.get("text", "")[:300],
+                    "url": url,
+                    "source": real_name
+                }
+                data_points.append(dp)
+                sources.append({"title": title, "url": url, "source": real_name})
+            return {"source": "exa", "results": data.get("results", []), "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"Exa search error: {e}")
             return {"error": str(e), "source": "exa", "data_points": [], "sources": []}
@@ -1710,22 +2611,23 @@ class SearchLayer:
     async def _google_search(query: str, num_results: int) -> Dict:
         """Search with Google via SerpAPI."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    "https://serpapi.com/search",
-                    params={"q": query, "api_key": SERPAPI_KEY, "engine": "google", "num": num_results}
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for r in data.get("organic_results", [])[:num_results]:
-                    url = r.get("link", "")
-                    title = r.get("title", "")
-                    real_name = extract_source_name(url, title)
-                    dp = {"title": title, "description": r.get("snippet", ""), "url": url, "source": real_name}
-                    data_points.append(dp)
-                    sources.append({"title": title, "url": url, "source": real_name})
-                return {"source": "google", "results": data.get("organic_results", []), "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("serpapi.com")
+            response = await client.get(
+                "https://serpapi.com/search",
+                timeout=30.0,
+                params={"q": query, "api_key": SERPAPI_KEY, "engine": "google", "num": num_results}
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for r in data.get("organic_results", [])[:num_results]:
+                url = r.get("link", "")
+                title = r.get("title", "")
+                real_name = extract_source_name(url, title)
+                dp = {"title": title, "description": r.get("snippet", ""), "url": url, "source": real_name}
+                data_points.append(dp)
+                sources.append({"title": title, "url": url, "source": real_name})
+            return {"source": "google", "results": data.get("organic_results", []), "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"Google search error: {e}")
             return {"error": str(e), "source": "google", "data_points": [], "sources": []}
@@ -1734,23 +2636,24 @@ class SearchLayer:
     async def _bing_search(query: str, num_results: int) -> Dict:
         """Search with Bing Web Search API."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    "https://api.bing.microsoft.com/v7.0/search",
-                    headers={"Ocp-Apim-Subscription-Key": BING_API_KEY},
-                    params={"q": query, "count": num_results, "mkt": "en-US", "freshness": "Month"}
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for r in data.get("webPages", {}).get("value", [])[:num_results]:
-                    url = r.get("url", "")
-                    title = r.get("name", "")
-                    real_name = extract_source_name(url, title)
-                    dp = {"title": title, "description": r.get("snippet", ""), "url": url, "source": real_name}
-                    data_points.append(dp)
-                    sources.append({"title": title, "url": url, "source": real_name})
-                return {"source": "bing", "results": data.get("webPages", {}).get("value", []), "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("api.bing.microsoft.com")
+            response = await client.get(
+                "https://api.bing.microsoft.com/v7.0/search",
+                timeout=30.0,
+                headers={"Ocp-Apim-Subscription-Key": BING_API_KEY},
+                params={"q": query, "count": num_results, "mkt": "en-US", "freshness": "Month"}
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for r in data.get("webPages", {}).get("value", [])[:num_results]:
+                url = r.get("url", "")
+                title = r.get("name", "")
+                real_name = extract_source_name(url, title)
+                dp = {"title": title, "description": r.get("snippet", ""), "url": url, "source": real_name}
+                data_points.append(dp)
+                sources.append({"title": title, "url": url, "source": real_name})
+            return {"source": "bing", "results": data.get("webPages", {}).get("value", []), "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"Bing search error: {e}")
             return {"error": str(e), "source": "bing", "data_points": [], "sources": []}
@@ -1759,27 +2662,28 @@ class SearchLayer:
     async def _google_custom_search(query: str, num_results: int) -> Dict:
         """Search with Google Custom Search API."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    "https://www.googleapis.com/customsearch/v1",
-                    params={
-                        "key": GOOGLE_CUSTOM_SEARCH_KEY,
-                        "cx": GOOGLE_CUSTOM_SEARCH_CX,
-                        "q": query,
-                        "num": min(num_results, 10)
-                    }
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for r in data.get("items", []):
-                    url = r.get("link", "")
-                    title = r.get("title", "")
-                    real_name = extract_source_name(url, title)
-                    dp = {"title": title, "description": r.get("snippet", ""), "url": url, "source": real_name}
-                    data_points.append(dp)
-                    sources.append({"title": title, "url": url, "source": real_name})
-                return {"source": "google_custom", "results": data.get("items", []), "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("www.googleapis.com")
+            response = await client.get(
+                "https://www.googleapis.com/customsearch/v1",
+                timeout=30.0,
+                params={
+                    "key": GOOGLE_CUSTOM_SEARCH_KEY,
+                    "cx": GOOGLE_CUSTOM_SEARCH_CX,
+                    "q": query,
+                    "num": min(num_results, 10)
+                }
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for r in data.get("items", []):
+                url = r.get("link", "")
+                title = r.get("title", "")
+                real_name = extract_source_name(url, title)
+                dp = {"title": title, "description": r.get("snippet", ""), "url": url, "source": real_name}
+                data_points.append(dp)
+                sources.append({"title": title, "url": url, "source": real_name})
+            return {"source": "google_custom", "results": data.get("items", []), "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"Google Custom Search error: {e}")
             return {"error": str(e), "source": "google_custom", "data_points": [], "sources": []}
@@ -1788,28 +2692,29 @@ class SearchLayer:
     async def _youtube_search(query: str, num_results: int = 5) -> Dict:
         """Search YouTube Data v3 for relevant videos."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    "https://www.googleapis.com/youtube/v3/search",
-                    params={
-                        "part": "snippet", "q": query, "key": YOUTUBE_API_KEY,
-                        "maxResults": num_results, "type": "video", "order": "relevance"
-                    }
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for item in data.get("items", []):
-                    snippet = item.get("snippet", {})
-                    video_id = item.get("id", {}).get("videoId", "")
-                    url = f"https://www.youtube.com/watch?v={video_id}" if video_id else ""
-                    title = snippet.get("title", "")
-                    channel = snippet.get("channelTitle", "YouTube")
-                    dp = {"title": title, "description": snippet.get("description", "")[:300], "url": url, "source": channel}
-                    data_points.append(dp)
-                    if url:
-                        sources.append({"title": f"{title} ({channel})", "url": url, "source": channel})
-                return {"source": "youtube", "results": data.get("items", []), "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("www.googleapis.com")
+            response = await client.get(
+                "https://www.googleapis.com/youtube/v3/search",
+                timeout=30.0,
+                params={
+                    "part": "snippet", "q": query, "key": YOUTUBE_API_KEY,
+                    "maxResults": num_results, "type": "video", "order": "relevance"
+                }
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for item in data.get("items", []):
+                snippet = item.get("snippet", {})
+                video_id = item.get("id", {}).get("videoId", "")
+                url = f"https://www.youtube.com/watch?v={video_id}" if video_id else ""
+                title = snippet.get("title", "")
+                channel = snippet.get("channelTitle", "YouTube")
+                dp = {"title": title, "description": snippet.get("description", "")[:300], "url": url, "source": channel}
+                data_points.append(dp)
+                if url:
+                    sources.append({"title": f"{title} ({channel})", "url": url, "source": channel})
+            return {"source": "youtube", "results": data.get("items", []), "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"YouTube search error: {e}")
             return {"error": str(e), "source": "youtube", "data_points": [], "sources": []}
@@ -1818,9 +2723,9 @@ class SearchLayer:
     async def _grok_search(query: str) -> Dict:
         """Search with Grok/X AI for real-time social data."""
         try:
-            if not grok_client:
+            if not grok_async_client:
                 return {"error": "Grok not configured", "source": "grok", "data_points": [], "sources": []}
-            response = grok_client.chat.completions.create(
+            response = await grok_async_client.chat.completions.create(
                 model="grok-4-1-fast-reasoning",
                 messages=[
                     {"role": "system", "content": f"You are a real-time search assistant. Today is {get_current_date_str()}. Provide the most current {get_current_year()} information with specific data points, numbers, and facts."},
@@ -1843,28 +2748,29 @@ class SearchLayer:
     async def _firecrawl_search(query: str) -> Dict:
         """Search with Firecrawl for deep web content extraction."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    "https://api.firecrawl.dev/v1/search",
-                    headers={
-                        "Authorization": f"Bearer {FIRECRAWL_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={"query": query, "limit": 5}
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for r in data.get("data", []):
-                    url = r.get("url", "")
-                    title = r.get("title", r.get("metadata", {}).get("title", ""))
-                    real_name = extract_source_name(url, title)
-                    content = r.get("markdown", r.get("content", ""))[:300]
-                    dp = {"title": title, "description": content, "url": url, "source": real_name}
-                    data_points.append(dp)
-                    if url:
-                        sources.append({"title": title, "url": url, "source": real_name})
-                return {"source": "firecrawl", "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("api.firecrawl.dev")
+            response = await client.post(
+                "https://api.firecrawl.dev/v1/search",
+                timeout=30.0,
+                headers={
+                    "Authorization": f"Bearer {FIRECRAWL_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                json={"query": query, "limit": 5}
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for r in data.get("data", []):
+                url = r.get("url", "")
+                title = r.get("title", r.get("metadata", {}).get("title", ""))
+                real_name = extract_source_name(url, title)
+                content = r.get("markdown", r.get("content", ""))[:300]
+                dp = {"title": title, "description": content, "url": url, "source": real_name}
+                data_points.append(dp)
+                if url:
+                    sources.append({"title": title, "url": url, "source": real_name})
+            return {"source": "firecrawl", "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"Firecrawl search error: {e}")
             return {"error": str(e), "source": "firecrawl", "data_points": [], "sources": []}
@@ -1873,34 +2779,35 @@ class SearchLayer:
     async def _pinterest_search(query: str, num_results: int = 10) -> Dict:
         """Search Pinterest for visual and trend data."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    "https://api.pinterest.com/v5/search/pins",
-                    headers={
-                        "Authorization": f"Bearer {PINTEREST_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    params={"query": query, "page_size": min(num_results, 25)}
-                )
-                data = response.json()
-                data_points = []
-                sources = []
-                for pin in data.get("items", []):
-                    pin_id = pin.get("id", "")
-                    title = pin.get("title", pin.get("description", ""))[:200]
-                    url = f"https://www.pinterest.com/pin/{pin_id}/" if pin_id else ""
-                    board = pin.get("board_owner", {}).get("username", "Pinterest")
-                    dp = {
-                        "title": title or f"Pinterest Pin {pin_id}",
-                        "description": pin.get("description", "")[:300],
-                        "url": url,
-                        "source": f"Pinterest ({board})",
-                        "image_url": pin.get("media", {}).get("images", {}).get("600x", {}).get("url", "")
-                    }
-                    data_points.append(dp)
-                    if url:
-                        sources.append({"title": title or f"Pinterest Pin", "url": url, "source": f"Pinterest ({board})"})
-                return {"source": "pinterest", "results": data.get("items", []), "data_points": data_points, "sources": sources}
+            client = HTTPClientPool.get_client("api.pinterest.com")
+            response = await client.get(
+                "https://api.pinterest.com/v5/search/pins",
+                timeout=30.0,
+                headers={
+                    "Authorization": f"Bearer {PINTEREST_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                params={"query": query, "page_size": min(num_results, 25)}
+            )
+            data = response.json()
+            data_points = []
+            sources = []
+            for pin in data.get("items", []):
+                pin_id = pin.get("id", "")
+                title = pin.get("title", pin.get("description", ""))[:200]
+                url = f"https://www.pinterest.com/pin/{pin_id}/" if pin_id else ""
+                board = pin.get("board_owner", {}).get("username", "Pinterest")
+                dp = {
+                    "title": title or f"Pinterest Pin {pin_id}",
+                    "description": pin.get("description", "")[:300],
+                    "url": url,
+                    "source": f"Pinterest ({board})",
+                    "image_url": pin.get("media", {}).get("images", {}).get("600x", {}).get("url", "")
+                }
+                data_points.append(dp)
+                if url:
+                    sources.append({"title": title or f"Pinterest Pin", "url": url, "source": f"Pinterest ({board})"})
+            return {"source": "pinterest", "results": data.get("items", []), "data_points": data_points, "sources": sources}
         except Exception as e:
             logger.error(f"Pinterest search error: {e}")
             return {"error": str(e), "source": "pinterest", "data_points": [], "sources": []}
@@ -1912,46 +2819,40 @@ class SearchLayer:
             if not BROWSERLESS_API_KEY:
                 return {"error": "Browserless not configured", "source": "browserless", "data_points": [], "sources": []}
 
-            async with httpx.AsyncClient(timeout=45.0) as client:
-                # Use Browserless to render and extract content from Google results
-                search_url = f"https://www.google.com/search?q={query}&num={num_results}"
-                response = await client.post(
-                    "https://production-sfo.browserless.io/content",
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Basic {BROWSERLESS_API_KEY}"
-                    },
-                    json={
-                        "url": search_url,
-                        "gotoOptions": {"waitUntil": "networkidle2", "timeout": 30000}
-                    }
-                )
-
-                if response.status_code != 200:
-                    return {"error": f"Browserless HTTP {response.status_code}", "source": "browserless", "data_points": [], "sources": []}
+            # Use Browserless to render and extract content from Google results
+            search_url = f"https://www.google.com/search?q={query}&num={num_results}"
+            client = HTTPClientPool.get_client("production-sfo.browserless.io")
+            response = await client.post(
+                "https://production-sfo.browserless.io/content",
+                timeout=45.0,
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Basic {BROWSERLESS_API_KEY}"
+                },
+                json={
+                    "url": search_url,
+                    "gotoOptions": {"waitUntil": "networkidle2", "timeout": 30000}
+                }
+            )
 
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.text, "html.parser")
-                for tag in soup(["script", "style", "nav", "footer"]):
-                    tag.decompose()
+            if response.status_code != 200:
+                return {"error": f"Browserless HTTP {response.status_code}", "source": "browserless", "data_points": [], "sources": []}
 
-                text = soup.get_text(separator="\n", strip=True)[:5000]
-                data_points = [{"title": "Deep Web Extraction", "description": text[:500], "source": "Browserless"}]
+            text, raw_links = await parse_off_loop(extract_text_and_links, response.text, 5000, 20)
+            data_points = [{"title": "Deep Web Extraction", "description": text[:500], "source": "Browserless"}]
 
-                links = []
-                for a in soup.find_all("a", href=True)[:20]:
-                    href = a["href"]
-                    if href.startswith("http") and "google" not in href:
-                        link_title = a.get_text(strip=True)[:100]
-                        real_name = extract_source_name(href, link_title)
-                        links.append({"title": link_title, "url": href, "source": real_name})
+            links = []
+            for href, link_title in raw_links:
+                if href.startswith("http") and "google" not in href:
+                    real_name = extract_source_name(href, link_title)
+                    links.append({"title": link_title, "url": href, "source": real_name})
 
-                return {
-                    "source": "browserless",
-                    "text": text,
-                    "data_points": data_points,
-                    "sources": links[:num_results]
-                }
+            return {
+                "source": "browserless",
+                "text": text,
+                "data_points": data_points,
+                "sources": links[:num_results]
+            }
         except Exception as e:
             logger.error(f"Browserless deep search error: {e}")
             return {"error": str(e), "source": "browserless", "data_points": [], "sources": []}
@@ -3048,15 +3949,15 @@ class MemoryManager:
         """Save a message to conversation history."""
         if supabase and conversation_id:
             try:
-                supabase.table("chat_messages").insert({
+                await PersistenceQueue.insert("chat_messages", {
                     "conversation_id": conversation_id,
                     "role": role,
                     "content": content[:10000],
                     "metadata": metadata or {}
-                }).execute()
-                supabase.table("conversations").update({
+                })
+                await PersistenceQueue.update("conversations", "id", conversation_id, {
                     "updated_at": datetime.now().isoformat()
-                }).eq("id", conversation_id).execute()
+                })
             except Exception as e:
                 logger.error(f"Save message error: {e}")
     
@@ -3149,11 +4050,10 @@ CRITICAL CONTEXT: Today is {current_date}. The current year is {current_year}.
         - moonshot/fetch:latest: Fetch and parse URL content to markdown
         
         The tool call loop handles Kimi autonomously deciding to search or fetch URLs.
+        Both rounds are consumed with `async for` on the AsyncOpenAI stream, so other
+        requests on this worker keep running while tokens arrive.
         """
         try:
-            import functools
-            loop = asyncio.get_event_loop()
-            
             # Build the API call parameters
             api_params = {
                 "model": "kimi-k2.5",
@@ -3177,17 +4077,14 @@ CRITICAL CONTEXT: Today is {current_date}. The current year is {current_year}.
                     },
                 ]
             
-            response = await loop.run_in_executor(None, functools.partial(
-                kimi_client.chat.completions.create,
-                **api_params
-            ))
+            response = await kimi_async_client.chat.completions.create(**api_params)
             
             # Track tool calls for the tool-call loop
             collected_tool_calls = {}
             current_content = ""
             finish_reason = None
             
-            for chunk in response:
+            async for chunk in response:
                 if not chunk.choices:
                     continue
                     
@@ -3266,14 +4163,13 @@ CRITICAL CONTEXT: Today is {current_date}. The current year is {current_year}.
                 continued_messages = messages + [assistant_msg] + tool_results
                 
                 # Make a second streaming call with the tool results
-                response2 = await loop.run_in_executor(None, functools.partial(
-                    kimi_client.chat.completions.create,
+                response2 = await kimi_async_client.chat.completions.create(
                     model="kimi-k2.5",
                     messages=continued_messages,
                     temperature=1,
                     max_tokens=config.get("max_tokens", 16384),
                     stream=True
-                ))
+                )
                 
                 yield event("task_progress", {
                     "id": "kimi_tools",
@@ -3281,7 +4177,7 @@ CRITICAL CONTEXT: Today is {current_date}. The current year is {current_year}.
                     "status": "complete"
                 })
                 
-                for chunk in response2:
+                async for chunk in response2:
                     if not chunk.choices:
                         continue
                     delta = chunk.choices[0].delta
@@ -3298,17 +4194,14 @@ CRITICAL CONTEXT: Today is {current_date}. The current year is {current_year}.
     async def _stream_grok(messages: List[Dict], config: Dict) -> AsyncGenerator[str, None]:
         """Stream from Grok."""
         try:
-            import functools
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, functools.partial(
-                grok_client.chat.completions.create,
+            response = await grok_async_client.chat.completions.create(
                 model="grok-3-mini",
                 messages=messages,
                 temperature=config.get("temperature", 0.7),
                 max_tokens=config.get("max_tokens", 4096),
                 stream=True
-            ))
-            for chunk in response:
+            )
+            async for chunk in response:
                 if chunk.choices and chunk.choices[0].delta.content:
                     yield event("content", {"chunk": chunk.choices[0].delta.content})
         except Exception as e:
@@ -3320,18 +4213,22 @@ CRITICAL CONTEXT: Today is {current_date}. The current year is {current_year}.
 # AGENT ORCHESTRATOR
 # ============================================================================
 
+# Max agents calling the LLM at once within one swarm
+SWARM_MAX_CONCURRENCY = int(os.getenv("SWARM_MAX_CONCURRENCY", "5"))
+
+
 class AgentOrchestrator:
     """Multi-agent execution system."""
     
     @staticmethod
     async def execute_agent(task: str, agent_type: str = "research", context: Dict = None) -> Dict:
         """Execute a single agent task."""
-        client = kimi_client or grok_client
+        client = kimi_async_client or grok_async_client
         if not client:
             return {"error": "No LLM client available"}
         
-        model = "kimi-k2.5" if client == kimi_client else "grok-3-mini"
-        temp = 1 if client == kimi_client else 0.5
+        model = "kimi-k2.5" if client == kimi_async_client else "grok-3-mini"
+        temp = 1 if client == kimi_async_client else 0.5
         current_date = get_current_date_str()
         
         system_prompts = {
@@ -3343,7 +4240,7 @@ class AgentOrchestrator:
         }
         
         try:
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": system_prompts.get(agent_type, system_prompts["research"])},
@@ -3357,45 +4254,86 @@ class AgentOrchestrator:
             return {"error": str(e)}
     
     @staticmethod
-    async def execute_swarm(task: str, num_agents: int = 5, context: Dict = None) -> AsyncGenerator[str, None]:
-        """Execute multiple agents in parallel."""
+    async def _synthesize(task: str, all_results: List[Dict]) -> str:
+        """Combine agent results into one response (falls back to the raw text)."""
+        synthesis_parts = [r.get("result", "") for r in all_results if isinstance(r, dict)]
+        combined = "\n\n".join(synthesis_parts[:3])
+        
+        client = kimi_async_client or grok_async_client
+        if not client:
+            return combined[:2000]
+        model = "kimi-k2.5" if client == kimi_async_client else "grok-3-mini"
+        temp = 1 if client == kimi_async_client else 0.5
+        try:
+            synth = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": f"Synthesize these agent results into a comprehensive response. Today is {get_current_date_str()}."},
+                    {"role": "user", "content": f"Task: {task}\n\nAgent results:\n{combined[:4000]}"}
+                ],
+                temperature=temp,
+                max_tokens=16384
+            )
+            return synth.choices[0].message.content
+        except Exception:
+            return combined[:2000]
+    
+    @staticmethod
+    async def execute_swarm(task: str, num_agents: int = 5, context: Dict = None,
+                            max_concurrency: Optional[int] = None, quorum: Optional[int] = None) -> AsyncGenerator[str, None]:
+        """Execute multiple agents in parallel.
+        
+        Agents run on the async LLM clients, at most `max_concurrency` at a time
+        (default SWARM_MAX_CONCURRENCY). Each agent_result is emitted as soon as
+        that agent finishes, and synthesis starts once `quorum` agents (default
+        min(3, num_agents)) have produced a result, while the rest keep running.
+        """
         yield event("swarm_start", {"task": task, "num_agents": num_agents})
         
         agent_types = ["research", "analysis", "creative", "data", "research"][:num_agents]
-        tasks = [AgentOrchestrator.execute_agent(task, at, context) for at in agent_types]
+        quorum = quorum or min(3, len(agent_types))
+        semaphore = asyncio.Semaphore(max_concurrency or SWARM_MAX_CONCURRENCY)
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def run_agent(agent_id: int, agent_type: str):
+            async with semaphore:
+                try:
+                    return agent_id, await AgentOrchestrator.execute_agent(task, agent_type, context)
+                except Exception as e:
+                    return agent_id, e
         
+        pending = {asyncio.create_task(run_agent(i, at)) for i, at in enumerate(agent_types)}
+        synth_task = None
         all_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                yield event("agent_error", {"agent_id": i, "error": str(result)})
-            else:
-                yield event("agent_result", {"agent_id": i, "result": result})
-                all_results.append(result)
+        usable = []
         
-        # Synthesize results
-        if all_results:
-            synthesis_parts = [r.get("result", "") for r in all_results if isinstance(r, dict)]
-            combined = "\n\n".join(synthesis_parts[:3])
-            
-            client = kimi_client or grok_client
-            if client:
-                model = "kimi-k2.5" if client == kimi_client else "grok-3-mini"
-                temp = 1 if client == kimi_client else 0.5
-                try:
-                    synth = client.chat.completions.create(
-                        model=model,
-                        messages=[
-                            {"role": "system", "content": f"Synthesize these agent results into a comprehensive response. Today is {get_current_date_str()}."},
-                            {"role": "user", "content": f"Task: {task}\n\nAgent results:\n{combined[:4000]}"}
-                        ],
-                        temperature=temp,
-                        max_tokens=16384
-                    )
-                    yield event("synthesis", {"content": synth.choices[0].message.content})
-                except Exception as e:
-                    yield event("synthesis", {"content": combined[:2000]})
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    if finished is synth_task:
+                        yield event("synthesis", {"content": finished.result(), "based_on": quorum})
+                        continue
+                    
+                    agent_id, result = finished.result()
+                    if isinstance(result, Exception):
+                        yield event("agent_error", {"agent_id": agent_id, "error": str(result)})
+                        continue
+                    yield event("agent_result", {"agent_id": agent_id, "result": result})
+                    all_results.append(result)
+                    if isinstance(result, dict) and result.get("result"):
+                        usable.append(result)
+                    
+                    if synth_task is None and len(usable) >= quorum:
+                        synth_task = asyncio.create_task(AgentOrchestrator._synthesize(task, list(usable)))
+                        pending.add(synth_task)
+            
+            # Quorum never reached (agent errors) - synthesize whatever came back
+            if synth_task is None and all_results:
+                content = await AgentOrchestrator._synthesize(task, usable or all_results)
+                yield event("synthesis", {"content": content, "based_on": len(usable or all_results)})
+        finally:
+            for t in pending:
+                t.cancel()
         
         yield event("swarm_complete", {"num_results": len(all_results)})
 
@@ -3410,6 +4348,25 @@ class ChatHandler:
     @staticmethod
     async def handle_chat(request: ChatRequest) -> AsyncGenerator[str, None]:
         """Handle chat with full pipeline: search → synthesize → files → conclusion."""
+        # The billing session is ended here as well, so a client disconnect
+        # (GeneratorExit) or an error mid-stream cannot leave its escrow held
+        billing: Dict[str, str] = {}
+        pipeline = ChatHandler._run_chat_pipeline(request, billing)
+        try:
+            async for chunk in pipeline:
+                yield chunk
+        finally:
+            await pipeline.aclose()
+            session_id = billing.pop("session_id", None)
+            if session_id and credit_service:
+                try:
+                    await credit_service.end_billing_session(session_id)
+                except Exception as e:
+                    logger.warning(f"Billing session cleanup failed for {session_id}: {e}")
+    
+    @staticmethod
+    async def _run_chat_pipeline(request: ChatRequest, billing: Dict[str, str]) -> AsyncGenerator[str, None]:
+        """Chat pipeline; records the open billing session in `billing`."""
         
         conversation_id = request.conversation_id or str(uuid.uuid4())
         user_message = ""
@@ -3492,16 +4449,15 @@ class ChatHandler:
         
         if credit_service and user_id and not is_admin:
             try:
-                min_required = await credit_service.get_min_required_for_mode(request.mode.value)
-                has_credits = await credit_service.has_sufficient_credits(user_id, min_required=min_required)
-                if not has_credits:
+                # Start billing session (one balance read; base cost debited from the local ledger).
+                # None means the balance is below the mode minimum.
+                billing_session_id = await credit_service.start_billing_session(user_id, request.mode.value)
+                if not billing_session_id:
                     yield event("credits_exhausted", {"message": "You've run out of credits.", "redirect": "/billing"})
                     return
-                # Start billing session (deducts base cost immediately)
-                billing_session_id = await credit_service.start_billing_session(user_id, request.mode.value)
-                if billing_session_id:
-                    balance = await credit_service.get_balance(user_id)
-                    yield event("credit_update", {"balance": balance, "operation": f"base_{request.mode.value}"})
+                billing["session_id"] = billing_session_id
+                balance = credit_service.get_session_balance(billing_session_id)
+                yield event("credit_update", {"balance": balance, "operation": f"base_{request.mode.value}"})
             except Exception as e:
                 logger.warning(f"Billing check failed (non-blocking): {e}")
         
@@ -3550,7 +4506,12 @@ class ChatHandler:
             if current_mode == "instant":
                 # Instant: minimal sources (1-2 APIs), fewer results, fast response
                 yield event("task_progress", {"id": "search", "title": "Quick lookup", "status": "active", "detail": "Checking latest information..."})
-                search_results = await SearchLayer.search(user_message, sources=["web"], num_results=5)
+                search_results = await SearchLayer.search(
+                    user_message, sources=["web"], num_results=5,
+                    deadline=INSTANT_SEARCH_DEADLINE,
+                    min_providers=INSTANT_SEARCH_MIN_PROVIDERS,
+                    min_sources=INSTANT_SEARCH_MIN_SOURCES,
+                )
             else:
                 # Auto/Research: full search across all sources
                 yield event("task_progress", {"id": "search", "title": "Searching across multiple sources", "status": "active", "detail": "Querying web, news, and social sources..."})
@@ -3569,7 +4530,7 @@ class ChatHandler:
                         if result.should_pause:
                             yield event("credit_update", {"balance": result.remaining_balance, "warning": "low_credits"})
                     # Send updated balance
-                    balance = await credit_service.get_balance(user_id)
+                    balance = credit_service.get_session_balance(billing_session_id)
                     yield event("credit_update", {"balance": balance, "operation": "search"})
                 except Exception as e:
                     logger.warning(f"Search billing failed (non-blocking): {e}")
@@ -3852,7 +4813,7 @@ FILE GENERATION:
             try:
                 llm_op = "llm_grok_stream" if request.mode.value == "instant" else "llm_kimi_stream"
                 result = await credit_service.bill_operation(billing_session_id, llm_op, 1.0, "LLM response generation")
-                balance = await credit_service.get_balance(user_id)
+                balance = result.remaining_balance
                 yield event("credit_update", {"balance": balance, "operation": "llm_response"})
                 if result.should_pause:
                     yield event("credit_update", {"balance": balance, "warning": "low_credits"})
@@ -4025,8 +4986,8 @@ FILE GENERATION:
                         if billing_session_id and credit_service:
                             try:
                                 file_op = f"file_{file_type}"
-                                await credit_service.bill_operation(billing_session_id, file_op, 1.0, f"Generated {file_type} file")
-                                balance = await credit_service.get_balance(user_id)
+                                billing = await credit_service.bill_operation(billing_session_id, file_op, 1.0, f"Generated {file_type} file")
+                                balance = billing.remaining_balance
                                 yield event("credit_update", {"balance": balance, "operation": f"file_{file_type}"})
                             except Exception as e:
                                 logger.warning(f"File billing failed (non-blocking): {e}")
@@ -4072,13 +5033,16 @@ FILE GENERATION:
         # End billing session and get total credits used
         credits_used = 0
         if billing_session_id and credit_service:
+            billing.pop("session_id", None)
             try:
                 billing_summary = await credit_service.end_billing_session(billing_session_id)
                 if billing_summary:
                     credits_used = billing_summary.get("total_credits_used", 0)
                     logger.info(f"Billing session {billing_session_id} ended. Total credits: {credits_used}, Operations: {billing_summary.get('operations_count', 0)}")
-                # Send final balance update
-                balance = await credit_service.get_balance(user_id)
+                    # Send final balance update (returned by the settlement)
+                    balance = billing_summary.get("remaining_balance", 0)
+                else:
+                    balance = await credit_service.get_balance(user_id)
                 yield event("credit_update", {"balance": balance, "operation": "complete", "total_used": credits_used})
             except Exception as e:
                 logger.warning(f"Billing session end failed (non-blocking): {e}")
@@ -4665,7 +5629,10 @@ async def chat_non_stream(request: ChatRequest):
 async def search_endpoint(request: SearchRequest):
     """Direct search endpoint."""
     try:
-        results = await SearchLayer.search(request.query, request.sources, request.num_results)
+        results = await SearchLayer.search(
+            request.query, request.sources, request.num_results,
+            deadline=request.deadline, min_providers=request.min_providers, min_sources=request.min_sources,
+        )
         return {"success": True, "results": results}
     except Exception as e:
         logger.error(f"Search error: {e}")
@@ -4793,14 +5760,93 @@ async def generate_file_endpoint(request: FileGenRequest):
         logger.error(f"File generation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _parse_byte_range(range_header: str, size: int) -> Optional[tuple]:
+    """Parse a single `bytes=` range. Returns (start, end) inclusive, None to serve
+    the whole file, or raises 416 for an unsatisfiable range."""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None  # Malformed or multi-range - serve the full file
+    if not match.group(1):
+        length = int(match.group(2))
+        if length == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        return max(size - length, 0), size - 1
+    start = int(match.group(1))
+    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+async def _iter_file_range(f, start: int, end: int):
+    """Yield bytes start..end of an already-open file, closing it when done."""
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def file_stream_response(path: Path, filename: str, media_type: str, request: Request, etag_seed: str):
+    """Chunked file response with ETag/If-None-Match and single-range support.
+    
+    The file is opened here, so a download-cache eviction that unlinks the
+    path afterwards does not affect the response. It is closed on every
+    path: 304, 416, a finished stream, or a response that is never iterated.
+    """
+    f = open(path, "rb")
+    try:
+        size = os.fstat(f.fileno()).st_size
+        etag = f'"{hashlib.md5(f"{etag_seed}:{size}".encode()).hexdigest()}"'
+        if filename.isascii():
+            disposition = f'attachment; filename="{filename}"'
+        else:
+            disposition = f"attachment; filename*=utf-8''{quote(filename)}"
+        headers = {"ETag": etag, "Accept-Ranges": "bytes", "Content-Disposition": disposition}
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            f.close()
+            return Response(status_code=304, headers=headers)
+        
+        byte_range = None
+        range_header = request.headers.get("range")
+        if range_header and size > 0 and request.headers.get("if-range", etag) == etag:
+            byte_range = _parse_byte_range(range_header, size)
+    except BaseException:
+        f.close()
+        raise
+    
+    # The background task closes the file even if the body is never iterated
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_iter_file_range(f, start, end), status_code=206,
+                                 media_type=media_type, headers=headers,
+                                 background=BackgroundTask(f.close))
+    
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(_iter_file_range(f, 0, size - 1), media_type=media_type, headers=headers,
+                             background=BackgroundTask(f.close))
+
+
 @app.get("/api/v1/download/{file_id}")
 @app.get("/api/v1/files/{file_id}/download")
-async def download_file(file_id: str):
+async def download_file(file_id: str, request: Request):
     """
     Download generated file. Checks multiple sources:
     1. In-memory FileEngine cache (fastest, current session)
     2. PersistentFileStore / Supabase Storage (permanent, survives restarts)
     3. Returns redirect to public URL if file is in Supabase Storage
+    
+    Files are streamed in chunks with Range and ETag/If-None-Match support.
     """
     media_types = {
         "excel": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -4817,26 +5863,25 @@ async def download_file(file_id: str):
         if file_info:
             filepath = Path(file_info["filepath"])
             if filepath.exists():
-                return FileResponse(
-                    path=str(filepath),
-                    filename=file_info["filename"],
-                    media_type=media_types.get(file_info["file_type"], "application/octet-stream")
+                return file_stream_response(
+                    filepath, file_info["filename"],
+                    media_types.get(file_info["file_type"], "application/octet-stream"),
+                    request, file_id,
                 )
         
         # 2. Check PersistentFileStore (Supabase Storage - permanent)
         persistent_info = PersistentFileStore.get_file(file_id)
         if persistent_info:
             filename = persistent_info["filename"]
-            file_type = persistent_info["file_type"]
+            media_type = media_types.get(persistent_info["file_type"], "application/octet-stream")
             
             # Try local cache first
-            local_path = Path(persistent_info.get("filepath", ""))
-            if local_path.exists():
-                return FileResponse(
-                    path=str(local_path),
-                    filename=filename,
-                    media_type=media_types.get(file_type, "application/octet-stream")
-                )
+            local_path = Path(persistent_info.get("filepath", "") or "")
+            if persistent_info.get("filepath") and local_path.is_file():
+                try:
+                    return file_stream_response(local_path, filename, media_type, request, file_id)
+                except FileNotFoundError:
+                    pass  # Evicted from the download cache meanwhile; refilled below
             
             # If public URL exists, redirect to it
             public_url = persistent_info.get("public_url", "")
@@ -4844,18 +5889,10 @@ async def download_file(file_id: str):
                 from fastapi.responses import RedirectResponse
                 return RedirectResponse(url=public_url)
             
-            # Download from Supabase Storage and serve
-            file_bytes = await PersistentFileStore.get_file_content(file_id)
-            if file_bytes:
-                # Cache locally for this session
-                OUTPUT_DIR.mkdir(exist_ok=True)
-                local_cache = OUTPUT_DIR / f"{file_id}_{filename}"
-                local_cache.write_bytes(file_bytes)
-                return FileResponse(
-                    path=str(local_cache),
-                    filename=filename,
-                    media_type=media_types.get(file_type, "application/octet-stream")
-                )
+            # Stream from Supabase Storage into the local cache and serve
+            local_path = await PersistentFileStore.ensure_local_file(file_id)
+            if local_path:
+                return file_stream_response(local_path, filename, media_type, request, file_id)
         
         raise HTTPException(status_code=404, detail="File not found. It may have been deleted or expired.")
     except HTTPException:
@@ -4903,7 +5940,10 @@ async def execute_swarm(request: SwarmRequest):
     """Execute agent swarm."""
     try:
         async def event_generator():
-            async for e in AgentOrchestrator.execute_swarm(request.task, request.num_agents, request.context):
+            async for e in AgentOrchestrator.execute_swarm(
+                request.task, request.num_agents, request.context,
+                max_concurrency=request.max_concurrency, quorum=request.quorum,
+            ):
                 yield e
         return StreamingResponse(event_generator(), media_type="text/event-stream")
     except Exception as e:
@@ -5182,14 +6222,14 @@ class TokenTracker:
             return
         try:
             buf = cls._usage_buffer[user_id]
-            supabase.table("usage_logs").insert({
+            await PersistenceQueue.insert("usage_logs", {
                 "user_id": user_id,
                 "total_tokens": buf["total_tokens"],
                 "total_cost_usd": round(buf["total_cost"], 6),
                 "request_count": buf["requests"],
                 "period_start": buf["records"][0]["timestamp"] if buf["records"] else datetime.now().isoformat(),
                 "period_end": datetime.now().isoformat()
-            }).execute()
+            })
         except Exception as e:
             logger.error(f"Token usage flush error: {e}")
     
@@ -5235,10 +6275,55 @@ async def get_usage(user_id: str = None, user: Dict = Depends(AuthManager.get_cu
 # ============================================================================
 
 class FileUploadManager:
-    """Handle file uploads with S3 storage and format validation."""
+    """Handle file uploads with S3 storage and format validation.
+    
+    Uploads are streamed to disk in UPLOAD_CHUNK_SIZE chunks while hashing, so
+    peak memory per upload stays around one chunk. Text extraction runs in the
+    upload worker pool and the S3 upload runs as a background stage that
+    streams from the spooled file. Base64 for vision calls is built on demand.
+    """
     
     # In-memory file registry (also persisted to Supabase)
     uploaded_files: Dict[str, Dict] = {}
+    _pool: Optional[ThreadPoolExecutor] = None
+    _background_tasks: set = set()
+    
+    @classmethod
+    def _get_pool(cls) -> ThreadPoolExecutor:
+        if cls._pool is None:
+            cls._pool = ThreadPoolExecutor(max_workers=UPLOAD_PIPELINE_WORKERS, thread_name_prefix="upload-pipeline")
+        return cls._pool
+    
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+    
+    @classmethod
+    async def _spool_to_disk(cls, file: UploadFile, dest: Path) -> Tuple[Optional[int], Optional[str]]:
+        """Stream the upload to dest while hashing. Returns (size, sha256 hex),
+        or (None, None) if the size cap was exceeded (nothing is left on disk)."""
+        max_bytes = MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        tmp = dest.with_name(dest.name + ".part")
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp, "wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        break
+                    hasher.update(chunk)
+                    await out.write(chunk)
+            if size > max_bytes:
+                tmp.unlink(missing_ok=True)
+                return None, None
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return size, hasher.hexdigest()
     
     @classmethod
     async def upload_file(cls, file: UploadFile, user_id: str = None) -> Dict:
@@ -5248,13 +6333,10 @@ class FileUploadManager:
         if content_type not in ALLOWED_UPLOAD_TYPES:
             return {"success": False, "error": f"File type '{content_type}' not supported. Allowed: images (PNG, JPEG, WebP, GIF), videos (MP4, WebM, MOV), documents (PDF, XLSX, DOCX, CSV, TXT, JSON, PPTX)"}
         
-        # Read file
-        file_bytes = await file.read()
-        file_size = len(file_bytes)
-        
-        # Validate size
-        if file_size > MAX_UPLOAD_SIZE_MB * 1024 * 1024:
-            return {"success": False, "error": f"File too large. Maximum size: {MAX_UPLOAD_SIZE_MB}MB"}
+        # Reject up front when the size is already known
+        too_large = {"success": False, "error": f"File too large. Maximum size: {MAX_UPLOAD_SIZE_MB}MB"}
+        if getattr(file, "size", None) and file.size > MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+            return too_large
         
         file_id = str(uuid.uuid4())
         original_name = file.filename or f"upload_{file_id}"
@@ -5269,24 +6351,22 @@ class FileUploadManager:
         else:
             category = "document"
         
-        # Store locally
+        # Stream to local disk, hashing as we go
         local_path = UPLOAD_DIR / stored_name
-        local_path.write_bytes(file_bytes)
-        
-        # Generate base64 for images (for Kimi vision)
-        base64_data = None
-        if category == "image" and file_size < 10 * 1024 * 1024:  # < 10MB
-            base64_data = base64.b64encode(file_bytes).decode()
+        file_size, sha256_hex = await cls._spool_to_disk(file, local_path)
+        if file_size is None:
+            return too_large
         
-        # Upload to S3 if configured
-        s3_url = None
+        # S3 upload runs in the background, streaming from the spooled file
         if S3_BUCKET and S3_ACCESS_KEY:
-            s3_url = await cls._upload_to_s3(file_bytes, stored_name, content_type)
+            task = asyncio.create_task(cls._s3_stage(file_id, local_path, stored_name, content_type, file_size, sha256_hex))
+            cls._background_tasks.add(task)
+            task.add_done_callback(cls._background_tasks.discard)
         
-        # Extract text content from documents for analysis
+        # Extract text content from documents in the worker pool
         extracted_text = None
         if category == "document":
-            extracted_text = await cls._extract_document_text(file_bytes, content_type, original_name)
+            extracted_text = await cls._extract_document_text(local_path, content_type, original_name)
         
         # Build file record
         file_record = {
@@ -5297,9 +6377,9 @@ class FileUploadManager:
             "category": category,
             "size_bytes": file_size,
             "size_mb": round(file_size / (1024 * 1024), 2),
+            "sha256": sha256_hex,
             "local_path": str(local_path),
-            "s3_url": s3_url,
-            "base64": base64_data,
+            "s3_url": None,
             "extracted_text": extracted_text[:5000] if extracted_text else None,
             "user_id": user_id or "anonymous",
             "uploaded_at": datetime.now().isoformat()
@@ -5310,10 +6390,10 @@ class FileUploadManager:
         # Persist to Supabase
         if supabase:
             try:
-                db_record = {k: v for k, v in file_record.items() if k not in ("base64", "extracted_text")}
+                db_record = {k: v for k, v in file_record.items() if k not in ("extracted_text", "sha256")}
                 if extracted_text:
                     db_record["extracted_text_preview"] = extracted_text[:1000]
-                supabase.table("file_uploads").insert(db_record).execute()
+                await PersistenceQueue.insert("file_uploads", db_record)
             except Exception as e:
                 logger.error(f"File DB persist error: {e}")
         
@@ -5324,17 +6404,28 @@ class FileUploadManager:
             "category": category,
             "content_type": content_type,
             "size_mb": file_record["size_mb"],
-            "url": s3_url or f"/api/v1/uploads/{file_id}",
+            "url": f"/api/v1/uploads/{file_id}",
             "has_extracted_text": bool(extracted_text),
             "preview": extracted_text[:500] if extracted_text else None
         }
     
     @classmethod
-    async def _upload_to_s3(cls, file_bytes: bytes, key: str, content_type: str) -> Optional[str]:
-        """Upload file to S3 or S3-compatible storage."""
+    async def _s3_stage(cls, file_id: str, local_path: Path, key: str, content_type: str, size: int, sha256_hex: str):
+        """Background stage: upload to S3, then record the URL."""
+        s3_url = await cls._upload_to_s3(local_path, key, content_type, size=size, sha256_hex=sha256_hex)
+        if not s3_url:
+            return
+        if file_id in cls.uploaded_files:
+            cls.uploaded_files[file_id]["s3_url"] = s3_url
+        if supabase:
+            await PersistenceQueue.update("file_uploads", "file_id", file_id, {"s3_url": s3_url})
+    
+    @classmethod
+    async def _upload_to_s3(cls, source, key: str, content_type: str,
+                            size: int = None, sha256_hex: str = None) -> Optional[str]:
+        """Upload file to S3 or S3-compatible storage. `source` is bytes or a local Path
+        (streamed in chunks, using the hash computed while spooling)."""
         try:
-            import hmac
-            import hashlib
             from datetime import timezone
             
             # Use httpx for S3 upload with presigned URL approach
@@ -5342,54 +6433,84 @@ class FileUploadManager:
             url = f"{endpoint}/{S3_BUCKET}/uploads/{key}"
             
             now = datetime.now(timezone.utc)
-            date_stamp = now.strftime('%Y%m%d')
             amz_date = now.strftime('%Y%m%dT%H%M%SZ')
             
+            if isinstance(source, (bytes, bytearray)):
+                content = source
+                size = len(source)
+                sha256_hex = hashlib.sha256(source).hexdigest()
+            else:
+                async def content():
+                    async with aiofiles.open(source, "rb") as f:
+                        while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+                            yield chunk
+                content = content()
+            
             headers = {
                 "Content-Type": content_type,
+                "Content-Length": str(size),
                 "x-amz-date": amz_date,
-                "x-amz-content-sha256": hashlib.sha256(file_bytes).hexdigest()
+                "x-amz-content-sha256": sha256_hex
             }
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.put(url, content=file_bytes, headers=headers)
-                if response.status_code in (200, 201):
-                    public_url = f"{endpoint}/{S3_BUCKET}/uploads/{key}"
-                    return public_url
-                else:
-                    logger.warning(f"S3 upload returned {response.status_code}")
-                    return None
+            client = HTTPClientPool.get_client(urlparse(endpoint).netloc)
+            response = await client.put(url, content=content, headers=headers, timeout=60.0)
+            if response.status_code in (200, 201):
+                public_url = f"{endpoint}/{S3_BUCKET}/uploads/{key}"
+                return public_url
+            else:
+                logger.warning(f"S3 upload returned {response.status_code}")
+                return None
         except Exception as e:
             logger.error(f"S3 upload error: {e}")
             return None
     
     @classmethod
-    async def _extract_document_text(cls, file_bytes: bytes, content_type: str, filename: str) -> Optional[str]:
-        """Extract text content from uploaded documents for analysis."""
+    async def _extract_document_text(cls, source, content_type: str, filename: str) -> Optional[str]:
+        """Extract text content from uploaded documents for analysis.
+        
+        `source` is raw bytes or a local Path; parsing runs in the upload worker pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            cls._get_pool(), cls._extract_document_text_sync, source, content_type, filename
+        )
+    
+    @staticmethod
+    def _extract_document_text_sync(source, content_type: str, filename: str) -> Optional[str]:
+        # Parsers accept either a path or a file-like object, so paths are never read into memory here
+        def open_source():
+            return BytesIO(source) if isinstance(source, (bytes, bytearray)) else str(source)
+        
         try:
             if content_type == "application/pdf":
                 # Use PyPDF2 or pdfplumber if available, fallback to basic extraction
                 try:
                     import fitz  # PyMuPDF
-                    doc = fitz.open(stream=file_bytes, filetype="pdf")
+                    if isinstance(source, (bytes, bytearray)):
+                        doc = fitz.open(stream=source, filetype="pdf")
+                    else:
+                        doc = fitz.open(str(source))
                     text = ""
                     for page in doc:
                         text += page.get_text() + "\n"
                     return text.strip() if text.strip() else None
                 except ImportError:
                     try:
-                        from io import BytesIO as BIO
                         import subprocess
-                        tmp_path = UPLOAD_DIR / f"tmp_{uuid.uuid4().hex}.pdf"
-                        tmp_path.write_bytes(file_bytes)
-                        result = subprocess.run(["pdftotext", str(tmp_path), "-"], capture_output=True, text=True, timeout=30)
-                        tmp_path.unlink(missing_ok=True)
+                        tmp_path = None
+                        if isinstance(source, (bytes, bytearray)):
+                            tmp_path = UPLOAD_DIR / f"tmp_{uuid.uuid4().hex}.pdf"
+                            tmp_path.write_bytes(source)
+                        result = subprocess.run(["pdftotext", str(tmp_path or source), "-"], capture_output=True, text=True, timeout=30)
+                        if tmp_path:
+                            tmp_path.unlink(missing_ok=True)
                         return result.stdout.strip() if result.stdout.strip() else None
                     except Exception:
                         return "[PDF content - text extraction not available]"
             
             elif content_type in ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"):
-                df_dict = pd.read_excel(BytesIO(file_bytes), sheet_name=None)
+                df_dict = pd.read_excel(open_source(), sheet_name=None)
                 text_parts = []
                 for sheet_name, df in df_dict.items():
                     text_parts.append(f"\n=== Sheet: {sheet_name} ===")
@@ -5399,7 +6520,7 @@ class FileUploadManager:
                 return "\n".join(text_parts)
             
             elif content_type in ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"):
-                doc = Document(BytesIO(file_bytes))
+                doc = Document(open_source())
                 text = "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
                 # Also extract tables
                 for table in doc.tables:
@@ -5408,15 +6529,18 @@ class FileUploadManager:
                 return text
             
             elif content_type == "text/csv":
-                df = pd.read_csv(BytesIO(file_bytes))
+                df = pd.read_csv(open_source())
                 return f"Columns: {', '.join(str(c) for c in df.columns)}\nRows: {len(df)}\n\n{df.head(30).to_string()}"
             
             elif content_type in ("text/plain", "text/markdown", "application/json"):
-                return file_bytes.decode("utf-8", errors="replace")[:10000]
+                if isinstance(source, (bytes, bytearray)):
+                    return source[:40000].decode("utf-8", errors="replace")[:10000]
+                with open(source, "rb") as f:
+                    return f.read(40000).decode("utf-8", errors="replace")[:10000]
             
             elif content_type == "application/vnd.openxmlformats-officedocument.presentationml.presentation":
                 from pptx import Presentation as PptxPres
-                prs = PptxPres(BytesIO(file_bytes))
+                prs = PptxPres(open_source())
                 text_parts = []
                 for i, slide in enumerate(prs.slides):
                     text_parts.append(f"\n=== Slide {i+1} ===")
@@ -5430,6 +6554,19 @@ class FileUploadManager:
             logger.error(f"Document text extraction error: {e}")
             return f"[Error extracting text: {str(e)}]"
     
+    @classmethod
+    async def get_base64(cls, file_id: str) -> Optional[str]:
+        """Build base64 for a vision call on demand (images up to MAX_VISION_BASE64_MB)."""
+        file_info = cls.get_file(file_id)
+        if not file_info or file_info["category"] != "image":
+            return None
+        if file_info["size_bytes"] >= MAX_VISION_BASE64_MB * 1024 * 1024:
+            return None
+        local_path = Path(file_info["local_path"])
+        if not local_path.exists():
+            return None
+        return await asyncio.to_thread(lambda: base64.b64encode(local_path.read_bytes()).decode())
+    
     @classmethod
     def get_file(cls, file_id: str) -> Optional[Dict]:
         """Get uploaded file info."""
@@ -5455,22 +6592,14 @@ class FileUploadManager:
         
         messages = [{"role": "system", "content": f"You are an expert file analyst. Today is {current_date}. Analyze the provided content thoroughly."}]
         
-        if category == "image" and file_info.get("base64"):
+        image_b64 = await cls.get_base64(file_id) if category == "image" else None
+        if image_b64:
             # Use Kimi-2.5 vision for image analysis
             messages.append({
                 "role": "user",
                 "content": [
                     {"type": "text", "text": analysis_prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:{file_info['content_type']};base64,{file_info['base64']}", "detail": "high"}}
-                ]
-            })
-        elif category == "video" and file_info.get("base64"):
-            # Kimi-2.5 supports video analysis
-            messages.append({
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": analysis_prompt},
-                    {"type": "video_url", "video_url": {"url": f"data:{file_info['content_type']};base64,{file_info['base64']}"}}
+                    {"type": "image_url", "image_url": {"url": f"data:{file_info['content_type']};base64,{image_b64}", "detail": "high"}}
                 ]
             })
         elif file_info.get("extracted_text"):
@@ -5976,6 +7105,8 @@ Use ONLY real, verified data. NEVER use placeholder names.
         """Update task progress in memory and DB."""
         if task_id not in cls._tasks:
             return
+        if cls._tasks[task_id]["status"] == "cancelled":
+            kwargs.pop("status", None)  # A late update must not revive a cancelled task
         
         cls._tasks[task_id]["progress"] = progress
         cls._tasks[task_id]["progress_message"] = message
@@ -6009,7 +7140,7 @@ Use ONLY real, verified data. NEVER use placeholder names.
                 if "error" in kwargs:
                     update_data["error"] = kwargs["error"]
                 
-                supabase.table("active_tasks").update(update_data).eq("task_id", task_id).execute()
+                await PersistenceQueue.update("active_tasks", "task_id", task_id, update_data)
             except Exception as e:
                 logger.error(f"Background task DB update error: {e}")
     
@@ -6022,16 +7153,16 @@ Use ONLY real, verified data. NEVER use placeholder names.
                 task["status"] = "cancelled"
                 task["progress_message"] = "Cancelled by user"
                 task["updated_at"] = datetime.now().isoformat()
-                # Persist to DB
-                if supabase:
-                    try:
-                        supabase.table("active_tasks").update({
-                            "status": "cancelled",
-                            "progress_message": "Cancelled by user",
-                            "updated_at": datetime.now().isoformat()
-                        }).eq("task_id", task_id).execute()
-                    except Exception as e:
-                        logger.error(f"Background task cancel DB error: {e}")
+                # Same queue key as _update_progress: merged into any pending
+                # progress write instead of racing it
+                try:
+                    await PersistenceQueue.update("active_tasks", "task_id", task_id, {
+                        "status": "cancelled",
+                        "progress_message": "Cancelled by user",
+                        "updated_at": task["updated_at"],
+                    })
+                except Exception as e:
+                    logger.error(f"Background task cancel DB error: {e}")
                 return True
         # Also try DB for tasks from previous sessions
         if supabase:
@@ -7223,6 +8354,17 @@ async def health_check():
             "v5_swarm_router": swarm_router_instance is not None,
             "v6_task_persistence": task_persistence is not None,
         },
+        "http_pool": HTTPClientPool.get_stats(),
+        "search_cache": SearchCache.get_stats(),
+        "search_providers": ProviderGovernor.get_all_stats(),
+        "persistence_queue": PersistenceQueue.get_stats(),
+        "task_event_log": task_persistence.get_memory_stats() if task_persistence else None,
+        "durable_event_log": task_persistence.event_log.get_stats() if task_persistence and task_persistence.event_log else None,
+        "websocket_fanout": ws_manager.get_stats() if ws_manager else None,
+        "browser_pool": browser_pool.get_stats() if browser_pool else None,
+        "browser_extraction": get_extraction_stats() if BROWSER_EXTRACTION_AVAILABLE else None,
+        "credit_ledger": credit_service.get_ledger_stats() if credit_service else None,
+        "rate_limiter": get_safety_guard().rate_limiter.get_stats() if SAFETY_GUARD_AVAILABLE else None,
         "upload_config": {
             "max_size_mb": MAX_UPLOAD_SIZE_MB,
             "image_formats": ["PNG", "JPEG", "WebP", "GIF", "SVG", "BMP", "TIFF"],
@@ -7428,7 +8570,8 @@ async def v2_execute_stream(request: ExecutionRequest):
                         # Forward key events to WebSocket clients
                         if ws_manager:
                             try:
-                                if evt_name == "browser_screenshot":
+                                if evt_name == "browser_screenshot" and evt_data.get("screenshot", evt_data.get("image")):
+                                    # Streamed frames already reached the channel via on_frame
                                     await ws_manager.broadcast_screenshot(
                                         execution_id=execution_id,
                                         image_base64=evt_data.get("screenshot", evt_data.get("image", "")),
@@ -7818,7 +8961,7 @@ async def websocket_execution(websocket: WebSocket, execution_id: str):
         await websocket.close(code=1003, reason="WebSocket manager not available")
         return
 
-    await ws_manager.connect(websocket, execution_id)
+    await ws_manager.connect(websocket, execution_id, binary_frames=websocket.query_params.get("frames") == "binary")
 
     try:
         while True:
@@ -7827,7 +8970,9 @@ async def websocket_execution(websocket: WebSocket, execution_id: str):
                 message = json.loads(data)
                 msg_type = message.get("type", "")
 
-                if msg_type == "cancel" and execution_orchestrator:
+                if msg_type == "frames":
+                    ws_manager.set_frame_mode(websocket, execution_id, message.get("mode") == "binary")
+                elif msg_type == "cancel" and execution_orchestrator:
                     await execution_orchestrator.cancel_execution(execution_id)
                     await ws_manager.broadcast(execution_id, "execution.cancelled", {"execution_id": execution_id})
                 elif msg_type == "pause" and execution_orchestrator:
@@ -7863,7 +9008,7 @@ async def websocket_execute_v2(websocket: WebSocket, execution_id: str):
         await websocket.close()
         return
     
-    await ws_manager.connect(websocket, execution_id)
+    await ws_manager.connect(websocket, execution_id, binary_frames=websocket.query_params.get("frames") == "binary")
     logger.info(f"V2 WebSocket connected: execution_id={execution_id}")
     
     try:
@@ -7873,7 +9018,10 @@ async def websocket_execute_v2(websocket: WebSocket, execution_id: str):
                 message = json.loads(data)
                 msg_type = message.get("type", "")
                 
-                if msg_type == "ping":
+                if msg_type == "frames":
+                    # {"type": "frames", "mode": "binary"} switches screenshots to binary frames
+                    ws_manager.set_frame_mode(websocket, execution_id, message.get("mode") == "binary")
+                elif msg_type == "ping":
                     await websocket.send_json({"type": "pong", "timestamp": datetime.now().isoformat()})
                 elif msg_type == "cancel" and execution_orchestrator:
                     await execution_orchestrator.cancel_execution(execution_id)
@@ -7902,104 +9050,65 @@ async def websocket_execute_v2(websocket: WebSocket, execution_id: str):
         await ws_manager.disconnect(websocket, execution_id)
 
 
+# ============================================================================
+# Screenshot Recordings (binary frames replayed from disk)
+# ============================================================================
+@app.get("/api/v2/browser/recordings/{execution_id}")
+async def get_screenshot_recording(execution_id: str):
+    """Frame count, duration and size of an execution's screenshot recording."""
+    if not AGENTIC_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Agentic modules not available")
+    summary = await asyncio.to_thread(recording_summary, execution_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return summary
+
+
+@app.websocket("/api/v2/ws/replay/{execution_id}")
+async def websocket_replay_recording(websocket: WebSocket, execution_id: str):
+    """Replay a recorded session as binary frames at its original pace.
+
+    Query: speed (default 1.0; 0 sends every frame immediately).
+    """
+    await websocket.accept()
+    if not AGENTIC_AVAILABLE or await asyncio.to_thread(recording_summary, execution_id) is None:
+        await websocket.send_json({"type": "error", "data": {"error": "Recording not found"}})
+        await websocket.close()
+        return
+    try:
+        speed = float(websocket.query_params.get("speed", "1.0"))
+    except ValueError:
+        speed = 1.0
+    try:
+        frames = 0
+        async for frame in replay_recording(execution_id, speed=speed):
+            await websocket.send_bytes(frame)
+            frames += 1
+        await websocket.send_json({"type": "replay_complete", "data": {"execution_id": execution_id, "frames": frames}})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Replay WebSocket error for {execution_id}: {e}")
+
+
 async def _run_browser_task_with_ws(execution_id: str, task: str, start_url: str = ""):
     """Run a browser task and stream screenshots to WebSocket clients.
     
     FIXED: This bridges the BrowserEngine event system to WebSocket manager.
     The browser engine emits events via sub_events list, and this function
-    forwards them to WebSocket clients in real-time.
+    forwards them to WebSocket clients in real-time. Raw frames go straight to
+    the frame stream through on_frame, whose backpressure signal sets the
+    capture quality.
     """
     if not browser_engine_instance or not ws_manager:
         return
     
     try:
-        sub_events = []
-        
-        # Execute the browser task
-        if hasattr(browser_engine_instance, 'execute_task'):
-            # Start the task in background and poll sub_events
-            task_coro = browser_engine_instance.execute_task(
-                task=task,
-                start_url=start_url or None,
-                max_steps=20,
-                sub_events=sub_events,
-            )
-            
-            # Run task and forward events concurrently
-            result_holder = {}
-            
-            async def run_task():
-                result_holder['result'] = await task_coro
-            
-            async def forward_events():
-                last_idx = 0
-                while 'result' not in result_holder:
-                    await asyncio.sleep(0.3)
-                    # Forward new events
-                    while last_idx < len(sub_events):
-                        evt = sub_events[last_idx]
-                        last_idx += 1
-                        evt_name = evt.get("event", "")
-                        evt_data = evt.get("data", {})
-                        
-                        if evt_name == "browser_screenshot":
-                            await ws_manager.broadcast_screenshot(
-                                execution_id=execution_id,
-                                image_base64=evt_data.get("screenshot", ""),
-                                url=evt_data.get("url", ""),
-                                title=evt_data.get("title", ""),
-                                action=evt_data.get("action", ""),
-                                step=evt_data.get("step", 0),
-                            )
-                        elif evt_name == "execution_reasoning":
-                            await ws_manager.broadcast_reasoning(
-                                execution_id=execution_id,
-                                content=evt_data.get("chunk", ""),
-                            )
-                        else:
-                            await ws_manager.broadcast(execution_id, evt_name, evt_data)
-                
-                # Forward any remaining events
-                while last_idx < len(sub_events):
-                    evt = sub_events[last_idx]
-                    last_idx += 1
-                    evt_name = evt.get("event", "")
-                    evt_data = evt.get("data", {})
-                    if evt_name == "browser_screenshot":
-                        await ws_manager.broadcast_screenshot(
-                            execution_id=execution_id,
-                            image_base64=evt_data.get("screenshot", ""),
-                            url=evt_data.get("url", ""),
-                            title=evt_data.get("title", ""),
-                            action=evt_data.get("action", ""),
-                            step=evt_data.get("step", 0),
-                        )
-                    elif evt_name == "execution_reasoning":
-                        await ws_manager.broadcast_reasoning(
-                            execution_id=execution_id,
-                            content=evt_data.get("chunk", ""),
-                        )
-                    else:
-                        await ws_manager.broadcast(execution_id, evt_name, evt_data)
-            
-            # Run both concurrently
-            await asyncio.gather(run_task(), forward_events())
-            
-            result = result_holder.get('result', {})
-        else:
-            # Fallback: just navigate
-            if start_url:
-                nav_result = await browser_engine_instance.navigate(start_url)
-                screenshot = await browser_engine_instance.take_screenshot()
-                if screenshot:
-                    await ws_manager.broadcast_screenshot(
-                        execution_id=execution_id,
-                        image_base64=screenshot,
-                        url=start_url,
-                        title=nav_result.get("title", ""),
-                        action="Navigated to URL",
-                    )
-            result = {"success": True, "message": "Navigation completed"}
+        # The execution gets its own context from the browser pool
+        on_frame = ws_manager.frame_publisher(execution_id)
+        async with browser_engine_instance.session(execution_id, on_frame=on_frame) as engine:
+            result = await _stream_browser_task(engine, execution_id, task, start_url)
         
         # Send completion
         await ws_manager.broadcast_completion(execution_id, True, result)
@@ -8007,6 +9116,82 @@ async def _run_browser_task_with_ws(execution_id: str, task: str, start_url: str
     except Exception as e:
         logger.error(f"Browser task with WS error: {e}")
         await ws_manager.broadcast_error(execution_id, str(e))
+    finally:
+        await browser_engine_instance.close_session(execution_id)
+
+
+async def _stream_browser_task(engine, execution_id: str, task: str, start_url: str = "") -> Dict[str, Any]:
+    """Drive one browser task on an engine, forwarding its events to WebSocket clients."""
+    async def forward_event(evt: dict):
+        evt_name = evt.get("event", "")
+        evt_data = evt.get("data", {})
+        if evt_name == "browser_screenshot":
+            if evt_data.get("streamed"):
+                return  # on_frame already published the raw frame
+            await ws_manager.broadcast_screenshot(
+                execution_id=execution_id,
+                image_base64=evt_data.get("screenshot", ""),
+                url=evt_data.get("url", ""),
+                title=evt_data.get("title", ""),
+                action=evt_data.get("action", ""),
+                step=evt_data.get("step", 0),
+            )
+            quality = ws_manager.frame_quality(execution_id)
+            if quality:
+                engine.screenshot_quality = quality
+        elif evt_name == "execution_reasoning":
+            await ws_manager.broadcast_reasoning(
+                execution_id=execution_id,
+                content=evt_data.get("chunk", ""),
+            )
+        else:
+            await ws_manager.broadcast(execution_id, evt_name, evt_data)
+
+    sub_events = []
+    
+    # Execute the browser task
+    if hasattr(engine, 'execute_task'):
+        # Start the task in background and poll sub_events
+        task_coro = engine.execute_task(
+            task=task,
+            start_url=start_url or None,
+            max_steps=20,
+            sub_events=sub_events,
+        )
+        
+        # Run task and forward events concurrently
+        result_holder = {}
+        
+        async def run_task():
+            try:
+                result_holder['result'] = await task_coro
+            finally:
+                result_holder.setdefault('result', {})  # Stop the forwarder on failure too
+        
+        async def forward_events():
+            last_idx = 0
+            while 'result' not in result_holder:
+                await asyncio.sleep(0.3)
+                # Forward new events
+                while last_idx < len(sub_events):
+                    last_idx += 1
+                    await forward_event(sub_events[last_idx - 1])
+            
+            # Forward any remaining events
+            while last_idx < len(sub_events):
+                last_idx += 1
+                await forward_event(sub_events[last_idx - 1])
+        
+        # Run both concurrently
+        await asyncio.gather(run_task(), forward_events())
+        
+        return result_holder.get('result', {})
+
+    # Fallback: just navigate
+    if start_url:
+        await engine.navigate(start_url)
+        await engine.capture_frame({"action": "Navigated to URL", "final": True})
+    return {"success": True, "message": "Navigation completed"}
 
 
 # ============================================================================
@@ -8036,61 +9221,48 @@ async def browser_execute_endpoint(
                 await ws_manager.broadcast(execution_id, "browser.started", start_data["data"])
             yield f"data: {json.dumps(start_data)}\n\n"
             
-            # Execute using the bridge function which handles event forwarding
-            sub_events = []
+            # Run in this execution's own pooled browser context; frames are
+            # published raw through on_frame
+            on_frame = ws_manager.frame_publisher(execution_id) if ws_manager else None
+            async with browser_engine_instance.session(execution_id, on_frame=on_frame) as engine:
+                # Execute using the bridge function which handles event forwarding
+                sub_events = []
             
-            if start_url:
-                nav_result = await browser_engine_instance.navigate(start_url)
-                screenshot = await browser_engine_instance.take_screenshot()
-                
-                if ws_manager and screenshot:
-                    await ws_manager.broadcast_screenshot(
-                        execution_id=execution_id,
-                        image_base64=screenshot,
-                        url=start_url,
-                        title=nav_result.get("title", ""),
-                        action="Navigated to URL",
-                    )
+                if start_url:
+                    nav_result = await engine.navigate(start_url)
+                    await engine.capture_frame({"action": "Navigated to URL"})
                 
-                nav_data = {"type": "browser.navigated", "data": {"url": start_url, "title": nav_result.get("title", "")}}
-                yield f"data: {json.dumps(nav_data)}\n\n"
+                    nav_data = {"type": "browser.navigated", "data": {"url": start_url, "title": nav_result.get("title", "")}}
+                    yield f"data: {json.dumps(nav_data)}\n\n"
             
-            # Execute the task
-            if hasattr(browser_engine_instance, 'execute_task'):
-                result = await browser_engine_instance.execute_task(task, start_url=start_url, max_steps=20, sub_events=sub_events)
+                # Execute the task
+                if hasattr(engine, 'execute_task'):
+                    result = await engine.execute_task(task, start_url=start_url, max_steps=20, sub_events=sub_events)
                 
-                # Forward sub_events as SSE
-                for evt in sub_events:
-                    evt_name = evt.get("event", "")
-                    evt_data = evt.get("data", {})
+                    # Forward sub_events as SSE
+                    for evt in sub_events:
+                        evt_name = evt.get("event", "")
+                        evt_data = evt.get("data", {})
                     
-                    if evt_name == "browser_screenshot" and ws_manager:
-                        await ws_manager.broadcast_screenshot(
-                            execution_id=execution_id,
-                            image_base64=evt_data.get("screenshot", ""),
-                            url=evt_data.get("url", ""),
-                            title=evt_data.get("title", ""),
-                            action=evt_data.get("action", ""),
-                            step=evt_data.get("step", 0),
-                        )
+                        if evt_name == "browser_screenshot" and ws_manager and not evt_data.get("streamed"):
+                            await ws_manager.broadcast_screenshot(
+                                execution_id=execution_id,
+                                image_base64=evt_data.get("screenshot", ""),
+                                url=evt_data.get("url", ""),
+                                title=evt_data.get("title", ""),
+                                action=evt_data.get("action", ""),
+                                step=evt_data.get("step", 0),
+                            )
                     
-                    # Don't send full screenshots in SSE (too large)
-                    if evt_name != "browser_screenshot":
-                        sse_payload = json.dumps({"type": evt_name, "data": evt_data})
-                        yield f"data: {sse_payload}\n\n"
-            else:
-                result = {"success": True, "message": "Browser navigation completed"}
-            
-            # Final screenshot via WebSocket
-            final_screenshot = await browser_engine_instance.take_screenshot()
-            if ws_manager and final_screenshot:
-                await ws_manager.broadcast_screenshot(
-                    execution_id=execution_id,
-                    image_base64=final_screenshot,
-                    url=start_url or "about:blank",
-                    title="Task Complete",
-                    action="Task completed",
-                )
+                        # Don't send full screenshots in SSE (too large)
+                        if evt_name != "browser_screenshot":
+                            sse_payload = json.dumps({"type": evt_name, "data": evt_data})
+                            yield f"data: {sse_payload}\n\n"
+                else:
+                    result = {"success": True, "message": "Browser navigation completed"}
+            
+                # Final screenshot via WebSocket
+                await engine.capture_frame({"title": "Task Complete", "action": "Task completed", "final": True})
             
             # Completion event
             completion_data = {"type": "execution_complete", "data": {"success": True, "result": {k: v for k, v in result.items() if k != 'final_screenshot'}, "execution_id": execution_id}}
@@ -8106,6 +9278,8 @@ async def browser_execute_endpoint(
                 await ws_manager.broadcast_error(execution_id, str(e))
             yield f"data: {json.dumps(error_data)}\n\n"
             yield "data: [DONE]\n\n"
+        finally:
+            await browser_engine_instance.close_session(execution_id)
     
     return StreamingResponse(
         stream_browser_events(),
@@ -8798,6 +9972,9 @@ async def refresh_domain_trends(domain: str, user: Dict = Depends(AuthManager.ge
 async def startup_event():
     """Initialize persistent file store and agentic components on server boot."""
     logger.info("McLeuker AI V6.0 starting up...")
+    await HTTPClientPool.startup()
+    if supabase:
+        PersistenceQueue.start()
     await PersistentFileStore.initialize()
     logger.info(f"Persistent file store loaded: {len(PersistentFileStore._file_cache)} files cached")
 
@@ -8985,6 +10162,19 @@ async def startup_event():
     logger.info(f"  Agentic Engine: {AGENTIC_ENGINE_AVAILABLE}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release app-lifetime resources on server shutdown."""
+    await PersistenceQueue.stop()
+    if task_persistence:
+        await task_persistence.stop()
+    await HTTPClientPool.shutdown()
+    shutdown_parse_pool()
+    FileUploadManager.shutdown()
+    if browser_pool:
+        await browser_pool.stop()
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Browser Pool Benchmark
+======================
+
+Runs T short browser tasks (navigate to a local page, read innerText, take a
+screenshot) with C-way concurrency and compares:
+
+1. launch-per-task  — a fresh Chromium for every task
+2. shared page      — one browser, one page, tasks serialized (old behavior)
+3. pool             — one warm Chromium, per-task BrowserContext leases
+
+Reports tasks/sec and p50 / p99 task latency (including queueing).
+
+Usage:
+    python scripts/bench_browser_pool.py --tasks 40 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agentic.browser_engine import CHROMIUM_ARGS, PLAYWRIGHT_AVAILABLE, BrowserPool  # noqa: E402
+
+PAGE = ("<html><head><title>bench</title></head><body>"
+        + "".join(f"<p>Paragraph {i} with some product copy.</p>" for i in range(300))
+        + "</body></html>").encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+async def run_page_task(page, url: str):
+    await page.goto(url, wait_until="domcontentloaded")
+    await page.evaluate("() => document.body.innerText.length")
+    await page.screenshot(type="jpeg", quality=70)
+
+
+async def bench_launch_per_task(url: str, tasks: int, concurrency: int) -> list:
+    from playwright.async_api import async_playwright
+    pw = await async_playwright().start()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        t = time.perf_counter()
+        async with sem:
+            browser = await pw.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            try:
+                page = await (await browser.new_context()).new_page()
+                await run_page_task(page, url)
+            finally:
+                await browser.close()
+        return time.perf_counter() - t
+
+    latencies = await asyncio.gather(*[one() for _ in range(tasks)])
+    await pw.stop()
+    return latencies
+
+
+async def bench_shared_page(url: str, tasks: int, concurrency: int) -> list:
+    from playwright.async_api import async_playwright
+    pw = await async_playwright().start()
+    browser = await pw.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+    page = await (await browser.new_context()).new_page()
+    lock = asyncio.Lock()  # One page: tasks must not interleave
+
+    async def one():
+        t = time.perf_counter()
+        async with lock:
+            await run_page_task(page, url)
+        return time.perf_counter() - t
+
+    latencies = await asyncio.gather(*[one() for _ in range(tasks)])
+    await browser.close()
+    await pw.stop()
+    return latencies
+
+
+async def bench_pool(url: str, tasks: int, concurrency: int) -> tuple:
+    pool = BrowserPool(max_contexts=concurrency)
+    await pool.start()
+
+    async def one(i: int):
+        t = time.perf_counter()
+        async with pool.lease(f"bench_{i}") as lease:
+            await run_page_task(lease.current_page, url)
+        await pool.close(f"bench_{i}")
+        return time.perf_counter() - t
+
+    latencies = await asyncio.gather(*[one(i) for i in range(tasks)])
+    stats = pool.get_stats()
+    await pool.stop()
+    return latencies, stats
+
+
+def report(name: str, latencies: list, wall: float):
+    ordered = sorted(latencies)
+    p99 = ordered[max(0, int(len(ordered) * 0.99) - 1)]
+    print(f"  {name:<16} {len(ordered) / wall:>7.2f} tasks/s   "
+          f"p50 {statistics.median(ordered) * 1000:>7.0f} ms   p99 {p99 * 1000:>7.0f} ms   wall {wall:>6.2f} s")
+
+
+async def run(args):
+    url = serve()
+    print(f"=== Browser Pool Benchmark: {args.tasks} tasks, concurrency {args.concurrency} ===\n")
+
+    if not args.skip_launch:
+        t = time.perf_counter()
+        latencies = await bench_launch_per_task(url, args.tasks, args.concurrency)
+        report("launch-per-task", latencies, time.perf_counter() - t)
+
+    t = time.perf_counter()
+    latencies = await bench_shared_page(url, args.tasks, args.concurrency)
+    report("shared page", latencies, time.perf_counter() - t)
+
+    t = time.perf_counter()
+    latencies, stats = await bench_pool(url, args.tasks, args.concurrency)
+    report("pool", latencies, time.perf_counter() - t)
+    print(f"\nPool: {stats['leases_created']} leases, {stats['waits']} waits "
+          f"(avg {stats['avg_wait_ms']} ms, max {stats['max_wait_ms']} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browser context pool throughput benchmark")
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-launch", action="store_true", help="Skip the slow launch-per-task baseline")
+    args = parser.parse_args()
+
+    if not PLAYWRIGHT_AVAILABLE:
+        print("✗ playwright not installed (pip install playwright && playwright install chromium)")
+        return 1
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Chat Streaming Concurrency Benchmark
+====================================
+
+Opens N concurrent /api/v1/chat/stream sessions against a running backend and
+records, per session, the time-to-first-token (first "content" event) and the
+total stream time.
+
+With a non-blocking streaming path the first tokens of all sessions arrive
+close together (TTFT spread ~ one model latency). If streaming blocks the
+event loop, TTFTs line up one after another and the spread grows with N.
+
+Usage:
+    python scripts/bench_chat_stream.py --url http://localhost:8000 --sessions 8
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import httpx
+
+
+async def run_session(client: httpx.AsyncClient, url: str, session_id: int, prompt: str, mode: str, t0: float) -> dict:
+    """Run one streaming chat and return its timing record."""
+    payload = {
+        "messages": [{"role": "user", "content": f"{prompt} (session {session_id})"}],
+        "mode": mode,
+        "stream": True,
+        "enable_tools": False,
+    }
+    started = time.perf_counter() - t0
+    first_token = None
+    chunks = 0
+    error = None
+
+    try:
+        async with client.stream("POST", f"{url}/api/v1/chat/stream", json=payload) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                try:
+                    evt = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
+                if evt.get("type") == "content":
+                    chunks += 1
+                    if first_token is None:
+                        first_token = time.perf_counter() - t0
+                elif evt.get("type") == "error":
+                    error = evt.get("data", {}).get("message")
+    except Exception as e:
+        error = str(e)
+
+    return {
+        "session": session_id,
+        "started": started,
+        "first_token": first_token,
+        "finished": time.perf_counter() - t0,
+        "chunks": chunks,
+        "error": error,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent chat stream TTFT benchmark")
+    parser.add_argument("--url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--sessions", type=int, default=8, help="Number of concurrent sessions")
+    parser.add_argument("--mode", default="instant", help="Chat mode to request")
+    parser.add_argument("--prompt", default="Write three sentences about autumn fashion trends.")
+    args = parser.parse_args()
+
+    print(f"=== Chat Stream Benchmark: {args.sessions} concurrent sessions -> {args.url} ===")
+
+    timeout = httpx.Timeout(300.0, connect=10.0)
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*[
+            run_session(client, args.url, i, args.prompt, args.mode, t0)
+            for i in range(args.sessions)
+        ])
+
+    print(f"{'session':>7} {'start':>8} {'ttft':>8} {'done':>8} {'chunks':>7}  error")
+    for r in sorted(results, key=lambda r: r["first_token"] or float("inf")):
+        ttft = f"{r['first_token']:.2f}" if r["first_token"] is not None else "-"
+        print(f"{r['session']:>7} {r['started']:>8.2f} {ttft:>8} {r['finished']:>8.2f} {r['chunks']:>7}  {r['error'] or ''}")
+
+    ttfts = [r["first_token"] for r in results if r["first_token"] is not None]
+    if not ttfts:
+        print("\n✗ No session produced a content token")
+        return 1
+
+    finishes = [r["finished"] for r in results]
+    # First token of the last session arriving before the first session finishes
+    # means the streams overlapped rather than running back to back.
+    interleaved = max(ttfts) < min(finishes)
+
+    print()
+    print(f"TTFT min/median/max : {min(ttfts):.2f}s / {statistics.median(ttfts):.2f}s / {max(ttfts):.2f}s")
+    print(f"TTFT spread         : {max(ttfts) - min(ttfts):.2f}s")
+    print(f"Wall time           : {max(finishes):.2f}s")
+    print(f"Interleaved         : {'✓ yes' if interleaved else '✗ no (sessions serialized)'}")
+    return 0 if interleaved else 2
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
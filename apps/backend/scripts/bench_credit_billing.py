@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Credit Billing Benchmark
+========================
+
+Runs simulated chat turns through CreditService against an in-memory
+Supabase stand-in that blocks for --rtt-ms on every request (the real client
+is synchronous), and reports per turn:
+
+1. Legacy: the per-operation flow (get_balance + deduct_credits + get_balance)
+2. Ledger: start_billing_session / bill_operation / end_billing_session
+3. Database round trips, billing wall time, and the credits charged by each
+
+Usage:
+    python scripts/bench_credit_billing.py --turns 50 --rtt-ms 40
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from credit_service import OPERATION_COSTS, CreditJournal, CreditService  # noqa: E402
+
+# One "thinking" turn: search fan-out, LLM answer, a file, the conclusion
+TURN_OPERATIONS = [
+    "search_brave", "search_exa", "search_perplexity",
+    "llm_kimi_stream", "file_pdf", "llm_kimi_conclusion",
+]
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db, self.table, self.action, self.payload, self.filters = db, table, "select", None, {}
+
+    def select(self, *_):
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        self.db.round_trip()
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.action == "insert":
+            rows.append(dict(self.payload))
+            return _Result([dict(self.payload)])
+        matched = [r for r in rows if all(r.get(k) == v for k, v in self.filters.items())]
+        if self.action == "update":
+            for r in matched:
+                r.update(self.payload)
+        return _Result([dict(r) for r in matched])
+
+
+class _Rpc:
+    def __init__(self, db, name, params):
+        self.db, self.name, self.params = db, name, params
+
+    def execute(self):
+        self.db.round_trip()
+        if self.name != "settle_credit_debits":
+            raise RuntimeError(f"PGRST202 Could not find the function {self.name}")
+        p = self.params
+        if p["p_settlement_id"] in self.db.settlements:
+            return _Result({"success": True, "duplicate": True, "new_balance": self.db.settlements[p["p_settlement_id"]]})
+        row = next(r for r in self.db.tables["user_credits"] if r["user_id"] == p["p_user_id"])
+        row["balance"] = max(0, row["balance"] - p["p_amount"])
+        self.db.tables.setdefault("credit_transactions", []).append({"user_id": p["p_user_id"], "amount": -p["p_amount"]})
+        self.db.settlements[p["p_settlement_id"]] = row["balance"]
+        return _Result({"success": True, "duplicate": False, "new_balance": row["balance"]})
+
+
+class FakeSupabase:
+    def __init__(self, rtt_ms: float):
+        self.rtt = rtt_ms / 1000
+        self.calls = 0
+        self.tables = {"user_credits": [], "users": []}
+        self.settlements = {}
+
+    def round_trip(self):
+        self.calls += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        return _Rpc(self, name, params)
+
+    def balance(self, user_id):
+        return next(r["balance"] for r in self.tables["user_credits"] if r["user_id"] == user_id)
+
+
+async def legacy_turn(service: CreditService, user_id: str, mode: str):
+    # has_sufficient_credits, then the previous start_billing_session / bill_operation
+    await service.has_sufficient_credits(user_id, 10)
+    await service.get_balance(user_id)
+    await service.deduct_credits(user_id, 3, f"base_{mode}")
+    await service.get_balance(user_id)
+    for operation in TURN_OPERATIONS:
+        await service.get_balance(user_id)
+        await service.deduct_credits(user_id, OPERATION_COSTS[operation], operation)
+        if operation != "llm_kimi_conclusion":
+            await service.get_balance(user_id)  # credit_update event
+
+
+async def ledger_turn(service: CreditService, user_id: str, mode: str):
+    session_id = await service.start_billing_session(user_id, mode)
+    service.get_session_balance(session_id)
+    for operation in TURN_OPERATIONS:
+        await service.bill_operation(session_id, operation, 1.0)
+    await service.end_billing_session(session_id)
+
+
+async def measure(name, turn, args, journal_dir):
+    db = FakeSupabase(args.rtt_ms)
+    user_id = "bench-user"
+    db.tables["user_credits"].append({"user_id": user_id, "balance": args.balance})
+    service = CreditService(db, journal=CreditJournal(str(Path(journal_dir) / name)))
+
+    timings = []
+    for _ in range(args.turns):
+        start = time.perf_counter()
+        await turn(service, user_id, "thinking")
+        timings.append((time.perf_counter() - start) * 1000)
+    charged = args.balance - db.balance(user_id)
+    print(f"{name:<7}: {db.calls / args.turns:5.1f} round trips/turn   "
+          f"p50 {statistics.median(timings):8.1f} ms   max {max(timings):8.1f} ms   "
+          f"charged {charged / args.turns:.0f} credits/turn")
+    return statistics.median(timings), charged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Credit billing overhead per chat turn")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="Simulated Supabase round trip")
+    parser.add_argument("--balance", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"=== Credit Billing Benchmark: {args.turns} turns x {len(TURN_OPERATIONS) + 1} billed operations, "
+          f"{args.rtt_ms:g} ms round trip ===")
+    with tempfile.TemporaryDirectory() as journal_dir:
+        legacy_ms, legacy_charged = asyncio.run(measure("Legacy", legacy_turn, args, journal_dir))
+        ledger_ms, ledger_charged = asyncio.run(measure("Ledger", ledger_turn, args, journal_dir))
+    print(f"Speedup: {legacy_ms / ledger_ms:.1f}x billing time per turn")
+    if legacy_charged != ledger_charged:
+        print(f"MISMATCH: legacy charged {legacy_charged}, ledger charged {ledger_charged}")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Durable Event Log Benchmark
+===========================
+
+Drives the SQLite execution event log the way several uvicorn workers would:
+one producer process appends events for E executions at a target rate, and
+W subscriber processes ("workers") each tail every execution with S
+concurrent subscribers. Reports:
+
+1. Sustained write throughput (events/sec committed)
+2. Delivered events/sec across all subscribers
+3. Producer-to-subscriber latency (p50 / p99 / max)
+
+Usage:
+    python scripts/bench_event_log.py --executions 20 --rate 2000 --seconds 10 \\
+        --workers 3 --subscribers 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.event_log import SQLiteEventLog  # noqa: E402
+
+
+def execution_ids(n: int) -> list:
+    return [f"bench_{i}" for i in range(n)]
+
+
+async def produce(path: str, executions: int, rate: int, seconds: float) -> dict:
+    log = SQLiteEventLog(path)
+    await log.start()
+    ids = execution_ids(executions)
+    sequences = {eid: 0 for eid in ids}
+    tick = 0.005
+    per_tick = max(1, int(rate * tick))
+    total = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    while time.perf_counter() < deadline:
+        for _ in range(per_tick):
+            eid = ids[total % executions]
+            sequences[eid] += 1
+            log.append(eid, sequences[eid], "execution_reasoning",
+                       {"chunk": "x" * 120, "sent_at": time.time()}, time.time())
+            total += 1
+        await asyncio.sleep(tick)
+
+    for eid in ids:
+        sequences[eid] += 1
+        log.append(eid, sequences[eid], "execution_complete", {"sent_at": time.time()}, time.time())
+    await log.stop()
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, **log.get_stats()}
+
+
+async def subscribe_all(path: str, executions: int, subscribers: int) -> dict:
+    log = SQLiteEventLog(path)
+    await log.start()
+    latencies = []
+    received = 0
+
+    async def tail(eid: str):
+        nonlocal received
+        async for record in log.tail(eid, 0, idle_timeout=5.0):
+            if record is None:
+                continue
+            received += 1
+            sent_at = record[2].get("sent_at")
+            if sent_at:
+                latencies.append((time.time() - sent_at) * 1000)
+
+    start = time.perf_counter()
+    ids = execution_ids(executions)
+    await asyncio.gather(*[tail(ids[i % executions]) for i in range(subscribers * executions)])
+    elapsed = time.perf_counter() - start
+    await log.stop()
+    return {"received": received, "elapsed": elapsed, "latencies": latencies, "wakeups": log.get_stats()["wakeups"]}
+
+
+def worker_main(path, executions, subscribers, out):
+    out.put(asyncio.run(subscribe_all(path, executions, subscribers)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable event log throughput benchmark")
+    parser.add_argument("--executions", type=int, default=20)
+    parser.add_argument("--rate", type=int, default=2000, help="Target events/sec appended")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=3, help="Subscriber processes")
+    parser.add_argument("--subscribers", type=int, default=5, help="Subscribers per execution per worker")
+    parser.add_argument("--path", default=None, help="SQLite file (default: temp file)")
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), "event_log.db")
+    SQLiteEventLog(path)._open()  # Create the schema before workers attach
+
+    print(f"=== Event Log Benchmark: {args.executions} executions, {args.rate} ev/s target, "
+          f"{args.workers} workers x {args.subscribers * args.executions} subscribers ===")
+
+    out = mp.Queue()
+    workers = [mp.Process(target=worker_main, args=(path, args.executions, args.subscribers, out))
+               for _ in range(args.workers)]
+    for w in workers:
+        w.start()
+    time.sleep(0.5)
+
+    produced = asyncio.run(produce(path, args.executions, args.rate, args.seconds))
+    results = [out.get() for _ in workers]
+    for w in workers:
+        w.join()
+
+    latencies = sorted(l for r in results for l in r["latencies"])
+    received = sum(r["received"] for r in results)
+    expected = produced["appended"] * args.subscribers * args.workers
+
+    print(f"\nWrites    : {produced['written']:,} events in {produced['batches']:,} batches "
+          f"-> {produced['written'] / produced['elapsed']:,.0f} events/sec")
+    print(f"Delivered : {received:,} / {expected:,} events "
+          f"-> {received / max(r['elapsed'] for r in results):,.0f} events/sec across subscribers")
+    if latencies:
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"Latency   : p50 {p50:.1f} ms   p99 {p99:.1f} ms   max {latencies[-1]:.1f} ms")
+    print(f"Wakeups   : {[r['wakeups'] for r in results]} per worker")
+    return 0 if received == expected else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+HTML Extraction Micro-Benchmark
+===============================
+
+Runs the URL fetcher's readable-content extractor over a corpus of saved HTML
+pages and reports:
+
+1. Per-parser extraction time (html.parser vs lxml, when installed)
+2. Event-loop stall while extracting the corpus inline vs via parse_off_loop
+
+Usage:
+    python scripts/bench_html_parse.py path/to/saved_pages/ [--rounds 3]
+
+The corpus directory should contain *.html files (e.g. saved with
+`curl -o page.html <url>` from retail and news sites).
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils import html_extract  # noqa: E402
+from src.utils.html_extract import extract_readable_content, parse_off_loop  # noqa: E402
+
+MAX_CONTENT_LENGTH = 8000
+
+
+def load_corpus(directory: Path) -> list:
+    pages = []
+    for path in sorted(directory.glob("*.htm*")):
+        pages.append((path.name, path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def bench_parser(pages: list, parser: str, rounds: int) -> list:
+    html_extract.HTML_PARSER = parser
+    timings = []
+    for name, html in pages:
+        samples = []
+        for _ in range(rounds):
+            t = time.perf_counter()
+            extract_readable_content(html, MAX_CONTENT_LENGTH)
+            samples.append((time.perf_counter() - t) * 1000)
+        timings.append((name, len(html), statistics.median(samples)))
+    return timings
+
+
+async def measure_stall(pages: list, offload: bool) -> tuple:
+    """Return (max loop lag ms, wall ms) while extracting every page once."""
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        interval = 0.005
+        while not stop.is_set():
+            t = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((time.perf_counter() - t - interval) * 1000)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    if offload:
+        await asyncio.gather(*[parse_off_loop(extract_readable_content, html, MAX_CONTENT_LENGTH) for _, html in pages])
+    else:
+        for _, html in pages:
+            extract_readable_content(html, MAX_CONTENT_LENGTH)
+            await asyncio.sleep(0)
+    wall = (time.perf_counter() - start) * 1000
+    stop.set()
+    await tick_task
+    return (max(lags) if lags else 0.0), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML extraction micro-benchmark")
+    parser.add_argument("corpus", type=Path, help="Directory of saved *.html pages")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"✗ No .html files in {args.corpus}")
+        return 1
+
+    total_kb = sum(len(h) for _, h in pages) / 1024
+    print(f"=== HTML Extraction Benchmark: {len(pages)} pages, {total_kb:.0f} KB ===\n")
+
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        parsers.append("lxml")
+    except ImportError:
+        print("(lxml not installed - skipping lxml backend)\n")
+
+    default_parser = html_extract.HTML_PARSER
+    totals = {}
+    for p in parsers:
+        timings = bench_parser(pages, p, args.rounds)
+        totals[p] = sum(t for _, _, t in timings)
+        print(f"--- {p} ---")
+        for name, size, ms in timings:
+            print(f"  {name[:40]:<40} {size / 1024:>8.0f} KB {ms:>9.1f} ms")
+        print(f"  {'TOTAL':<40} {'':>11} {totals[p]:>9.1f} ms\n")
+    if "lxml" in totals:
+        print(f"lxml speedup: {totals['html.parser'] / totals['lxml']:.2f}x\n")
+    html_extract.HTML_PARSER = default_parser
+
+    print(f"--- Event loop stall ({default_parser}, {html_extract.HTML_PARSE_WORKERS} workers) ---")
+    inline_lag, inline_wall = asyncio.run(measure_stall(pages, offload=False))
+    pool_lag, pool_wall = asyncio.run(measure_stall(pages, offload=True))
+    print(f"  inline        max lag {inline_lag:>8.1f} ms   wall {inline_wall:>8.1f} ms")
+    print(f"  parse pool    max lag {pool_lag:>8.1f} ms   wall {pool_wall:>8.1f} ms")
+    html_extract.shutdown_parse_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
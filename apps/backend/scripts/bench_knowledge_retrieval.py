@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Knowledge Retrieval Benchmark
+=============================
+
+Grows the fashion knowledge base with synthetic chunks and measures
+RAGRetriever.retrieve latency (BM25 inverted index) at each size.
+
+Usage:
+    python scripts/bench_knowledge_retrieval.py --sizes 1000,10000,50000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.rag_system import KnowledgeCategory, RAGSystem  # noqa: E402
+
+QUERIES = [
+    "sustainable materials recycled polyester",
+    "AI virtual try-on technology",
+    "luxury brand market growth in asia",
+    "quiet luxury trend this season",
+    "skincare personalization with ai",
+    "heritage craftsmanship and vintage archives",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge base retrieval benchmark")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated synthetic chunk counts")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--words", type=int, default=60, help="Words per synthetic chunk")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rag = RAGSystem()
+    vocabulary = sorted({w.lower() for c in rag.knowledge_base.chunks.values() for w in c.content.split()})
+    vocabulary += [f"term{i}" for i in range(20000)]
+    categories = list(KnowledgeCategory)
+
+    print(f"=== Knowledge Retrieval Benchmark: sizes {args.sizes}, {args.queries} queries ===")
+    added = 0
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        start = time.perf_counter()
+        while added < size:
+            content = " ".join(rng.choices(vocabulary, k=args.words))
+            rag.knowledge_base.add_chunk(content, rng.choice(categories), f"synthetic_{added}")
+            added += 1
+        build_s = time.perf_counter() - start
+
+        latencies = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            rag.retrieve(QUERIES[i % len(QUERIES)], top_k=5)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"{len(rag.knowledge_base.chunks):>7,} chunks: p50 {statistics.median(latencies):.3f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.3f} ms   (indexed in {build_s:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Swarm Dispatch Benchmark
+========================
+
+Queues N tasks on an AgentSwarmCoordinator with a no-op agent (no LLM calls:
+every task names its agent) and reports:
+
+1. Submit throughput (tasks/sec queued)
+2. Submit -> start latency (p50 / p99 / max)
+3. End-to-end throughput until every task completed
+4. Priority inversions in start order (TaskPriority, FIFO within a priority)
+
+Usage:
+    python scripts/bench_swarm_dispatch.py --tasks 10000 --concurrency 100 --work-ms 1
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# The agent_swarm package imports itself as a top-level package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from agent_swarm.core.coordinator import (  # noqa: E402
+    AgentMetadata, AgentSwarmCoordinator, TaskPriority,
+)
+
+
+class NoopAgent:
+    work_seconds = 0.0
+    started = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def execute(self, description, input_data, context):
+        NoopAgent.started.append(input_data["index"])
+        await asyncio.sleep(self.work_seconds)
+        return {"ok": True}
+
+
+async def run(args) -> int:
+    NoopAgent.work_seconds = args.work_ms / 1000
+    coordinator = AgentSwarmCoordinator(llm_client=None, max_concurrent_tasks=args.concurrency)
+    coordinator.register_agent(NoopAgent, AgentMetadata(name="noop", max_concurrent_tasks=args.concurrency))
+    rng = random.Random(args.seed)
+    priorities = list(TaskPriority)
+
+    start = time.perf_counter()
+    task_ids = []
+    for i in range(args.tasks):
+        task_ids.append(await coordinator.submit_task(
+            f"task {i}", {"index": i}, priority=rng.choice(priorities), preferred_agent="noop",
+        ))
+    submit_s = time.perf_counter() - start
+
+    tasks = await asyncio.gather(*(coordinator.wait_for_task(t, timeout=600) for t in task_ids))
+    total_s = time.perf_counter() - start
+    await coordinator.stop()
+
+    missing = sum(1 for t in tasks if t is None or t.status != "completed")
+    done = [t for t in tasks if t is not None and t.started_at]
+    latencies = sorted((t.started_at - t.created_at).total_seconds() * 1000 for t in done)
+
+    # All tasks are queued before the first one starts, so start order must be
+    # non-decreasing in priority value (FIFO within a priority)
+    started_priorities = [tasks[i].priority.value for i in NoopAgent.started]
+    inversions = sum(1 for a, b in zip(started_priorities, started_priorities[1:]) if b < a)
+
+    print(f"=== Swarm Dispatch Benchmark: {args.tasks:,} tasks, concurrency {args.concurrency}, "
+          f"{args.work_ms} ms work ===")
+    print(f"Submit     : {args.tasks / submit_s:,.0f} tasks/sec queued")
+    if latencies:
+        print(f"Start lag  : p50 {statistics.median(latencies):.1f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms   max {latencies[-1]:.1f} ms")
+    print(f"Throughput : {len(done) / total_s:,.0f} tasks/sec end-to-end ({total_s:.2f}s)")
+    print(f"Priority   : {inversions} inversions in start order")
+    print(f"Incomplete : {missing}")
+    return 0 if missing == 0 else 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent swarm dispatch benchmark")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--work-ms", type=float, default=1.0, help="Simulated agent work per task")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
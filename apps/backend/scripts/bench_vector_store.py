@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Vector Store Benchmark
+======================
+
+Compares query latency of the RAG in-memory vector store against the previous
+pure-Python cosine loop, at several corpus sizes:
+
+1. Legacy: Python `zip` cosine over every chunk (measured on a few queries)
+2. Exact: one float32 matrix-vector product + argpartition top-k
+3. Batched: the same query set through search_batch in one matrix product
+4. ANN: hnswlib index with recall@k against exact (only if hnswlib is installed)
+
+Usage:
+    python scripts/bench_vector_store.py --sizes 10000,100000 --dim 1536 --queries 200
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agentic.memory import rag_v3  # noqa: E402
+from src.agentic.memory.rag_v3 import DocumentChunk, InMemoryVectorStore  # noqa: E402
+
+
+def legacy_search(docs, query, top_k):
+    def cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm_a = math.sqrt(sum(x * x for x in a))
+        norm_b = math.sqrt(sum(x * x for x in b))
+        return dot / (norm_a * norm_b) if norm_a and norm_b else 0.0
+
+    scored = [(cosine(query, d.embedding), d) for d in docs]
+    scored.sort(key=lambda r: r[0], reverse=True)
+    return scored[:top_k]
+
+
+def build(size, dim, rng):
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    chunks = [DocumentChunk(id=str(i), content="", embedding=vectors[i]) for i in range(size)]
+    store = InMemoryVectorStore(dim=dim)
+    start = time.perf_counter()
+    store.add_batch(chunks)
+    return store, chunks, time.perf_counter() - start
+
+
+def run_size(size, args, rng):
+    print(f"\n--- {size:,} chunks x {args.dim} dims ---")
+    store, chunks, build_s = build(size, args.dim, rng)
+    print(f"Insert    : {build_s * 1000:,.0f} ms ({size / build_s:,.0f} chunks/s)")
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    # Exact search always; keep ANN out of the exact measurement
+    rag_v3.RAG_VECTOR_ANN_MIN_CHUNKS = sys.maxsize
+    start = time.perf_counter()
+    exact = [store.search(q, args.top_k, -1.0) for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / args.queries
+    print(f"Exact     : {exact_ms:8.2f} ms/query")
+
+    start = time.perf_counter()
+    store.search_batch(list(queries), args.top_k, -1.0)
+    batch_ms = (time.perf_counter() - start) * 1000 / args.queries
+    print(f"Batched   : {batch_ms:8.2f} ms/query ({args.queries} queries per call)")
+
+    if size <= args.legacy_max:
+        legacy_docs = [DocumentChunk(id=c.id, embedding=c.embedding.tolist()) for c in chunks]
+        n = min(args.legacy_queries, args.queries)
+        start = time.perf_counter()
+        for q in queries[:n]:
+            legacy_search(legacy_docs, q.tolist(), args.top_k)
+        legacy_ms = (time.perf_counter() - start) * 1000 / n
+        print(f"Legacy    : {legacy_ms:8.2f} ms/query ({legacy_ms / exact_ms:,.0f}x slower than exact)")
+    else:
+        print(f"Legacy    : skipped (> --legacy-max {args.legacy_max:,})")
+
+    if rag_v3.HNSWLIB_AVAILABLE:
+        rag_v3.RAG_VECTOR_ANN_MIN_CHUNKS = 0
+        start = time.perf_counter()
+        store.search(queries[0], args.top_k, -1.0)  # Builds the index
+        print(f"ANN build : {(time.perf_counter() - start) * 1000:,.0f} ms")
+        start = time.perf_counter()
+        approx = [store.search(q, args.top_k, -1.0) for q in queries]
+        ann_ms = (time.perf_counter() - start) * 1000 / args.queries
+        recall = np.mean([
+            len({r.chunk.id for r in a} & {r.chunk.id for r in e}) / max(1, len(e))
+            for a, e in zip(approx, exact)
+        ])
+        print(f"ANN       : {ann_ms:8.2f} ms/query (recall@{args.top_k} {recall:.3f})")
+    else:
+        print("ANN       : skipped (hnswlib not installed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG vector store benchmark")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--legacy-queries", type=int, default=3, help="Queries timed on the Python loop")
+    parser.add_argument("--legacy-max", type=int, default=20000, help="Skip the Python loop above this size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"=== Vector Store Benchmark: sizes {args.sizes}, {args.dim} dims, top-{args.top_k} ===")
+    rng = np.random.default_rng(args.seed)
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        run_size(size, args, rng)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
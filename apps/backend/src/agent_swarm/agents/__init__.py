@@ -3,6 +3,7 @@ from agent_swarm.agents.definitions import (
     AgentDefinition,
     get_agent_definition,
     search_agents,
+    search_agents_scored,
     get_agents_by_capability,
     get_agents_by_category,
     AGENT_REGISTRY,
@@ -13,8 +13,12 @@ Comprehensive agent definitions covering:
 Each agent is configured for optimal performance with kimi-2.5.
 """
 
+import heapq
+import math
+import re
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 @dataclass
@@ -898,26 +902,174 @@ def get_agent_definition(name: str) -> Optional[AgentDefinition]:
     return AGENT_REGISTRY.get(name)
 
 
+# ==================== CATALOG INDEX ====================
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can could do for from how i in into is it me my of on or our please "
+    "should so some that the their them then this to us was we what when where which who why will "
+    "with would you your".split()
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def stem(token: str) -> str:
+    """Light suffix stemmer: writer/writing/writes -> writ, blogging -> blog, analyses -> analys."""
+    if len(token) <= 4 or token.isdigit():
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    for suffix in ("ing", "ed", "er", "ly"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            break
+    if len(token) > 4 and token.endswith("e"):
+        token = token[:-1]
+    if len(token) > 3 and token[-1] == token[-2] and token[-1] not in "lsz":
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, stemmed word tokens with stop words removed."""
+    return [
+        stem(token) for token in _TOKEN_RE.findall(text.lower().replace("_", " "))
+        if token not in _STOPWORDS
+    ]
+
+
+def flatten_text(value: Any) -> str:
+    """Join a field that may be a string or (nested) list of strings."""
+    if not value:
+        return ""
+    if isinstance(value, str):
+        return value
+    return " ".join(flatten_text(v) for v in value)
+
+
+class AgentCatalogIndex:
+    """
+    TF-IDF index over an agent catalog.
+    Fields are weighted (name and tags count more than description text) and
+    document vectors are L2-normalized, so rank() is a sparse cosine score.
+    """
+
+    FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "capabilities": 2.0, "category": 1.5, "description": 1.0}
+
+    def __init__(self):
+        self._postings: Dict[str, List[Tuple[str, float]]] = {}
+        self._idf: Dict[str, float] = {}
+        self.size = 0
+        self.catalog_chars = 0
+
+    def build(self, entries: Iterable[Dict[str, Any]]):
+        """Index entries shaped like {"name", "description", "category", "tags", "capabilities"}."""
+        doc_terms: Dict[str, Counter] = {}
+        catalog_chars = 0
+        for entry in entries:
+            terms: Counter = Counter()
+            for field_name, weight in self.FIELD_WEIGHTS.items():
+                for token in tokenize(flatten_text(entry.get(field_name))):
+                    terms[token] += weight
+            doc_terms[entry["name"]] = terms
+            catalog_chars += len(entry.get("description") or "") + len(entry["name"]) + 40
+
+        n_docs = len(doc_terms)
+        document_frequency = Counter(term for terms in doc_terms.values() for term in terms)
+        self._idf = {term: math.log(1 + n_docs / df) for term, df in document_frequency.items()}
+        postings: Dict[str, List[Tuple[str, float]]] = {}
+        for name, terms in doc_terms.items():
+            weights = {term: (1 + math.log(tf)) * self._idf[term] for term, tf in terms.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                postings.setdefault(term, []).append((name, weight / norm))
+        self._postings = postings
+        self.size = n_docs
+        self.catalog_chars = catalog_chars
+
+    def rank(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        exclude: Optional[Iterable[str]] = None,
+        allowed: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top-k (agent name, score) for a query; all matches when top_k is None."""
+        query_terms = Counter(tokenize(query))
+        excluded = set(exclude or ())
+        allowed = set(allowed) if allowed is not None else None
+        scores: Dict[str, float] = {}
+        for term, tf in query_terms.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            query_weight = (1 + math.log(tf)) * self._idf[term]
+            for name, weight in postings:
+                scores[name] = scores.get(name, 0.0) + query_weight * weight
+        ranked = [
+            (name, score) for name, score in scores.items()
+            if name not in excluded and (allowed is None or name in allowed)
+        ]
+        if top_k is None:
+            return sorted(ranked, key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(top_k, ranked, key=lambda item: item[1])
+
+
+_CATALOG_INDEX = AgentCatalogIndex()
+_CAPABILITY_INDEX: Dict[str, List[AgentDefinition]] = {}
+_CATEGORY_INDEX: Dict[str, List[AgentDefinition]] = {}
+
+
+def _rebuild_indexes():
+    """(Re)build the catalog, capability and category indexes over AGENT_REGISTRY."""
+    agents = list(AGENT_REGISTRY.values())
+    _CATALOG_INDEX.build(
+        {
+            "name": agent.name,
+            "description": agent.description,
+            "category": f"{agent.category} {agent.subcategory}",
+            "tags": agent.tags,
+            "capabilities": agent.capabilities,
+        }
+        for agent in agents
+    )
+    _CAPABILITY_INDEX.clear()
+    _CATEGORY_INDEX.clear()
+    for agent in agents:
+        for capability in set(flatten_text(agent.capabilities).split()):
+            _CAPABILITY_INDEX.setdefault(capability, []).append(agent)
+        _CATEGORY_INDEX.setdefault(agent.category, []).append(agent)
+
+
+def get_catalog_index() -> AgentCatalogIndex:
+    """Shared catalog index; rebuilt when definitions_part2 (or anyone) grows the registry."""
+    if _CATALOG_INDEX.size != len(AGENT_REGISTRY):
+        _rebuild_indexes()
+    return _CATALOG_INDEX
+
+
 def get_agents_by_category(category: str) -> List[AgentDefinition]:
     """Get all agents in a category."""
-    return [agent for agent in ALL_AGENTS if agent.category == category]
+    get_catalog_index()
+    return list(_CATEGORY_INDEX.get(category, []))
 
 
 def get_agents_by_capability(capability: str) -> List[AgentDefinition]:
     """Get all agents with a specific capability."""
-    return [agent for agent in ALL_AGENTS if capability in agent.capabilities]
+    get_catalog_index()
+    return list(_CAPABILITY_INDEX.get(capability, []))
+
+
+def search_agents_scored(query: str, limit: Optional[int] = None) -> List[Tuple[AgentDefinition, float]]:
+    """Search agents by name, description, category, tags and capabilities, best match first."""
+    ranked = get_catalog_index().rank(query, limit)
+    return [(AGENT_REGISTRY[name], score) for name, score in ranked if name in AGENT_REGISTRY]
 
 
 def search_agents(query: str) -> List[AgentDefinition]:
-    """Search agents by name, description, or tags."""
-    query = query.lower()
-    results = []
-    
-    for agent in ALL_AGENTS:
-        if (query in agent.name.lower() or
-            query in agent.description.lower() or
-            query in agent.category.lower() or
-            any(query in tag.lower() for tag in agent.tags)):
-            results.append(agent)
-    
-    return results
+    """Search agents by name, description, or tags (ranked by relevance)."""
+    return [agent for agent, _ in search_agents_scored(query)]
+
+
+_rebuild_indexes()
@@ -336,6 +336,13 @@ async def get_agent_metrics(request: Request):
     return coordinator.get_agent_stats()
 
 
+@router.get("/metrics/routing")
+async def get_routing_metrics(request: Request):
+    """Get routing decisions by source, latency, decision-cache and token-savings stats."""
+    agent_router = _get_router_instance(request)
+    return agent_router.get_routing_stats()
+
+
 # ==================== Health ====================
 
 @router.get("/health")
@@ -16,16 +16,22 @@ Built on top of kimi-2.5 + grok-4-1-fast-reasoning model capabilities.
 
 import asyncio
 import functools
+import itertools
 import json
 import logging
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
 from uuid import uuid4
 
+from agent_swarm.agents.definitions import AgentCatalogIndex
+from agent_swarm.core.router import (
+    CHARS_PER_TOKEN, SWARM_ROUTER_PRERANK_TOP_K, RoutingDecisionCache, input_digest, normalize_task,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -155,11 +161,23 @@ class AgentSwarmCoordinator:
         self._agent_instances: Dict[str, AgentInstance] = {}
         self._agent_categories: Dict[str, Set[str]] = defaultdict(set)
         
-        # Task management
+        # Agent selection: catalog pre-ranking + decision cache (rebuilt on registry changes)
+        self._catalog = AgentCatalogIndex()
+        self._catalog_dirty = True
+        self._selection_cache = RoutingDecisionCache()
+        
+        # Task management: one long-lived dispatcher pulls from the priority
+        # queue (FIFO within a priority) and holds a concurrency slot per task
         self._task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._task_sequence = itertools.count()
+        self._slots = asyncio.Semaphore(max_concurrent_tasks)
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._running_count = 0
+        self._completion_futures: Dict[str, asyncio.Future] = {}
         self._active_tasks: Dict[str, SwarmTask] = {}
         self._completed_tasks: Dict[str, SwarmTask] = {}
-        self._task_history: List[str] = []
+        self._task_history: deque = deque()
         self._max_history = 10000
         
         # Communication
@@ -173,6 +191,9 @@ class AgentSwarmCoordinator:
             "tasks_failed": 0,
             "agents_registered": 0,
             "agents_active": 0,
+            "selection_llm_calls": 0,
+            "selection_cache_hits": 0,
+            "selection_tokens_saved": 0,
         }
         
         # Background tasks
@@ -185,6 +206,7 @@ class AgentSwarmCoordinator:
         """Start the coordinator background tasks."""
         self._monitoring_task = asyncio.create_task(self._monitoring_loop())
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        self._ensure_dispatcher()
         logger.info("AgentSwarmCoordinator started")
 
     async def stop(self):
@@ -193,6 +215,9 @@ class AgentSwarmCoordinator:
             self._monitoring_task.cancel()
         if self._cleanup_task:
             self._cleanup_task.cancel()
+        if self._dispatcher_task:
+            self._dispatcher_task.cancel()
+            self._dispatcher_task = None
         
         for instance_id in list(self._agent_instances.keys()):
             await self.terminate_agent(instance_id)
@@ -215,6 +240,7 @@ class AgentSwarmCoordinator:
         self._agents[agent_name] = agent_class
         self._agent_metadata[agent_name] = metadata
         self._agent_categories[metadata.category].add(agent_name)
+        self._catalog_dirty = True
         
         self._metrics["agents_registered"] += 1
         
@@ -245,6 +271,7 @@ class AgentSwarmCoordinator:
         metadata = self._agent_metadata.pop(agent_name)
         self._agents.pop(agent_name)
         self._agent_categories[metadata.category].discard(agent_name)
+        self._catalog_dirty = True
         
         self._metrics["agents_registered"] -= 1
         logger.info(f"Unregistered agent: {agent_name}")
@@ -383,22 +410,23 @@ class AgentSwarmCoordinator:
         if preferred_agent:
             task.assigned_agent = preferred_agent
         
-        await self._task_queue.put((
-            priority.value,
-            time.time(),
-            task.id,
-            task,
-        ))
-        
         self._active_tasks[task.id] = task
+        self._completion_futures[task.id] = asyncio.get_running_loop().create_future()
+        self._enqueue(task)
         self._metrics["tasks_submitted"] += 1
         
         logger.info(f"Submitted task: {task.id} (priority: {priority.name})")
         
-        asyncio.create_task(self._process_tasks())
+        self._ensure_dispatcher()
         
         return task.id
 
+    def _enqueue(self, task: SwarmTask, sequence: Optional[int] = None):
+        """Queue a task; the sequence number keeps FIFO order within a priority."""
+        if sequence is None:
+            sequence = next(self._task_sequence)
+        self._task_queue.put_nowait((task.priority.value, sequence, task.id, task))
+
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a pending or running task."""
         task = self._active_tasks.get(task_id)
@@ -407,6 +435,8 @@ class AgentSwarmCoordinator:
         
         if task.status == "pending":
             task.status = "cancelled"
+            task.completed_at = datetime.utcnow()
+            self._move_to_completed(task)
             return True
         
         if task.status == "running" and task.assigned_agent:
@@ -443,46 +473,68 @@ class AgentSwarmCoordinator:
         timeout: Optional[int] = None,
     ) -> Optional[SwarmTask]:
         """Wait for a task to complete."""
-        start = time.time()
         timeout = timeout or self.task_timeout
         
-        while time.time() - start < timeout:
-            task = self._active_tasks.get(task_id) or self._completed_tasks.get(task_id)
-            if task and task.status in ("completed", "failed", "cancelled"):
-                return task
-            await asyncio.sleep(0.1)
+        task = self._active_tasks.get(task_id) or self._completed_tasks.get(task_id)
+        if task and task.status in ("completed", "failed", "cancelled"):
+            return task
         
-        return None
+        future = self._completion_futures.get(task_id)
+        if future is None:
+            return None
+        # asyncio.wait leaves the shared future alone on timeout
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        return future.result() if done else None
 
     # ==================== Task Routing & Execution ====================
 
-    async def _process_tasks(self):
-        """Process tasks from the queue."""
-        while not self._task_queue.empty():
-            active_count = sum(
-                1 for t in self._active_tasks.values()
-                if t.status == "running"
-            )
+    def _ensure_dispatcher(self):
+        if self._dispatcher_task is None or self._dispatcher_task.done():
+            self._dispatcher_task = asyncio.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self):
+        """Start queued tasks in priority order whenever a concurrency slot is free."""
+        while True:
+            await self._slots.acquire()
+            try:
+                priority, sequence, task_id, task = await self._task_queue.get()
+            except BaseException:
+                self._slots.release()
+                raise
             
-            if active_count >= self.max_concurrent_tasks:
-                await asyncio.sleep(0.1)
+            if task.status == "cancelled":
+                self._slots.release()
                 continue
             
+            runner = asyncio.create_task(self._run_task(task, sequence))
+            self._inflight.add(runner)
+            runner.add_done_callback(self._inflight.discard)
+
+    async def _run_task(self, task: SwarmTask, sequence: int):
+        """Route and execute one dispatched task, then free its slot."""
+        try:
+            instance_id = await self._route_task(task)
+            if instance_id is None:
+                if task.status == "pending":
+                    # No instance could be spawned: retry shortly, keeping queue position
+                    asyncio.get_running_loop().call_later(0.1, self._enqueue, task, sequence)
+                return
+            self._running_count += 1
             try:
-                priority, timestamp, task_id, task = self._task_queue.get_nowait()
-                
-                if task.status == "cancelled":
-                    continue
-                
-                await self._route_task(task)
-                
-            except asyncio.QueueEmpty:
-                break
-            except Exception as e:
-                logger.error(f"Error processing task: {e}")
+                await self._execute_task(task, instance_id)
+            finally:
+                self._running_count -= 1
+        except Exception as e:
+            logger.error(f"Error processing task: {e}")
+            if task.id in self._active_tasks:
+                task.status = "failed"
+                task.error = str(e)
+                self._move_to_completed(task)
+        finally:
+            self._slots.release()
 
-    async def _route_task(self, task: SwarmTask):
-        """Route a task to the best available agent."""
+    async def _route_task(self, task: SwarmTask) -> Optional[str]:
+        """Route a task to the best available agent. Returns the instance ID."""
         if not task.assigned_agent:
             agent_name = await self._select_agent_for_task(task)
         else:
@@ -492,7 +544,13 @@ class AgentSwarmCoordinator:
             task.status = "failed"
             task.error = "No suitable agent found"
             self._move_to_completed(task)
-            return
+            return None
+        
+        if agent_name not in self._agents:
+            task.status = "failed"
+            task.error = f"Unknown agent: {agent_name}"
+            self._move_to_completed(task)
+            return None
         
         instance_id = await self._get_available_instance(agent_name)
         
@@ -500,13 +558,7 @@ class AgentSwarmCoordinator:
             instance_id = await self.spawn_agent(agent_name)
         
         if not instance_id:
-            await self._task_queue.put((
-                task.priority.value,
-                time.time(),
-                task.id,
-                task,
-            ))
-            return
+            return None
         
         task.assigned_agent = instance_id
         task.status = "running"
@@ -516,15 +568,44 @@ class AgentSwarmCoordinator:
         instance.status = AgentStatus.BUSY
         instance.current_tasks.append(task.id)
         
-        asyncio.create_task(self._execute_task(task, instance_id))
+        return instance_id
+
+    def _catalog_index(self) -> AgentCatalogIndex:
+        if self._catalog_dirty:
+            self._catalog.build(
+                {
+                    "name": m.name,
+                    "description": m.description,
+                    "category": f"{m.category} {m.subcategory}",
+                    "tags": m.tags,
+                    "capabilities": [c.name for c in m.capabilities],
+                }
+                for m in self._agent_metadata.values()
+            )
+            self._catalog_dirty = False
+        return self._catalog
 
     async def _select_agent_for_task(self, task: SwarmTask) -> Optional[str]:
-        """Use grok-4-1-fast-reasoning to select the best agent for a task."""
-        available_agents = list(self._agent_metadata.values())
-        
-        if not available_agents:
+        """Use grok-4-1-fast-reasoning to select the best agent among the pre-ranked candidates."""
+        if not self._agent_metadata:
             return None
         
+        catalog = self._catalog_index()
+        input_text = json.dumps(task.input_data, indent=2)[:500]
+        cache_key = (normalize_task(task.description), input_digest(input_text))
+        cached = self._selection_cache.get(cache_key)
+        if cached is not None and cached in self._agents:
+            self._metrics["selection_cache_hits"] += 1
+            self._metrics["selection_tokens_saved"] += catalog.catalog_chars // CHARS_PER_TOKEN
+            return cached
+        
+        ranked = catalog.rank(task.description, SWARM_ROUTER_PRERANK_TOP_K)
+        if ranked:
+            available_agents = [self._agent_metadata[name] for name, _ in ranked]
+        else:
+            # No lexical overlap with any agent: let the LLM see the whole catalog
+            available_agents = list(self._agent_metadata.values())
+        
         agent_descriptions = []
         for metadata in available_agents:
             caps = [c.name for c in metadata.capabilities]
@@ -537,7 +618,7 @@ class AgentSwarmCoordinator:
         prompt = f"""Given the following task and available agents, select the best agent to handle this task.
 
 Task: {task.description}
-Task Input: {json.dumps(task.input_data, indent=2)[:500]}
+Task Input: {input_text}
 
 Available Agents:
 {chr(10).join(agent_descriptions)}
@@ -547,6 +628,7 @@ Respond with ONLY the agent name that is best suited for this task. If no agent
 Best Agent:"""
 
         try:
+            self._metrics["selection_llm_calls"] += 1
             loop = asyncio.get_event_loop()
             response = await loop.run_in_executor(
                 None,
@@ -564,11 +646,15 @@ Best Agent:"""
             if agent_name == "NONE" or agent_name not in self._agents:
                 return None
             
+            self._selection_cache.put(cache_key, agent_name)
+            self._metrics["selection_tokens_saved"] += max(
+                0, (catalog.catalog_chars - sum(map(len, agent_descriptions))) // CHARS_PER_TOKEN
+            )
             return agent_name
             
         except Exception as e:
             logger.error(f"Failed to select agent: {e}")
-            # Fallback: pick the first available agent
+            # Fallback: pick the best pre-ranked (else first available) agent
             if available_agents:
                 return available_agents[0].name
             return None
@@ -653,7 +739,6 @@ Best Agent:"""
             
             instance.last_active = datetime.utcnow()
             self._move_to_completed(task)
-            asyncio.create_task(self._process_tasks())
 
     def _move_to_completed(self, task: SwarmTask):
         """Move a task from active to completed."""
@@ -663,8 +748,12 @@ Best Agent:"""
         self._completed_tasks[task.id] = task
         self._task_history.append(task.id)
         
+        future = self._completion_futures.pop(task.id, None)
+        if future is not None and not future.done():
+            future.set_result(task)
+        
         if len(self._task_history) > self._max_history:
-            old_id = self._task_history.pop(0)
+            old_id = self._task_history.popleft()
             if old_id in self._completed_tasks:
                 del self._completed_tasks[old_id]
 
@@ -746,7 +835,7 @@ Best Agent:"""
         """Get coordinator metrics."""
         return {
             **self._metrics,
-            "active_tasks": len([t for t in self._active_tasks.values() if t.status == "running"]),
+            "active_tasks": self._running_count,
             "pending_tasks": self._task_queue.qsize(),
             "completed_tasks": len(self._completed_tasks),
             "agent_instances": len(self._agent_instances),
@@ -3,22 +3,94 @@ Agent Router - Intelligent Task Routing for Agent Swarm
 =======================================================
 
 Routes tasks to the most appropriate agent(s) using:
-- LLM-based agent selection (grok-4-1-fast-reasoning for reasoning)
+- Local TF-IDF pre-ranking over the agent catalog (names, descriptions,
+  tags, capabilities); only the top-k candidates are shown to the LLM
+- LLM-based agent selection (grok-4-1-fast-reasoning for reasoning), one
+  call returning a ranked selection for single- and multi-agent routing
+- A TTL decision cache keyed by the normalized task shape and the input data
 - Capability matching
 - Keyword-based routing
 - Historical performance
+
+Configuration:
+- SWARM_ROUTER_PRERANK_TOP_K: candidates sent to the LLM (default 8)
+- SWARM_ROUTER_CACHE_TTL: seconds a routing decision is reused (default 900)
+- SWARM_ROUTER_CACHE_SIZE: max cached decisions (default 2048)
 """
 
 import asyncio
 import functools
+import hashlib
 import json
 import logging
-from collections import Counter
+import os
+import re
+import time
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
+from agent_swarm.agents.definitions import flatten_text, get_catalog_index, search_agents_scored, tokenize
+
 logger = logging.getLogger(__name__)
 
+SWARM_ROUTER_PRERANK_TOP_K = int(os.getenv("SWARM_ROUTER_PRERANK_TOP_K", "8"))
+SWARM_ROUTER_CACHE_TTL = float(os.getenv("SWARM_ROUTER_CACHE_TTL", "900"))
+SWARM_ROUTER_CACHE_SIZE = int(os.getenv("SWARM_ROUTER_CACHE_SIZE", "2048"))
+
+# Rough prompt-size estimate used for token-savings accounting
+CHARS_PER_TOKEN = 4
+
+_LITERAL_RE = re.compile(r"https?://\S+|\S+@\S+\.\S+|\d+(?:[.,]\d+)*")
+
+
+def normalize_task(task_description: str) -> str:
+    """Task "shape": URLs, emails, numbers and stop words removed.
+
+    Quoted text is kept; it usually names what the task is about.
+    """
+    return " ".join(tokenize(_LITERAL_RE.sub(" ", task_description)))
+
+
+def input_digest(input_text: str) -> str:
+    """Cache-key component for the task input text a routing prompt shows."""
+    return hashlib.sha256(input_text.encode("utf-8")).hexdigest()
+
+
+class RoutingDecisionCache:
+    """TTL + LRU cache of routing selections keyed by normalized task shape."""
+
+    def __init__(self, ttl: float = SWARM_ROUTER_CACHE_TTL, max_entries: int = SWARM_ROUTER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
 
 @dataclass
 class RoutingDecision:
@@ -35,9 +107,9 @@ class AgentRouter:
     Intelligent router for agent task assignment.
     
     Uses multiple strategies:
-    1. LLM-based semantic routing (grok-4-1-fast-reasoning)
+    1. LLM-based semantic routing (grok-4-1-fast-reasoning) over TF-IDF pre-ranked candidates
     2. Capability-based matching
-    3. Keyword-based routing
+    3. Keyword-based routing (scored catalog search)
     4. Historical performance
     """
 
@@ -48,14 +120,19 @@ class AgentRouter:
         coordinator: Any = None,
         enable_llm_routing: bool = True,
         enable_fallback: bool = True,
+        prerank_top_k: int = SWARM_ROUTER_PRERANK_TOP_K,
     ):
         self.llm_client = llm_client
         self.reasoning_client = reasoning_client or llm_client
         self.coordinator = coordinator
         self.enable_llm_routing = enable_llm_routing
         self.enable_fallback = enable_fallback
+        self.prerank_top_k = prerank_top_k
         
-        # Routing history for learning
+        # Routing decision cache (pre-ranking uses the shared catalog index)
+        self._decision_cache = RoutingDecisionCache()
+        
+        # Routing history for learning (decisions with latency/token savings, and outcomes)
         self._routing_history: List[Dict] = []
         
         logger.info("AgentRouter initialized")
@@ -69,17 +146,47 @@ class AgentRouter:
         required_capabilities: Optional[List[str]] = None,
     ) -> Optional[RoutingDecision]:
         """Route a task to the best agent."""
-        # Import here to avoid circular imports
-        from agent_swarm.agents.definitions import get_agent_definition, search_agents, get_agents_by_capability
-        
         # Try LLM-based routing first
         if self.enable_llm_routing and self.reasoning_client:
-            decision = await self._llm_route(
+            decisions = await self._llm_route(
                 task_description, input_data,
                 preferred_agents, excluded_agents, required_capabilities,
             )
-            if decision:
-                return decision
+            if decisions:
+                return decisions[0]
+        
+        return self._local_route(task_description, excluded_agents, required_capabilities)
+
+    async def route_multi_agent(
+        self,
+        task_description: str,
+        input_data: Optional[Dict[str, Any]] = None,
+        max_agents: int = 3,
+    ) -> List[RoutingDecision]:
+        """Route a task to multiple agents for parallel execution (one LLM call)."""
+        decisions: List[RoutingDecision] = []
+        if self.enable_llm_routing and self.reasoning_client:
+            decisions = await self._llm_route(task_description, input_data, max_agents=max_agents)
+        
+        # Top up from keyword/capability routing without further LLM round trips
+        excluded = {d.agent_name for d in decisions}
+        while len(decisions) < max_agents:
+            decision = self._local_route(task_description, list(excluded))
+            if not decision:
+                break
+            decisions.append(decision)
+            excluded.add(decision.agent_name)
+        
+        return decisions
+
+    def _local_route(
+        self,
+        task_description: str,
+        excluded_agents: Optional[List[str]] = None,
+        required_capabilities: Optional[List[str]] = None,
+    ) -> Optional[RoutingDecision]:
+        """Routing without the LLM: capabilities, keywords, fallback."""
+        started = time.perf_counter()
         
         # Fallback to capability-based routing
         if required_capabilities:
@@ -87,94 +194,97 @@ class AgentRouter:
                 task_description, required_capabilities, excluded_agents,
             )
             if decision:
+                self._record_routing(task_description, [decision], "capability", started)
                 return decision
         
         # Fallback to keyword-based routing
         decision = self._keyword_route(task_description, excluded_agents)
         if decision:
+            self._record_routing(task_description, [decision], "keyword", started)
             return decision
         
         # Final fallback
         if self.enable_fallback:
-            return self._fallback_route(excluded_agents)
+            decision = self._fallback_route(excluded_agents)
+            if decision:
+                self._record_routing(task_description, [decision], "fallback", started)
+            return decision
         
         return None
 
-    async def route_multi_agent(
-        self,
-        task_description: str,
-        input_data: Optional[Dict[str, Any]] = None,
-        max_agents: int = 3,
-    ) -> List[RoutingDecision]:
-        """Route a task to multiple agents for parallel execution."""
-        decisions = []
-        excluded = set()
-        
-        for _ in range(max_agents):
-            decision = await self.route_task(
-                task_description, input_data,
-                excluded_agents=list(excluded),
-            )
-            if not decision:
-                break
-            decisions.append(decision)
-            excluded.add(decision.agent_name)
-        
-        return decisions
-
     async def _llm_route(
         self,
         task_description: str,
         input_data: Optional[Dict[str, Any]],
-        preferred_agents: Optional[List[str]],
-        excluded_agents: Optional[List[str]],
-        required_capabilities: Optional[List[str]],
-    ) -> Optional[RoutingDecision]:
-        """Use LLM (grok-4-1-fast-reasoning) to select the best agent."""
-        from agent_swarm.agents.definitions import get_agent_definition, search_agents
+        preferred_agents: Optional[List[str]] = None,
+        excluded_agents: Optional[List[str]] = None,
+        required_capabilities: Optional[List[str]] = None,
+        max_agents: int = 1,
+    ) -> List[RoutingDecision]:
+        """Use LLM (grok-4-1-fast-reasoning) to select and rank the best agent(s)."""
+        from agent_swarm.agents.definitions import get_agent_definition, get_agents_by_capability
+        
+        started = time.perf_counter()
+        catalog = get_catalog_index()
+        input_text = str(input_data)[:500] if input_data else "None"
+        cache_key = (
+            normalize_task(task_description),
+            input_digest(input_text),
+            max_agents,
+            tuple(sorted(preferred_agents or ())),
+            tuple(sorted(excluded_agents or ())),
+            tuple(sorted(required_capabilities or ())),
+        )
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            decisions = [RoutingDecision(**vars(d)) for d in cached]
+            self._record_routing(task_description, decisions, "cache", started,
+                                 tokens_saved=catalog.catalog_chars // CHARS_PER_TOKEN)
+            return decisions
         
         try:
-            # Get candidate agents
+            # Get candidate agents: preferred ones, else the pre-ranked top-k
             if preferred_agents:
-                candidates = [
-                    get_agent_definition(name)
-                    for name in preferred_agents
-                    if get_agent_definition(name)
-                ]
+                scores = {name: 0.0 for name in preferred_agents}
             else:
-                candidates = list(search_agents(task_description)[:10])
+                allowed = None
+                if required_capabilities:
+                    allowed = {a.name for cap in required_capabilities for a in get_agents_by_capability(cap)} or None
+                scores = dict(catalog.rank(task_description, self.prerank_top_k, excluded_agents, allowed))
+            candidates = [get_agent_definition(name) for name in scores]
+            candidates = [c for c in candidates if c]
             
             if excluded_agents:
                 candidates = [c for c in candidates if c.name not in excluded_agents]
             
             if not candidates:
-                return None
+                return []
             
             # Build agent descriptions
             agent_descriptions = []
             for agent in candidates:
-                caps = ", ".join(agent.capabilities[:5])
+                caps = flatten_text(agent.capabilities[:5]).replace(" ", ", ")
                 agent_descriptions.append(
                     f"{agent.name}: {agent.description}\n"
                     f"  Capabilities: {caps}\n"
                     f"  Category: {agent.category}"
                 )
             
-            prompt = f"""Select the best agent for this task. Reason carefully about which agent's capabilities best match the task requirements.
+            count = min(max_agents, len(candidates))
+            prompt = f"""Select the best {"agent" if count == 1 else f"{count} agents, ranked best first,"} for this task. Reason carefully about which agent's capabilities best match the task requirements.
 
 Task: {task_description}
 
-Input Data: {str(input_data)[:500] if input_data else "None"}
+Input Data: {input_text}
 
 Available Agents:
 {chr(10).join(agent_descriptions)}
 
 Respond in JSON format:
 {{
-    "selected_agent": "agent_name",
-    "confidence": 0.95,
-    "reasoning": "Why this agent is best",
-    "estimated_seconds": 120
+    "selected_agents": [
+        {{"agent": "agent_name", "confidence": 0.95, "reasoning": "Why this agent fits", "estimated_seconds": 120}}
+    ]
 }}"""
 
             loop = asyncio.get_event_loop()
@@ -185,7 +295,7 @@ Respond in JSON format:
                     model="grok-4-1-fast-reasoning",
                     messages=[{"role": "user", "content": prompt}],
                     temperature=0.3,
-                    max_tokens=500,
+                    max_tokens=300 + 200 * count,
                 )
             )
             
@@ -197,27 +307,49 @@ Respond in JSON format:
                 content = content.split("```")[1].split("```")[0].strip()
             
             result = json.loads(content)
+            selections = result.get("selected_agents")
+            if selections is None and result.get("selected_agent"):
+                selections = [{"agent": result["selected_agent"], **result}]
             
-            selected_name = result.get("selected_agent")
-            if not selected_name or selected_name not in [a.name for a in candidates]:
-                return None
+            candidate_names = [a.name for a in candidates]
+            decisions: List[RoutingDecision] = []
+            for selection in selections or []:
+                name = selection.get("agent") if isinstance(selection, dict) else selection
+                if name not in candidate_names or any(d.agent_name == name for d in decisions):
+                    continue
+                selection = selection if isinstance(selection, dict) else {}
+                alternatives = [
+                    (n, round(scores.get(n, 0.0), 3)) for n in candidate_names
+                    if n != name
+                ][:3]
+                decisions.append(RoutingDecision(
+                    agent_name=name,
+                    confidence=selection.get("confidence", 0.8),
+                    reasoning=selection.get("reasoning", "LLM selection"),
+                    alternatives=alternatives,
+                    estimated_time=selection.get("estimated_seconds", 60),
+                ))
+                if len(decisions) >= count:
+                    break
             
-            alternatives = [
-                (a.name, 0.5) for a in candidates
-                if a.name != selected_name
-            ][:3]
+            if not decisions:
+                return []
             
-            return RoutingDecision(
-                agent_name=selected_name,
-                confidence=result.get("confidence", 0.8),
-                reasoning=result.get("reasoning", "LLM selection"),
-                alternatives=alternatives,
-                estimated_time=result.get("estimated_seconds", 60),
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", None) or len(prompt) // CHARS_PER_TOKEN
+            full_catalog_tokens = (catalog.catalog_chars + len(prompt) - sum(map(len, agent_descriptions))) // CHARS_PER_TOKEN
+            self._decision_cache.put(cache_key, decisions)
+            self._record_routing(
+                task_description, decisions, "llm", started,
+                prompt_tokens=prompt_tokens,
+                tokens_saved=max(0, full_catalog_tokens - prompt_tokens),
+                candidates=len(candidates),
             )
+            return [RoutingDecision(**vars(d)) for d in decisions]
             
         except Exception as e:
             logger.error(f"LLM routing failed: {e}")
-            return None
+            return []
 
     def _capability_route(
         self,
@@ -259,24 +391,23 @@ Respond in JSON format:
         task_description: str,
         excluded_agents: Optional[List[str]],
     ) -> Optional[RoutingDecision]:
-        """Route based on keyword matching."""
-        from agent_swarm.agents.definitions import search_agents
-        
-        candidates = search_agents(task_description)
-        
-        if excluded_agents:
-            candidates = [c for c in candidates if c.name not in excluded_agents]
+        """Route based on keyword matching (scored catalog search)."""
+        excluded = set(excluded_agents or ())
+        candidates = [
+            (agent, score) for agent, score in search_agents_scored(task_description, 4 + len(excluded))
+            if agent.name not in excluded
+        ]
         
         if not candidates:
             return None
         
-        best = candidates[0]
+        best, best_score = candidates[0]
         
         return RoutingDecision(
             agent_name=best.name,
-            confidence=0.6,
+            confidence=round(min(0.5 + best_score * 0.1, 0.85), 3),
             reasoning="Keyword match",
-            alternatives=[(c.name, 0.4) for c in candidates[1:3]],
+            alternatives=[(agent.name, round(score, 3)) for agent, score in candidates[1:3]],
             estimated_time=60,
         )
 
@@ -321,6 +452,33 @@ Respond in JSON format:
         
         return None
 
+    def _record_routing(
+        self,
+        task_description: str,
+        decisions: List[RoutingDecision],
+        source: str,
+        started: float,
+        prompt_tokens: int = 0,
+        tokens_saved: int = 0,
+        candidates: int = 0,
+    ):
+        """Record a routing decision with its latency and estimated LLM token savings."""
+        self._append_history({
+            "task": task_description[:200],
+            "agent": decisions[0].agent_name if decisions else None,
+            "agents": [d.agent_name for d in decisions],
+            "source": source,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "prompt_tokens": prompt_tokens,
+            "tokens_saved": tokens_saved,
+            "candidates": candidates,
+        })
+
+    def _append_history(self, record: Dict[str, Any]):
+        self._routing_history.append(record)
+        if len(self._routing_history) > 1000:
+            self._routing_history = self._routing_history[-1000:]
+
     def record_routing_result(
         self,
         task_description: str,
@@ -329,26 +487,42 @@ Respond in JSON format:
         execution_time: int,
     ):
         """Record routing result for learning."""
-        self._routing_history.append({
+        self._append_history({
             "task": task_description,
             "agent": decision.agent_name,
             "confidence": decision.confidence,
             "success": success,
             "execution_time": execution_time,
         })
-        if len(self._routing_history) > 1000:
-            self._routing_history = self._routing_history[-1000:]
 
     def get_routing_stats(self) -> Dict[str, Any]:
         """Get routing statistics."""
-        if not self._routing_history:
-            return {"total_routings": 0}
+        routings = [r for r in self._routing_history if "source" in r]
+        outcomes = [r for r in self._routing_history if "success" in r]
+        
+        latency_by_source: Dict[str, List[float]] = {}
+        for record in routings:
+            latency_by_source.setdefault(record["source"], []).append(record["latency_ms"])
+        routing_stats = {
+            "decisions": len(routings),
+            "by_source": {source: len(values) for source, values in latency_by_source.items()},
+            "avg_latency_ms": {
+                source: round(sum(values) / len(values), 2) for source, values in latency_by_source.items()
+            },
+            "llm_prompt_tokens": sum(r["prompt_tokens"] for r in routings),
+            "estimated_tokens_saved": sum(r["tokens_saved"] for r in routings),
+            "decision_cache": self._decision_cache.get_stats(),
+            "catalog_agents": get_catalog_index().size,
+        }
+        
+        if not outcomes:
+            return {"total_routings": 0, "routing": routing_stats}
         
-        total = len(self._routing_history)
-        successful = sum(1 for r in self._routing_history if r["success"])
+        total = len(outcomes)
+        successful = sum(1 for r in outcomes if r["success"])
         
         agent_stats = {}
-        for record in self._routing_history:
+        for record in outcomes:
             agent = record["agent"]
             if agent not in agent_stats:
                 agent_stats[agent] = {"total": 0, "success": 0}
@@ -361,4 +535,5 @@ Respond in JSON format:
             "successful_routings": successful,
             "success_rate": successful / total if total > 0 else 0,
             "agent_stats": agent_stats,
+            "routing": routing_stats,
         }
@@ -11,6 +11,12 @@ Provides real end-to-end browser automation with live screenshot streaming:
 This replaces Browserless for interactive tasks while keeping it for
 simple content extraction. The engine runs headless Chromium server-side
 and streams every screenshot to the frontend so users can watch live.
+
+Concurrent executions share one warm Chromium through BrowserPool: each
+execution leases its own isolated BrowserContext (cookies, storage, page),
+bounded by BROWSER_POOL_MAX_CONTEXTS with a FIFO waiting queue. Idle leases
+are recycled after BROWSER_POOL_IDLE_SECONDS and the browser is restarted
+once its process tree exceeds BROWSER_POOL_MEMORY_MB.
 """
 
 import asyncio
@@ -20,7 +26,9 @@ import os
 import re
 import time
 import functools
-from typing import Dict, Any, Optional, List, Callable, AsyncGenerator
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Callable, AsyncGenerator, AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -39,6 +47,25 @@ except ImportError:
 # OpenAI-compatible client for Kimi K2.5 vision
 import openai
 
+try:
+    from ..utils.browser_extraction import extraction_goto, load_stats, render_cache
+except ImportError:  # Loaded as top-level "agentic" package (src/ on sys.path)
+    from utils.browser_extraction import extraction_goto, load_stats, render_cache
+
+BROWSER_POOL_MAX_CONTEXTS = int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "4"))
+BROWSER_POOL_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "120"))
+BROWSER_POOL_IDLE_SECONDS = float(os.getenv("BROWSER_POOL_IDLE_SECONDS", "120"))
+BROWSER_POOL_MAX_LEASE_SECONDS = float(os.getenv("BROWSER_POOL_MAX_LEASE_SECONDS", "1800"))
+BROWSER_POOL_MEMORY_MB = int(os.getenv("BROWSER_POOL_MEMORY_MB", "2048"))
+
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+]
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
 
 # ============================================================================
 # DATA MODELS
@@ -99,6 +126,374 @@ class BrowserStepResult:
     duration_ms: float = 0.0
 
 
+# ============================================================================
+# BROWSER POOL
+# ============================================================================
+
+class BrowserPoolTimeout(Exception):
+    """No browser context became free within the acquire timeout."""
+
+
+@dataclass
+class BrowserLease:
+    """An execution's isolated context in the shared browser.
+
+    Field names follow BrowserSessionV3 so V3 sessions can wrap a lease.
+    """
+    id: str
+    context: Any = None
+    pages: List[Any] = field(default_factory=list)
+    browser: Any = None
+    generation: int = 0
+    refs: int = 1
+    created_at: float = field(default_factory=time.monotonic)
+    last_activity: float = field(default_factory=time.monotonic)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def current_page(self) -> Optional[Any]:
+        return self.pages[-1] if self.pages else None
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+
+def _process_tree_rss_mb(root_pid: int, name_hint: str = "chrom") -> Optional[float]:
+    """Resident memory of root_pid's descendant browser processes (Linux /proc; None elsewhere)."""
+    proc = "/proc"
+    if not os.path.isdir(proc):
+        return None
+    parents: Dict[int, int] = {}
+    for entry in os.listdir(proc):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{proc}/{entry}/stat", "rb") as f:
+                stat = f.read().decode(errors="replace")
+            parents[int(entry)] = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in parents.items():
+        children.setdefault(ppid, []).append(pid)
+    total_kb = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"{proc}/{pid}/comm") as f:
+                name = f.read().strip().lower()
+            if name_hint not in name and "headless_shell" not in name:
+                continue
+            with open(f"{proc}/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class BrowserPool:
+    """
+    One warm headless Chromium handing out per-execution BrowserContext leases.
+
+    - acquire(execution_id) returns the execution's lease, creating a fresh
+      context (with the caller's context options, if any) when a slot is
+      free; otherwise the caller waits in FIFO order
+    - release() keeps an unused lease warm for the same execution until it
+      has been idle for idle_seconds (or a waiter needs the slot)
+    - a maintenance loop recycles idle and overdue leases and restarts the
+      browser when its process tree exceeds memory_limit_mb; leases on the
+      old browser finish there before it is closed
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = BROWSER_POOL_MAX_CONTEXTS,
+        acquire_timeout: float = BROWSER_POOL_ACQUIRE_TIMEOUT,
+        idle_seconds: float = BROWSER_POOL_IDLE_SECONDS,
+        max_lease_seconds: float = BROWSER_POOL_MAX_LEASE_SECONDS,
+        memory_limit_mb: int = BROWSER_POOL_MEMORY_MB,
+        viewport: Optional[Dict[str, int]] = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+        check_interval: float = 15.0,
+    ):
+        self.max_contexts = max(1, max_contexts)
+        self.acquire_timeout = acquire_timeout
+        self.idle_seconds = idle_seconds
+        self.max_lease_seconds = max_lease_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.viewport = viewport or {"width": BrowserEngine.VIEWPORT_WIDTH, "height": BrowserEngine.VIEWPORT_HEIGHT}
+        self.user_agent = user_agent
+        self.check_interval = check_interval
+
+        self._playwright = None
+        self._browser = None
+        self._generation = 0
+        self._retired: List[Any] = []
+        self._leases: Dict[str, BrowserLease] = {}
+        self._opening = 0
+        self._waiters: deque = deque()
+        self._start_lock = asyncio.Lock()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._stats = {"leases_created": 0, "leases_reused": 0, "leases_recycled": 0, "waits": 0,
+                       "wait_ms_total": 0.0, "max_wait_ms": 0.0, "timeouts": 0, "restarts": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        if self._browser is not None:
+            return
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright not installed. Run: pip install playwright && playwright install chromium")
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            self._generation += 1
+            if self._maintenance_task is None:
+                self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+            logger.info(f"Browser pool started (generation {self._generation}, max {self.max_contexts} contexts)")
+
+    async def stop(self):
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+        for lease in list(self._leases.values()):
+            await self._close_lease(lease)
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("Browser pool stopped"))
+        self._waiters.clear()
+        for browser in [*self._retired, self._browser]:
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+        self._retired.clear()
+        self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Browser pool stopped")
+
+    # ------------------------------------------------------------------
+    # Leases
+    # ------------------------------------------------------------------
+
+    def _slots_used(self) -> int:
+        return len(self._leases) + self._opening
+
+    async def acquire(self, execution_id: str, timeout: Optional[float] = None,
+                      context_options: Optional[Dict[str, Any]] = None) -> BrowserLease:
+        """Lease an isolated context for execution_id (shared by its own nested calls).
+
+        context_options (e.g. accept_downloads) apply when a new context is created.
+        """
+        lease = self._leases.get(execution_id)
+        if lease is not None:
+            lease.refs += 1
+            lease.touch()
+            self._stats["leases_reused"] += 1
+            return lease
+
+        await self.start()
+        if self._slots_used() >= self.max_contexts or self._waiters:
+            await self._wait_for_slot(timeout if timeout is not None else self.acquire_timeout)
+        else:
+            self._opening += 1
+
+        # A slot is now reserved in _opening
+        try:
+            lease = self._leases.get(execution_id)
+            if lease is not None:  # Another call for this execution won the race
+                self._opening -= 1
+                self._hand_over_slot()
+                lease.refs += 1
+                return lease
+            lease = await self._new_lease(execution_id, context_options)
+            self._leases[execution_id] = lease
+            self._opening -= 1
+            return lease
+        except BaseException:
+            self._opening -= 1
+            self._hand_over_slot()
+            raise
+
+    async def _wait_for_slot(self, timeout: float):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["waits"] += 1
+        started = time.monotonic()
+        # Free a slot held only by an idle lease, if any
+        await self._recycle(lambda lease: lease.refs <= 0, limit=1)
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon_waiter(waiter)
+            raise
+        waited_ms = (time.monotonic() - started) * 1000
+        self._stats["wait_ms_total"] += waited_ms
+        self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], waited_ms)
+        if not done:
+            self._abandon_waiter(waiter)
+            self._stats["timeouts"] += 1
+            raise BrowserPoolTimeout(f"No browser context free within {timeout:.1f}s "
+                                     f"({self.max_contexts} in use, {len(self._waiters)} waiting)")
+        waiter.result()  # Re-raises if the pool was stopped
+
+    def _abandon_waiter(self, waiter: asyncio.Future):
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        elif waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+            # The slot was handed to us after all; pass it on
+            self._opening -= 1
+            self._hand_over_slot()
+        waiter.cancel()
+
+    def _hand_over_slot(self):
+        """Give a freed slot to the longest-waiting caller."""
+        while self._waiters and self._slots_used() < self.max_contexts:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._opening += 1
+                waiter.set_result(True)
+                return
+
+    async def _new_lease(self, execution_id: str, context_options: Optional[Dict[str, Any]] = None) -> BrowserLease:
+        browser = self._browser
+        options = {"viewport": self.viewport, "user_agent": self.user_agent, **(context_options or {})}
+        context = await browser.new_context(**options)
+        try:
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+        self._stats["leases_created"] += 1
+        return BrowserLease(id=execution_id, context=context, pages=[page], browser=browser,
+                            generation=self._generation)
+
+    async def release(self, execution_id: str, close: bool = False):
+        """Drop one reference; the context stays warm for the execution unless close=True."""
+        lease = self._leases.get(execution_id)
+        if lease is None:
+            return
+        lease.refs -= 1
+        lease.touch()
+        if lease.refs <= 0 and (close or self._waiters or lease.generation != self._generation):
+            await self._close_lease(lease)
+
+    async def close(self, execution_id: str):
+        """Close an execution's context regardless of outstanding references."""
+        lease = self._leases.get(execution_id)
+        if lease is not None:
+            await self._close_lease(lease)
+
+    @asynccontextmanager
+    async def lease(self, execution_id: str) -> AsyncIterator[BrowserLease]:
+        lease = await self.acquire(execution_id)
+        try:
+            yield lease
+        finally:
+            await self.release(execution_id)
+
+    async def _close_lease(self, lease: BrowserLease):
+        if self._leases.get(lease.id) is not lease:
+            return
+        del self._leases[lease.id]
+        lease.metadata["closed"] = True  # Holders (e.g. V3 sessions) reopen on next use
+        try:
+            await lease.context.close()
+        except Exception as e:
+            logger.debug(f"Browser context close error: {e}")
+        self._hand_over_slot()
+        await self._close_retired()
+
+    async def _recycle(self, predicate: Callable[[BrowserLease], bool], limit: Optional[int] = None) -> int:
+        recycled = 0
+        for lease in list(self._leases.values()):
+            if limit is not None and recycled >= limit:
+                break
+            if predicate(lease):
+                await self._close_lease(lease)
+                recycled += 1
+        self._stats["leases_recycled"] += recycled
+        return recycled
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def memory_mb(self) -> Optional[float]:
+        return _process_tree_rss_mb(os.getpid())
+
+    async def restart(self):
+        """Launch a fresh browser for new leases; active leases finish on the old one."""
+        old = self._browser
+        self._browser = None
+        if old is not None:
+            self._retired.append(old)
+        await self.start()
+        self._stats["restarts"] += 1
+        await self._recycle(lambda lease: lease.refs <= 0 and lease.browser is not self._browser)
+        await self._close_retired()
+
+    async def _close_retired(self):
+        for browser in list(self._retired):
+            if not any(lease.browser is browser for lease in self._leases.values()):
+                self._retired.remove(browser)
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.debug(f"Retired browser close error: {e}")
+
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.check_interval)
+                now = time.monotonic()
+                idle = await self._recycle(lambda lease: lease.refs <= 0 and now - lease.last_activity > self.idle_seconds)
+                overdue = await self._recycle(lambda lease: now - lease.created_at > self.max_lease_seconds)
+                if overdue:
+                    logger.warning(f"Browser pool reclaimed {overdue} lease(s) held over {self.max_lease_seconds:.0f}s")
+                if idle:
+                    logger.debug(f"Browser pool recycled {idle} idle context(s)")
+                memory = await asyncio.to_thread(self.memory_mb) if self.memory_limit_mb else None
+                if memory and memory > self.memory_limit_mb and self._browser is not None:
+                    logger.warning(f"Browser pool at {memory:.0f} MB (limit {self.memory_limit_mb} MB), restarting browser")
+                    await self.restart()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Browser pool maintenance error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = self._stats["waits"]
+        return {
+            "running": self._browser is not None,
+            "generation": self._generation,
+            "max_contexts": self.max_contexts,
+            "active": sum(1 for lease in self._leases.values() if lease.refs > 0),
+            "idle": sum(1 for lease in self._leases.values() if lease.refs <= 0),
+            "waiting": len(self._waiters),
+            "retired_browsers": len(self._retired),
+            "avg_wait_ms": round(self._stats["wait_ms_total"] / waits, 1) if waits else 0.0,
+            **{k: (round(v, 1) if isinstance(v, float) else v) for k, v in self._stats.items() if k != "wait_ms_total"},
+        }
+
+
 # ============================================================================
 # BROWSER ENGINE
 # ============================================================================
@@ -123,6 +518,8 @@ class BrowserEngine:
         grok_client: Optional[openai.OpenAI] = None,
         on_screenshot: Optional[Callable] = None,
         on_action: Optional[Callable] = None,
+        on_frame: Optional[Callable] = None,
+        pool: Optional[BrowserPool] = None,
     ):
         """
         Initialize browser engine.
@@ -132,22 +529,70 @@ class BrowserEngine:
             grok_client: Fallback OpenAI-compatible client for Grok vision
             on_screenshot: Callback(screenshot_b64, url, title) called after each screenshot
             on_action: Callback(action_description) called before each action
+            on_frame: Callback(jpeg_bytes, url, title, meta) called with the raw frame
+                (binary WebSocket streaming, no base64). May return the capture
+                quality to use next. When set, browser_screenshot events carry no
+                base64 payload.
+            pool: Shared BrowserPool; when set, session(execution_id) hands each
+                execution its own context instead of the engine's single page
         """
         self.kimi_client = kimi_client
         self.grok_client = grok_client
         self.on_screenshot = on_screenshot
         self.on_action = on_action
+        self.on_frame = on_frame
+        # Lowered by the frame stream while WebSocket clients fall behind
+        self.screenshot_quality = self.SCREENSHOT_QUALITY
 
         self._playwright: Optional[Any] = None
         self._browser: Optional[Any] = None
         self._context: Optional[Any] = None
         self._page: Optional[Any] = None
         self._started = False
+        self.pool = pool
+        self._lease: Optional[BrowserLease] = None
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
+    @asynccontextmanager
+    async def session(self, execution_id: str, on_frame: Optional[Callable] = None) -> AsyncIterator["BrowserEngine"]:
+        """Engine bound to the execution's pooled context (self when unpooled).
+
+        on_frame overrides the engine's frame callback for this execution.
+        """
+        if self.pool is None or not execution_id:
+            if on_frame is None:
+                yield self
+                return
+            previous, self.on_frame = self.on_frame, on_frame
+            try:
+                yield self
+            finally:
+                self.on_frame = previous
+            return
+        async with self.pool.lease(execution_id) as lease:
+            engine = BrowserEngine(
+                kimi_client=self.kimi_client,
+                grok_client=self.grok_client,
+                on_screenshot=self.on_screenshot,
+                on_action=self.on_action,
+                on_frame=on_frame or self.on_frame,
+            )
+            engine._lease = lease
+            engine._context = lease.context
+            engine._page = lease.current_page
+            engine._started = True
+            engine.screenshot_quality = self.screenshot_quality
+            yield engine
+
+    async def close_session(self, execution_id: str):
+        """Close the execution's pooled context once the execution has finished."""
+        if self.pool is not None and execution_id:
+            await self.pool.close(execution_id)
+            render_cache.discard_scope(execution_id)
+
     async def start(self):
         """Launch headless Chromium browser."""
         if not PLAYWRIGHT_AVAILABLE:
@@ -157,18 +602,10 @@ class BrowserEngine:
             return
 
         self._playwright = await async_playwright().start()
-        self._browser = await self._playwright.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-            ],
-        )
+        self._browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
         self._context = await self._browser.new_context(
             viewport={"width": self.VIEWPORT_WIDTH, "height": self.VIEWPORT_HEIGHT},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            user_agent=DEFAULT_USER_AGENT,
         )
         self._page = await self._context.new_page()
         self._started = True
@@ -176,6 +613,10 @@ class BrowserEngine:
 
     async def stop(self):
         """Close browser and clean up."""
+        if self._lease is not None:
+            return  # Pooled context: the pool owns its lifetime
+        if self.pool is not None:
+            await self.pool.stop()
         if self._context:
             await self._context.close()
         if self._browser:
@@ -189,39 +630,62 @@ class BrowserEngine:
     # Screenshot
     # ------------------------------------------------------------------
 
-    async def take_screenshot(self) -> str:
-        """Take a screenshot and return as base64 JPEG string."""
+    async def capture_frame(self, meta: Optional[Dict[str, Any]] = None) -> bytes:
+        """Take a screenshot and return the raw JPEG bytes (meta goes to on_frame)."""
         if not self._page:
-            return ""
+            return b""
 
         try:
-            screenshot_bytes = await self._page.screenshot(
+            frame = await self._page.screenshot(
                 type="jpeg",
-                quality=self.SCREENSHOT_QUALITY,
+                quality=self.screenshot_quality,
                 full_page=False,
             )
-            b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
-
-            # Notify callback
-            if self.on_screenshot:
-                url = self._page.url
-                title = await self._page.title()
-                try:
-                    await self.on_screenshot(b64, url, title)
-                except Exception:
-                    pass  # Don't fail on callback errors
-
-            return b64
         except Exception as e:
             logger.error(f"Screenshot error: {e}")
+            return b""
+
+        if self.on_frame:
+            try:
+                quality = await self.on_frame(frame, self._page.url, await self._page.title(), meta or {})
+                if quality:
+                    self.screenshot_quality = quality
+            except Exception:
+                pass  # Don't fail on callback errors
+        return frame
+
+    async def take_screenshot(self, meta: Optional[Dict[str, Any]] = None) -> str:
+        """Take a screenshot and return as base64 JPEG string."""
+        screenshot_bytes = await self.capture_frame(meta)
+        if not screenshot_bytes:
             return ""
+        b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
+
+        # Notify callback
+        if self.on_screenshot:
+            try:
+                await self.on_screenshot(b64, self._page.url, await self._page.title())
+            except Exception:
+                pass  # Don't fail on callback errors
 
-    async def get_state(self) -> BrowserState:
+        return b64
+
+    def _screenshot_event(self, state: BrowserState, step: int, action: str) -> Dict[str, Any]:
+        """browser_screenshot event data; the image itself is left out when
+        on_frame already streamed the raw frame."""
+        data = {"url": state.url, "title": state.title, "step": step, "action": action}
+        if self.on_frame:
+            data["streamed"] = True
+        else:
+            data["screenshot"] = state.screenshot_b64
+        return data
+
+    async def get_state(self, frame_meta: Optional[Dict[str, Any]] = None) -> BrowserState:
         """Get current browser state including screenshot."""
         if not self._page:
             return BrowserState()
 
-        screenshot_b64 = await self.take_screenshot()
+        screenshot_b64 = await self.take_screenshot(frame_meta)
 
         # Extract visible text (first 5000 chars for context)
         try:
@@ -260,8 +724,10 @@ class BrowserEngine:
                 url = action.url or action.text or ""
                 if not url.startswith("http"):
                     url = "https://" + url
+                nav_start = time.perf_counter()
                 await self._page.goto(url, wait_until="domcontentloaded", timeout=30000)
                 await asyncio.sleep(1)  # Let page settle
+                load_stats.record("full", (time.perf_counter() - nav_start) * 1000)
 
             elif action.action_type == BrowserActionType.CLICK:
                 if action.selector:
@@ -553,14 +1019,8 @@ Instructions:
             ))
 
         # Take initial screenshot
-        state = await self.get_state()
-        emit("browser_screenshot", {
-            "screenshot": state.screenshot_b64,
-            "url": state.url,
-            "title": state.title,
-            "step": 0,
-            "action": "Initial page load",
-        })
+        state = await self.get_state({"step": 0, "action": "Initial page load"})
+        emit("browser_screenshot", self._screenshot_event(state, 0, "Initial page load"))
 
         # CUA Loop
         history: List[Dict[str, Any]] = []
@@ -597,17 +1057,11 @@ Instructions:
 
             # Get new state
             await asyncio.sleep(0.5)  # Let page update
-            state = await self.get_state()
+            state = await self.get_state({"step": step_num, "action": action_desc})
             final_url = state.url
 
             # Stream screenshot to frontend
-            emit("browser_screenshot", {
-                "screenshot": state.screenshot_b64,
-                "url": state.url,
-                "title": state.title,
-                "step": step_num,
-                "action": action_desc,
-            })
+            emit("browser_screenshot", self._screenshot_event(state, step_num, action_desc))
 
             # Record step
             step_result = BrowserStepResult(
@@ -652,8 +1106,13 @@ Instructions:
     # Simple operations (non-CUA, direct control)
     # ------------------------------------------------------------------
 
-    async def navigate_and_extract(self, url: str, sub_events=None) -> Dict[str, Any]:
-        """Navigate to a URL, take screenshot, extract text. Simple non-CUA operation."""
+    async def navigate_and_extract(self, url: str, sub_events=None, screenshot: bool = True) -> Dict[str, Any]:
+        """Navigate to a URL, take screenshot, extract text. Simple non-CUA operation.
+
+        With screenshot=False the page is loaded with the extraction profile
+        (no images/fonts/media/trackers, no settle sleep) and recently rendered
+        URLs are served from the render cache.
+        """
         def emit(event_name: str, data: Dict):
             if sub_events is not None:
                 try:
@@ -661,6 +1120,9 @@ Instructions:
                 except Exception:
                     pass
 
+        if not screenshot:
+            return await self._extract_text_only(url, emit)
+
         if not self._started:
             await self.start()
 
@@ -672,15 +1134,9 @@ Instructions:
             description=f"Navigate to {url}",
         ))
 
-        state = await self.get_state()
+        state = await self.get_state({"step": 1, "action": f"Loaded {url}"})
 
-        emit("browser_screenshot", {
-            "screenshot": state.screenshot_b64,
-            "url": state.url,
-            "title": state.title,
-            "step": 1,
-            "action": f"Loaded {url}",
-        })
+        emit("browser_screenshot", self._screenshot_event(state, 1, f"Loaded {url}"))
 
         return {
             "type": "browser_extraction",
@@ -691,6 +1147,38 @@ Instructions:
             "screenshot": state.screenshot_b64,
         }
 
+    async def _extract_text_only(self, url: str, emit: Callable) -> Dict[str, Any]:
+        if not url.startswith("http"):
+            url = "https://" + url
+
+        scope = self._lease.id if self._lease is not None else ""
+        cached = render_cache.get(url, "browser_engine", scope)
+        if cached:
+            load_stats.cache_hits += 1
+            emit("execution_reasoning", {"chunk": f"- Using the page rendered moments ago for {url}\n"})
+            return {**cached, "cached": True}
+
+        if not self._started:
+            await self.start()
+
+        emit("execution_reasoning", {"chunk": f"- Reading {url} (text only)...\n"})
+        await extraction_goto(self._page, url)
+        try:
+            page_text = await self._page.evaluate("() => document.body?.innerText?.substring(0, 5000) || ''")
+        except Exception:
+            page_text = ""
+
+        result = {
+            "type": "browser_extraction",
+            "success": True,
+            "url": self._page.url,
+            "title": await self._page.title(),
+            "content": page_text,
+            "screenshot": "",
+        }
+        render_cache.put(url, result, "browser_engine", scope)
+        return result
+
     async def navigate_and_screenshot(self, url: str) -> Dict[str, Any]:
         """Navigate to URL and return screenshot. Minimal operation."""
         if not self._started:
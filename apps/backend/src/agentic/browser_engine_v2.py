@@ -83,6 +83,7 @@ class BrowserEngineV2:
 
     VIEWPORT_WIDTH = 1280
     VIEWPORT_HEIGHT = 720
+    SCREENSHOT_QUALITY = 80
 
     def __init__(
         self,
@@ -108,6 +109,11 @@ class BrowserEngineV2:
         self.state = BrowserState()
         self.action_history: List[Dict] = []
         self.event_callbacks: List[Callable] = []
+        # Lowered by the frame stream while WebSocket clients fall behind
+        self.screenshot_quality = self.SCREENSHOT_QUALITY
+        # Callback(jpeg_bytes, url, title, meta) for raw binary streaming;
+        # may return the capture quality to use next
+        self.on_frame: Optional[Callable] = None
 
         self.is_available = PLAYWRIGHT_V2_AVAILABLE
         logger.info(f"BrowserEngineV2 initialized (headless={headless}, available={self.is_available})")
@@ -500,18 +506,30 @@ Respond with ONLY a JSON object. No markdown, no explanation."""
                 pass
             return {"action": "done"}
 
-    async def _capture_screenshot(self) -> str:
-        """Capture screenshot as base64 JPEG"""
+    async def _capture_frame(self) -> bytes:
+        """Capture screenshot as raw JPEG bytes"""
         if not self.page:
-            return ""
+            return b""
         try:
-            screenshot_bytes = await self.page.screenshot(
-                type="jpeg", quality=80, full_page=False
+            frame = await self.page.screenshot(
+                type="jpeg", quality=self.screenshot_quality, full_page=False
             )
-            return base64.b64encode(screenshot_bytes).decode("utf-8")
         except Exception as e:
             logger.error(f"Screenshot failed: {e}")
-            return ""
+            return b""
+        if self.on_frame and frame:
+            try:
+                quality = await self.on_frame(frame, self.page.url, self.state.title, {})
+                if quality:
+                    self.screenshot_quality = quality
+            except Exception as e:
+                logger.error(f"Frame callback error: {e}")
+        return frame
+
+    async def _capture_screenshot(self) -> str:
+        """Capture screenshot as base64 JPEG"""
+        frame = await self._capture_frame()
+        return base64.b64encode(frame).decode("utf-8") if frame else ""
 
     async def _get_page_text(self) -> str:
         """Get visible text from page"""
@@ -72,6 +72,18 @@ STEP_TYPE_TO_PHASE = {
     StepType.DELIVER: "delivery",
 }
 
+# Max steps of each type running at once in the DAG scheduler. The browser
+# engine drives a single live page, and sandbox/GitHub steps may mutate shared
+# state, so those run one at a time; research and analysis fan out.
+STEP_CONCURRENCY_LIMITS = {
+    StepType.RESEARCH: 4,
+    StepType.THINK: 2,
+    StepType.BROWSER: 1,
+    StepType.CODE: 1,
+    StepType.GITHUB: 1,
+}
+MAX_PARALLEL_STEPS = 6
+
 
 @dataclass
 class ExecutionArtifact:
@@ -142,14 +154,16 @@ class _SubEventQueue:
     Allows _exec_github (and others) to keep using sub_events.append()
     while the events are immediately available to the streaming consumer.
     """
-    def __init__(self, queue: asyncio.Queue):
+    def __init__(self, queue: asyncio.Queue, tag: Any = None):
         self._queue = queue
+        self._tag = tag
         self._items: List[Dict] = []
 
     def append(self, item: Dict):
         self._items.append(item)
         try:
-            self._queue.put_nowait(item)
+            # Tagged proxies share one queue across concurrent steps
+            self._queue.put_nowait(item if self._tag is None else (self._tag, item))
         except Exception:
             pass
 
@@ -189,6 +203,9 @@ class ExecutionOrchestrator:
         browser_engine=None,
         max_steps: int = 15,
         enable_auto_correct: bool = True,
+        step_concurrency: Optional[Dict[StepType, int]] = None,
+        max_parallel_steps: int = MAX_PARALLEL_STEPS,
+        frame_publisher: Optional[Callable[[str], Callable]] = None,
     ):
         self.kimi = kimi_client
         self.grok = grok_client
@@ -197,9 +214,15 @@ class ExecutionOrchestrator:
         self.browserless = browserless_client
         self.github = github_client
         self.browser_engine = browser_engine  # Playwright-based browser with live screenshots
+        # execution_id -> engine on_frame callback (raw frames to the WebSocket frame stream)
+        self.frame_publisher = frame_publisher
         self.local_sandbox = None  # Lazy-init local sandbox as E2B fallback
         self.max_steps = max_steps
         self.enable_auto_correct = enable_auto_correct
+        self.step_concurrency = {
+            t: max(1, n) for t, n in {**STEP_CONCURRENCY_LIMITS, **(step_concurrency or {})}.items()
+        }
+        self.max_parallel_steps = max(1, max_parallel_steps)
         self._executions: Dict[str, Dict[str, Any]] = {}
         # User-provided credentials stored per execution
         self._credentials: Dict[str, Dict[str, str]] = {}
@@ -359,6 +382,7 @@ class ExecutionOrchestrator:
             "cancelled": False,
             "paused": False,
         }
+        step_tasks: set = set()
 
         try:
             # === PHASE 1: START ===
@@ -421,11 +445,22 @@ class ExecutionOrchestrator:
                 "detail": f"Plan includes: {tools_desc}. {plan.reasoning[:80] if plan.reasoning else 'Optimized for accuracy and speed.'}"
             }}
 
-            # === PHASE 3: EXECUTE STEPS ===
+            # === PHASE 3: EXECUTE STEPS (dependency-ordered, ready steps run concurrently) ===
             all_step_results: List[ExecutionStep] = []
             total_steps = len(plan.steps)
+            base_progress = 10
+            valid_types = {st.value for st in StepType}
 
+            pending: Dict[int, Dict[str, Any]] = {}
             for i, step_data in enumerate(plan.steps):
+                pending[step_data.get("step_number", i + 1)] = step_data
+            finished: Dict[int, ExecutionStep] = {}
+            running: Dict[int, tuple] = {}  # step_num -> (step, phase, title)
+            running_by_type: Dict[StepType, int] = {}
+            merged: asyncio.Queue = asyncio.Queue()
+            phase_started = datetime.now()
+
+            while pending or running:
                 if self._executions.get(execution_id, {}).get("cancelled"):
                     yield {"event": "execution_error", "data": {"message": "Execution cancelled by user"}}
                     return
@@ -433,105 +468,85 @@ class ExecutionOrchestrator:
                 while self._executions.get(execution_id, {}).get("paused"):
                     await asyncio.sleep(0.5)
 
-                step_num = step_data.get("step_number", i + 1)
-                step_type_str = step_data.get("step_type", "think")
-                instruction = step_data.get("instruction", "")
-                step_id = f"step-{step_num}"
-
-                valid_types = {st.value for st in StepType}
-                actual_type = step_type_str if step_type_str in valid_types else "think"
-                phase = STEP_TYPE_TO_PHASE.get(StepType(actual_type), "execution")
-
-                base_progress = 10
-                step_progress = base_progress + int(((i + 0.5) / max(total_steps, 1)) * 70)
-
-                # Clean step title — no API names
-                step_title = self._clean_step_title(actual_type, instruction)
-
-                # Emit step started
-                yield {"event": "step_update", "data": {
-                    "id": step_id, "phase": phase,
-                    "title": step_title,
-                    "status": "active",
-                    "detail": f"Step {step_num} of {total_steps}"
-                }}
-                yield {"event": "execution_reasoning", "data": {
-                    "chunk": f"**Step {step_num}/{total_steps}**\n- {step_title}\n"
-                }}
-                yield {"event": "execution_progress", "data": {"progress": step_progress, "status": "executing"}}
-                # task_progress for message field — rich 3-line detail
-                step_details = self._get_step_detail_lines(actual_type, instruction, step_num, total_steps)
-                yield {"event": "task_progress", "data": {
-                    "id": f"tp-{step_id}", "step": f"tp-{step_id}",
-                    "title": step_title,
-                    "status": "active",
-                    "detail": step_details
-                }}
-
-                # Execute the step
-                step = ExecutionStep(
-                    step_id=step_id,
-                    execution_id=execution_id,
-                    step_number=step_num,
-                    step_type=StepType(actual_type),
-                    status=ExecutionStatus.EXECUTING,
-                    agent=step_data.get("agent", "kimi"),
-                    instruction=instruction,
-                    input_data=step_data,
-                )
-                step.started_at = datetime.now()
+                # Launch every step whose dependencies are done, within the caps
+                for step_num in sorted(pending):
+                    if len(running) >= self.max_parallel_steps:
+                        break
+                    step_data = pending[step_num]
+                    deps = step_data.get("dependencies", [])
+                    if any(d not in finished for d in deps):
+                        continue
+                    step_type_str = step_data.get("step_type", "think")
+                    step_type = StepType(step_type_str if step_type_str in valid_types else "think")
+                    if running_by_type.get(step_type, 0) >= self.step_concurrency.get(step_type, 1):
+                        continue
+
+                    del pending[step_num]
+                    instruction = step_data.get("instruction", "")
+                    step_id = f"step-{step_num}"
+                    phase = STEP_TYPE_TO_PHASE.get(step_type, "execution")
+
+                    # Clean step title — no API names
+                    step_title = self._clean_step_title(step_type.value, instruction)
+
+                    # Emit step started
+                    yield {"event": "step_update", "data": {
+                        "id": step_id, "phase": phase,
+                        "title": step_title,
+                        "status": "active",
+                        "detail": f"Step {step_num} of {total_steps}"
+                    }}
+                    yield {"event": "execution_reasoning", "data": {
+                        "chunk": f"**Step {step_num}/{total_steps}**\n- {step_title}\n"
+                    }}
+                    # task_progress for message field — rich 3-line detail
+                    step_details = self._get_step_detail_lines(step_type.value, instruction, step_num, total_steps)
+                    yield {"event": "task_progress", "data": {
+                        "id": f"tp-{step_id}", "step": f"tp-{step_id}",
+                        "title": step_title,
+                        "status": "active",
+                        "detail": step_details
+                    }}
 
-                try:
-                    # ALL step types use streaming execution via asyncio.Queue
-                    # so sub-events (browser screenshots, reasoning, credential requests)
-                    # reach the frontend in real-time as they're produced.
-                    event_queue: asyncio.Queue = asyncio.Queue()
-                    result_holder: Dict[str, Any] = {"result": None, "error": None}
-
-                    async def _run_step(_step, _ctx, _prev, _queue, _eid, _type):
-                        proxy = _SubEventQueue(_queue)
-                        try:
-                            if _type == "github":
-                                r = await self._exec_github(_step, _ctx, _prev, proxy, _eid)
-                            elif _type == "browser":
-                                r = await self._exec_browser(_step, _ctx, proxy)
-                            elif _type == "code":
-                                r = await self._exec_code(_step, _ctx, _prev, proxy)
-                            elif _type == "research":
-                                r = await self._exec_research(_step, _ctx, _prev, proxy)
-                            elif _type == "think":
-                                r = await self._exec_think(_step, _ctx, _prev, proxy)
-                            else:
-                                r = await self._exec_think(_step, _ctx, _prev, proxy)
-                            result_holder["result"] = r
-                        except Exception as exc:
-                            result_holder["error"] = exc
-                        finally:
-                            await _queue.put(None)  # sentinel
-
-                    step_task = asyncio.create_task(
-                        _run_step(step, context, all_step_results, event_queue, execution_id, actual_type)
+                    step = ExecutionStep(
+                        step_id=step_id,
+                        execution_id=execution_id,
+                        step_number=step_num,
+                        step_type=step_type,
+                        status=ExecutionStatus.EXECUTING,
+                        agent=step_data.get("agent", "kimi"),
+                        instruction=instruction,
+                        input_data=step_data,
+                        dependencies=[f"step-{d}" for d in deps],
                     )
+                    step.started_at = datetime.now()
+                    # Steps only see the outputs of what they (transitively) depend on
+                    previous = [finished[n] for n in sorted(self._dependency_closure(step_num, plan.steps))]
+                    running[step_num] = (step, phase, step_title)
+                    running_by_type[step_type] = running_by_type.get(step_type, 0) + 1
+                    step_tasks.add(asyncio.create_task(
+                        self._run_step(step, context, previous, merged, execution_id)
+                    ))
+
+                # ALL step types stream sub-events (browser screenshots, reasoning,
+                # credential requests) through the merged queue in real time;
+                # a None event marks the end of that step.
+                step_num, sub_evt = await merged.get()
+                if sub_evt is not None:
+                    yield sub_evt
+                    continue
+
+                step, phase, step_title = running.pop(step_num)
+                running_by_type[step.step_type] -= 1
+                step_id = step.step_id
+                finished[step_num] = step
+                all_step_results.append(step)
 
-                    # Yield sub-events in real-time as they're produced
-                    while True:
-                        sub_evt = await event_queue.get()
-                        if sub_evt is None:
-                            break
-                        yield sub_evt
-
-                    await step_task
-                    if result_holder["error"]:
-                        raise result_holder["error"]
-                    result = result_holder["result"]
-
-                    step.output_data = result
-                    step.status = ExecutionStatus.COMPLETED
-                    step.completed_at = datetime.now()
+                if step.status == ExecutionStatus.COMPLETED:
                     elapsed = (step.completed_at - step.started_at).total_seconds()
 
                     # Clean result summary
-                    result_summary = self._clean_result_summary(result)
+                    result_summary = self._clean_result_summary(step.output_data)
                     yield {"event": "step_update", "data": {
                         "id": step_id, "phase": phase,
                         "title": step_title,
@@ -539,7 +554,7 @@ class ExecutionOrchestrator:
                         "detail": result_summary
                     }}
                     yield {"event": "execution_reasoning", "data": {
-                        "chunk": f"- Done ({elapsed:.1f}s): {result_summary}\n\n"
+                        "chunk": f"- Step {step_num} done ({elapsed:.1f}s): {result_summary}\n\n"
                     }}
                     # task_progress: step complete — concise summary
                     yield {"event": "task_progress", "data": {
@@ -548,21 +563,17 @@ class ExecutionOrchestrator:
                         "status": "complete",
                         "detail": result_summary[:120]
                     }}
-
-                except Exception as e:
-                    step.status = ExecutionStatus.FAILED
-                    step.error_message = str(e)
-                    step.completed_at = datetime.now()
-                    logger.error(f"Step {step_num} failed: {e}")
+                else:
+                    logger.error(f"Step {step_num} failed: {step.error_message}")
 
                     yield {"event": "step_update", "data": {
                         "id": step_id, "phase": phase,
                         "title": step_title,
                         "status": "error",
-                        "detail": f"Failed: {str(e)[:100]}"
+                        "detail": f"Failed: {step.error_message[:100]}"
                     }}
                     yield {"event": "execution_reasoning", "data": {
-                        "chunk": f"- Failed: {str(e)[:150]}\n\n"
+                        "chunk": f"- Step {step_num} failed: {step.error_message[:150]}\n\n"
                     }}
                     # task_progress: step failed
                     yield {"event": "task_progress", "data": {
@@ -572,12 +583,19 @@ class ExecutionOrchestrator:
                         "detail": f"Encountered an issue, continuing..."
                     }}
 
-                all_step_results.append(step)
                 yield {"event": "execution_progress", "data": {
-                    "progress": base_progress + int(((i + 1) / max(total_steps, 1)) * 70),
+                    "progress": base_progress + int((len(finished) / max(total_steps, 1)) * 70),
                     "status": "executing"
                 }}
 
+            all_step_results.sort(key=lambda st: st.step_number)
+            timing = self._step_timing(all_step_results)
+            timing["wall_time"] = round((datetime.now() - phase_started).total_seconds(), 2)
+            logger.info(
+                f"Execution {execution_id} steps: wall {timing['wall_time']}s, "
+                f"critical path {timing['critical_path_time']}s, serial {timing['serial_time']}s"
+            )
+
             # === PHASE 4: VERIFICATION ===
             yield {"event": "step_update", "data": {
                 "id": "verify-1", "phase": "verification",
@@ -660,6 +678,7 @@ class ExecutionOrchestrator:
                 "execution_time": round(execution_time, 1),
                 "steps_completed": len([s for s in all_step_results if s.status == ExecutionStatus.COMPLETED]),
                 "total_steps": len(all_step_results),
+                "step_timing": timing,
             }}
             yield {"event": "complete", "data": {
                 "content": full_content,
@@ -672,8 +691,107 @@ class ExecutionOrchestrator:
             yield {"event": "error", "data": {"message": str(e)}}
 
         finally:
+            for task in step_tasks:
+                task.cancel()
             self._executions.pop(execution_id, None)
             self._credentials.pop(execution_id, None)
+            if self.browser_engine and hasattr(self.browser_engine, "close_session"):
+                try:
+                    await self.browser_engine.close_session(execution_id)
+                except Exception as e:
+                    logger.debug(f"Browser session close error: {e}")
+
+    # ------------------------------------------------------------------
+    # Step scheduling
+    # ------------------------------------------------------------------
+
+    async def _run_step(self, step, context, previous, queue, execution_id):
+        """Run one step, forwarding its sub-events to the shared queue as
+        (step_number, event) and finishing with (step_number, None)."""
+        proxy = _SubEventQueue(queue, tag=step.step_number)
+        try:
+            if step.step_type == StepType.GITHUB:
+                r = await self._exec_github(step, context, previous, proxy, execution_id)
+            elif step.step_type == StepType.BROWSER:
+                r = await self._exec_browser(step, context, proxy, execution_id)
+            elif step.step_type == StepType.CODE:
+                r = await self._exec_code(step, context, previous, proxy)
+            elif step.step_type == StepType.RESEARCH:
+                r = await self._exec_research(step, context, previous, proxy)
+            else:
+                r = await self._exec_think(step, context, previous, proxy)
+            step.output_data = r
+            step.status = ExecutionStatus.COMPLETED
+        except Exception as exc:
+            step.status = ExecutionStatus.FAILED
+            step.error_message = str(exc)
+        finally:
+            step.completed_at = datetime.now()
+            queue.put_nowait((step.step_number, None))
+
+    @staticmethod
+    def _dependency_closure(step_number: int, steps: List[Dict[str, Any]]) -> set:
+        """All step numbers that `step_number` depends on, directly or transitively."""
+        deps_by_num = {s.get("step_number"): s.get("dependencies", []) for s in steps}
+        seen: set = set()
+        stack = list(deps_by_num.get(step_number, []))
+        while stack:
+            n = stack.pop()
+            if n not in seen:
+                seen.add(n)
+                stack.extend(deps_by_num.get(n, []))
+        return seen
+
+    @staticmethod
+    def _normalize_dependencies(steps: List[Dict[str, Any]]) -> List[List[int]]:
+        """Make plan dependencies a valid DAG and return its parallel groups.
+
+        Only references to earlier steps are kept (this rules out cycles), and
+        a final "think" step with no dependencies synthesizes everything before it.
+        Returns the step numbers grouped by dependency depth.
+        """
+        known = set()
+        depth: Dict[int, int] = {}
+        for idx, s in enumerate(steps):
+            num = s["step_number"]
+            raw = s.get("dependencies") or []
+            deps = []
+            for d in raw if isinstance(raw, list) else [raw]:
+                try:
+                    d = int(d)
+                except (TypeError, ValueError):
+                    continue
+                if d in known and d not in deps:
+                    deps.append(d)
+            if not deps and s.get("step_type") == "think" and idx == len(steps) - 1:
+                deps = [p["step_number"] for p in steps[:idx]]
+            s["dependencies"] = deps
+            depth[num] = 1 + max((depth[d] for d in deps), default=-1)
+            known.add(num)
+
+        groups: List[List[int]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for num, level in depth.items():
+            groups[level].append(num)
+        return groups
+
+    @staticmethod
+    def _step_timing(steps: List[ExecutionStep]) -> Dict[str, float]:
+        """Serial time (sum of step durations) vs critical path (longest dependency chain)."""
+        durations = {
+            s.step_id: (s.completed_at - s.started_at).total_seconds()
+            for s in steps if s.started_at and s.completed_at
+        }
+        finish: Dict[str, float] = {}
+        for s in sorted(steps, key=lambda st: st.step_number):
+            if s.step_id in durations:
+                finish[s.step_id] = durations[s.step_id] + max((finish.get(d, 0.0) for d in s.dependencies), default=0.0)
+        serial = sum(durations.values())
+        critical = max(finish.values(), default=0.0)
+        return {
+            "serial_time": round(serial, 2),
+            "critical_path_time": round(critical, 2),
+            "parallel_speedup": round(serial / critical, 2) if critical else 1.0,
+        }
 
     # ------------------------------------------------------------------
     # Planning
@@ -719,6 +837,7 @@ RULES:
 - Use "browser" for ANY task that requires visiting a website, clicking, filling forms, or interacting with web pages
 - Always include at least one "research" step for information gathering
 - End with a "think" step to synthesize all findings
+- Steps that do not need another step's output must have empty dependencies — independent steps run in parallel
 - Keep instructions specific and actionable
 - For GitHub write operations (push, edit, create PR), the instruction must specify: owner, repo, file path, and what to change
 - For browser steps, specify the target URL and what actions to perform (navigate, click, type, extract)
@@ -764,6 +883,10 @@ User Request: {user_request}
                     s["step_type"] = "think"
                 if "agent" not in s:
                     s["agent"] = "kimi"
+            numbers = [s.get("step_number") for s in steps]
+            if not all(isinstance(n, int) for n in numbers) or len(set(numbers)) != len(numbers):
+                for idx, s in enumerate(steps):
+                    s["step_number"] = idx + 1
 
             # Force browser step if URLs detected but not in plan
             if has_urls and not any(s.get("step_type") == "browser" for s in steps):
@@ -778,26 +901,34 @@ User Request: {user_request}
                 steps.insert(0, browser_step)
                 for idx, s in enumerate(steps):
                     s["step_number"] = idx + 1
+                    if idx > 0:
+                        # Later steps read the page content, so they all wait for it
+                        s["dependencies"] = [1] + [int(d) + 1 for d in s.get("dependencies") or [] if str(d).isdigit()]
 
             # Force github step if repo operations needed but not in plan
             if needs_github and "github" in available_tools and not any(s.get("step_type") == "github" for s in steps):
+                steps = steps[:self.max_steps - 1]
                 github_step = {
-                    "step_number": len(steps) + 1,
+                    "step_number": max((s["step_number"] for s in steps), default=0) + 1,
                     "step_type": "github",
                     "instruction": f"Perform GitHub operation for: {user_request[:200]}",
                     "agent": "kimi",
                     "expected_output": "Repository operation result",
-                    "dependencies": [],
+                    # Commits what the earlier steps produced
+                    "dependencies": [s["step_number"] for s in steps],
                 }
                 steps.append(github_step)
 
+            steps = steps[:self.max_steps]
+            parallel_groups = self._normalize_dependencies(steps)
+
             return ExecutionPlan(
                 plan_id=f"plan_{uuid.uuid4().hex[:8]}",
                 objective=plan_data.get("objective", user_request),
-                steps=steps[:self.max_steps],
-                estimated_duration=len(steps) * 15,
+                steps=steps,
+                estimated_duration=len(parallel_groups) * 15,
                 reasoning=plan_data.get("reasoning", ""),
-                parallel_groups=plan_data.get("parallel_groups", [[s["step_number"]] for s in steps]),
+                parallel_groups=parallel_groups,
             )
 
         except (json.JSONDecodeError, KeyError) as e:
@@ -819,7 +950,8 @@ User Request: {user_request}
         fallback_steps.append({
             "step_number": step_num, "step_type": "research",
             "instruction": f"Research: {user_request}",
-            "agent": "kimi", "expected_output": "Research findings", "dependencies": [],
+            "agent": "kimi", "expected_output": "Research findings",
+            "dependencies": list(range(1, step_num)),
         })
         step_num += 1
 
@@ -827,7 +959,8 @@ User Request: {user_request}
             fallback_steps.append({
                 "step_number": step_num, "step_type": "code",
                 "instruction": f"Write and execute code for: {user_request}",
-                "agent": "kimi", "expected_output": "Code output", "dependencies": [],
+                "agent": "kimi", "expected_output": "Code output",
+                "dependencies": list(range(1, step_num)),
             })
             step_num += 1
 
@@ -835,7 +968,8 @@ User Request: {user_request}
             fallback_steps.append({
                 "step_number": step_num, "step_type": "github",
                 "instruction": f"GitHub operation: {user_request[:200]}",
-                "agent": "kimi", "expected_output": "Repo operation result", "dependencies": [],
+                "agent": "kimi", "expected_output": "Repo operation result",
+                "dependencies": list(range(1, step_num)),
             })
             step_num += 1
 
@@ -845,14 +979,15 @@ User Request: {user_request}
             "agent": "kimi", "expected_output": "Final analysis",
             "dependencies": list(range(1, step_num)),
         })
+        parallel_groups = self._normalize_dependencies(fallback_steps)
 
         return ExecutionPlan(
             plan_id=f"plan_{uuid.uuid4().hex[:8]}",
             objective=user_request,
             steps=fallback_steps,
-            estimated_duration=len(fallback_steps) * 15,
+            estimated_duration=len(parallel_groups) * 15,
             reasoning="Automatic plan based on task analysis",
-            parallel_groups=[[s["step_number"]] for s in fallback_steps],
+            parallel_groups=parallel_groups,
         )
 
     # ------------------------------------------------------------------
@@ -873,7 +1008,7 @@ User Request: {user_request}
         elif step.step_type == StepType.CODE:
             result = await self._exec_code(step, context, previous_steps, sub_events)
         elif step.step_type == StepType.BROWSER:
-            result = await self._exec_browser(step, context, sub_events)
+            result = await self._exec_browser(step, context, sub_events, execution_id)
         elif step.step_type == StepType.GITHUB:
             # GitHub uses the streaming variant so credential_request reaches frontend before wait
             result = await self._exec_github(step, context, previous_steps, sub_events, execution_id)
@@ -1117,11 +1252,38 @@ print(result)
     # BROWSER — Playwright live browser + Browserless fallback
     # ------------------------------------------------------------------
 
-    async def _exec_browser(self, step, context, sub_events):
+    async def _run_browser_engine(self, engine, step, urls, is_interactive, sub_events):
+        """Run the CUA loop or a plain navigate + extract on the given engine."""
+        if is_interactive or not urls:
+            # Full CUA (Computer-Use Agent) loop with vision model
+            sub_events.append({"event": "execution_reasoning", "data": {
+                "chunk": "- Starting live browser automation with screen capture...\n"
+            }})
+            start_url = urls[0] if urls else None
+            return await engine.execute_task(
+                task=step.instruction,
+                start_url=start_url,
+                max_steps=15,
+                sub_events=sub_events,
+            )
+
+        # Simple text extraction: fast profile (no heavy resources, cached renders)
+        target_url = urls[0]
+        sub_events.append({"event": "execution_reasoning", "data": {
+            "chunk": f"- Opening {target_url[:80]} in live browser...\n"
+        }})
+        return await engine.navigate_and_extract(
+            url=target_url,
+            sub_events=sub_events,
+            screenshot=False,
+        )
+
+    async def _exec_browser(self, step, context, sub_events, execution_id: str = ""):
         """Execute browser operations with live screenshot streaming.
 
         Priority:
-        1. Playwright browser engine (interactive, screenshots streamed to frontend)
+        1. Playwright browser engine (interactive, screenshots streamed to frontend),
+           in the execution's own pooled browser context
         2. Browserless (simple content extraction fallback)
         3. LLM fallback (no browser available)
         """
@@ -1138,31 +1300,11 @@ print(result)
         # === PRIORITY 1: Playwright Browser Engine (live screenshots) ===
         if self.browser_engine:
             try:
-                if is_interactive or not urls:
-                    # Full CUA (Computer-Use Agent) loop with vision model
-                    sub_events.append({"event": "execution_reasoning", "data": {
-                        "chunk": "- Starting live browser automation with screen capture...\n"
-                    }})
-                    start_url = urls[0] if urls else None
-                    result = await self.browser_engine.execute_task(
-                        task=step.instruction,
-                        start_url=start_url,
-                        max_steps=15,
-                        sub_events=sub_events,
-                    )
-                    return result
-                else:
-                    # Simple navigate + extract with screenshot
-                    target_url = urls[0]
-                    sub_events.append({"event": "execution_reasoning", "data": {
-                        "chunk": f"- Opening {target_url[:80]} in live browser...\n"
-                    }})
-                    result = await self.browser_engine.navigate_and_extract(
-                        url=target_url,
-                        sub_events=sub_events,
-                    )
-                    return result
-
+                if hasattr(self.browser_engine, "session"):
+                    on_frame = self.frame_publisher(execution_id) if self.frame_publisher and execution_id else None
+                    async with self.browser_engine.session(execution_id, on_frame=on_frame) as engine:
+                        return await self._run_browser_engine(engine, step, urls, is_interactive, sub_events)
+                return await self._run_browser_engine(self.browser_engine, step, urls, is_interactive, sub_events)
             except Exception as e:
                 logger.error(f"Browser engine error: {e}")
                 sub_events.append({"event": "execution_reasoning", "data": {
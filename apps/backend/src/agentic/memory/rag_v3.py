@@ -4,9 +4,10 @@ RAG V3 - Retrieval Augmented Generation System
 Enhanced RAG system with:
 - Document chunking with overlap
 - Multiple embedding providers (Kimi, OpenAI-compatible)
+- Embedding cache (memory LRU + SQLite) and a coalescing embedding batcher
 - Vector similarity search via Supabase pgvector
 - Contextual retrieval with conversation awareness
-- Fallback to in-memory vector store
+- Fallback to in-memory NumPy vector store (optional hnswlib ANN index)
 
 Integrates with existing Supabase client from main.py.
 """
@@ -15,17 +16,43 @@ import asyncio
 import hashlib
 import json
 import logging
-import math
+import os
 import re
+import sqlite3
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import httpx
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Exact search is used below this many live chunks (or when hnswlib is missing)
+RAG_VECTOR_ANN_MIN_CHUNKS = int(os.getenv("RAG_VECTOR_ANN_MIN_CHUNKS", "50000"))
+RAG_VECTOR_ANN_EF = int(os.getenv("RAG_VECTOR_ANN_EF", "128"))
+# Compact once tombstoned rows exceed this fraction of the matrix
+RAG_VECTOR_COMPACT_RATIO = float(os.getenv("RAG_VECTOR_COMPACT_RATIO", "0.25"))
+
+# Embedding cache (memory LRU + SQLite tier; empty path disables the disk tier)
+RAG_EMBED_CACHE_SIZE = int(os.getenv("RAG_EMBED_CACHE_SIZE", "20000"))
+RAG_EMBED_CACHE_PATH = os.getenv("RAG_EMBED_CACHE_PATH", "/tmp/mcleuker_embedding_cache.db")
+# Embedding batcher: coalescing window, provider batch size, concurrent provider calls
+RAG_EMBED_BATCH_WINDOW_MS = float(os.getenv("RAG_EMBED_BATCH_WINDOW_MS", "5"))
+RAG_EMBED_MAX_BATCH = int(os.getenv("RAG_EMBED_MAX_BATCH", "64"))
+RAG_EMBED_MAX_CONCURRENCY = int(os.getenv("RAG_EMBED_MAX_CONCURRENCY", "4"))
+# Retries (exponential backoff, Retry-After honoured) on 429 / 5xx / network errors
+RAG_EMBED_RETRIES = int(os.getenv("RAG_EMBED_RETRIES", "2"))
+
 
 # ---------------------------------------------------------------------------
 # Document model
@@ -69,11 +96,19 @@ class SearchResult:
 
 class EmbeddingProvider:
     """Base class for embedding providers."""
+    model: str = ""
+
     async def embed(self, text: str) -> List[float]:
         raise NotImplementedError
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        return [await self.embed(t) for t in texts]
+        semaphore = asyncio.Semaphore(RAG_EMBED_MAX_CONCURRENCY)
+
+        async def one(text: str) -> List[float]:
+            async with semaphore:
+                return await self.embed(text)
+
+        return list(await asyncio.gather(*(one(t) for t in texts)))
 
 
 class KimiEmbeddingProvider(EmbeddingProvider):
@@ -107,17 +142,57 @@ class KimiEmbeddingProvider(EmbeddingProvider):
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         async with httpx.AsyncClient(timeout=60) as client:
+            try:
+                return await self._embed_split(client, texts)
+            except Exception as e:
+                logger.error(f"Batch embedding of {len(texts)} texts failed: {e}")
+                # Return zero vectors as fallback
+                return [[0.0] * 1536 for _ in texts]
+
+    async def _embed_split(self, client: httpx.AsyncClient, texts: List[str]) -> List[List[float]]:
+        """Embed texts, halving the batch only when the provider rejects the input.
+
+        Halves run one after the other on the same client, so a split batch
+        still holds a single provider slot.
+        """
+        try:
+            return await self._post_embeddings(client, texts)
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 429 or not 400 <= status < 500:
+                raise
+            if len(texts) == 1:
+                logger.warning(f"Embedding input rejected ({status}), using zero vector")
+                return [[0.0] * 1536]
+            logger.warning(f"Batch embedding of {len(texts)} texts rejected ({status}), splitting")
+            mid = len(texts) // 2
+            left = await self._embed_split(client, texts[:mid])
+            return left + await self._embed_split(client, texts[mid:])
+
+    async def _post_embeddings(self, client: httpx.AsyncClient, texts: List[str]) -> List[List[float]]:
+        attempt, delay = 0, 0.5
+        while True:
+            last = attempt >= RAG_EMBED_RETRIES
             try:
                 resp = await client.post(
                     f"{self.base_url}/embeddings",
                     headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
                     json={"model": self.model, "input": texts},
                 )
-                resp.raise_for_status()
-                data = resp.json()
-                return [d["embedding"] for d in sorted(data["data"], key=lambda x: x["index"])]
-            except Exception:
-                return [await self.embed(t) for t in texts]
+            except httpx.TransportError:
+                if last:
+                    raise
+            else:
+                if last or (resp.status_code != 429 and resp.status_code < 500):
+                    resp.raise_for_status()
+                    data = resp.json()
+                    return [d["embedding"] for d in sorted(data["data"], key=lambda x: x["index"])]
+                retry_after = resp.headers.get("retry-after", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            attempt += 1
+            await asyncio.sleep(min(delay, 10.0))
+            delay *= 2
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
@@ -135,6 +210,221 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
             logger.error(f"OpenAI embedding failed: {e}")
             return [0.0] * 1536
 
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        try:
+            resp = await self.client.embeddings.create(model=self.model, input=texts)
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+        except Exception as e:
+            logger.warning(f"OpenAI batch embedding failed ({e}), embedding individually")
+            return await super().embed_batch(texts)
+
+
+# ---------------------------------------------------------------------------
+# Embedding cache and batcher
+# ---------------------------------------------------------------------------
+
+class EmbeddingCache:
+    """Embeddings keyed by (model, sha256(text)): in-memory LRU over a SQLite tier."""
+
+    def __init__(self, max_entries: int = RAG_EMBED_CACHE_SIZE, path: Optional[str] = RAG_EMBED_CACHE_PATH):
+        self.max_entries = max_entries
+        self.path = path or None
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_errors": 0}
+
+    @staticmethod
+    def key(model: str, text: str) -> Tuple[str, str]:
+        return model, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_memory(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    def put_memory(self, key: Tuple[str, str], vector: List[float]):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[float]]:
+        found = {}
+        missing = []
+        for key in keys:
+            vector = self.get_memory(key)
+            if vector is not None:
+                found[key] = vector
+                self._stats["memory_hits"] += 1
+            else:
+                missing.append(key)
+        if missing and self.path:
+            try:
+                from_disk = await asyncio.to_thread(self._read_disk, missing)
+            except Exception as e:
+                self._stats["disk_errors"] += 1
+                logger.debug(f"Embedding cache read failed: {e}")
+                from_disk = {}
+            for key, vector in from_disk.items():
+                self.put_memory(key, vector)
+            found.update(from_disk)
+            self._stats["disk_hits"] += len(from_disk)
+        self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    async def put_many(self, items: Dict[Tuple[str, str], List[float]]):
+        # Zero vectors are provider failure fallbacks, never cache them
+        items = {k: v for k, v in items.items() if any(v)}
+        for key, vector in items.items():
+            self.put_memory(key, vector)
+        if items and self.path:
+            try:
+                await asyncio.to_thread(self._write_disk, items)
+            except Exception as e:
+                self._stats["disk_errors"] += 1
+                logger.debug(f"Embedding cache write failed: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, text_hash)) WITHOUT ROWID"
+            )
+        return self._db
+
+    def _read_disk(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[float]]:
+        found = {}
+        with self._db_lock:
+            db = self._connect()
+            for model in {k[0] for k in keys}:
+                hashes = [k[1] for k in keys if k[0] == model]
+                for i in range(0, len(hashes), 500):
+                    part = hashes[i:i + 500]
+                    rows = db.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                        f"AND text_hash IN ({','.join('?' * len(part))})",
+                        [model, *part],
+                    ).fetchall()
+                    for text_hash, blob in rows:
+                        found[(model, text_hash)] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _write_disk(self, items: Dict[Tuple[str, str], List[float]]):
+        rows = [(m, h, np.asarray(v, dtype=np.float32).tobytes()) for (m, h), v in items.items()]
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)", rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+        hits = lookups - self._stats["misses"]
+        return {"memory_entries": len(self._memory), "disk_path": self.path,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0, **self._stats}
+
+
+class EmbeddingBatcher(EmbeddingProvider):
+    """Caching, coalescing front for an EmbeddingProvider.
+
+    Concurrent `embed` calls (e.g. searches from different requests) are held
+    for RAG_EMBED_BATCH_WINDOW_MS and sent as one provider batch. Identical
+    texts share one slot; cached texts never reach the provider. At most
+    RAG_EMBED_MAX_CONCURRENCY provider calls run at once.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        cache: Optional[EmbeddingCache] = None,
+        window_ms: float = RAG_EMBED_BATCH_WINDOW_MS,
+        max_batch: int = RAG_EMBED_MAX_BATCH,
+        max_concurrency: int = RAG_EMBED_MAX_CONCURRENCY,
+    ):
+        self.provider = provider
+        self.model = getattr(provider, "model", "") or type(provider).__name__
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self._stats = {"requested": 0, "provider_calls": 0, "provider_texts": 0, "coalesced": 0}
+
+    async def embed(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self._stats["requested"] += len(texts)
+        keys = [EmbeddingCache.key(self.model, t) for t in texts]
+        cached = await self.cache.get_many(list(dict.fromkeys(keys)))
+
+        loop = asyncio.get_running_loop()
+        waiting: Dict[Tuple[str, str], asyncio.Future] = {}
+        for key, text in zip(keys, texts):
+            if key in cached or key in waiting:
+                continue
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._stats["coalesced"] += 1
+                waiting[key] = pending[1]
+                continue
+            future = loop.create_future()
+            self._pending[key] = (text, future)
+            waiting[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        if waiting:
+            # Futures are shared with other callers: a cancelled caller must
+            # not cancel them
+            vectors = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            cached.update(zip(waiting.keys(), vectors))
+        return [cached[key] for key in keys]
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        items = list(batch.items())
+        for i in range(0, len(items), self.max_batch):
+            task = asyncio.create_task(self._run_batch(items[i:i + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items: List[Tuple[Tuple[str, str], Tuple[str, asyncio.Future]]]):
+        texts = [text for _, (text, _) in items]
+        try:
+            async with self._semaphore:
+                self._stats["provider_calls"] += 1
+                self._stats["provider_texts"] += len(texts)
+                vectors = await self.provider.embed_batch(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"provider returned {len(vectors)} embeddings for {len(texts)} texts")
+        except Exception as e:
+            for _, (_, future) in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, (_, future)), vector in zip(items, vectors):
+            if not future.done():
+                future.set_result(vector)
+        await self.cache.put_many({key: vector for (key, _), vector in zip(items, vectors)})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"model": self.model, "pending": len(self._pending), **self._stats,
+                "cache": self.cache.get_stats()}
+
 
 # ---------------------------------------------------------------------------
 # Text chunking
@@ -184,34 +474,242 @@ def chunk_text(
 # ---------------------------------------------------------------------------
 
 class InMemoryVectorStore:
-    """Simple in-memory vector store using cosine similarity."""
+    """In-memory vector store backed by a contiguous float32 matrix.
+
+    Rows are L2-normalized on insert, so a query is one matrix-vector product
+    followed by an argpartition top-k. Deleted rows are tombstoned and dropped
+    on compaction. Above RAG_VECTOR_ANN_MIN_CHUNKS live rows, searches go
+    through an hnswlib index when hnswlib is installed.
+    """
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024):
+        self.dim = dim
+        self._initial_capacity = initial_capacity
+        self._matrix: Optional[np.ndarray] = None  # (capacity, dim), rows [0, _size) in use
+        self._alive = np.zeros(0, dtype=bool)
+        self._chunks: List[Optional[DocumentChunk]] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._size = 0
+        self._tombstones = 0
+        self._ann = None
+        self._ann_dirty = True
+
+    def __len__(self) -> int:
+        return self._size - self._tombstones
 
-    def __init__(self):
-        self._documents: List[DocumentChunk] = []
+    # -- Writes ----------------------------------------------------------------
 
     def add(self, chunk: DocumentChunk):
-        self._documents.append(chunk)
+        self.add_batch([chunk])
+
+    def add_batch(self, chunks: List[DocumentChunk]):
+        """Insert (or replace, by chunk id) chunks that carry an embedding."""
+        chunks = [c for c in chunks if c.embedding is not None and len(c.embedding)]
+        if not chunks:
+            return
+        if self.dim is None:
+            self.dim = len(chunks[0].embedding)
+        valid = [c for c in chunks if len(c.embedding) == self.dim]
+        if len(valid) < len(chunks):
+            logger.warning(f"Skipped {len(chunks) - len(valid)} chunks with embedding dim != {self.dim}")
+        valid = list({c.id: c for c in valid}.values())
+        if not valid:
+            return
+
+        vectors = self._normalize(np.asarray([c.embedding for c in valid], dtype=np.float32))
+        for c in valid:
+            if c.id in self._row_by_id:
+                self.remove(c.id)
+        self._ensure_capacity(self._size + len(valid))
+        start = self._size
+        self._matrix[start:start + len(valid)] = vectors
+        self._alive[start:start + len(valid)] = True
+        for offset, c in enumerate(valid):
+            self._chunks.append(c)
+            self._row_by_id[c.id] = start + offset
+        self._size += len(valid)
+
+        if self._ann is not None and not self._ann_dirty:
+            try:
+                if self._ann.get_max_elements() < self._size:
+                    self._ann.resize_index(max(self._size, self._ann.get_max_elements() * 2))
+                self._ann.add_items(vectors, np.arange(start, self._size))
+            except Exception as e:
+                logger.warning(f"ANN index update failed, will rebuild: {e}")
+                self._ann_dirty = True
+
+    def remove(self, chunk_id: str) -> bool:
+        """Tombstone a chunk; compacts once tombstones pass RAG_VECTOR_COMPACT_RATIO."""
+        row = self._row_by_id.pop(chunk_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._chunks[row] = None
+        self._tombstones += 1
+        if self._ann is not None and not self._ann_dirty:
+            try:
+                self._ann.mark_deleted(row)
+            except Exception:
+                self._ann_dirty = True
+        if self._tombstones > max(64, self._size * RAG_VECTOR_COMPACT_RATIO):
+            self.compact()
+        return True
+
+    def remove_source(self, source: str) -> int:
+        ids = [c.id for c in self._chunks if c is not None and c.source == source]
+        for chunk_id in ids:
+            self.remove(chunk_id)
+        return len(ids)
+
+    def compact(self):
+        """Drop tombstoned rows and re-pack the matrix."""
+        if not self._tombstones:
+            return
+        keep = np.flatnonzero(self._alive[:self._size])
+        capacity = max(self._initial_capacity, len(keep))
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(keep)] = self._matrix[keep]
+        self._matrix = matrix
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:len(keep)] = True
+        self._chunks = [self._chunks[i] for i in keep]
+        self._row_by_id = {c.id: i for i, c in enumerate(self._chunks)}
+        self._size = len(keep)
+        self._tombstones = 0
+        self._ann_dirty = True
+
+    def _ensure_capacity(self, needed: int):
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(self._initial_capacity, capacity * 2, needed)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        alive = np.zeros(new_capacity, dtype=bool)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+            alive[:self._size] = self._alive[:self._size]
+        self._matrix = matrix  # Also turns a read-only memmap into a writable copy
+        self._alive = alive
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0  # Zero (fallback) embeddings keep similarity 0
+        return vectors / norms
+
+    # -- Search ----------------------------------------------------------------
 
     def search(self, query_embedding: List[float], top_k: int = 5, threshold: float = 0.5) -> List[SearchResult]:
+        return self.search_batch([query_embedding], top_k, threshold)[0]
+
+    def search_batch(
+        self, query_embeddings: List[List[float]], top_k: int = 5, threshold: float = 0.5,
+    ) -> List[List[SearchResult]]:
+        """Search several queries with a single matrix product."""
+        if not query_embeddings:
+            return []
+        live = len(self)
+        if not live or top_k <= 0 or any(len(q) != self.dim for q in query_embeddings):
+            return [[] for _ in query_embeddings]
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(top_k, live)
+
+        if live >= RAG_VECTOR_ANN_MIN_CHUNKS and HNSWLIB_AVAILABLE:
+            hits = self._search_ann(queries, k)
+            if hits is not None:
+                return [self._results(rows, scores, threshold) for rows, scores in hits]
+
+        scores = queries @ self._matrix[:self._size].T  # (queries, rows)
+        if self._tombstones:
+            scores[:, ~self._alive[:self._size]] = -np.inf
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self._size), (len(queries), self._size))
+        results = []
+        for qi in range(len(queries)):
+            rows = top[qi]
+            row_scores = scores[qi, rows]
+            order = np.argsort(-row_scores)
+            results.append(self._results(rows[order], row_scores[order], threshold))
+        return results
+
+    def _results(self, rows, scores, threshold: float) -> List[SearchResult]:
         results = []
-        for doc in self._documents:
-            if doc.embedding:
-                sim = self._cosine_similarity(query_embedding, doc.embedding)
-                if sim >= threshold:
-                    results.append(SearchResult(chunk=doc, similarity=sim))
-        results.sort(key=lambda r: r.similarity, reverse=True)
-        return results[:top_k]
+        for row, score in zip(rows, scores):
+            if score < threshold:
+                break
+            chunk = self._chunks[int(row)]
+            if chunk is not None:
+                results.append(SearchResult(chunk=chunk, similarity=float(score)))
+        return results
 
-    @staticmethod
-    def _cosine_similarity(a: List[float], b: List[float]) -> float:
-        if len(a) != len(b):
-            return 0.0
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = math.sqrt(sum(x * x for x in a))
-        norm_b = math.sqrt(sum(x * x for x in b))
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return dot / (norm_a * norm_b)
+    def _search_ann(self, queries: np.ndarray, k: int):
+        try:
+            if self._ann is None or self._ann_dirty:
+                self._build_ann()
+            self._ann.set_ef(max(RAG_VECTOR_ANN_EF, k * 2))
+            labels, distances = self._ann.knn_query(queries, k=k)
+            return [(labels[i], 1.0 - distances[i]) for i in range(len(queries))]
+        except Exception as e:
+            logger.warning(f"ANN search failed, using exact search: {e}")
+            self._ann = None
+            return None
+
+    def _build_ann(self):
+        live_rows = np.flatnonzero(self._alive[:self._size])
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.init_index(max_elements=max(self._size, 1024), ef_construction=200, M=16)
+        index.add_items(self._matrix[live_rows], live_rows)
+        self._ann = index
+        self._ann_dirty = False
+        logger.info(f"Built ANN index over {len(live_rows)} chunks")
+
+    # -- Persistence -----------------------------------------------------------
+
+    def save(self, directory: str):
+        """Write vectors.npy (live rows) and chunks.json to `directory`."""
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        matrix = self._matrix[:self._size] if self._matrix is not None else np.zeros((0, self.dim or 0), np.float32)
+        np.save(os.path.join(directory, "vectors.npy"), matrix)
+        chunks = [
+            {**c.to_dict(), "created_at": c.created_at.isoformat()}
+            for c in self._chunks
+        ]
+        with open(os.path.join(directory, "chunks.json"), "w") as f:
+            json.dump({"dim": self.dim, "chunks": chunks}, f, default=str)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "InMemoryVectorStore":
+        """Load a saved store; with mmap the matrix is paged in lazily until the first write."""
+        with open(os.path.join(directory, "chunks.json")) as f:
+            saved = json.load(f)
+        matrix = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r" if mmap else None)
+        store = cls(dim=saved["dim"])
+        chunks = []
+        for i, row in enumerate(saved["chunks"]):
+            created_at = row.pop("created_at", None)
+            chunk = DocumentChunk(**row)
+            if created_at:
+                chunk.created_at = datetime.fromisoformat(created_at)
+            chunk.embedding = matrix[i]  # Normalized view, no copy
+            chunks.append(chunk)
+        store._matrix = matrix
+        store._alive = np.ones(len(chunks), dtype=bool)
+        store._chunks = chunks
+        store._row_by_id = {c.id: i for i, c in enumerate(chunks)}
+        store._size = len(chunks)
+        return store
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": len(self),
+            "tombstones": self._tombstones,
+            "dim": self.dim,
+            "capacity": 0 if self._matrix is None else self._matrix.shape[0],
+            "ann": "hnswlib" if self._ann is not None else None,
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -235,7 +733,11 @@ class RAGSystemV3:
         chunk_overlap: int = 200,
         top_k: int = 5,
         similarity_threshold: float = 0.5,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ):
+        # Every embedding goes through the cache and the coalescing batcher
+        if not isinstance(embedding_provider, EmbeddingBatcher):
+            embedding_provider = EmbeddingBatcher(embedding_provider, cache=embedding_cache)
         self.embedding_provider = embedding_provider
         self.supabase = supabase_client
         self.chunk_size = chunk_size
@@ -283,8 +785,7 @@ class RAGSystemV3:
         if self._use_supabase:
             await self._store_supabase(doc_chunks, user_id, conversation_id)
         else:
-            for c in doc_chunks:
-                self._memory_store.add(c)
+            self._memory_store.add_batch(doc_chunks)
 
         logger.info(f"Added {len(doc_chunks)} chunks from document (source={source})")
         return [c.id for c in doc_chunks]
@@ -306,6 +807,13 @@ class RAGSystemV3:
         else:
             return self._memory_store.search(query_embedding, k, self.similarity_threshold)
 
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "supabase": self._use_supabase,
+            "embeddings": self.embedding_provider.get_stats(),
+            "memory_store": self._memory_store.get_stats(),
+        }
+
     async def get_context_for_query(
         self,
         query: str,
@@ -364,8 +872,7 @@ class RAGSystemV3:
         except Exception as e:
             logger.error(f"Supabase store failed: {e}")
             # Fallback to memory
-            for c in chunks:
-                self._memory_store.add(c)
+            self._memory_store.add_batch(chunks)
 
     async def _search_supabase(
         self,
@@ -11,16 +11,28 @@ Handles:
 - Reasoning/thinking content
 - File generation events
 - Error and completion events
+- Binary screenshot frames (raw JPEG/WebP with a small header) for clients
+  that opt in with `?frames=binary` or a `{"type": "frames", "mode": "binary"}`
+  message; other clients keep receiving base64 `browser_screenshot` events
 """
 
 import asyncio
+import base64
 import json
 import logging
-from typing import Dict, Optional, Set, Any
+import time
+from typing import Callable, Dict, Optional, Set, Any
 from fastapi import WebSocket, WebSocketDisconnect
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+try:
+    from ..core.broadcast_hub import BroadcastHub
+    from ..core.frame_stream import ScreenshotChannel, prune_recordings
+except ImportError:  # Loaded as top-level "agentic" package (src/ on sys.path)
+    from core.broadcast_hub import BroadcastHub
+    from core.frame_stream import ScreenshotChannel, prune_recordings
+
 logger = logging.getLogger(__name__)
 
 
@@ -119,6 +131,8 @@ class ExecutionWebSocketManager:
     - Automatic reconnection handling
     - Heartbeat/ping-pong
     - Message queuing for offline clients
+    - Serialize-once fan-out: each socket has its own bounded queue and writer
+      task (see BroadcastHub), so a slow client never stalls the others
     """
     
     def __init__(self):
@@ -128,6 +142,11 @@ class ExecutionWebSocketManager:
         self.message_queues: Dict[str, list] = {}
         # Track connection health
         self.connection_heartbeats: Dict[WebSocket, datetime] = {}
+        self.hub = BroadcastHub()
+        # Sockets that receive screenshots as binary frames
+        self.binary_frame_clients: Set[WebSocket] = set()
+        # execution_id -> screenshot channel (dedup, pacing, recording)
+        self.frame_channels: Dict[str, ScreenshotChannel] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
     
     async def start(self):
@@ -140,7 +159,12 @@ class ExecutionWebSocketManager:
         if self._cleanup_task:
             self._cleanup_task.cancel()
         
+        for channel in list(self.frame_channels.values()):
+            await channel.close()
+        self.frame_channels.clear()
+
         # Close all connections
+        await self.hub.close_all()
         for execution_id, websockets in self.connections.items():
             for ws in websockets:
                 try:
@@ -152,7 +176,7 @@ class ExecutionWebSocketManager:
         self.message_queues.clear()
         logger.info("WebSocket manager stopped")
     
-    async def connect(self, websocket: WebSocket, execution_id: str):
+    async def connect(self, websocket: WebSocket, execution_id: str, binary_frames: bool = False):
         """Accept a new WebSocket connection."""
         await websocket.accept()
         
@@ -161,16 +185,19 @@ class ExecutionWebSocketManager:
         
         self.connections[execution_id].add(websocket)
         self.connection_heartbeats[websocket] = datetime.now()
+        self.hub.register(websocket)
+        if binary_frames:
+            self.binary_frame_clients.add(websocket)
         
         # Send any queued messages
         if execution_id in self.message_queues:
             for message in self.message_queues[execution_id]:
-                try:
-                    await websocket.send_json(message)
-                except Exception:
-                    break
+                self.hub.send(websocket, message, scope=execution_id)
             # Clear queue after sending
             del self.message_queues[execution_id]
+
+        # Late joiners start from the current screen
+        self._send_latest_frame(websocket, execution_id)
         
         logger.info(f"WebSocket connected for execution {execution_id}. Total connections: {len(self.connections[execution_id])}")
     
@@ -182,6 +209,8 @@ class ExecutionWebSocketManager:
                 del self.connections[execution_id]
         
         self.connection_heartbeats.pop(websocket, None)
+        self.binary_frame_clients.discard(websocket)
+        await self.hub.unregister(websocket)
         
         try:
             await websocket.close()
@@ -225,23 +254,103 @@ class ExecutionWebSocketManager:
     async def broadcast_screenshot(
         self,
         execution_id: str,
-        image_base64: str,
+        image_base64: str = "",
         url: str = "",
         title: str = "",
         action: str = "",
         step: int = 0,
+        image_bytes: Optional[bytes] = None,
+        final: bool = False,
     ):
-        """Broadcast a screenshot to all connected clients."""
-        message = ScreenshotMessage(
-            image=image_base64,
-            url=url,
-            title=title,
-            action=action,
-            step=step,
-        ).to_dict()
-        
-        await self._broadcast(execution_id, message)
-    
+        """Broadcast a screenshot to all connected clients.
+
+        Pass raw `image_bytes` when available; `image_base64` is accepted for
+        existing callers and decoded once.
+        """
+        if image_bytes is None:
+            if not image_base64:
+                return
+            try:
+                image_bytes = base64.b64decode(image_base64)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Dropping undecodable screenshot for {execution_id}: {e}")
+                return
+        await self.publish_frame(execution_id, image_bytes, url=url, title=title,
+                                 action=action, step=step, final=final)
+
+    # ========================================================================
+    # Binary screenshot frames
+    # ========================================================================
+
+    async def publish_frame(self, execution_id: str, image: bytes, final: bool = False, **meta) -> bool:
+        """Offer a raw JPEG/WebP frame. Near-duplicates and frames that exceed
+        the backpressure-adjusted rate are skipped. Returns True if sent now."""
+        return await self._frame_channel(execution_id).publish(image, meta, final=final)
+
+    def frame_publisher(self, execution_id: str) -> Callable:
+        """Engine on_frame callback: raw frames go straight to the execution's
+        channel (no base64). Returns the capture quality to use next."""
+        async def publish(image: bytes, url: str = "", title: str = "",
+                          meta: Optional[Dict[str, Any]] = None) -> Optional[int]:
+            meta = dict(meta or {})
+            final = bool(meta.pop("final", False))
+            url = meta.pop("url", None) or url
+            title = meta.pop("title", None) or title
+            await self.publish_frame(execution_id, image, final=final, url=url, title=title, **meta)
+            return self.frame_quality(execution_id)
+        return publish
+
+    def frame_quality(self, execution_id: str) -> Optional[int]:
+        """Capture quality suggested by client backpressure (None if no channel yet)."""
+        channel = self.frame_channels.get(execution_id)
+        return channel.quality if channel else None
+
+    def set_frame_mode(self, websocket: WebSocket, execution_id: str, binary: bool):
+        """Switch a socket between binary frames and base64 JSON screenshots."""
+        if binary:
+            self.binary_frame_clients.add(websocket)
+        else:
+            self.binary_frame_clients.discard(websocket)
+        self._send_latest_frame(websocket, execution_id)
+
+    async def close_frame_channel(self, execution_id: str):
+        channel = self.frame_channels.pop(execution_id, None)
+        if channel:
+            await channel.close()
+
+    def _frame_channel(self, execution_id: str) -> ScreenshotChannel:
+        channel = self.frame_channels.get(execution_id)
+        if channel is None:
+            channel = ScreenshotChannel(
+                execution_id,
+                self.hub,
+                targets=lambda: self._frame_targets(execution_id),
+                to_json=lambda image_b64, meta: ScreenshotMessage(
+                    image=image_b64,
+                    url=meta.get("url", ""),
+                    title=meta.get("title", ""),
+                    action=meta.get("action", ""),
+                    step=meta.get("step", 0),
+                ).to_dict(),
+            )
+            self.frame_channels[execution_id] = channel
+        return channel
+
+    def _frame_targets(self, execution_id: str):
+        sockets = self.connections.get(execution_id, set())
+        binary = [ws for ws in sockets if ws in self.binary_frame_clients]
+        legacy = [ws for ws in sockets if ws not in self.binary_frame_clients]
+        return binary, legacy
+
+    def _send_latest_frame(self, websocket: WebSocket, execution_id: str):
+        channel = self.frame_channels.get(execution_id)
+        if not channel or channel.latest_frame is None:
+            return
+        if websocket in self.binary_frame_clients:
+            self.hub.send(websocket, channel.latest_frame, "browser_screenshot", execution_id)
+        else:
+            self.hub.send(websocket, channel.json_message(), "browser_screenshot", execution_id)
+
     async def broadcast_step_update(
         self,
         execution_id: str,
@@ -282,6 +391,8 @@ class ExecutionWebSocketManager:
                 "timestamp": datetime.now().isoformat(),
             }
         }
+        # Flush a held final frame before the completion event
+        await self.close_frame_channel(execution_id)
         await self._broadcast(execution_id, message)
     
     async def broadcast_error(self, execution_id: str, error: str):
@@ -334,14 +445,13 @@ class ExecutionWebSocketManager:
                 self.message_queues[execution_id] = self.message_queues[execution_id][-100:]
             return
         
-        disconnected = set()
-        for ws in self.connections[execution_id]:
-            try:
-                await ws.send_json(message)
-                self.connection_heartbeats[ws] = datetime.now()
-            except Exception as e:
-                logger.warning(f"Failed to send to WebSocket: {e}")
-                disconnected.add(ws)
+        # Encoded once; each socket's writer task sends it independently
+        targets = list(self.connections[execution_id])
+        disconnected = set(self.hub.publish(targets, message, scope=execution_id))
+        now = datetime.now()
+        for ws in targets:
+            if ws not in disconnected:
+                self.connection_heartbeats[ws] = now
         
         # Clean up disconnected clients
         for ws in disconnected:
@@ -366,12 +476,27 @@ class ExecutionWebSocketManager:
                     for ws in stale:
                         logger.info(f"Removing stale WebSocket connection for {execution_id}")
                         await self.disconnect(ws, execution_id)
+
+                # Finish screenshot channels of executions that went quiet
+                idle_cutoff = time.monotonic() - 600
+                for execution_id, channel in list(self.frame_channels.items()):
+                    if channel.last_activity < idle_cutoff:
+                        await self.close_frame_channel(execution_id)
+                await asyncio.to_thread(prune_recordings)
                         
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Cleanup loop error: {e}")
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Fan-out metrics, including per-connection lag and screenshot frames."""
+        return {
+            **self.hub.get_stats(),
+            "binary_frame_clients": len(self.binary_frame_clients),
+            "frames": {eid: ch.stats() for eid, ch in list(self.frame_channels.items())[:20]},
+        }
+
     def get_connection_count(self, execution_id: str = None) -> int:
         """Get the number of active connections."""
         if execution_id:
@@ -9,9 +9,12 @@ Features:
 - Execution stream lifecycle (start / step / screenshot / error / end)
 - Channel-based subscriptions
 - Automatic cleanup of stale sessions
+- Serialize-once fan-out with per-session outbound queues (BroadcastHub)
+- Binary screenshot frames for sessions that send {"type": "frames", "mode": "binary"}
 """
 
 import asyncio
+import base64
 import json
 import logging
 import time
@@ -22,6 +25,13 @@ from uuid import uuid4
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+try:
+    from ...core.broadcast_hub import BroadcastHub
+    from ...core.frame_stream import ScreenshotChannel
+except ImportError:  # Loaded as top-level "api" package (src/ on sys.path)
+    from core.broadcast_hub import BroadcastHub
+    from core.frame_stream import ScreenshotChannel
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +50,7 @@ class WebSocketSessionV2:
     connected_at: datetime = field(default_factory=datetime.utcnow)
     last_ping: datetime = field(default_factory=datetime.utcnow)
     is_alive: bool = True
+    binary_frames: bool = False
 
 
 # ---------------------------------------------------------------------------
@@ -63,6 +74,8 @@ class WebSocketManagerV2:
         self._heartbeat_interval = heartbeat_interval
         self._heartbeat_timeout = heartbeat_timeout
         self._cleanup_task: Optional[asyncio.Task] = None
+        self.hub = BroadcastHub()
+        self._frame_channels: Dict[str, ScreenshotChannel] = {}
         logger.info("WebSocketManagerV2 initialized")
 
     async def start(self):
@@ -75,6 +88,10 @@ class WebSocketManagerV2:
         if self._cleanup_task:
             self._cleanup_task.cancel()
             self._cleanup_task = None
+        for channel in list(self._frame_channels.values()):
+            await channel.close()
+        self._frame_channels.clear()
+        await self.hub.close_all()
 
     # -- Connection lifecycle --------------------------------------------------
 
@@ -92,6 +109,7 @@ class WebSocketManagerV2:
             conversation_id=conversation_id,
         )
         self._sessions[session.session_id] = session
+        self.hub.register(websocket, on_close=lambda _conn: setattr(session, "is_alive", False))
 
         # Subscribe to conversation channel
         if conversation_id:
@@ -129,6 +147,8 @@ class WebSocketManagerV2:
                 del self._conversation_sessions[conv_id]
 
         session.is_alive = False
+        if session.websocket:
+            await self.hub.unregister(session.websocket)
         logger.info(f"WS V2 disconnected: {session_id}")
 
     # -- Message handling ------------------------------------------------------
@@ -166,6 +186,9 @@ class WebSocketManagerV2:
             channel = data.get("channel", "")
             session.subscriptions.discard(channel)
 
+        elif msg_type == "frames":
+            session.binary_frames = data.get("mode") == "binary"
+
     # -- Execution streaming ---------------------------------------------------
 
     async def start_execution_stream(
@@ -209,14 +232,40 @@ class WebSocketManagerV2:
         }
         await self._broadcast_to_execution(execution_id, payload)
 
-    async def stream_screenshot(self, execution_id: str, screenshot_b64: str, metadata: Optional[Dict] = None):
-        payload = {
-            "type": "execution.screenshot",
-            "execution_id": execution_id,
-            "screenshot": screenshot_b64,
-            "metadata": metadata or {},
-        }
-        await self._broadcast_to_execution(execution_id, payload)
+    async def stream_screenshot(self, execution_id: str, screenshot_b64: str = "", metadata: Optional[Dict] = None,
+                                image_bytes: Optional[bytes] = None, final: bool = False):
+        """Stream a screenshot (binary frame or base64 event, per session mode)."""
+        if image_bytes is None:
+            if not screenshot_b64:
+                return
+            image_bytes = base64.b64decode(screenshot_b64)
+        await self._frame_channel(execution_id).publish(image_bytes, metadata or {}, final=final)
+
+    def _frame_channel(self, execution_id: str) -> ScreenshotChannel:
+        channel = self._frame_channels.get(execution_id)
+        if channel is None:
+            channel = ScreenshotChannel(
+                execution_id,
+                self.hub,
+                targets=lambda: self._frame_targets(execution_id),
+                to_json=lambda image_b64, meta: {
+                    "type": "execution.screenshot",
+                    "execution_id": execution_id,
+                    "screenshot": image_b64,
+                    "metadata": {k: v for k, v in meta.items() if k != "execution_id"},
+                },
+            )
+            self._frame_channels[execution_id] = channel
+        return channel
+
+    def _frame_targets(self, execution_id: str):
+        session_ids = self._execution_sessions.get(execution_id) or set(self._sessions.keys())
+        binary, legacy = [], []
+        for sid in list(session_ids):
+            session = self._sessions.get(sid)
+            if session and session.websocket and session.is_alive:
+                (binary if session.binary_frames else legacy).append(session.websocket)
+        return binary, legacy
 
     async def stream_error(self, execution_id: str, error: str):
         payload = {"type": "execution.error", "execution_id": execution_id, "error": error}
@@ -229,6 +278,9 @@ class WebSocketManagerV2:
             "success": success,
             "timestamp": datetime.utcnow().isoformat(),
         }
+        channel = self._frame_channels.pop(execution_id, None)
+        if channel:
+            await channel.close()
         await self._broadcast_to_execution(execution_id, payload)
         # Clean up
         self._execution_sessions.pop(execution_id, None)
@@ -236,15 +288,21 @@ class WebSocketManagerV2:
     # -- Broadcasting ----------------------------------------------------------
 
     async def _send(self, session: WebSocketSessionV2, data: Dict[str, Any]):
-        """Send data to a single session."""
+        """Queue data for a single session (sent by its writer task)."""
         if not session.websocket or not session.is_alive:
             return
-        try:
-            await session.websocket.send_json(data)
-        except Exception as e:
-            logger.warning(f"Failed to send to {session.session_id}: {e}")
+        if not self.hub.send(session.websocket, data):
             session.is_alive = False
 
+    def _publish(self, session_ids, data: Dict[str, Any], execution_id: Optional[str] = None):
+        """Encode once and queue for every live session in session_ids."""
+        sockets = []
+        for sid in list(session_ids):
+            session = self._sessions.get(sid)
+            if session and session.websocket and session.is_alive:
+                sockets.append(session.websocket)
+        self.hub.publish(sockets, data, scope=execution_id)
+
     async def _broadcast_to_execution(self, execution_id: str, data: Dict[str, Any]):
         """Broadcast to all sessions subscribed to an execution."""
         session_ids = self._execution_sessions.get(execution_id, set())
@@ -255,28 +313,19 @@ class WebSocketManagerV2:
         # Fallback: broadcast to all sessions if no specific subscriptions
         if not session_ids:
             session_ids = set(self._sessions.keys())
-        for sid in list(session_ids):
-            session = self._sessions.get(sid)
-            if session:
-                await self._send(session, data)
+        self._publish(session_ids, data, execution_id)
 
     async def _broadcast_to_conversation(self, conversation_id: Optional[str], data: Dict[str, Any]):
         """Broadcast to all sessions subscribed to a conversation."""
         if not conversation_id:
             # Broadcast to all
-            for session in self._sessions.values():
-                await self._send(session, data)
+            self._publish(self._sessions.keys(), data)
             return
-        session_ids = self._conversation_sessions.get(conversation_id, set())
-        for sid in list(session_ids):
-            session = self._sessions.get(sid)
-            if session:
-                await self._send(session, data)
+        self._publish(self._conversation_sessions.get(conversation_id, set()), data)
 
     async def broadcast_all(self, data: Dict[str, Any]):
         """Broadcast to all connected sessions."""
-        for session in self._sessions.values():
-            await self._send(session, data)
+        self._publish(self._sessions.keys(), data)
 
     # -- Cleanup ---------------------------------------------------------------
 
@@ -307,6 +356,8 @@ class WebSocketManagerV2:
             "total_sessions": len(self._sessions),
             "active_executions": len(self._execution_sessions),
             "conversation_subscriptions": len(self._conversation_sessions),
+            "fanout": self.hub.get_stats(),
+            "frames": {eid: ch.stats() for eid, ch in list(self._frame_channels.items())[:20]},
         }
 
 
@@ -338,8 +389,9 @@ class ExecutionStreamManagerV2:
     async def stream_tool_result(self, execution_id: str, tool_name: str, result: Any, success: bool = True):
         await self.ws_manager.stream_tool_result(execution_id, tool_name, result, success)
 
-    async def stream_screenshot(self, execution_id: str, screenshot_b64: str, metadata: Optional[Dict] = None):
-        await self.ws_manager.stream_screenshot(execution_id, screenshot_b64, metadata)
+    async def stream_screenshot(self, execution_id: str, screenshot_b64: str = "", metadata: Optional[Dict] = None,
+                                image_bytes: Optional[bytes] = None, final: bool = False):
+        await self.ws_manager.stream_screenshot(execution_id, screenshot_b64, metadata, image_bytes, final)
 
     async def stream_error(self, execution_id: str, error: str):
         await self.ws_manager.stream_error(execution_id, error)
@@ -0,0 +1,288 @@
+"""
+Broadcast Hub — serialize-once WebSocket fan-out
+=================================================
+
+Shared by the WebSocket managers. A broadcast encodes the message once and
+hands the same string to every target connection. Each connection has a
+bounded outbound queue drained by its own writer task, so a slow client only
+delays itself, never the other clients or the emitting execution.
+
+Drop policy by event class when a client falls behind:
+- screenshot: only the latest pending frame per execution is kept
+- progress:   pending updates of the same type and execution are coalesced
+              to the newest
+- critical:   completion / error / file events are never dropped
+- default:    dropped (and counted) only once the queue is full
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Payload = Union[str, bytes]
+
+PROGRESS_EVENT_TYPES = {
+    "execution_progress", "task_progress", "progress", "execution.status",
+    "execution.progress", "heartbeat", "keepalive",
+}
+CRITICAL_MARKERS = ("complete", "completed", "error", "failed", "cancelled",
+                    "file_generated", "artifact", "credential_request")
+
+
+def classify_event(event_type: str) -> str:
+    """Map an event type to its drop-policy class."""
+    event_type = (event_type or "").lower()
+    if "screenshot" in event_type or event_type == "frame":
+        return "screenshot"
+    if event_type in PROGRESS_EVENT_TYPES:
+        return "progress"
+    if any(marker in event_type for marker in CRITICAL_MARKERS):
+        return "critical"
+    return "default"
+
+
+class _Outbound:
+    __slots__ = ("payload", "event_class", "key", "enqueued_at")
+
+    def __init__(self, payload: Payload, event_class: str, key: Optional[str]):
+        self.payload = payload
+        self.event_class = event_class
+        self.key = key
+        self.enqueued_at = time.monotonic()
+
+
+class HubConnection:
+    """One client socket: bounded outbound queue plus a writer task."""
+
+    def __init__(self, websocket, max_queue: int, send_timeout: float,
+                 on_close: Optional[Callable[["HubConnection"], Any]] = None):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self.closed = False
+
+        self._queue: deque = deque()
+        self._pending_by_key: Dict[str, _Outbound] = {}
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+        self.connected_at = time.time()
+        self.last_send_at: Optional[float] = None
+        self.sent = 0
+        self.bytes_sent = 0
+        self.coalesced = 0
+        # Screenshots overwritten before they were sent (frame-rate backpressure)
+        self.screenshots_replaced = 0
+        self.dropped = 0
+        self.max_lag_ms = 0.0
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, payload: Payload, event_type: str = "", scope: str = "") -> bool:
+        """Queue an encoded message. Returns False if it was dropped.
+
+        scope (the execution id) keeps a socket that follows several
+        executions from coalescing one execution's update into another's.
+        """
+        if self.closed:
+            return False
+        event_class = classify_event(event_type)
+
+        # Screenshots and progress replace their pending predecessor in place
+        key = None
+        if event_class == "screenshot":
+            key = f"screenshot:{scope}"
+        elif event_class == "progress":
+            key = f"progress:{event_type}:{scope}"
+        if key:
+            pending = self._pending_by_key.get(key)
+            if pending is not None:
+                pending.payload = payload
+                self.coalesced += 1
+                if event_class == "screenshot":
+                    self.screenshots_replaced += 1
+                return True
+
+        if len(self._queue) >= self.max_queue and event_class != "critical":
+            if not self._evict_droppable():
+                self.dropped += 1
+                return False
+
+        item = _Outbound(payload, event_class, key)
+        self._queue.append(item)
+        if key:
+            self._pending_by_key[key] = item
+        self._wakeup.set()
+        return True
+
+    def _evict_droppable(self) -> bool:
+        """Make room by dropping the oldest screenshot or progress update."""
+        for item in self._queue:
+            if item.event_class in ("screenshot", "progress"):
+                self._queue.remove(item)
+                self._pending_by_key.pop(item.key, None)
+                self.dropped += 1
+                return True
+        return False
+
+    @property
+    def lag_ms(self) -> float:
+        """Age of the oldest message still waiting to be sent."""
+        if not self._queue:
+            return 0.0
+        return (time.monotonic() - self._queue[0].enqueued_at) * 1000
+
+    async def _write_loop(self):
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                item = self._queue.popleft()
+                if item.key:
+                    self._pending_by_key.pop(item.key, None)
+                lag = (time.monotonic() - item.enqueued_at) * 1000
+                self.max_lag_ms = max(self.max_lag_ms, lag)
+                if isinstance(item.payload, bytes):
+                    await asyncio.wait_for(self.websocket.send_bytes(item.payload), self.send_timeout)
+                else:
+                    await asyncio.wait_for(self.websocket.send_text(item.payload), self.send_timeout)
+                self.sent += 1
+                self.bytes_sent += len(item.payload)
+                self.last_send_at = time.time()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"WebSocket writer closed ({type(e).__name__}: {e})")
+        finally:
+            self._mark_closed()
+
+    def _mark_closed(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._pending_by_key.clear()
+        if self.on_close:
+            try:
+                self.on_close(self)
+            except Exception as e:
+                logger.debug(f"on_close callback error: {e}")
+
+    async def close(self):
+        self._mark_closed()
+        if self._writer and not self._writer.done() and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "lag_ms": round(self.lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "sent": self.sent,
+            "bytes_sent": self.bytes_sent,
+            "coalesced": self.coalesced,
+            "screenshots_replaced": self.screenshots_replaced,
+            "dropped": self.dropped,
+            "connected_for_s": round(time.time() - self.connected_at, 1),
+        }
+
+
+class BroadcastHub:
+    """Registry of HubConnections with serialize-once publish."""
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self._connections: Dict[Any, HubConnection] = {}
+        self.messages_published = 0
+        self.bytes_encoded = 0
+
+    def register(self, websocket, on_close: Optional[Callable[[HubConnection], Any]] = None) -> HubConnection:
+        conn = self._connections.get(websocket)
+        if conn is None or conn.closed:
+            conn = HubConnection(websocket, self.max_queue, self.send_timeout, on_close)
+            self._connections[websocket] = conn
+            conn.start()
+        return conn
+
+    def get(self, websocket) -> Optional[HubConnection]:
+        return self._connections.get(websocket)
+
+    async def unregister(self, websocket):
+        conn = self._connections.pop(websocket, None)
+        if conn:
+            await conn.close()
+
+    def discard(self, websocket):
+        """Synchronous unregister: the writer task is cancelled, not awaited."""
+        conn = self._connections.pop(websocket, None)
+        if conn:
+            conn._mark_closed()
+            if conn._writer and not conn._writer.done():
+                conn._writer.cancel()
+
+    @staticmethod
+    def encode(message: Union[Dict[str, Any], str, bytes]) -> Payload:
+        if isinstance(message, (str, bytes)):
+            return message
+        return json.dumps(message, default=str)
+
+    def publish(self, websockets: Iterable, message: Union[Dict[str, Any], str, bytes],
+                event_type: Optional[str] = None, scope: Optional[str] = None) -> List[Any]:
+        """Encode once and enqueue for each socket. Never awaits a send.
+
+        scope defaults to the message's execution_id (top level or in data).
+        Returns the sockets whose connection is closed (for caller cleanup).
+        """
+        if event_type is None and isinstance(message, dict):
+            event_type = message.get("type", "")
+        if scope is None and isinstance(message, dict):
+            data = message.get("data")
+            scope = message.get("execution_id") or (data.get("execution_id") if isinstance(data, dict) else None)
+        payload = self.encode(message)
+        self.messages_published += 1
+        self.bytes_encoded += len(payload)
+
+        closed = []
+        for ws in websockets:
+            conn = self._connections.get(ws)
+            if conn is None or conn.closed:
+                closed.append(ws)
+                continue
+            conn.enqueue(payload, event_type or "", scope or "")
+        return closed
+
+    def send(self, websocket, message: Union[Dict[str, Any], str, bytes], event_type: Optional[str] = None,
+             scope: Optional[str] = None) -> bool:
+        """Queue a message for one socket (keeps ordering with broadcasts)."""
+        return not self.publish([websocket], message, event_type, scope)
+
+    async def close_all(self):
+        for ws in list(self._connections):
+            await self.unregister(ws)
+
+    def get_stats(self) -> Dict[str, Any]:
+        conns = [c for c in self._connections.values() if not c.closed]
+        per_connection = sorted((c.stats() for c in conns), key=lambda s: s["lag_ms"], reverse=True)
+        return {
+            "connections": len(conns),
+            "messages_published": self.messages_published,
+            "bytes_encoded": self.bytes_encoded,
+            "dropped": sum(c.dropped for c in conns),
+            "coalesced": sum(c.coalesced for c in conns),
+            "max_lag_ms": max((s["lag_ms"] for s in per_connection), default=0.0),
+            "per_connection": per_connection[:20],
+        }
@@ -0,0 +1,351 @@
+"""
+McLeuker AI - Durable Execution Event Log
+Append-only log of execution events shared by every uvicorn worker, so an SSE
+reconnect (`/api/v2/execute/{id}/events?from_seq=N`) can be served by any
+process, not just the one running the task.
+
+Architecture:
+  1. The worker running a task appends events (non-blocking, in-memory batch)
+  2. A writer task flushes batches in one transaction every few milliseconds
+  3. Any worker tails the log by (execution_id, sequence)
+  4. Tailers sleep on a wakeup event; it is set by local flushes and by one
+     per-process watcher that notices commits from other workers
+
+Configuration:
+- TASK_EVENT_LOG_BACKEND: "sqlite" (default) or "none"
+- TASK_EVENT_LOG_PATH: SQLite file shared by the workers
+- TASK_EVENT_LOG_RETENTION_HOURS: events older than this are pruned
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENT_LOG_BACKEND = os.getenv("TASK_EVENT_LOG_BACKEND", "sqlite").lower()
+TASK_EVENT_LOG_PATH = os.getenv("TASK_EVENT_LOG_PATH", "/tmp/mcleuker_event_log.db")
+TASK_EVENT_LOG_RETENTION_HOURS = float(os.getenv("TASK_EVENT_LOG_RETENTION_HOURS", "24"))
+
+TERMINAL_EVENT_TYPES = ("execution_complete", "execution_error", "execution_cancelled")
+
+# (sequence, event_type, data, timestamp)
+LogRecord = Tuple[int, str, Dict[str, Any], float]
+
+
+class EventLogBackend:
+    """Interface for durable execution event logs."""
+
+    # Bumped on every wakeup so a tailer can tell it missed one between read and wait
+    version = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def append(self, execution_id: str, sequence: int, event_type: str,
+               data: Dict[str, Any], timestamp: float):
+        """Queue an event for writing. Must not block."""
+        raise NotImplementedError
+
+    async def read(self, execution_id: str, after_sequence: int, limit: int = 500) -> List[LogRecord]:
+        """Events with sequence > after_sequence, in order."""
+        raise NotImplementedError
+
+    async def last_sequence(self, execution_id: str) -> int:
+        raise NotImplementedError
+
+    async def wait(self, timeout: float, since_version: Optional[int] = None) -> bool:
+        """Sleep until new events may be available. Returns False on timeout."""
+        raise NotImplementedError
+
+    async def prune(self, older_than_seconds: float) -> int:
+        return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def tail(
+        self,
+        execution_id: str,
+        after_sequence: int = 0,
+        idle_timeout: float = 30.0,
+    ) -> AsyncGenerator[Optional[LogRecord], None]:
+        """Replay then follow an execution's events until a terminal event.
+
+        Yields None after `idle_timeout` seconds without events (for keepalives).
+        """
+        seq = after_sequence
+        while True:
+            version = self.version
+            records = await self.read(execution_id, seq)
+            if records:
+                for record in records:
+                    seq = record[0]
+                    yield record
+                    if record[1] in TERMINAL_EVENT_TYPES:
+                        return
+                continue
+            if not await self.wait(idle_timeout, since_version=version):
+                yield None
+
+
+class SQLiteEventLog(EventLogBackend):
+    """SQLite (WAL) event log usable from several processes on one host."""
+
+    def __init__(
+        self,
+        path: str = TASK_EVENT_LOG_PATH,
+        flush_interval: float = 0.02,
+        batch_size: int = 500,
+        poll_interval: float = 0.05,
+        max_payload_bytes: int = 16384,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        # Larger string fields (base64 screenshots) are not persisted; live
+        # screenshots reach clients over the WebSocket channel instead.
+        self.max_payload_bytes = max_payload_bytes
+
+        self._pending: List[tuple] = []
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._data_version = 0
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_wakeup: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._waiters = 0
+        self._stopping = False
+
+        self._stats = {"appended": 0, "written": 0, "batches": 0, "write_errors": 0,
+                       "payloads_dropped": 0, "wakeups": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _open(self):
+        if self._writer is not None:
+            return
+        self._writer = self._connect()
+        self._writer.execute(
+            """CREATE TABLE IF NOT EXISTS execution_events (
+                execution_id TEXT NOT NULL,
+                sequence INTEGER NOT NULL,
+                event_type TEXT NOT NULL,
+                data TEXT NOT NULL,
+                ts REAL NOT NULL,
+                PRIMARY KEY (execution_id, sequence)
+            ) WITHOUT ROWID"""
+        )
+        self._writer.execute("CREATE INDEX IF NOT EXISTS idx_execution_events_ts ON execution_events (ts)")
+        self._reader = self._connect()
+        self._data_version = self._reader.execute("PRAGMA data_version").fetchone()[0]
+
+    async def start(self):
+        if self._writer_task:
+            return
+        await asyncio.to_thread(self._open)
+        self._wakeup = asyncio.Event()
+        self._flush_wakeup = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._watch_task = asyncio.create_task(self._watch_loop())
+        logger.info(f"SQLite event log at {self.path}")
+
+    async def stop(self):
+        # The writer exits its loop on its own (cancelling it mid wait_for can be
+        # swallowed on Python 3.11); the watcher only sleeps and can be cancelled.
+        self._stopping = True
+        if self._flush_wakeup:
+            self._flush_wakeup.set()
+        if self._watch_task:
+            self._watch_task.cancel()
+        for task in (self._writer_task, self._watch_task):
+            if task:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._writer_task = self._watch_task = None
+        self._stopping = False
+        if self._writer is not None:
+            await asyncio.to_thread(self._write_batch, self._take_pending())
+            self._writer.close()
+            self._reader.close()
+            self._writer = self._reader = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, execution_id, sequence, event_type, data, timestamp):
+        if isinstance(data, dict):
+            large = [k for k, v in data.items() if isinstance(v, str) and len(v) > self.max_payload_bytes]
+            if large:
+                data = {k: v for k, v in data.items() if k not in large}
+                data["payload_omitted"] = large
+                self._stats["payloads_dropped"] += len(large)
+        self._pending.append((execution_id, sequence, event_type, json.dumps(data, default=str), timestamp))
+        self._stats["appended"] += 1
+        if self._flush_wakeup and (len(self._pending) >= self.batch_size or event_type in TERMINAL_EVENT_TYPES):
+            self._flush_wakeup.set()
+
+    def _take_pending(self) -> List[tuple]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _write_batch(self, batch: List[tuple]):
+        if not batch or self._writer is None:
+            return
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                self._writer.executemany(
+                    "INSERT OR REPLACE INTO execution_events (execution_id, sequence, event_type, data, ts) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+                self._writer.execute("COMMIT")
+                self._stats["written"] += len(batch)
+                self._stats["batches"] += 1
+            except Exception:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    async def _writer_loop(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            if not self._pending:
+                continue
+            batch = self._take_pending()
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self._notify()
+            except asyncio.CancelledError:
+                self._pending = batch + self._pending
+                raise
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                logger.warning(f"Event log write error (will retry): {e}")
+                self._pending = batch + self._pending
+                await asyncio.sleep(0.5)
+
+    # ------------------------------------------------------------------
+    # Reads and wakeups
+    # ------------------------------------------------------------------
+
+    def _read(self, execution_id: str, after_sequence: int, limit: int) -> List[LogRecord]:
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT sequence, event_type, data, ts FROM execution_events "
+                "WHERE execution_id = ? AND sequence > ? ORDER BY sequence LIMIT ?",
+                (execution_id, after_sequence, limit),
+            ).fetchall()
+        return [(seq, etype, json.loads(data), ts) for seq, etype, data, ts in rows]
+
+    async def read(self, execution_id, after_sequence, limit=500):
+        if self._reader is None:
+            return []
+        return await asyncio.to_thread(self._read, execution_id, after_sequence, limit)
+
+    def _last_sequence(self, execution_id: str) -> int:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT MAX(sequence) FROM execution_events WHERE execution_id = ?", (execution_id,)
+            ).fetchone()
+        return row[0] or 0
+
+    async def last_sequence(self, execution_id):
+        if self._reader is None:
+            return 0
+        return await asyncio.to_thread(self._last_sequence, execution_id)
+
+    def _notify(self):
+        # Wake everyone waiting on the current event and start a fresh one
+        self.version += 1
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    async def wait(self, timeout, since_version=None):
+        if self._wakeup is None:
+            await asyncio.sleep(timeout)
+            return False
+        if since_version is not None and since_version != self.version:
+            return True
+        self._waiters += 1
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            self._stats["wakeups"] += 1
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters -= 1
+
+    def _read_data_version(self) -> int:
+        with self._read_lock:
+            return self._reader.execute("PRAGMA data_version").fetchone()[0]
+
+    async def _watch_loop(self):
+        """Wake local tailers when another worker commits (PRAGMA data_version changes)."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self._waiters:
+                continue
+            try:
+                version = await asyncio.to_thread(self._read_data_version)
+            except Exception as e:
+                logger.debug(f"Event log watch error: {e}")
+                continue
+            if version != self._data_version:
+                self._data_version = version
+                self._notify()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _prune(self, cutoff: float) -> int:
+        with self._write_lock:
+            return self._writer.execute("DELETE FROM execution_events WHERE ts < ?", (cutoff,)).rowcount
+
+    async def prune(self, older_than_seconds):
+        if self._writer is None:
+            return 0
+        return await asyncio.to_thread(self._prune, time.time() - older_than_seconds)
+
+    def get_stats(self):
+        return {"backend": "sqlite", "path": self.path, "pending": len(self._pending),
+                "waiters": self._waiters, **self._stats}
+
+
+def create_event_log() -> Optional[EventLogBackend]:
+    """Build the configured event log backend (None when disabled)."""
+    if TASK_EVENT_LOG_BACKEND == "sqlite":
+        return SQLiteEventLog(TASK_EVENT_LOG_PATH)
+    if TASK_EVENT_LOG_BACKEND not in ("none", "", "off"):
+        logger.warning(f"Unknown TASK_EVENT_LOG_BACKEND '{TASK_EVENT_LOG_BACKEND}', event log disabled")
+    return None
@@ -0,0 +1,528 @@
+"""
+McLeuker AI - Binary Screenshot Frame Stream
+Live browser screenshots sent as raw JPEG/WebP bytes in binary WebSocket
+frames instead of base64 strings inside JSON events.
+
+Architecture:
+  1. The browser engine captures a frame (raw bytes, no base64)
+  2. A ScreenshotChannel per execution drops it when it is perceptually
+     identical to the last frame sent (dHash, Hamming distance)
+  3. A FrameRateController reads the per-connection lag of the broadcast hub
+     and lowers capture quality / frame rate while clients fall behind; a
+     frame that arrives too early is held and sent when the interval elapses
+     (latest wins), so the final state of the page is never lost
+  4. The encoded frame is fanned out once to binary clients; legacy JSON
+     clients get a base64 `browser_screenshot` event built at most once
+  5. Sent frames are appended to a recording file that can be replayed
+
+Wire format (big-endian, 20-byte header followed by meta JSON and image):
+  magic "MF" | version u8 | format u8 | flags u8 | quality u8 |
+  seq u32 | timestamp_ms u64 | meta_len u16 | meta (UTF-8 JSON) | image
+  format: 1=jpeg 2=webp 3=png; flags: 1=final frame, 2=replayed
+
+Configuration:
+- SCREENSHOT_STREAM_FORMAT: "jpeg" (default) or "webp" (transcoded, needs Pillow)
+- SCREENSHOT_MAX_QUALITY / SCREENSHOT_MIN_QUALITY: capture quality bounds
+- SCREENSHOT_MIN_INTERVAL_MS / SCREENSHOT_MAX_INTERVAL_MS: frame interval bounds
+- SCREENSHOT_DEDUP_DISTANCE: max dHash bit difference treated as "same frame"
+- SCREENSHOT_RECORDING: record sent frames to disk (opt-in, "false" by default)
+- SCREENSHOT_RECORDING_DIR / SCREENSHOT_RECORDING_RETENTION_HOURS
+- SCREENSHOT_RECORDING_MAX_MB: per-execution recording cap (later frames are not recorded)
+- SCREENSHOT_RECORDING_MAX_TOTAL_MB: recordings directory cap (oldest pruned first)
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pillow — optional; without it only byte-identical frames are suppressed
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+SCREENSHOT_STREAM_FORMAT = os.getenv("SCREENSHOT_STREAM_FORMAT", "jpeg").lower()
+SCREENSHOT_MAX_QUALITY = int(os.getenv("SCREENSHOT_MAX_QUALITY", "70"))
+SCREENSHOT_MIN_QUALITY = int(os.getenv("SCREENSHOT_MIN_QUALITY", "35"))
+SCREENSHOT_MIN_INTERVAL_MS = int(os.getenv("SCREENSHOT_MIN_INTERVAL_MS", "100"))
+SCREENSHOT_MAX_INTERVAL_MS = int(os.getenv("SCREENSHOT_MAX_INTERVAL_MS", "2000"))
+SCREENSHOT_DEDUP_DISTANCE = int(os.getenv("SCREENSHOT_DEDUP_DISTANCE", "4"))
+SCREENSHOT_RECORDING = os.getenv("SCREENSHOT_RECORDING", "false").lower() == "true"
+SCREENSHOT_RECORDING_DIR = Path(os.getenv("SCREENSHOT_RECORDING_DIR", "/tmp/mcleuker_recordings"))
+SCREENSHOT_RECORDING_RETENTION_HOURS = float(os.getenv("SCREENSHOT_RECORDING_RETENTION_HOURS", "24"))
+SCREENSHOT_RECORDING_MAX_BYTES = int(float(os.getenv("SCREENSHOT_RECORDING_MAX_MB", "50")) * 1024 * 1024)
+SCREENSHOT_RECORDING_MAX_TOTAL_BYTES = int(float(os.getenv("SCREENSHOT_RECORDING_MAX_TOTAL_MB", "500")) * 1024 * 1024)
+
+FRAME_MAGIC = b"MF"
+FRAME_VERSION = 1
+FORMAT_JPEG, FORMAT_WEBP, FORMAT_PNG = 1, 2, 3
+FORMAT_NAMES = {FORMAT_JPEG: "jpeg", FORMAT_WEBP: "webp", FORMAT_PNG: "png"}
+FLAG_FINAL = 1
+FLAG_REPLAY = 2
+
+_HEADER = struct.Struct(">2sBBBBIQH")
+_LENGTH = struct.Struct(">I")
+
+
+# ============================================================================
+# Frame codec
+# ============================================================================
+
+@dataclass(slots=True)
+class Frame:
+    seq: int
+    format: int
+    flags: int
+    quality: int
+    timestamp: float
+    meta: Dict[str, Any]
+    image: bytes
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{FORMAT_NAMES.get(self.format, 'jpeg')}"
+
+
+def detect_format(image: bytes) -> int:
+    """Image format code from the file signature (JPEG when unknown)."""
+    if image[:4] == b"RIFF" and image[8:12] == b"WEBP":
+        return FORMAT_WEBP
+    if image[:8] == b"\x89PNG\r\n\x1a\n":
+        return FORMAT_PNG
+    return FORMAT_JPEG
+
+
+def encode_frame(seq: int, image: bytes, meta: Optional[Dict[str, Any]] = None, flags: int = 0,
+                 quality: int = 0, timestamp: Optional[float] = None) -> bytes:
+    meta_bytes = json.dumps(meta or {}, separators=(",", ":"), default=str).encode("utf-8")
+    if len(meta_bytes) > 0xFFFF:
+        meta_bytes = b"{}"
+    header = _HEADER.pack(
+        FRAME_MAGIC, FRAME_VERSION, detect_format(image), flags, max(0, min(quality, 255)),
+        seq & 0xFFFFFFFF, int((timestamp or time.time()) * 1000), len(meta_bytes),
+    )
+    return b"".join((header, meta_bytes, image))
+
+
+def decode_frame(data: bytes) -> Frame:
+    if len(data) < _HEADER.size:
+        raise ValueError("Frame shorter than header")
+    magic, version, fmt, flags, quality, seq, ts_ms, meta_len = _HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Not a screenshot frame")
+    meta_end = _HEADER.size + meta_len
+    meta = json.loads(data[_HEADER.size:meta_end] or b"{}")
+    return Frame(seq, fmt, flags, quality, ts_ms / 1000, meta, bytes(data[meta_end:]))
+
+
+def with_flags(frame_bytes: bytes, flags: int) -> bytes:
+    """Copy of an encoded frame with extra flag bits set."""
+    patched = bytearray(frame_bytes)
+    patched[4] |= flags
+    return bytes(patched)
+
+
+# ============================================================================
+# Perceptual hash
+# ============================================================================
+
+def perceptual_hash(image: bytes) -> int:
+    """64-bit difference hash (dHash) of an image.
+
+    JPEG frames are decoded at reduced scale via draft mode, so hashing a
+    1280x720 screenshot costs about a millisecond. Without Pillow this falls
+    back to a content digest, which only matches byte-identical frames.
+    """
+    if not PIL_AVAILABLE:
+        return int.from_bytes(hashlib.blake2b(image, digest_size=8).digest(), "big")
+    with Image.open(io.BytesIO(image)) as img:
+        img.draft("L", (72, 64))
+        pixels = list(img.convert("L").resize((9, 8)).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            value = (value << 1) | (left > pixels[row * 9 + col + 1])
+    return value
+
+
+def hash_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def transcode_webp(image: bytes, quality: int) -> bytes:
+    if not PIL_AVAILABLE:
+        return image
+    with Image.open(io.BytesIO(image)) as img:
+        out = io.BytesIO()
+        img.save(out, format="WEBP", quality=quality, method=0)
+        return out.getvalue()
+
+
+# ============================================================================
+# Backpressure-driven quality / rate control
+# ============================================================================
+
+class FrameRateController:
+    """Capture quality and minimum frame interval, adapted to client lag."""
+
+    def __init__(
+        self,
+        max_quality: int = SCREENSHOT_MAX_QUALITY,
+        min_quality: int = SCREENSHOT_MIN_QUALITY,
+        min_interval: float = SCREENSHOT_MIN_INTERVAL_MS / 1000,
+        max_interval: float = SCREENSHOT_MAX_INTERVAL_MS / 1000,
+        high_lag_ms: float = 500.0,
+        low_lag_ms: float = 100.0,
+    ):
+        self.max_quality = max_quality
+        self.min_quality = min(min_quality, max_quality)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.high_lag_ms = high_lag_ms
+        self.low_lag_ms = low_lag_ms
+        self.quality = max_quality
+        self.interval = min_interval
+        self.degradations = 0
+
+    def observe(self, lag_ms: float, frames_replaced: int = 0):
+        """Feed the worst client lag and how many queued frames were overwritten."""
+        if lag_ms > self.high_lag_ms or frames_replaced:
+            self.quality = max(self.min_quality, self.quality - 10)
+            self.interval = min(self.max_interval, max(self.interval, 0.05) * 1.5)
+            self.degradations += 1
+        elif lag_ms < self.low_lag_ms:
+            self.quality = min(self.max_quality, self.quality + 5)
+            self.interval = max(self.min_interval, self.interval / 1.25)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"quality": self.quality, "interval_ms": round(self.interval * 1000),
+                "degradations": self.degradations}
+
+
+# ============================================================================
+# Recording
+# ============================================================================
+
+def _recording_name(execution_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", execution_id)[:128] or "recording"
+
+
+def recording_path(execution_id: str, directory: Path = SCREENSHOT_RECORDING_DIR) -> Path:
+    return directory / f"{_recording_name(execution_id)}.frames"
+
+
+class FrameRecorder:
+    """Appends encoded frames to `<dir>/<execution_id>.frames` as length-prefixed records.
+
+    Frames past max_bytes are counted as truncated and not written.
+    """
+
+    def __init__(self, execution_id: str, directory: Path = SCREENSHOT_RECORDING_DIR,
+                 max_bytes: int = SCREENSHOT_RECORDING_MAX_BYTES):
+        self.path = recording_path(execution_id, directory)
+        self.max_bytes = max_bytes
+        self._file = None
+        self.frames = 0
+        self.bytes_written = 0
+        self.truncated = 0
+
+    def write(self, frame_bytes: bytes):
+        if self.max_bytes and self.bytes_written + len(frame_bytes) + _LENGTH.size > self.max_bytes:
+            self.truncated += 1
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+        self._file.write(_LENGTH.pack(len(frame_bytes)))
+        self._file.write(frame_bytes)
+        self._file.flush()
+        self.frames += 1
+        self.bytes_written += len(frame_bytes) + _LENGTH.size
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def iter_recording(path: Path) -> Iterator[bytes]:
+    """Encoded frames of a recording file, in order (a torn tail is ignored)."""
+    with open(path, "rb") as f:
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(prefix)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield data
+
+
+def recording_summary(execution_id: str, directory: Path = SCREENSHOT_RECORDING_DIR) -> Optional[Dict[str, Any]]:
+    path = recording_path(execution_id, directory)
+    if not path.exists():
+        return None
+    frames = [decode_frame(data) for data in iter_recording(path)]
+    if not frames:
+        return {"execution_id": execution_id, "frames": 0, "duration_s": 0.0, "size_bytes": path.stat().st_size}
+    return {
+        "execution_id": execution_id,
+        "frames": len(frames),
+        "duration_s": round(frames[-1].timestamp - frames[0].timestamp, 3),
+        "size_bytes": path.stat().st_size,
+        "formats": sorted({FORMAT_NAMES.get(f.format, "jpeg") for f in frames}),
+        "started_at": frames[0].timestamp,
+    }
+
+
+async def replay_recording(
+    execution_id: str,
+    speed: float = 1.0,
+    directory: Path = SCREENSHOT_RECORDING_DIR,
+    max_gap: float = 5.0,
+) -> AsyncGenerator[bytes, None]:
+    """Yield recorded frames (flagged as replayed) paced by their original timing.
+
+    speed <= 0 yields as fast as possible; gaps longer than max_gap are shortened.
+    """
+    path = recording_path(execution_id, directory)
+    frames = await asyncio.to_thread(lambda: list(iter_recording(path)))
+    previous_ts = None
+    for data in frames:
+        ts = _HEADER.unpack_from(data)[6] / 1000
+        if previous_ts is not None and speed > 0:
+            await asyncio.sleep(min(max_gap, max(0.0, ts - previous_ts)) / speed)
+        previous_ts = ts
+        yield with_flags(data, FLAG_REPLAY)
+
+
+def prune_recordings(older_than_seconds: float = SCREENSHOT_RECORDING_RETENTION_HOURS * 3600,
+                     directory: Path = SCREENSHOT_RECORDING_DIR,
+                     max_total_bytes: int = SCREENSHOT_RECORDING_MAX_TOTAL_BYTES) -> int:
+    """Remove expired recordings, then the oldest ones until the directory fits max_total_bytes."""
+    if not directory.exists():
+        return 0
+    cutoff = time.time() - older_than_seconds
+    removed = 0
+    kept = []
+    for path in directory.glob("*.frames"):
+        try:
+            st = path.stat()
+            if st.st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+            else:
+                kept.append((st.st_mtime, st.st_size, path))
+        except OSError:
+            pass
+    total = sum(size for _, size, _ in kept)
+    for _, size, path in sorted(kept):
+        if not max_total_bytes or total <= max_total_bytes:
+            break
+        try:
+            path.unlink()
+            removed += 1
+            total -= size
+        except OSError:
+            pass
+    return removed
+
+
+# ============================================================================
+# Per-execution channel
+# ============================================================================
+
+# Returns (binary sockets, JSON sockets) at send time
+TargetsFn = Callable[[], Tuple[List[Any], List[Any]]]
+# Builds the legacy JSON event from (base64 image, meta)
+JsonFn = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+
+@dataclass
+class _PendingFrame:
+    image: bytes
+    meta: Dict[str, Any]
+    phash: Optional[int]
+    flags: int = 0
+    captured_at: float = field(default_factory=time.time)
+
+
+class ScreenshotChannel:
+    """Dedupes, paces and fans out the screenshot frames of one execution."""
+
+    def __init__(
+        self,
+        channel_id: str,
+        hub,
+        targets: TargetsFn,
+        to_json: JsonFn,
+        record: bool = SCREENSHOT_RECORDING,
+        recording_dir: Path = SCREENSHOT_RECORDING_DIR,
+        stream_format: str = SCREENSHOT_STREAM_FORMAT,
+        dedup_distance: int = SCREENSHOT_DEDUP_DISTANCE,
+        controller: Optional[FrameRateController] = None,
+    ):
+        self.channel_id = channel_id
+        self.hub = hub
+        self.targets = targets
+        self.to_json = to_json
+        self.recorder = FrameRecorder(channel_id, recording_dir) if record else None
+        self.stream_format = stream_format
+        self.dedup_distance = dedup_distance
+        self.controller = controller or FrameRateController()
+
+        self.seq = 0
+        self.latest_frame: Optional[bytes] = None
+        self.latest_json: Optional[Dict[str, Any]] = None
+        self.last_activity = time.monotonic()
+        self._last_hash: Optional[int] = None
+        self._last_sent_at = 0.0
+        self._pending: Optional[_PendingFrame] = None
+        self._deferred: Optional[asyncio.Task] = None
+        self._replaced_seen = 0
+        self._lock = asyncio.Lock()
+        self._stats = {"captured": 0, "sent": 0, "duplicates": 0, "deferred": 0,
+                       "superseded": 0, "bytes_sent": 0, "json_encodes": 0}
+
+    @property
+    def quality(self) -> int:
+        """Capture quality the browser engine should use for the next frame."""
+        return self.controller.quality
+
+    async def publish(self, image: bytes, meta: Optional[Dict[str, Any]] = None, final: bool = False) -> bool:
+        """Offer a captured frame. Returns True if it was sent now.
+
+        Final frames bypass dedup and pacing so the last page state always lands.
+        """
+        if not image:
+            return False
+        self._stats["captured"] += 1
+        self.last_activity = time.monotonic()
+        try:
+            phash = await asyncio.to_thread(perceptual_hash, image)
+        except Exception as e:
+            logger.debug(f"Frame hash failed ({e}); sending without dedup")
+            phash = None
+
+        async with self._lock:
+            if (not final and phash is not None and self._last_hash is not None
+                    and hash_distance(phash, self._last_hash) <= self.dedup_distance):
+                self._stats["duplicates"] += 1
+                # A newer look-alike supersedes a held frame that was about to go out
+                if self._pending is not None:
+                    self._pending = None
+                    self._stats["superseded"] += 1
+                return False
+
+            self._observe_backpressure()
+            frame = _PendingFrame(image, dict(meta or {}), phash, FLAG_FINAL if final else 0)
+            wait = self._last_sent_at + self.controller.interval - time.monotonic()
+            if not final and wait > 0:
+                if self._pending is not None:
+                    self._stats["superseded"] += 1
+                self._pending = frame
+                self._stats["deferred"] += 1
+                if self._deferred is None or self._deferred.done():
+                    self._deferred = asyncio.create_task(self._send_deferred(wait))
+                return False
+
+            self._pending = None
+            await self._send(frame)
+            return True
+
+    async def _send_deferred(self, delay: float):
+        await asyncio.sleep(delay)
+        async with self._lock:
+            frame, self._pending = self._pending, None
+            if frame is not None:
+                await self._send(frame)
+
+    async def _send(self, frame: _PendingFrame):
+        image = frame.image
+        if self.stream_format == "webp" and PIL_AVAILABLE and detect_format(image) != FORMAT_WEBP:
+            try:
+                image = await asyncio.to_thread(transcode_webp, image, self.controller.quality)
+            except Exception as e:
+                logger.debug(f"WebP transcode failed, sending original: {e}")
+
+        self.seq += 1
+        meta = {**frame.meta, "execution_id": self.channel_id}
+        encoded = encode_frame(self.seq, image, meta, frame.flags, self.controller.quality, frame.captured_at)
+        self.latest_frame = encoded
+        self.latest_json = None
+        self._last_hash = frame.phash
+        self._last_sent_at = time.monotonic()
+
+        binary, legacy = self.targets()
+        if binary:
+            self.hub.publish(binary, encoded, "browser_screenshot", self.channel_id)
+        if legacy:
+            self.hub.publish(legacy, self.json_message(), "browser_screenshot", self.channel_id)
+        self._stats["sent"] += 1
+        self._stats["bytes_sent"] += len(encoded) * len(binary)
+
+        if self.recorder:
+            try:
+                await asyncio.to_thread(self.recorder.write, encoded)
+            except Exception as e:
+                logger.warning(f"Screenshot recording disabled for {self.channel_id}: {e}")
+                self.recorder = None
+
+    def json_message(self) -> Optional[Dict[str, Any]]:
+        """Legacy base64 event for the latest frame (encoded at most once per frame)."""
+        if self.latest_frame is None:
+            return None
+        if self.latest_json is None:
+            frame = decode_frame(self.latest_frame)
+            self.latest_json = self.to_json(base64.b64encode(frame.image).decode("ascii"), frame.meta)
+            self._stats["json_encodes"] += 1
+        return self.latest_json
+
+    def _observe_backpressure(self):
+        binary, legacy = self.targets()
+        lag = 0.0
+        replaced = 0
+        for ws in (*binary, *legacy):
+            conn = self.hub.get(ws)
+            if conn is not None and not conn.closed:
+                lag = max(lag, conn.lag_ms)
+                replaced += conn.screenshots_replaced
+        self.controller.observe(lag, max(0, replaced - self._replaced_seen))
+        self._replaced_seen = replaced
+
+    async def close(self):
+        """Flush a held frame and close the recording."""
+        if self._deferred and not self._deferred.done():
+            self._deferred.cancel()
+            try:
+                await self._deferred
+            except asyncio.CancelledError:
+                pass
+        async with self._lock:
+            frame, self._pending = self._pending, None
+            if frame is not None:
+                await self._send(frame)
+        if self.recorder:
+            await asyncio.to_thread(self.recorder.close)
+
+    def stats(self) -> Dict[str, Any]:
+        out = {"seq": self.seq, **self._stats, **self.controller.stats()}
+        if self.recorder:
+            out["recorded_frames"] = self.recorder.frames
+            out["recording_truncated"] = self.recorder.truncated
+        return out
@@ -8,6 +8,9 @@ Provides context-aware information retrieval to enhance AI responses.
 import os
 import json
 import hashlib
+import heapq
+import math
+import time
 import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
@@ -76,6 +79,119 @@ class RetrievalResult:
         }
 
 
+# BM25 parameters
+RAG_BM25_K1 = float(os.getenv("RAG_BM25_K1", "1.2"))
+RAG_BM25_B = float(os.getenv("RAG_BM25_B", "0.75"))
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring.
+    Postings map term -> {doc number: term frequency}; categories are kept as
+    bitsets (bytearrays) over doc numbers so a category filter is one bit test.
+    """
+
+    def __init__(self, k1: float = RAG_BM25_K1, b: float = RAG_BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.doc_keys: Dict[int, str] = {}
+        self.doc_numbers: Dict[str, int] = {}
+        self.doc_terms: Dict[int, Dict[str, int]] = {}
+        self.category_bits: Dict[Any, bytearray] = {}
+        self.doc_boost: Dict[int, float] = {}
+        self._next_doc = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, key: str, text: str, category: Any = None, boost: float = 1.0):
+        """Index a document (replaces an existing one with the same key)."""
+        if key in self.doc_numbers:
+            self.remove(key)
+        doc = self._next_doc
+        self._next_doc += 1
+        tokens = tokenize(text)
+        term_freqs: Dict[str, int] = {}
+        for token in tokens:
+            term_freqs[token] = term_freqs.get(token, 0) + 1
+        for term, tf in term_freqs.items():
+            self.postings.setdefault(term, {})[doc] = tf
+        self.doc_terms[doc] = term_freqs
+        self.doc_lengths[doc] = len(tokens)
+        self.doc_keys[doc] = key
+        self.doc_numbers[key] = doc
+        self.doc_boost[doc] = boost
+        self._total_length += len(tokens)
+        if category is not None:
+            bits = self.category_bits.setdefault(category, bytearray())
+            if len(bits) <= doc >> 3:
+                bits.extend(bytes((doc >> 3) + 1 - len(bits)))
+            bits[doc >> 3] |= 1 << (doc & 7)
+
+    def remove(self, key: str) -> bool:
+        doc = self.doc_numbers.pop(key, None)
+        if doc is None:
+            return False
+        for term in self.doc_terms.pop(doc):
+            postings = self.postings[term]
+            del postings[doc]
+            if not postings:
+                del self.postings[term]
+        self._total_length -= self.doc_lengths.pop(doc)
+        del self.doc_keys[doc]
+        del self.doc_boost[doc]
+        for bits in self.category_bits.values():
+            if len(bits) > doc >> 3:
+                bits[doc >> 3] &= ~(1 << (doc & 7)) & 0xFF
+        return True
+
+    def category_mask(self, categories) -> bytes:
+        """Union of the categories' bitsets."""
+        mask = 0
+        for category in categories:
+            mask |= int.from_bytes(self.category_bits.get(category, b""), "little")
+        return mask.to_bytes((self._next_doc + 7) // 8, "little")
+
+    def score(self, terms, required_mask: Optional[bytes] = None, masked_terms=()) -> Dict[int, float]:
+        """BM25 scores for every doc containing a query term.
+
+        Terms in `masked_terms` only count for docs whose bit is set in
+        `required_mask`.
+        """
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return {}
+        avg_length = self._total_length / n_docs or 1.0
+        k1, b = self.k1, self.b
+        lengths = self.doc_lengths
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            check_mask = required_mask is not None and term in masked_terms
+            for doc, tf in postings.items():
+                if check_mask and not (required_mask[doc >> 3] >> (doc & 7)) & 1:
+                    continue
+                norm = k1 * (1 - b + b * lengths[doc] / avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return scores
+
+    def top_k(self, scores: Dict[int, float], k: int) -> List[Tuple[str, float]]:
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1] * self.doc_boost[item[0]])
+        return [(self.doc_keys[doc], score * self.doc_boost[doc]) for doc, score in best]
+
+
 class FashionKnowledgeBase:
     """
     Fashion domain knowledge base with curated information.
@@ -85,7 +201,7 @@ class FashionKnowledgeBase:
     def __init__(self):
         self.chunks: Dict[str, KnowledgeChunk] = {}
         self.category_index: Dict[KnowledgeCategory, List[str]] = {cat: [] for cat in KnowledgeCategory}
-        self.keyword_index: Dict[str, List[str]] = {}
+        self.index = BM25Index()
         
         # Initialize with fashion domain knowledge
         self._initialize_knowledge_base()
@@ -284,16 +400,15 @@ class FashionKnowledgeBase:
             metadata=metadata or {}
         )
         
+        existing = self.chunks.get(chunk_id)
+        if existing is not None:
+            self.category_index[existing.category].remove(chunk_id)
         self.chunks[chunk_id] = chunk
         self.category_index[category].append(chunk_id)
         
-        # Build keyword index
-        words = re.findall(r'\b\w+\b', content.lower())
-        for word in set(words):
-            if len(word) > 3:
-                if word not in self.keyword_index:
-                    self.keyword_index[word] = []
-                self.keyword_index[word].append(chunk_id)
+        # Incremental BM25 index update (trends and sustainability get a ranking boost)
+        boost = 1.2 if category in (KnowledgeCategory.TRENDS, KnowledgeCategory.SUSTAINABILITY) else 1.0
+        self.index.add(chunk_id, content, category, boost)
         
         return chunk
     
@@ -314,49 +429,44 @@ class RAGRetriever:
     
     def retrieve(self, query: str, top_k: int = 5, categories: List[KnowledgeCategory] = None) -> RetrievalResult:
         """Retrieve relevant knowledge chunks for a query"""
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         query_lower = query.lower()
-        query_words = set(re.findall(r'\b\w+\b', query_lower))
+        query_words = tokenize(query_lower)
         
         # Determine categories to search
         if categories is None:
             categories = self._infer_categories(query_lower)
         
-        # Score all relevant chunks
-        scored_chunks: List[Tuple[KnowledgeChunk, float]] = []
+        # Keywords (> 3 chars) match across the whole base; short words only
+        # match inside the searched categories
+        index = self.kb.index
+        short_words = {w for w in query_words if len(w) <= 3}
+        scores = index.score(query_words, index.category_mask(categories), short_words)
         
-        for category in categories:
-            for chunk in self.kb.get_chunks_by_category(category):
-                score = self._calculate_relevance(query_words, chunk)
-                if score > 0:
-                    scored_chunks.append((chunk, score))
-        
-        # Also search by keywords
-        for word in query_words:
-            if word in self.kb.keyword_index:
-                for chunk_id in self.kb.keyword_index[word]:
-                    if chunk_id in self.kb.chunks:
-                        chunk = self.kb.chunks[chunk_id]
-                        score = self._calculate_relevance(query_words, chunk)
-                        if score > 0 and not any(c.id == chunk.id for c, _ in scored_chunks):
-                            scored_chunks.append((chunk, score))
-        
-        # Sort by score and get top_k
-        scored_chunks.sort(key=lambda x: x[1], reverse=True)
-        top_chunks = [chunk for chunk, score in scored_chunks[:top_k]]
+        # Heap top-k over a shortlist, then the exact-phrase boost
+        phrase = " ".join(sorted(set(query_words)))
+        shortlist = index.top_k(scores, max(top_k * 4, top_k))
+        scored_chunks: List[Tuple[KnowledgeChunk, float]] = []
+        for chunk_id, score in shortlist:
+            chunk = self.kb.chunks[chunk_id]
+            if phrase and phrase in chunk.content.lower():
+                score *= 1.5
+            scored_chunks.append((chunk, score))
+        scored_chunks = heapq.nlargest(top_k, scored_chunks, key=lambda x: x[1])
         
         # Update relevance scores
-        for i, chunk in enumerate(top_chunks):
-            chunk.relevance_score = scored_chunks[i][1] if i < len(scored_chunks) else 0
+        top_chunks = []
+        for chunk, score in scored_chunks:
+            chunk.relevance_score = round(score, 4)
+            top_chunks.append(chunk)
         
-        retrieval_time = (time.time() - start_time) * 1000
+        retrieval_time = (time.perf_counter() - start_time) * 1000
         
         return RetrievalResult(
             query=query,
             chunks=top_chunks,
-            total_found=len(scored_chunks),
+            total_found=len(scores),
             categories_searched=[c.value for c in categories],
             retrieval_time_ms=retrieval_time
         )
@@ -386,31 +496,6 @@ class RAGRetriever:
             categories = [KnowledgeCategory.TRENDS, KnowledgeCategory.SUSTAINABILITY, KnowledgeCategory.TECHNOLOGY]
         
         return categories
-    
-    def _calculate_relevance(self, query_words: set, chunk: KnowledgeChunk) -> float:
-        """Calculate relevance score between query and chunk"""
-        chunk_words = set(re.findall(r'\b\w+\b', chunk.content.lower()))
-        
-        # Word overlap
-        overlap = len(query_words & chunk_words)
-        if overlap == 0:
-            return 0.0
-        
-        # Jaccard similarity
-        union = len(query_words | chunk_words)
-        jaccard = overlap / union if union > 0 else 0
-        
-        # Boost for exact phrase matches
-        query_str = " ".join(sorted(query_words))
-        if query_str in chunk.content.lower():
-            jaccard *= 1.5
-        
-        # Boost for category relevance
-        category_boost = 1.0
-        if chunk.category in [KnowledgeCategory.TRENDS, KnowledgeCategory.SUSTAINABILITY]:
-            category_boost = 1.2
-        
-        return min(jaccard * category_boost, 1.0)
 
 
 class RAGGenerator:
@@ -489,7 +574,7 @@ class RAGSystem:
         stats = {
             "total_chunks": len(self.knowledge_base.chunks),
             "categories": {},
-            "keywords_indexed": len(self.knowledge_base.keyword_index)
+            "keywords_indexed": len(self.knowledge_base.index.postings)
         }
         
         for category in KnowledgeCategory:
@@ -6,23 +6,40 @@ Comprehensive safety system for AI outputs including:
 - Output validation and filtering
 - Confidence scoring
 - Hallucination detection
-- Rate limiting
+- Rate limiting (GCRA, in-memory or SQLite shared state)
 - Content moderation
 
 Inspired by Manus AI safety architecture.
+
+Rate limiting configuration:
+- SAFETY_RATE_LIMIT_BACKEND: "memory" (per process) or "sqlite" (shared by workers)
+- SAFETY_RATE_LIMIT_DB_PATH: SQLite file for the shared backend (default /tmp/mcleuker_rate_limits.db)
+- SAFETY_RATE_LIMIT_MAX_KEYS: in-memory key cap before idle keys are force-evicted (default 100000)
+- SAFETY_RATE_LIMIT_SWEEP_SECONDS: how often the SQLite backend deletes idle keys (default 60)
+- SAFETY_RATE_LIMIT_BURST_FRACTION: share of each window's limit admitted as an
+  immediate burst (default 0.5); the rest is spread over the window
 """
 
 import re
 import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, Tuple
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
+from collections import OrderedDict
 import logging
 
 logger = logging.getLogger(__name__)
 
+SAFETY_RATE_LIMIT_BACKEND = os.getenv("SAFETY_RATE_LIMIT_BACKEND", "memory").lower()
+SAFETY_RATE_LIMIT_DB_PATH = os.getenv("SAFETY_RATE_LIMIT_DB_PATH", "/tmp/mcleuker_rate_limits.db")
+SAFETY_RATE_LIMIT_MAX_KEYS = int(os.getenv("SAFETY_RATE_LIMIT_MAX_KEYS", "100000"))
+SAFETY_RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("SAFETY_RATE_LIMIT_SWEEP_SECONDS", "60"))
+SAFETY_RATE_LIMIT_BURST_FRACTION = float(os.getenv("SAFETY_RATE_LIMIT_BURST_FRACTION", "0.5"))
+
 
 class SafetyLevel(Enum):
     """Safety levels for content"""
@@ -366,76 +383,244 @@ class ConfidenceScorer:
         return avg_weight
 
 
+# Limiter state per key: one theoretical arrival time (TAT) per window.
+# A key whose TATs are all in the past is fully replenished, so dropping it
+# is lossless; that is the idle-eviction rule for both backends.
+RateState = List[float]
+
+
+class MemoryRateLimitBackend:
+    """Per-process limiter state, oldest-touched keys first"""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = SAFETY_RATE_LIMIT_MAX_KEYS, sweep_batch: int = 4):
+        self.max_keys = max_keys
+        self.sweep_batch = sweep_batch
+        self._states: "OrderedDict[str, RateState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.forced_evictions = 0
+
+    def transact(self, key: str, now: float, fn: Callable[[Optional[RateState]], Tuple[Optional[RateState], Any]]) -> Any:
+        with self._lock:
+            new_state, result = fn(self._states.get(key))
+            if new_state is not None:
+                self._states[key] = new_state
+                self._states.move_to_end(key)
+            self._sweep(now)
+            return result
+
+    def _sweep(self, now: float):
+        # Amortized O(1): look at a few of the least recently touched keys
+        for _ in range(min(self.sweep_batch, len(self._states))):
+            key, state = next(iter(self._states.items()))
+            if max(state) <= now:
+                del self._states[key]
+                self.evictions += 1
+            else:
+                self._states.move_to_end(key)
+        while len(self._states) > self.max_keys:
+            self._states.popitem(last=False)
+            self.forced_evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        keys = len(self._states)
+        # Key string + list of floats + dict slot, roughly
+        approx = sum(len(k) + 49 for k in self._states) + keys * (56 + 8 * 3 + 24 * 3 + 100)
+        return {
+            "backend": self.name,
+            "keys": keys,
+            "approx_memory_bytes": approx,
+            "evictions": self.evictions,
+            "forced_evictions": self.forced_evictions,
+        }
+
+
+class SQLiteRateLimitBackend:
+    """Limiter state in a WAL SQLite file shared by every worker on the host"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SAFETY_RATE_LIMIT_DB_PATH, sweep_seconds: float = SAFETY_RATE_LIMIT_SWEEP_SECONDS):
+        self.path = path
+        self.sweep_seconds = sweep_seconds
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, state TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_expires ON rate_limits(expires)")
+        return self._db
+
+    def transact(self, key: str, now: float, fn: Callable[[Optional[RateState]], Tuple[Optional[RateState], Any]]) -> Any:
+        with self._lock:
+            db = self._connect()
+            # IMMEDIATE takes the write lock up front so check-and-record is atomic across processes
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT state FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                new_state, result = fn(json.loads(row[0]) if row else None)
+                if new_state is not None:
+                    db.execute(
+                        "INSERT OR REPLACE INTO rate_limits (key, state, expires) VALUES (?, ?, ?)",
+                        (key, json.dumps(new_state), max(new_state)),
+                    )
+                if now >= self._next_sweep:
+                    self._next_sweep = now + self.sweep_seconds
+                    self.evictions += db.execute("DELETE FROM rate_limits WHERE expires <= ?", (now,)).rowcount
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"backend": self.name, "path": self.path, "evictions": self.evictions}
+        try:
+            with self._lock:
+                stats["keys"] = self._connect().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+            stats["db_bytes"] = os.path.getsize(self.path)
+        except (sqlite3.Error, OSError) as e:
+            stats["error"] = str(e)
+        return stats
+
+
+def create_rate_limit_backend(kind: str = SAFETY_RATE_LIMIT_BACKEND):
+    """Backend by name; falls back to in-memory if SQLite cannot be opened"""
+    if kind == "sqlite":
+        backend = SQLiteRateLimitBackend()
+        try:
+            with backend._lock:
+                backend._connect()
+            return backend
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"SQLite rate limit backend unavailable, using memory: {e}")
+    return MemoryRateLimitBackend()
+
+
 class RateLimiter:
-    """Rate limiting for API requests"""
-    
+    """
+    Rate limiting for API requests.
+    GCRA per window: one timestamp per window per user, O(1) check-and-record.
+    Each window admits a burst of B = limit * burst_fraction requests, then
+    one request per window / (limit - B + 1) seconds, so no rolling window
+    ever holds more than `limit` requests.
+    """
+
+    WINDOW_SECONDS = {"minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
     def __init__(
         self,
         requests_per_minute: int = 60,
         requests_per_hour: int = 500,
-        requests_per_day: int = 5000
+        requests_per_day: int = 5000,
+        backend=None,
+        burst_fraction: float = SAFETY_RATE_LIMIT_BURST_FRACTION
     ):
         self.limits = {
             "minute": requests_per_minute,
             "hour": requests_per_hour,
             "day": requests_per_day
         }
-        self.requests: Dict[str, List[datetime]] = defaultdict(list)
-    
+        # (name, tolerance, emission interval, burst): a request is admitted
+        # while its theoretical arrival time stays within `tolerance` of now.
+        # With burst B and interval window / (limit - B + 1), any rolling
+        # window holds fewer than B + (limit - B + 1) arrivals.
+        self._windows = []
+        for name, limit in self.limits.items():
+            burst = max(1, min(limit, round(limit * burst_fraction)))
+            interval = self.WINDOW_SECONDS[name] / (limit - burst + 1)
+            self._windows.append((name, burst * interval, interval, burst))
+        self.backend = backend or create_rate_limit_backend()
+        self._stats = {"checks": 0, "allowed": 0, "denied": 0, "backend_errors": 0}
+
+    def _admit(self, state: Optional[RateState], now: float) -> Tuple[Optional[str], RateState]:
+        """First window that would be exceeded (or None), and the state after admitting"""
+        new_state = []
+        for i, (name, tolerance, interval, _) in enumerate(self._windows):
+            tat = max(state[i], now) if state else now
+            if tat + interval - now > tolerance + 1e-9:
+                return name, state
+            new_state.append(tat + interval)
+        return None, new_state
+
+    def _error(self, window: str) -> str:
+        return f"Rate limit exceeded: {self.limits[window]} requests per {window}"
+
+    def _run(self, user_id: str, record: bool) -> Tuple[bool, Optional[str]]:
+        now = time.time()
+
+        def fn(state):
+            exceeded, new_state = self._admit(state, now)
+            return (new_state if record and not exceeded else None), exceeded
+
+        self._stats["checks"] += 1
+        try:
+            exceeded = self.backend.transact(user_id, now, fn)
+        except Exception as e:
+            # Fail open: the limiter must not take the API down
+            self._stats["backend_errors"] += 1
+            logger.warning(f"Rate limit backend error: {e}")
+            return True, None
+        if exceeded:
+            self._stats["denied"] += 1
+            return False, self._error(exceeded)
+        self._stats["allowed"] += 1
+        return True, None
+
     def check(self, user_id: str) -> Tuple[bool, Optional[str]]:
         """Check if user is within rate limits"""
-        now = datetime.utcnow()
-        user_requests = self.requests[user_id]
-        
-        # Clean old requests
-        user_requests[:] = [
-            req for req in user_requests
-            if now - req < timedelta(days=1)
-        ]
-        
-        # Check limits
-        minute_ago = now - timedelta(minutes=1)
-        hour_ago = now - timedelta(hours=1)
-        
-        minute_count = sum(1 for req in user_requests if req > minute_ago)
-        hour_count = sum(1 for req in user_requests if req > hour_ago)
-        day_count = len(user_requests)
-        
-        if minute_count >= self.limits["minute"]:
-            return False, f"Rate limit exceeded: {self.limits['minute']} requests per minute"
-        if hour_count >= self.limits["hour"]:
-            return False, f"Rate limit exceeded: {self.limits['hour']} requests per hour"
-        if day_count >= self.limits["day"]:
-            return False, f"Rate limit exceeded: {self.limits['day']} requests per day"
-        
-        return True, None
-    
+        return self._run(user_id, record=False)
+
+    def acquire(self, user_id: str) -> Tuple[bool, Optional[str]]:
+        """Check and record a request atomically"""
+        return self._run(user_id, record=True)
+
     def record(self, user_id: str):
         """Record a request"""
-        self.requests[user_id].append(datetime.utcnow())
-    
+        now = time.time()
+
+        def fn(state):
+            new_state = [
+                max(state[i], now) + interval if state else now + interval
+                for i, (_, _, interval, _) in enumerate(self._windows)
+            ]
+            return new_state, None
+
+        try:
+            self.backend.transact(user_id, now, fn)
+        except Exception as e:
+            self._stats["backend_errors"] += 1
+            logger.warning(f"Rate limit backend error: {e}")
+
     def get_usage(self, user_id: str) -> Dict:
-        """Get usage statistics for a user"""
-        now = datetime.utcnow()
-        user_requests = self.requests.get(user_id, [])
-        
-        minute_ago = now - timedelta(minutes=1)
-        hour_ago = now - timedelta(hours=1)
-        
-        return {
-            "minute": {
-                "used": sum(1 for req in user_requests if req > minute_ago),
-                "limit": self.limits["minute"]
-            },
-            "hour": {
-                "used": sum(1 for req in user_requests if req > hour_ago),
-                "limit": self.limits["hour"]
-            },
-            "day": {
-                "used": len([req for req in user_requests if now - req < timedelta(days=1)]),
-                "limit": self.limits["day"]
-            }
-        }
+        """Get usage statistics for a user (requests not yet replenished per window)"""
+        now = time.time()
+        try:
+            state = self.backend.transact(user_id, now, lambda st: (None, st))
+        except Exception:
+            state = None
+        usage = {}
+        for i, (name, _, interval, burst) in enumerate(self._windows):
+            used = max(0.0, state[i] - now) / interval if state else 0.0
+            usage[name] = {"used": min(burst, int(used + 0.999)), "limit": self.limits[name], "burst": burst}
+        return usage
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "limits": dict(self.limits), **self.backend.get_stats()}
 
 
 class SafetyGuard:
@@ -457,8 +642,14 @@ class SafetyGuard:
     ) -> ValidationResult:
         """Validate an incoming request"""
         
-        # Rate limit check
-        allowed, error = self.rate_limiter.check(user_id)
+        # Input validation (local); only valid requests count against the limit
+        result = self.input_validator.validate(query, context)
+        
+        # Rate limit check (and record, in one backend transaction)
+        if result.is_valid:
+            allowed, error = self.rate_limiter.acquire(user_id)
+        else:
+            allowed, error = self.rate_limiter.check(user_id)
         if not allowed:
             return ValidationResult(
                 is_valid=False,
@@ -466,12 +657,6 @@ class SafetyGuard:
                 issues=[error]
             )
         
-        # Input validation
-        result = self.input_validator.validate(query, context)
-        
-        if result.is_valid:
-            self.rate_limiter.record(user_id)
-        
         return result
     
     def validate_response(
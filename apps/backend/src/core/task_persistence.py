@@ -8,20 +8,33 @@ Architecture:
   2. Events are buffered in-memory AND stored in Supabase execution_history
   3. SSE endpoint streams events from buffer (live) or replays from DB (reconnect)
   4. WebSocket also receives events for the live execution panel
+  5. Events are also appended to a durable event log (src/core/event_log.py)
+     so a reconnect that lands on another uvicorn worker can tail them
 """
 
 import asyncio
 import json
 import logging
+import os
 import time
 import uuid
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
-from typing import Any, AsyncGenerator, Callable, Coroutine, Dict, List, Optional
+from typing import Any, AsyncGenerator, Callable, Coroutine, Dict, Iterator, List, Optional, Tuple
+
+from .event_log import TASK_EVENT_LOG_RETENTION_HOURS, EventLogBackend
 
 logger = logging.getLogger(__name__)
 
+# Events kept in memory per execution (older ones fall out of the ring)
+EVENT_BUFFER_CAPACITY = int(os.getenv("TASK_EVENT_BUFFER_CAPACITY", "500"))
+# Top-level string fields larger than this (e.g. base64 screenshots) are stored out-of-line
+LARGE_PAYLOAD_BYTES = int(os.getenv("TASK_EVENT_LARGE_PAYLOAD_BYTES", "16384"))
+# Out-of-line payload budget per execution; oldest payloads are dropped beyond it
+PAYLOAD_BUDGET_BYTES = int(os.getenv("TASK_EVENT_PAYLOAD_BUDGET_MB", "16")) * 1024 * 1024
+
 
 class ExecutionStatus(str, Enum):
     PENDING = "pending"
@@ -32,13 +45,170 @@ class ExecutionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class BufferedEvent:
-    """A single event in the execution stream."""
+    """A single event in the execution stream.
+
+    When buffered, large payload fields are moved out of `data` and `refs`
+    maps the field name to its key in the execution's PayloadStore, and
+    `inline_size` holds the serialized size of what stayed inline.
+    """
     event_type: str
     data: Dict[str, Any]
     timestamp: float = field(default_factory=time.time)
     sequence: int = 0
+    refs: Optional[Dict[str, int]] = None
+    inline_size: int = field(default=0, repr=False, compare=False)
+
+
+class PayloadStore:
+    """Out-of-line storage for large event fields, bounded by a byte budget.
+
+    Payloads are evicted oldest-first once the budget is exceeded; events
+    referencing an evicted payload are replayed without that field.
+    """
+
+    def __init__(self, budget_bytes: int = PAYLOAD_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._items: "OrderedDict[int, str]" = OrderedDict()
+        self._next_key = 0
+        self.bytes = 0
+        self.stored = 0
+        self.evicted = 0
+        self.evicted_bytes = 0
+
+    def put(self, value: str) -> int:
+        self._next_key += 1
+        self._items[self._next_key] = value
+        self.bytes += len(value)
+        self.stored += 1
+        while self.bytes > self.budget_bytes and len(self._items) > 1:
+            _, old = self._items.popitem(last=False)
+            self.bytes -= len(old)
+            self.evicted += 1
+            self.evicted_bytes += len(old)
+        return self._next_key
+
+    def get(self, key: int) -> Optional[str]:
+        return self._items.get(key)
+
+    def discard(self, key: int):
+        value = self._items.pop(key, None)
+        if value is not None:
+            self.bytes -= len(value)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class EventRingBuffer:
+    """Fixed-capacity event log indexed by sequence number.
+
+    Append is O(1) and overwrites the oldest slot once full; `since(seq)`
+    jumps straight to the slot after `seq` for reconnect replay. Large
+    fields are split into `payloads` on append and restored by `resolve`.
+    """
+
+    def __init__(self, capacity: int = EVENT_BUFFER_CAPACITY, payloads: Optional[PayloadStore] = None):
+        self.capacity = max(1, capacity)
+        self._slots: List[Optional[BufferedEvent]] = [None] * self.capacity
+        self.first_sequence = 1
+        self.last_sequence = 0
+        self.payloads = payloads if payloads is not None else PayloadStore()
+        self.inline_bytes = 0
+        self.appended = 0
+        self.evicted = 0
+
+    def append(self, event: BufferedEvent) -> BufferedEvent:
+        """Store an event (its sequence must follow the previous one). Returns the stored copy."""
+        if self.last_sequence == 0:
+            self.first_sequence = event.sequence
+        elif event.sequence != self.last_sequence + 1:
+            raise ValueError(f"Non-contiguous event sequence {event.sequence} after {self.last_sequence}")
+
+        data, refs = event.data, None
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if isinstance(value, str) and len(value) > LARGE_PAYLOAD_BYTES:
+                    if refs is None:
+                        data, refs = dict(data), {}
+                    refs[key] = self.payloads.put(value)
+                    data[key] = None
+        stored = replace(event, data=data, refs=refs)
+        stored.inline_size = self._inline_size(stored)
+
+        slot = event.sequence % self.capacity
+        old = self._slots[slot]
+        if old is not None:
+            self._forget(old)
+            self.first_sequence = old.sequence + 1
+        self._slots[slot] = stored
+        self.inline_bytes += stored.inline_size
+        self.last_sequence = event.sequence
+        self.appended += 1
+        return stored
+
+    def _forget(self, event: BufferedEvent):
+        self.inline_bytes -= event.inline_size
+        self.evicted += 1
+        for key in (event.refs or {}).values():
+            self.payloads.discard(key)
+
+    @staticmethod
+    def _inline_size(event: BufferedEvent) -> int:
+        try:
+            return len(json.dumps(event.data, default=str)) + len(event.event_type)
+        except (TypeError, ValueError):
+            return 0
+
+    def get(self, sequence: int) -> Optional[BufferedEvent]:
+        if sequence < self.first_sequence or sequence > self.last_sequence:
+            return None
+        return self._slots[sequence % self.capacity]
+
+    def since(self, sequence: int) -> Iterator[BufferedEvent]:
+        """Yield buffered events with sequence > `sequence`, including ones appended while iterating."""
+        seq = max(sequence + 1, self.first_sequence)
+        while seq <= self.last_sequence:
+            seq = max(seq, self.first_sequence)  # Skip slots overwritten meanwhile
+            evt = self.get(seq)
+            if evt is not None:
+                yield evt
+            seq += 1
+
+    def resolve(self, event: BufferedEvent) -> BufferedEvent:
+        """Return the event with its out-of-line payloads restored."""
+        if not event.refs:
+            return event
+        data = dict(event.data)
+        for key, ref in event.refs.items():
+            value = self.payloads.get(ref)
+            if value is None:
+                data.pop(key, None)
+                data["payload_evicted"] = True
+            else:
+                data[key] = value
+        return replace(event, data=data, refs=None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "capacity": self.capacity,
+            "events": len(self),
+            "first_sequence": self.first_sequence,
+            "last_sequence": self.last_sequence,
+            "events_evicted": self.evicted,
+            "inline_bytes": self.inline_bytes,
+            "payloads": len(self.payloads),
+            "payload_bytes": self.payloads.bytes,
+            "payloads_evicted": self.payloads.evicted,
+            "payload_bytes_evicted": self.payloads.evicted_bytes,
+        }
+
+    def __len__(self):
+        return self.last_sequence - self.first_sequence + 1 if self.last_sequence else 0
+
+    def __iter__(self) -> Iterator[BufferedEvent]:
+        return self.since(0)
 
 
 @dataclass
@@ -50,7 +220,7 @@ class PersistentExecution:
     mode: str = "agent"
     conversation_id: Optional[str] = None
     status: ExecutionStatus = ExecutionStatus.PENDING
-    events: List[BufferedEvent] = field(default_factory=list)
+    events: EventRingBuffer = field(default_factory=EventRingBuffer)
     steps: List[Dict] = field(default_factory=list)
     result: Dict = field(default_factory=dict)
     files_generated: List[Dict] = field(default_factory=list)
@@ -73,27 +243,36 @@ class TaskPersistenceManager:
     Tasks run independently of SSE/WebSocket connections.
     """
 
-    def __init__(self, supabase=None, ws_manager=None):
+    def __init__(self, supabase=None, ws_manager=None, event_log: Optional[EventLogBackend] = None):
         self.supabase = supabase
         self.ws_manager = ws_manager
+        self.event_log = event_log
         self._executions: Dict[str, PersistentExecution] = {}
-        self._max_buffer_size = 500  # Max events to keep in memory per execution
+        self._max_buffer_size = EVENT_BUFFER_CAPACITY  # Max events to keep in memory per execution
         self._cleanup_interval = 300  # Clean up completed executions after 5 min
         self._cleanup_task: Optional[asyncio.Task] = None
 
     async def start(self):
-        """Start the cleanup background task."""
+        """Start the cleanup background task (and the durable event log)."""
+        if self.event_log:
+            try:
+                await self.event_log.start()
+            except Exception as e:
+                logger.warning(f"Event log unavailable, reconnects limited to this worker: {e}")
+                self.event_log = None
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
         logger.info("TaskPersistenceManager started")
 
     async def stop(self):
-        """Stop the cleanup task."""
+        """Stop the cleanup task and flush the event log."""
         if self._cleanup_task:
             self._cleanup_task.cancel()
             try:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+        if self.event_log:
+            await self.event_log.stop()
 
     # ========================================================================
     # EXECUTION LIFECYCLE
@@ -116,6 +295,7 @@ class TaskPersistenceManager:
             task_description=task_description,
             mode=mode,
             conversation_id=conversation_id,
+            events=EventRingBuffer(self._max_buffer_size),
         )
         self._executions[eid] = execution
 
@@ -217,12 +397,12 @@ class TaskPersistenceManager:
             sequence=execution._event_sequence,
         )
 
-        # Buffer the event (trim if too large)
+        # Buffer the event (O(1); large payloads go out-of-line, oldest event falls out)
         execution.events.append(buffered)
-        if len(execution.events) > self._max_buffer_size:
-            execution.events = execution.events[-self._max_buffer_size:]
+        if self.event_log:
+            self.event_log.append(execution_id, buffered.sequence, event_type, data, buffered.timestamp)
 
-        # Notify all SSE subscribers
+        # Notify all SSE subscribers (live events carry their payloads inline)
         for queue in execution._subscribers:
             try:
                 queue.put_nowait(buffered)
@@ -264,6 +444,11 @@ class TaskPersistenceManager:
         """
         execution = self._executions.get(execution_id)
         if not execution:
+            # Running (or ran) on another worker: tail the shared event log
+            if self.event_log and await self.event_log.last_sequence(execution_id):
+                async for evt in self._tail_event_log(execution_id, from_sequence):
+                    yield evt
+                return
             # Try to load from DB
             execution = await self._db_load(execution_id)
             if not execution:
@@ -273,10 +458,19 @@ class TaskPersistenceManager:
         execution._subscribers.append(queue)
 
         try:
+            # Events that already fell out of the ring come from the durable log
+            last_sent = from_sequence
+            if self.event_log and from_sequence + 1 < execution.events.first_sequence:
+                for seq, etype, data, ts in await self.event_log.read(
+                    execution_id, from_sequence, limit=execution.events.first_sequence - from_sequence - 1
+                ):
+                    last_sent = seq
+                    yield BufferedEvent(event_type=etype, data=data, timestamp=ts, sequence=seq)
+
             # Replay buffered events
-            for evt in execution.events:
-                if evt.sequence > from_sequence:
-                    yield evt
+            for evt in execution.events.since(last_sent):
+                last_sent = evt.sequence
+                yield execution.events.resolve(evt)
 
             # If already completed, we're done
             if execution.status in (ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.CANCELLED):
@@ -286,6 +480,8 @@ class TaskPersistenceManager:
             while True:
                 try:
                     evt = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    if evt.sequence <= last_sent:
+                        continue  # Already sent during replay
                     yield evt
                     if evt.event_type in ("execution_complete", "execution_error", "execution_cancelled"):
                         break
@@ -300,6 +496,14 @@ class TaskPersistenceManager:
     # EXECUTION MANAGEMENT
     # ========================================================================
 
+    async def _tail_event_log(self, execution_id: str, from_sequence: int) -> AsyncGenerator[BufferedEvent, None]:
+        async for record in self.event_log.tail(execution_id, from_sequence):
+            if record is None:
+                yield BufferedEvent(event_type="keepalive", data={"status": "running"})
+                continue
+            seq, etype, data, ts = record
+            yield BufferedEvent(event_type=etype, data=data, timestamp=ts, sequence=seq)
+
     async def cancel_execution(self, execution_id: str):
         """Cancel a running execution."""
         execution = self._executions.get(execution_id)
@@ -324,6 +528,7 @@ class TaskPersistenceManager:
             "error": execution.error,
             "event_count": len(execution.events),
             "last_sequence": execution._event_sequence,
+            "event_log": execution.events.stats(),
             "created_at": execution.created_at,
             "started_at": execution.started_at,
             "completed_at": execution.completed_at,
@@ -355,6 +560,21 @@ class TaskPersistenceManager:
 
         return sorted(active, key=lambda x: x.get("created_at", 0), reverse=True)[:limit]
 
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Memory held by in-process event logs (for /health)."""
+        per_execution = {eid: e.events.stats() for eid, e in self._executions.items()}
+        return {
+            "executions": len(per_execution),
+            "events": sum(s["events"] for s in per_execution.values()),
+            "inline_bytes": sum(s["inline_bytes"] for s in per_execution.values()),
+            "payload_bytes": sum(s["payload_bytes"] for s in per_execution.values()),
+            "payloads_evicted": sum(s["payloads_evicted"] for s in per_execution.values()),
+            "largest": sorted(
+                ({"execution_id": eid, **s} for eid, s in per_execution.items()),
+                key=lambda s: s["inline_bytes"] + s["payload_bytes"], reverse=True,
+            )[:5],
+        }
+
     # ========================================================================
     # INTERNAL HELPERS
     # ========================================================================
@@ -521,6 +741,8 @@ class TaskPersistenceManager:
                     del self._executions[eid]
                 if to_remove:
                     logger.info(f"Cleaned up {len(to_remove)} completed executions from memory")
+                if self.event_log:
+                    await self.event_log.prune(TASK_EVENT_LOG_RETENTION_HOURS * 3600)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -6,6 +6,9 @@ Manages WebSocket connections for:
 - Browser screenshot streaming
 - Execution progress updates
 - Live screen sharing
+
+Broadcasts are encoded once and fanned out through BroadcastHub, which gives
+every socket its own bounded queue and writer task.
 """
 
 import asyncio
@@ -14,6 +17,8 @@ from typing import Dict, Set, Any, Optional
 from fastapi import WebSocket
 import logging
 
+from .broadcast_hub import BroadcastHub
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,10 +28,12 @@ class ExecutionWebSocketManager:
     def __init__(self):
         self._connections: Dict[str, Set[WebSocket]] = {}  # execution_id -> websockets
         self._global_connections: Set[WebSocket] = set()
+        self.hub = BroadcastHub()
 
     async def connect(self, websocket: WebSocket, execution_id: Optional[str] = None):
         """Accept a WebSocket connection."""
         await websocket.accept()
+        self.hub.register(websocket)
         if execution_id:
             if execution_id not in self._connections:
                 self._connections[execution_id] = set()
@@ -42,6 +49,7 @@ class ExecutionWebSocketManager:
             if not self._connections[execution_id]:
                 del self._connections[execution_id]
         self._global_connections.discard(websocket)
+        self.hub.discard(websocket)
 
     async def broadcast(self, event_type: str, data: Dict, execution_id: Optional[str] = None):
         """Broadcast an event to all relevant connections."""
@@ -52,12 +60,7 @@ class ExecutionWebSocketManager:
             targets.update(self._connections[execution_id])
         targets.update(self._global_connections)
 
-        disconnected = set()
-        for ws in targets:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                disconnected.add(ws)
+        disconnected = set(self.hub.publish(targets, message, event_type, execution_id or ""))
 
         # Clean up disconnected
         for ws in disconnected:
@@ -65,6 +68,9 @@ class ExecutionWebSocketManager:
             for eid in list(self._connections.keys()):
                 self._connections[eid].discard(ws)
 
+    def get_stats(self) -> Dict[str, Any]:
+        return self.hub.get_stats()
+
     async def send_screenshot(self, screenshot_b64: str, url: str, title: str, execution_id: Optional[str] = None):
         """Send a browser screenshot to connected clients."""
         await self.broadcast("browser_screenshot", {
@@ -19,6 +19,7 @@ import base64
 import json
 import logging
 import re
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
@@ -34,6 +35,11 @@ from playwright.async_api import (
     TimeoutError as PlaywrightTimeout,
 )
 
+try:
+    from ...utils.browser_extraction import extraction_goto, load_stats, render_cache
+except ImportError:
+    from utils.browser_extraction import extraction_goto, load_stats, render_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -117,8 +123,12 @@ class BrowserEngineV3:
         viewport: Optional[Dict[str, int]] = None,
         user_agent: Optional[str] = None,
         llm_client: Optional[Any] = None,
+        pool: Optional[Any] = None,
     ):
         self.headless = headless
+        # Optional BrowserPool (src/agentic/browser_engine.py): sessions lease
+        # contexts from its shared browser instead of launching one here
+        self._pool = pool
         self.viewport = viewport or {"width": 1280, "height": 720}
         self.user_agent = user_agent or (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -131,6 +141,9 @@ class BrowserEngineV3:
         self._sessions: Dict[str, BrowserSessionV3] = {}
         self._default_session_id: Optional[str] = None
         self._screenshot_callback: Optional[Callable] = None
+        self._frame_callback: Optional[Callable] = None
+        # Lowered by the frame stream while WebSocket clients fall behind
+        self.screenshot_quality = 80
 
         logger.info("BrowserEngineV3 initialized")
 
@@ -154,7 +167,9 @@ class BrowserEngineV3:
 
     async def shutdown(self):
         for session in self._sessions.values():
-            if session.context:
+            if session.metadata.get("pooled"):
+                await self._pool.release(session.id, close=True)
+            elif session.context:
                 try:
                     await session.context.close()
                 except Exception:
@@ -169,6 +184,27 @@ class BrowserEngineV3:
     def set_screenshot_callback(self, callback: Callable):
         self._screenshot_callback = callback
 
+    def set_frame_callback(self, callback: Callable):
+        """Callback(session_id, jpeg_bytes, metadata) with raw frames for binary
+        streaming. May return the capture quality to use next."""
+        self._frame_callback = callback
+
+    async def _snapshot(self, page, session_id: str, metadata: Optional[Dict] = None) -> str:
+        """Capture once: raw bytes to the frame callback, base64 for the result."""
+        frame = await self._capture_frame(page)
+        if not frame:
+            return ""
+        if self._frame_callback:
+            try:
+                quality = await self._frame_callback(session_id, frame, {"url": page.url, **(metadata or {})})
+                if quality:
+                    self.screenshot_quality = quality
+            except Exception as e:
+                logger.error(f"Frame callback error: {e}")
+        screenshot_b64 = base64.b64encode(frame).decode("utf-8")
+        await self._notify_screenshot(session_id, screenshot_b64, metadata)
+        return screenshot_b64
+
     async def _notify_screenshot(self, session_id: str, screenshot_b64: str, metadata: Optional[Dict] = None):
         if self._screenshot_callback:
             try:
@@ -190,17 +226,27 @@ class BrowserEngineV3:
     # -- Session management ----------------------------------------------------
 
     async def create_session(self, session_id: Optional[str] = None) -> str:
-        await self.initialize()
         session = BrowserSessionV3(id=session_id or str(uuid4()))
-        context = await self._browser.new_context(
-            viewport=self.viewport,
-            user_agent=self.user_agent,
-            accept_downloads=True,
-        )
+        if self._pool is not None:
+            lease = await self._pool.acquire(session.id, context_options={
+                "viewport": self.viewport,
+                "user_agent": self.user_agent,
+                "accept_downloads": True,
+            })
+            context, page = lease.context, lease.current_page
+            session.metadata["pooled"] = True
+            session.metadata["lease"] = lease
+        else:
+            await self.initialize()
+            context = await self._browser.new_context(
+                viewport=self.viewport,
+                user_agent=self.user_agent,
+                accept_downloads=True,
+            )
+            page = await context.new_page()
         context.set_default_timeout(30000)
         context.set_default_navigation_timeout(30000)
         session.context = context
-        page = await context.new_page()
         session.pages.append(page)
         self._sessions[session.id] = session
         if self._default_session_id is None:
@@ -210,14 +256,24 @@ class BrowserEngineV3:
 
     async def close_session(self, session_id: str):
         session = self._sessions.pop(session_id, None)
-        if session and session.context:
+        render_cache.discard_scope(session_id)
+        if session and session.metadata.get("pooled"):
+            await self._pool.release(session_id, close=True)
+            logger.info(f"Released pooled browser session: {session_id}")
+        elif session and session.context:
             await session.context.close()
             logger.info(f"Closed browser session: {session_id}")
 
     def get_session(self, session_id: Optional[str] = None) -> Optional[BrowserSessionV3]:
-        if session_id:
-            return self._sessions.get(session_id)
-        return self._sessions.get(self._default_session_id)
+        session = self._sessions.get(session_id or self._default_session_id)
+        lease = session.metadata.get("lease") if session else None
+        if lease is not None and lease.metadata.get("closed"):
+            # The pool reclaimed this session's context; callers open a new one
+            self._sessions.pop(session.id, None)
+            if self._default_session_id == session.id:
+                self._default_session_id = None
+            return None
+        return session
 
     # -- Navigation ------------------------------------------------------------
 
@@ -239,10 +295,11 @@ class BrowserEngineV3:
 
         try:
             logger.info(f"Navigating to: {url}")
+            nav_start = time.perf_counter()
             response = await page.goto(url, wait_until=wait_until, timeout=timeout)
             await page.wait_for_load_state("domcontentloaded")
-            screenshot_b64 = await self._take_screenshot(page)
-            await self._notify_screenshot(session.id, screenshot_b64, {"action": "navigate", "url": url})
+            load_stats.record("full", (time.perf_counter() - nav_start) * 1000)
+            screenshot_b64 = await self._snapshot(page, session.id, {"action": "navigate", "url": url})
             page_info = await self._get_page_info(page, screenshot_b64)
             session.last_activity = datetime.utcnow()
             return {
@@ -285,8 +342,7 @@ class BrowserEngineV3:
             await element.scroll_into_view_if_needed()
             await element.click(timeout=timeout)
             await asyncio.sleep(0.5)
-            screenshot_b64 = await self._take_screenshot(page)
-            await self._notify_screenshot(session.id, screenshot_b64, {"action": "click"})
+            screenshot_b64 = await self._snapshot(page, session.id, {"action": "click"})
             session.last_activity = datetime.utcnow()
             return {"success": True, "url": page.url, "title": await page.title(), "screenshot": screenshot_b64}
         except Exception as e:
@@ -325,8 +381,7 @@ class BrowserEngineV3:
             if submit:
                 await element.press("Enter")
                 await asyncio.sleep(0.5)
-            screenshot_b64 = await self._take_screenshot(page)
-            await self._notify_screenshot(session.id, screenshot_b64, {"action": "type"})
+            screenshot_b64 = await self._snapshot(page, session.id, {"action": "type"})
             session.last_activity = datetime.utcnow()
             return {"success": True, "text": text, "url": page.url, "screenshot": screenshot_b64}
         except Exception as e:
@@ -355,8 +410,7 @@ class BrowserEngineV3:
                 "left": f"window.scrollBy(-{amount}, 0)",
             }
             await page.evaluate(scroll_map.get(direction, scroll_map["down"]))
-            screenshot_b64 = await self._take_screenshot(page)
-            await self._notify_screenshot(session.id, screenshot_b64, {"action": "scroll", "direction": direction})
+            screenshot_b64 = await self._snapshot(page, session.id, {"action": "scroll", "direction": direction})
             session.last_activity = datetime.utcnow()
             return {"success": True, "direction": direction, "amount": amount, "screenshot": screenshot_b64}
         except Exception as e:
@@ -365,14 +419,35 @@ class BrowserEngineV3:
 
     # -- Text extraction -------------------------------------------------------
 
-    async def extract_text(self, selector: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+    async def extract_text(
+        self,
+        selector: Optional[str] = None,
+        session_id: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Read text from the current page, or from `url` loaded with the extraction profile.
+
+        Whole-page reads of a recently rendered `url` are served from the render cache.
+        """
+        if url and not selector:
+            cached = render_cache.get(url, "engine_v3", session_id or self._default_session_id)
+            if cached:
+                load_stats.cache_hits += 1
+                return {**cached, "cached": True}
+
         session = self.get_session(session_id)
+        if not session and url:
+            session_id = await self.create_session(session_id)
+            session = self.get_session(session_id)
         if not session:
             return {"success": False, "error": "No active session"}
         page = session.current_page
         if not page:
             return {"success": False, "error": "No active page"}
         try:
+            if url:
+                await extraction_goto(page, url)
+                session.last_activity = datetime.utcnow()
             if selector:
                 element = await page.query_selector(selector)
                 text = await element.text_content() if element else None
@@ -380,7 +455,12 @@ class BrowserEngineV3:
                     return {"success": False, "error": f"Element not found: {selector}"}
             else:
                 text = await page.evaluate("() => document.body.innerText")
-            return {"success": True, "text": text, "length": len(text) if text else 0}
+            result = {"success": True, "text": text, "length": len(text) if text else 0}
+            if url:
+                result["url"] = page.url
+                if not selector:
+                    render_cache.put(url, result, "engine_v3", session.id)
+            return result
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -428,8 +508,7 @@ class BrowserEngineV3:
                 if btn:
                     await btn.click()
                     await asyncio.sleep(1)
-            screenshot_b64 = await self._take_screenshot(page)
-            await self._notify_screenshot(session.id, screenshot_b64, {"action": "fill_form"})
+            screenshot_b64 = await self._snapshot(page, session.id, {"action": "fill_form"})
             session.last_activity = datetime.utcnow()
             return {"success": all(r.get("success") for r in results), "fields": results, "screenshot": screenshot_b64}
         except Exception as e:
@@ -512,13 +591,16 @@ class BrowserEngineV3:
 
     # -- Internal helpers ------------------------------------------------------
 
-    async def _take_screenshot(self, page, full_page: bool = False) -> str:
+    async def _capture_frame(self, page, full_page: bool = False) -> bytes:
         try:
-            screenshot_bytes = await page.screenshot(full_page=full_page, type="jpeg", quality=80)
-            return base64.b64encode(screenshot_bytes).decode("utf-8")
+            return await page.screenshot(full_page=full_page, type="jpeg", quality=self.screenshot_quality)
         except Exception as e:
             logger.error(f"Screenshot failed: {e}")
-            return ""
+            return b""
+
+    async def _take_screenshot(self, page, full_page: bool = False) -> str:
+        frame = await self._capture_frame(page, full_page)
+        return base64.b64encode(frame).decode("utf-8") if frame else ""
 
     async def _get_page_info(self, page, screenshot_b64: Optional[str] = None) -> PageInfoV3:
         return PageInfoV3(
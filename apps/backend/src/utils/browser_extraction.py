@@ -0,0 +1,226 @@
+"""
+Browser Extraction Profile - fast page loads for text-only navigations.
+
+Navigations that only read `innerText` need no images, fonts, media or
+third-party trackers, and no `networkidle` wait. The extraction profile
+aborts those requests through Playwright routing, waits for
+`domcontentloaded`, then waits until the body text stops changing. Rendered
+text is kept in an in-memory cache, so callers that take no screenshot can
+re-read a recently loaded URL without touching the browser.
+
+Load times of the full and extraction profiles are tracked so /health can
+report the page-load time saved.
+
+Configuration:
+- BROWSER_EXTRACTION_BLOCK_TYPES: resource types to abort (default image,media,font)
+- BROWSER_EXTRACTION_STABLE_MS: text must be unchanged this long (default 300)
+- BROWSER_EXTRACTION_MAX_SETTLE_MS: give up waiting for stability after this (default 3000)
+- BROWSER_EXTRACTION_CACHE_TTL: seconds a rendered page stays cached (default 300)
+- BROWSER_EXTRACTION_CACHE_SIZE: max cached pages (default 256)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+BROWSER_EXTRACTION_BLOCK_TYPES = frozenset(
+    t.strip() for t in os.getenv("BROWSER_EXTRACTION_BLOCK_TYPES", "image,media,font").split(",") if t.strip()
+)
+BROWSER_EXTRACTION_STABLE_MS = int(os.getenv("BROWSER_EXTRACTION_STABLE_MS", "300"))
+BROWSER_EXTRACTION_MAX_SETTLE_MS = int(os.getenv("BROWSER_EXTRACTION_MAX_SETTLE_MS", "3000"))
+BROWSER_EXTRACTION_CACHE_TTL = float(os.getenv("BROWSER_EXTRACTION_CACHE_TTL", "300"))
+BROWSER_EXTRACTION_CACHE_SIZE = int(os.getenv("BROWSER_EXTRACTION_CACHE_SIZE", "256"))
+
+# Ad, analytics and tag-manager hosts (matched as host suffixes)
+BLOCKED_HOST_SUFFIXES = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "connect.facebook.net",
+    "analytics.tiktok.com", "ads.linkedin.com", "snap.licdn.com", "bat.bing.com",
+    "hotjar.com", "segment.io", "segment.com", "mixpanel.com", "amplitude.com", "fullstory.com",
+    "clarity.ms", "newrelic.com", "nr-data.net", "criteo.com", "criteo.net", "taboola.com",
+    "outbrain.com", "adnxs.com", "scorecardresearch.com", "quantserve.com", "amazon-adsystem.com",
+    "ct.pinterest.com", "cdn.cookielaw.org", "optimizely.com", "branch.io",
+)
+
+_TEXT_LENGTH_JS = "() => document.body ? document.body.innerText.length : 0"
+
+
+def is_blocked_request(resource_type: str, url: str) -> bool:
+    """True if the extraction profile should abort this request."""
+    if resource_type in BROWSER_EXTRACTION_BLOCK_TYPES:
+        return True
+    host = urlsplit(url).hostname or ""
+    return any(host == suffix or host.endswith("." + suffix) for suffix in BLOCKED_HOST_SUFFIXES)
+
+
+def cache_key(url: str) -> str:
+    """Cache key for a URL: scheme/host lower-cased, fragment dropped."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+# ============================================================================
+# Render cache and load-time stats
+# ============================================================================
+
+class RenderCache:
+    """TTL + LRU cache of recently rendered page text.
+
+    Entries are keyed by (kind, scope, URL): kind names the result shape of
+    the engine that stored it, scope the execution / session whose browser
+    context rendered it, so neither result shapes nor cookie-bearing pages
+    cross between engines or executions.
+    """
+
+    def __init__(self, ttl: float = BROWSER_EXTRACTION_CACHE_TTL, max_entries: int = BROWSER_EXTRACTION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, kind: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        key = (kind, scope or "", cache_key(url))
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def put(self, url: str, page: Dict[str, Any], kind: str, scope: str = ""):
+        if self.max_entries <= 0:
+            return
+        key = (kind, scope or "", cache_key(url))
+        self._entries[key] = (time.monotonic(), dict(page))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard_scope(self, scope: str):
+        """Drop the pages rendered by a finished execution / session."""
+        for key in [k for k in self._entries if k[1] == scope]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+
+class LoadTimeStats:
+    """Page-load timings per profile ("full" or "extraction")."""
+
+    def __init__(self):
+        self._count = {"full": 0, "extraction": 0}
+        self._total_ms = {"full": 0.0, "extraction": 0.0}
+        self.requests_blocked = 0
+        self.requests_allowed = 0
+        self.cache_hits = 0
+
+    def record(self, profile: str, elapsed_ms: float):
+        self._count[profile] = self._count.get(profile, 0) + 1
+        self._total_ms[profile] = self._total_ms.get(profile, 0.0) + elapsed_ms
+
+    def average_ms(self, profile: str) -> Optional[float]:
+        count = self._count.get(profile, 0)
+        return self._total_ms[profile] / count if count else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        full = self.average_ms("full")
+        fast = self.average_ms("extraction")
+        saved = None
+        if full is not None:
+            # Each fast load saves the difference; each cache hit saves a whole full load
+            saved = self._count["extraction"] * (full - (fast or 0.0)) + self.cache_hits * full
+        return {
+            "full_loads": self._count["full"],
+            "extraction_loads": self._count["extraction"],
+            "avg_full_ms": round(full, 1) if full is not None else None,
+            "avg_extraction_ms": round(fast, 1) if fast is not None else None,
+            "cache_hits": self.cache_hits,
+            "requests_blocked": self.requests_blocked,
+            "requests_allowed": self.requests_allowed,
+            "estimated_time_saved_s": round(saved / 1000, 1) if saved is not None else None,
+        }
+
+
+render_cache = RenderCache()
+load_stats = LoadTimeStats()
+
+
+def get_extraction_stats() -> Dict[str, Any]:
+    return {**load_stats.get_stats(), "render_cache": render_cache.get_stats()}
+
+
+# ============================================================================
+# Navigation
+# ============================================================================
+
+async def _route_extraction(route):
+    request = route.request
+    try:
+        if is_blocked_request(request.resource_type, request.url):
+            load_stats.requests_blocked += 1
+            await route.abort()
+        else:
+            load_stats.requests_allowed += 1
+            await route.continue_()
+    except Exception as e:  # Page closed or request already handled
+        logger.debug(f"Extraction route error: {e}")
+
+
+async def wait_for_stable_content(
+    page,
+    stable_ms: int = BROWSER_EXTRACTION_STABLE_MS,
+    max_ms: int = BROWSER_EXTRACTION_MAX_SETTLE_MS,
+    poll_ms: int = 100,
+) -> float:
+    """Wait until body text length stops changing. Returns ms waited."""
+    start = time.perf_counter()
+    deadline = start + max_ms / 1000
+    last_length = -1
+    stable_since = start
+    while True:
+        try:
+            length = await page.evaluate(_TEXT_LENGTH_JS)
+        except Exception:
+            length = -1  # Mid-navigation (client-side redirect); keep waiting
+        now = time.perf_counter()
+        if length != last_length or length <= 0:
+            last_length = length
+            stable_since = now
+        elif (now - stable_since) * 1000 >= stable_ms:
+            break
+        if now >= deadline:
+            break
+        await asyncio.sleep(poll_ms / 1000)
+    return (time.perf_counter() - start) * 1000
+
+
+async def extraction_goto(page, url: str, timeout: int = 30000):
+    """Navigate with the extraction profile. Returns the navigation response."""
+    start = time.perf_counter()
+    await page.route("**/*", _route_extraction)
+    try:
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        await wait_for_stable_content(page)
+    finally:
+        try:
+            await page.unroute("**/*", _route_extraction)
+        except Exception:
+            pass
+    load_stats.record("extraction", (time.perf_counter() - start) * 1000)
+    return response
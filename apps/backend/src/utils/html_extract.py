@@ -0,0 +1,121 @@
+"""
+HTML Extraction - readable text and links from fetched pages.
+
+Parsing a large retail or news page costs hundreds of milliseconds of CPU,
+so async callers go through `parse_off_loop`, which runs the extractor in a
+bounded worker pool instead of on the event loop. The lxml parser backend is
+used when installed (it is several times faster than html.parser).
+
+Configuration:
+- HTML_PARSE_WORKERS: pool size (default 4)
+- HTML_PARSE_USE_PROCESSES: "true" to use a process pool instead of threads
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+HTML_PARSE_WORKERS = int(os.getenv("HTML_PARSE_WORKERS", "4"))
+HTML_PARSE_USE_PROCESSES = os.getenv("HTML_PARSE_USE_PROCESSES", "false").lower() == "true"
+
+_STRIP_TAGS = ['script', 'style', 'nav', 'footer', 'header',
+               'aside', 'iframe', 'noscript', 'svg', 'form']
+_MAIN_SELECTORS = ['article', 'main', '[role="main"]', '.post-content',
+                   '.article-body', '.entry-content', '#content', '.content']
+_BLOCK_TAGS = ['h1', 'h2', 'h3', 'h4', 'p', 'li', 'td', 'th',
+               'blockquote', 'pre', 'code', 'figcaption']
+
+_pool: Optional[Executor] = None
+
+
+def extract_readable_content(html: str, max_length: int) -> Dict[str, str]:
+    """Extract the page title and main readable content as light markdown."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    title = ""
+    if soup.title and soup.title.string:
+        title = soup.title.string.strip()
+
+    for tag in soup.find_all(_STRIP_TAGS):
+        tag.decompose()
+
+    main_content = None
+    for selector in _MAIN_SELECTORS:
+        main_content = soup.select_one(selector)
+        if main_content:
+            break
+
+    if not main_content:
+        main_content = soup.body if soup.body else soup
+
+    content_parts = []
+    for element in main_content.find_all(_BLOCK_TAGS):
+        text = element.get_text(strip=True)
+        if not text or len(text) < 3:
+            continue
+        tag_name = element.name
+        if tag_name in ('h1', 'h2', 'h3', 'h4'):
+            content_parts.append(f"\n{'#' * int(tag_name[1])} {text}\n")
+        elif tag_name == 'li':
+            content_parts.append(f"- {text}")
+        elif tag_name == 'blockquote':
+            content_parts.append(f"> {text}")
+        elif tag_name in ('pre', 'code'):
+            content_parts.append(f"```\n{text}\n```")
+        else:
+            content_parts.append(text)
+
+    content = "\n".join(content_parts)
+    if len(content) < 100:
+        content = main_content.get_text(separator="\n", strip=True)
+
+    return {"title": title, "content": content[:max_length]}
+
+
+def extract_text_and_links(html: str, max_text: int = 5000, max_links: int = 20) -> Tuple[str, List[Tuple[str, str]]]:
+    """Extract visible page text and the first (href, link text) pairs."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(["script", "style", "nav", "footer"]):
+        tag.decompose()
+
+    text = soup.get_text(separator="\n", strip=True)[:max_text]
+    links = [
+        (a["href"], a.get_text(strip=True)[:100])
+        for a in soup.find_all("a", href=True)[:max_links]
+    ]
+    return text, links
+
+
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        if HTML_PARSE_USE_PROCESSES:
+            _pool = ProcessPoolExecutor(max_workers=HTML_PARSE_WORKERS)
+        else:
+            _pool = ThreadPoolExecutor(max_workers=HTML_PARSE_WORKERS, thread_name_prefix="html-parse")
+    return _pool
+
+
+async def parse_off_loop(fn, *args, **kwargs):
+    """Run an extractor from this module in the bounded parse pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_parse_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
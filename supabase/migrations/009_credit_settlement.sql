@@ -0,0 +1,94 @@
+-- ============================================================================
+-- McLeuker AI Platform - Batched Credit Settlement
+-- Version: 009
+-- Date: 2026-10-16
+-- Purpose: One atomic RPC that settles a billing session's locally debited
+--          credits (credit_service.py CreditLedger). Replaces the per-operation
+--          user_credits / users / credit_transactions writes.
+-- ============================================================================
+
+-- ============================================================================
+-- 1. CREDIT SETTLEMENTS - Idempotency keys for settle_credit_debits
+-- ============================================================================
+-- A settlement replayed from the backend's crash journal carries the same
+-- settlement_id, so it is applied at most once.
+CREATE TABLE IF NOT EXISTS credit_settlements (
+    settlement_id TEXT PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    session_id TEXT,
+    amount INTEGER NOT NULL,
+    balance_after INTEGER NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_credit_settlements_user_id ON credit_settlements(user_id);
+
+ALTER TABLE credit_settlements ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================================
+-- 2. settle_credit_debits - deduct, sync users, log the transaction in one call
+-- ============================================================================
+-- p_operations is a JSON array of {"op": ..., "cost": ...} kept in the
+-- transaction description for the usage history.
+CREATE OR REPLACE FUNCTION settle_credit_debits(
+    p_user_id UUID,
+    p_amount INTEGER,
+    p_settlement_id TEXT,
+    p_session_id TEXT DEFAULT NULL,
+    p_operations JSONB DEFAULT '[]'::jsonb
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_balance INTEGER;
+    v_previous INTEGER;
+BEGIN
+    IF p_amount IS NULL OR p_amount <= 0 THEN
+        RAISE EXCEPTION 'settle_credit_debits: amount must be positive (got %)', p_amount;
+    END IF;
+
+    SELECT balance_after INTO v_previous
+    FROM credit_settlements WHERE settlement_id = p_settlement_id;
+    IF FOUND THEN
+        RETURN jsonb_build_object('success', true, 'duplicate', true, 'new_balance', v_previous);
+    END IF;
+
+    UPDATE user_credits
+    SET balance = GREATEST(balance - p_amount, 0),
+        lifetime_used = lifetime_used + p_amount,
+        updated_at = NOW()
+    WHERE user_id = p_user_id
+    RETURNING balance INTO v_balance;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'error', 'No credit record');
+    END IF;
+
+    UPDATE users SET credit_balance = v_balance WHERE id = p_user_id;
+
+    INSERT INTO credit_transactions (user_id, amount, balance_after, type, description, session_id, operation)
+    VALUES (
+        p_user_id, -p_amount, v_balance, 'deduction',
+        'Credit deduction: ' || COALESCE(
+            (SELECT string_agg(e->>'op', ', ') FROM jsonb_array_elements(p_operations) AS e),
+            'session'
+        ),
+        p_session_id,
+        CASE WHEN jsonb_array_length(p_operations) = 1 THEN p_operations->0->>'op' ELSE 'batch' END
+    );
+
+    INSERT INTO credit_settlements (settlement_id, user_id, session_id, amount, balance_after)
+    VALUES (p_settlement_id, p_user_id, p_session_id, p_amount, v_balance);
+
+    RETURN jsonb_build_object('success', true, 'duplicate', false, 'new_balance', v_balance);
+END;
+$$;
+
+-- Backend only: a client able to call this could settle arbitrary amounts
+-- against any user. Revoke the PUBLIC default and the blanket grant to
+-- authenticated from migration 003.
+REVOKE EXECUTE ON FUNCTION settle_credit_debits(UUID, INTEGER, TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION settle_credit_debits(UUID, INTEGER, TEXT, TEXT, JSONB) TO service_role;